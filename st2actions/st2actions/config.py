@@ -65,7 +65,24 @@ def _register_action_runner_opts():
                         'Works only with Paramiko SSH runner.'),
         cfg.BoolOpt('use_ssh_config',
                     default=False,
-                    help='Use the .ssh/config file. Useful to override ports etc.')
+                    help='Use the .ssh/config file. Useful to override ports etc.'),
+        cfg.BoolOpt('use_remote_script_cache',
+                    default=False,
+                    help='Upload remote scripts and libs to a content addressed cache directory ' +
+                         'on the remote hosts and skip the upload if the content is already ' +
+                         'present.'),
+        cfg.StrOpt('remote_script_cache_dir',
+                   default='~/.st2-script-cache',
+                   help='Location of the remote script cache on the remote filesystem. Path ' +
+                        'which starts with "~/" is relative to the home directory of the SSH ' +
+                        'user. Cache is shared by all the actions so the action "dir" ' +
+                        'parameter doesn\'t apply to it.'),
+        cfg.IntOpt('remote_script_cache_ttl', default=86400,
+                   help='Remote script cache entries which haven\'t been used for this many ' +
+                        'seconds are removed.'),
+        cfg.IntOpt('remote_script_cache_prune_interval', default=3600,
+                   help='How often (in seconds) to prune stale remote script cache entries ' +
+                        'on a particular host.'),
     ]
     CONF.register_opts(ssh_runner_opts, group='ssh_runner')
 
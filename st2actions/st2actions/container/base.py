@@ -17,6 +17,9 @@ import json
 import sys
 import traceback
 
+import six
+from oslo_config import cfg
+
 from st2common import log as logging
 from st2common.util import date as date_utils
 from st2common.constants import action as action_constants
@@ -30,6 +33,7 @@ from st2common.services import access, executions
 from st2common.util.action_db import (get_action_by_ref, get_runnertype_by_name)
 from st2common.util.action_db import (update_liveaction_status, get_liveaction_by_id)
 from st2common.util import param as param_utils
+from st2common.util import signed_token
 
 from st2actions.container.service import RunnerContainerService
 from st2actions.runners import get_runner, AsyncActionRunner
@@ -41,6 +45,9 @@ __all__ = [
     'get_runner_container'
 ]
 
+# Signed execution tokens for actions with a timeout expire this many seconds after the timeout
+EXECUTION_TOKEN_TIMEOUT_GRACE_PERIOD = 60
+
 
 class RunnerContainer(object):
 
@@ -69,10 +76,6 @@ class RunnerContainer(object):
         return liveaction_db.result
 
     def _do_run(self, runner, runnertype_db, action_db, liveaction_db):
-        # Create a temporary auth token which will be available
-        # for the duration of the action execution.
-        runner.auth_token = self._create_auth_token(runner.context)
-
         updated_liveaction_db = None
         try:
             # Finalized parameters are resolved and then rendered. This process could
@@ -85,6 +88,12 @@ class RunnerContainer(object):
             except ParamException as e:
                 raise actionrunner.ActionRunnerException(str(e))
 
+            # Create a temporary auth token which will be available
+            # for the duration of the action execution.
+            runner.auth_token = self._create_auth_token(context=runner.context,
+                                                        execution_id=runner.execution_id,
+                                                        ttl=self._get_auth_token_ttl(runner))
+
             LOG.debug('Performing pre-run for runner: %s', runner.runner_id)
             runner.pre_run()
 
@@ -171,7 +180,12 @@ class RunnerContainer(object):
         finally:
             # Always clean-up the auth_token
             status = liveaction_db.status
-            self._clean_up_auth_token(runner=runner, status=status)
+            cleaned_up = self._clean_up_auth_token(runner=runner, status=status)
+
+            # Signed tokens which have been issued for the execution (e.g. the ones which have
+            # been passed to the workflow engine) stay valid until revoked
+            if not cleaned_up:
+                self._revoke_auth_tokens(execution_id=runner.execution_id)
 
         return liveaction_db
 
@@ -251,18 +265,55 @@ class RunnerContainer(object):
 
         return runner
 
-    def _create_auth_token(self, context):
+    def _create_auth_token(self, context, execution_id=None, ttl=None):
         if not context:
             return None
         user = context.get('user', None)
         if not user:
             return None
+        if access.execution_tokens_enabled() and execution_id:
+            return access.create_execution_token(user, execution_id=execution_id, ttl=ttl)
         return access.create_token(user)
 
+    def _get_auth_token_ttl(self, runner):
+        """
+        Return TTL for the signed execution token of the provided runner.
+
+        Tokens for synchronous actions with a timeout expire shortly after the action timeout.
+        Async actions (e.g. workflows) keep using the token after the runner returns so they use
+        the configured TTL.
+        """
+        ttl = cfg.CONF.auth.execution_token_ttl
+        timeout = (runner.runner_parameters or {}).get('timeout', None)
+
+        if isinstance(runner, AsyncActionRunner):
+            return ttl
+
+        if isinstance(timeout, six.integer_types) and not isinstance(timeout, bool) and timeout > 0:
+            ttl = min(ttl, timeout + EXECUTION_TOKEN_TIMEOUT_GRACE_PERIOD)
+
+        return ttl
+
     def _delete_auth_token(self, auth_token):
-        if auth_token:
+        if not auth_token:
+            return
+
+        if signed_token.is_signed_token(auth_token.token):
+            # Signed tokens are not stored in the database, revoke all the tokens which have been
+            # issued for the execution instead
+            access.revoke_execution_tokens(auth_token.metadata['execution_id'])
+        else:
             access.delete_token(auth_token.token)
 
+    def _revoke_auth_tokens(self, execution_id):
+        if not access.execution_tokens_enabled() or not execution_id:
+            return
+
+        try:
+            access.revoke_execution_tokens(execution_id)
+        except:
+            LOG.exception('Unable to revoke auth tokens for execution %s.', execution_id)
+
     def _setup_async_query(self, liveaction_id, runnertype_db, query_context):
         query_module = getattr(runnertype_db, 'query_module', None)
         if not query_module:
@@ -42,7 +42,13 @@ def _register_common_opts():
 def _register_notifier_opts():
     notifier_opts = [
         cfg.StrOpt('logging', default='conf/logging.notifier.conf',
-                   help='Location of the logging configuration file.')
+                   help='Location of the logging configuration file.'),
+        cfg.IntOpt('batch_size', default=100,
+                   help=('Maximum number of completed executions which are processed together. '
+                         '1 means each execution is processed as soon as it completes.')),
+        cfg.FloatOpt('batch_linger', default=0.1,
+                     help=('Maximum time (in seconds) to wait for more completed executions '
+                           'before processing a batch which is not full.'))
     ]
     CONF.register_opts(notifier_opts, group='notifier')
 
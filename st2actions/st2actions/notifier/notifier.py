@@ -14,6 +14,7 @@
 # limitations under the License.
 
 import json
+from collections import defaultdict
 
 from kombu import Connection
 from oslo_config import cfg
@@ -58,11 +59,28 @@ ACTION_TRIGGER_TYPE = INTERNAL_TRIGGER_TYPES['action'][0]
 NOTIFY_TRIGGER_TYPE = INTERNAL_TRIGGER_TYPES['action'][1]
 
 
-class Notifier(consumers.MessageHandler):
+class NotificationBatch(object):
+    """
+    Data which is shared while post-processing a batch of liveactions.
+    """
+
+    def __init__(self, policy_dbs=None, runner_refs=None):
+        # Maps action ref to the list of enabled policies for that action
+        self.policy_dbs = policy_dbs or {}
+        # Maps action ref to the runner ref
+        self.runner_refs = runner_refs or {}
+        # List of (trigger, payload, trace_context) tuples which are dispatched once the whole
+        # batch has been processed
+        self.triggers = []
+
+
+class Notifier(consumers.BatchedMessageHandler):
     message_type = LiveActionDB
 
-    def __init__(self, connection, queues, trigger_dispatcher=None):
-        super(Notifier, self).__init__(connection, queues)
+    def __init__(self, connection, queues, trigger_dispatcher=None, batch_size=1,
+                 batch_linger=0):
+        super(Notifier, self).__init__(connection, queues, batch_size=batch_size,
+                                       batch_linger=batch_linger)
         if not trigger_dispatcher:
             trigger_dispatcher = TriggerDispatcher(LOG)
         self._trigger_dispatcher = trigger_dispatcher
@@ -90,12 +108,61 @@ class Notifier(consumers.MessageHandler):
                           live_action_id, extra=extra)
             return None
 
-        self._apply_post_run_policies(liveaction_db=liveaction)
+        self._post_run(liveaction=liveaction, execution=execution)
+
+    def process_batch(self, liveactions):
+        """
+        Process multiple liveactions at once.
+
+        Executions, policies and runner references for all the liveactions are retrieved using
+        a single query each and all the triggers are dispatched at once at the end. Otherwise
+        each liveaction is processed the same way as in ``process``.
+        """
+        completed_liveactions = []
+
+        for liveaction_db in liveactions:
+            if liveaction_db.status not in LIVEACTION_COMPLETED_STATES:
+                LOG.debug('Skipping processing of liveaction %s since it\'s not in a completed '
+                          'state' % (str(liveaction_db.id)),
+                          extra={'live_action_db': liveaction_db})
+                continue
+
+            completed_liveactions.append(liveaction_db)
+
+        if not completed_liveactions:
+            return
+
+        LOG.debug('Processing %s liveactions', len(completed_liveactions))
+
+        action_refs = list(set([liveaction_db.action for liveaction_db in completed_liveactions]))
+        executions = self._get_executions_for_liveactions(completed_liveactions)
+        batch = NotificationBatch(policy_dbs=self._get_post_run_policies(action_refs),
+                                  runner_refs=self._get_runner_refs(action_refs))
+
+        for liveaction_db in completed_liveactions:
+            live_action_id = str(liveaction_db.id)
+            extra = {'live_action_db': liveaction_db}
+            execution = executions.get(live_action_id, None)
+
+            if not execution:
+                LOG.error('Execution object corresponding to LiveAction %s not found.',
+                          live_action_id, extra=extra)
+                continue
+
+            try:
+                self._post_run(liveaction=liveaction_db, execution=execution, batch=batch)
+            except:
+                LOG.exception('Failed to process liveaction %s.', live_action_id, extra=extra)
+
+        self._dispatch_triggers(batch.triggers)
+
+    def _post_run(self, liveaction, execution, batch=None):
+        self._apply_post_run_policies(liveaction_db=liveaction, batch=batch)
 
         if liveaction.notify is not None:
-            self._post_notify_triggers(liveaction=liveaction, execution=execution)
+            self._post_notify_triggers(liveaction=liveaction, execution=execution, batch=batch)
 
-        self._post_generic_trigger(liveaction=liveaction, execution=execution)
+        self._post_generic_trigger(liveaction=liveaction, execution=execution, batch=batch)
 
     def _get_execution_for_liveaction(self, liveaction):
         execution = ActionExecution.get(liveaction__id=str(liveaction.id))
@@ -105,7 +172,16 @@ class Notifier(consumers.MessageHandler):
 
         return execution
 
-    def _post_notify_triggers(self, liveaction=None, execution=None):
+    def _get_executions_for_liveactions(self, liveactions):
+        """
+        Return a dictionary which maps liveaction id to the corresponding execution.
+        """
+        liveaction_ids = [str(liveaction.id) for liveaction in liveactions]
+        execution_dbs = ActionExecution.query(liveaction__id__in=liveaction_ids)
+        return dict([(execution_db.liveaction['id'], execution_db)
+                     for execution_db in execution_dbs])
+
+    def _post_notify_triggers(self, liveaction=None, execution=None, batch=None):
         notify = getattr(liveaction, 'notify', None)
 
         if not notify:
@@ -115,21 +191,21 @@ class Notifier(consumers.MessageHandler):
             self._post_notify_subsection_triggers(
                 liveaction=liveaction, execution=execution,
                 notify_subsection=notify.on_complete,
-                default_message_suffix='completed.')
+                default_message_suffix='completed.', batch=batch)
         if liveaction.status == LIVEACTION_STATUS_SUCCEEDED and notify.on_success:
             self._post_notify_subsection_triggers(
                 liveaction=liveaction, execution=execution,
                 notify_subsection=notify.on_success,
-                default_message_suffix='succeeded.')
+                default_message_suffix='succeeded.', batch=batch)
         if liveaction.status in LIVEACTION_FAILED_STATES and notify.on_failure:
             self._post_notify_subsection_triggers(
                 liveaction=liveaction, execution=execution,
                 notify_subsection=notify.on_failure,
-                default_message_suffix='failed.')
+                default_message_suffix='failed.', batch=batch)
 
     def _post_notify_subsection_triggers(self, liveaction=None, execution=None,
                                          notify_subsection=None,
-                                         default_message_suffix=None):
+                                         default_message_suffix=None, batch=None):
         routes = (getattr(notify_subsection, 'routes') or
                   getattr(notify_subsection, 'channels', None))
 
@@ -169,20 +245,22 @@ class Notifier(consumers.MessageHandler):
             payload['start_timestamp'] = isotime.format(liveaction.start_timestamp)
             payload['end_timestamp'] = isotime.format(liveaction.end_timestamp)
             payload['action_ref'] = liveaction.action
-            payload['runner_ref'] = self._get_runner_ref(liveaction.action)
+            payload['runner_ref'] = self._get_runner_ref(liveaction.action, batch=batch)
 
             trace_context = self._get_trace_context(execution_id=execution_id)
 
             failed_routes = []
             for route in routes:
                 try:
+                    # Each route gets its own copy since dispatch can be deferred
+                    payload = dict(payload)
                     payload['route'] = route
                     # Deprecated. Only for backward compatibility reasons.
                     payload['channel'] = route
                     LOG.debug('POSTing %s for %s. Payload - %s.', NOTIFY_TRIGGER_TYPE['name'],
                               liveaction.id, payload)
-                    self._trigger_dispatcher.dispatch(self._notify_trigger, payload=payload,
-                                                      trace_context=trace_context)
+                    self._dispatch_trigger(self._notify_trigger, payload=payload,
+                                           trace_context=trace_context, batch=batch)
                 except:
                     failed_routes.append(route)
 
@@ -214,7 +292,7 @@ class Notifier(consumers.MessageHandler):
         # it shall be created downstream. Sure this is impl leakage of some sort.
         return None
 
-    def _post_generic_trigger(self, liveaction=None, execution=None):
+    def _post_generic_trigger(self, liveaction=None, execution=None, batch=None):
         if not ACTION_SENSOR_ENABLED:
             LOG.debug('Action trigger is disabled, skipping trigger dispatch...')
             return
@@ -226,7 +304,7 @@ class Notifier(consumers.MessageHandler):
                    # deprecate 'action_name' at some point and switch to 'action_ref'
                    'action_name': liveaction.action,
                    'action_ref': liveaction.action,
-                   'runner_ref': self._get_runner_ref(liveaction.action),
+                   'runner_ref': self._get_runner_ref(liveaction.action, batch=batch),
                    'parameters': liveaction.get_masked_parameters(),
                    'result': liveaction.result}
         # Use execution_id to extract trace rather than liveaction. execution_id
@@ -235,12 +313,53 @@ class Notifier(consumers.MessageHandler):
         trace_context = self._get_trace_context(execution_id=execution_id)
         LOG.debug('POSTing %s for %s. Payload - %s. TraceContext - %s',
                   ACTION_TRIGGER_TYPE['name'], liveaction.id, payload, trace_context)
-        self._trigger_dispatcher.dispatch(self._action_trigger, payload=payload,
-                                          trace_context=trace_context)
+        self._dispatch_trigger(self._action_trigger, payload=payload,
+                               trace_context=trace_context, batch=batch)
+
+    def _dispatch_trigger(self, trigger, payload, trace_context, batch=None):
+        if batch:
+            batch.triggers.append((trigger, payload, trace_context))
+            return
+
+        self._trigger_dispatcher.dispatch(trigger, payload=payload, trace_context=trace_context)
+
+    def _dispatch_triggers(self, triggers):
+        if not triggers:
+            return
+
+        try:
+            self._trigger_dispatcher.dispatch_many(triggers)
+            return
+        except:
+            LOG.exception('Failed to dispatch %s triggers at once, dispatching them one by one.',
+                          len(triggers))
+
+        for (trigger, payload, trace_context) in triggers:
+            try:
+                self._trigger_dispatcher.dispatch(trigger, payload=payload,
+                                                  trace_context=trace_context)
+            except:
+                LOG.exception('Failed to dispatch trigger %s for execution %s.', trigger,
+                              payload.get('execution_id', None))
+
+    def _get_post_run_policies(self, action_refs):
+        """
+        Return a dictionary which maps action ref to the list of enabled policies for that action.
+        """
+        policy_dbs = defaultdict(list)
+
+        for policy_db in Policy.query(resource_ref__in=action_refs, enabled=True):
+            policy_dbs[policy_db.resource_ref].append(policy_db)
+
+        return policy_dbs
 
-    def _apply_post_run_policies(self, liveaction_db):
+    def _apply_post_run_policies(self, liveaction_db, batch=None):
         # Apply policies defined for the action.
-        policy_dbs = Policy.query(resource_ref=liveaction_db.action, enabled=True)
+        if batch:
+            policy_dbs = batch.policy_dbs.get(liveaction_db.action, [])
+        else:
+            policy_dbs = Policy.query(resource_ref=liveaction_db.action, enabled=True)
+
         LOG.debug('Applying %s post_run policies' % (len(policy_dbs)))
 
         for policy_db in policy_dbs:
@@ -257,16 +376,28 @@ class Notifier(consumers.MessageHandler):
 
         return liveaction_db
 
-    def _get_runner_ref(self, action_ref):
+    def _get_runner_ref(self, action_ref, batch=None):
         """
         Retrieve a runner reference for the provided action.
 
         :rtype: ``str``
         """
+        if batch and action_ref in batch.runner_refs:
+            return batch.runner_refs[action_ref]
+
         action = Action.get_by_ref(action_ref)
         return action['runner_type']['name']
 
+    def _get_runner_refs(self, action_refs):
+        """
+        Return a dictionary which maps action ref to the runner reference.
+        """
+        action_dbs = Action.query(ref__in=action_refs)
+        return dict([(action_db.ref, action_db.runner_type['name']) for action_db in action_dbs])
+
 
 def get_notifier():
     with Connection(transport_utils.get_messaging_urls()) as conn:
-        return Notifier(conn, [ACTIONUPDATE_WORK_Q], trigger_dispatcher=TriggerDispatcher(LOG))
+        return Notifier(conn, [ACTIONUPDATE_WORK_Q], trigger_dispatcher=TriggerDispatcher(LOG),
+                        batch_size=cfg.CONF.notifier.batch_size,
+                        batch_linger=cfg.CONF.notifier.batch_linger)
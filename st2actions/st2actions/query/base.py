@@ -14,8 +14,10 @@
 # limitations under the License.
 
 import abc
+import heapq
+import itertools
 import eventlet
-import Queue
+import eventlet.event
 import six
 import time
 
@@ -23,8 +25,10 @@ from st2actions.container.service import RunnerContainerService
 from st2actions.runners import get_runner
 from st2common import log as logging
 from st2common.constants import action as action_constants
+from st2common.persistence.execution import ActionExecution
 from st2common.persistence.executionstate import ActionExecutionState
 from st2common.persistence.liveaction import LiveAction
+from st2common.services import access
 from st2common.services import executions
 from st2common.util.action_db import (get_action_by_ref, get_runnertype_by_name)
 from st2common.util import date as date_utils
@@ -33,56 +37,226 @@ LOG = logging.getLogger(__name__)
 
 __all__ = [
     'Querier',
-    'QueryContext'
+    'QueryContext',
+    'QuerySchedule'
 ]
 
 
+class QuerySchedule(object):
+    """
+    Priority queue of query contexts ordered by the time the next query is due.
+    """
+
+    def __init__(self):
+        self._heap = []
+        # Tie breaker so entries with the same due time are returned in insertion order and
+        # query contexts themselves are never compared
+        self._counter = itertools.count()
+
+    def put(self, query_context, due_time, interval):
+        """
+        :param due_time: Timestamp at which the query context should be queried.
+        :type due_time: ``float``
+
+        :param interval: Interval which was used to calculate due time. Used to calculate the
+                         next interval when the query context needs to be re-scheduled.
+        :type interval: ``float``
+        """
+        heapq.heappush(self._heap, (due_time, next(self._counter), query_context, interval))
+
+    def get_due(self, now):
+        """
+        Remove and return (due_time, query_context, interval) tuple for the earliest due query
+        context or None if there are no query contexts which are due.
+        """
+        if not self._heap or self._heap[0][0] > now:
+            return None
+
+        (due_time, _, query_context, interval) = heapq.heappop(self._heap)
+        return (due_time, query_context, interval)
+
+    def remove(self, filter_func):
+        """
+        Remove all the query contexts for which filter_func returns True.
+        """
+        self._heap = [entry for entry in self._heap if not filter_func(entry[2])]
+        heapq.heapify(self._heap)
+
+    def get_next_due_time(self):
+        if not self._heap:
+            return None
+
+        return self._heap[0][0]
+
+    def qsize(self):
+        return len(self._heap)
+
+    def empty(self):
+        return not self._heap
+
+
 @six.add_metaclass(abc.ABCMeta)
 class Querier(object):
     def __init__(self, threads_pool_size=10, query_interval=1, empty_q_sleep_time=5,
-                 no_workers_sleep_time=1, container_service=None):
+                 no_workers_sleep_time=1, container_service=None, max_query_interval=10,
+                 query_backoff_factor=1.5, batch_size=0):
+        """
+        :param query_interval: Interval (in seconds) between the first queries for a query
+                               context.
+        :type query_interval: ``float``
+
+        :param max_query_interval: Maximum interval (in seconds) between the queries for a query
+                                   context.
+        :type max_query_interval: ``float``
+
+        :param query_backoff_factor: Factor by which the query interval grows after each query
+                                     which doesn't return a completed status. Long running jobs
+                                     are therefore queried less frequently.
+        :type query_backoff_factor: ``float``
+
+        :param batch_size: If greater than 0, due query contexts are queried in batches of up to
+                           this many items using query_batch method.
+        :type batch_size: ``int``
+        """
         self._query_threads_pool_size = threads_pool_size
-        self._query_contexts = Queue.Queue()
+        self._query_contexts = QuerySchedule()
         self._thread_pool = eventlet.GreenPool(self._query_threads_pool_size)
         self._empty_q_sleep_time = empty_q_sleep_time
         self._no_workers_sleep_time = no_workers_sleep_time
         self._query_interval = query_interval
+        self._max_query_interval = max(max_query_interval, query_interval)
+        self._query_backoff_factor = query_backoff_factor
+        self._batch_size = batch_size
+        # Maps id of all the query contexts which are being tracked (including the ones which are
+        # currently being queried) to the query context
+        self._tracked_query_contexts = {}
         if not container_service:
             container_service = RunnerContainerService()
         self.container_service = container_service
         self._started = False
 
+        # Set when new query contexts are added so the dispatch loop can wake up early
+        self._wakeup_event = eventlet.event.Event()
+
+        # Stats
+        self._queries_count = 0
+        self._last_lag = 0.0
+        self._max_lag = 0.0
+
     def start(self):
         self._started = True
         while True:
-            while self._query_contexts.empty():
-                eventlet.greenthread.sleep(self._empty_q_sleep_time)
             while self._thread_pool.free() <= 0:
                 eventlet.greenthread.sleep(self._no_workers_sleep_time)
             self._fire_queries()
+            self._wait_for_next_due_query()
 
     def add_queries(self, query_contexts=None):
         if query_contexts is None:
             query_contexts = []
         LOG.debug('Adding queries to querier: %s' % query_contexts)
+        now = time.time()
+        for query_context in query_contexts:
+            if query_context.id in self._tracked_query_contexts:
+                LOG.debug('Query context %s is already being tracked.', query_context)
+                continue
+
+            self._tracked_query_contexts[query_context.id] = query_context
+            self._query_contexts.put(query_context, now, self._query_interval)
+
+        if query_contexts and not self._wakeup_event.ready():
+            self._wakeup_event.send(True)
+
+    def remove_queries(self, filter_func):
+        """
+        Stop tracking all the query contexts for which filter_func returns True. State objects
+        are left intact so the query contexts can be picked up by another querier.
+        """
+        query_contexts = [query_context for query_context in
+                          six.itervalues(self._tracked_query_contexts)
+                          if filter_func(query_context)]
+
         for query_context in query_contexts:
-            self._query_contexts.put((time.time(), query_context))
+            del self._tracked_query_contexts[query_context.id]
+            self._forget_query_context(query_context)
+
+        self._query_contexts.remove(filter_func)
+        LOG.debug('Removed %d queries from querier.', len(query_contexts))
+
+    def is_tracked(self, query_context):
+        return query_context.id in self._tracked_query_contexts
 
     def is_started(self):
         return self._started
 
+    def get_stats(self):
+        """
+        Return querier stats.
+
+        queue_depth - number of query contexts which are being tracked.
+        queries_count - number of queries (or batch queries) dispatched so far.
+        lag - how late (in seconds) the most recently dispatched query was.
+        max_lag - maximum lag observed so far.
+
+        :rtype: ``dict``
+        """
+        return {
+            'queue_depth': self._query_contexts.qsize(),
+            'queries_count': self._queries_count,
+            'lag': self._last_lag,
+            'max_lag': self._max_lag
+        }
+
+    def _wait_for_next_due_query(self):
+        """
+        Sleep until the earliest query context is due or until new query contexts are added.
+        """
+        next_due_time = self._query_contexts.get_next_due_time()
+
+        if next_due_time is None:
+            timeout = self._empty_q_sleep_time
+        else:
+            timeout = max(next_due_time - time.time(), 0)
+
+        if timeout > 0:
+            with eventlet.Timeout(timeout, False):
+                self._wakeup_event.wait()
+
+        if self._wakeup_event.ready():
+            self._wakeup_event.reset()
+
     def _fire_queries(self):
-        if self._thread_pool.free() <= 0:
-            return
-        while not self._query_contexts.empty() and self._thread_pool.free() > 0:
-            (last_query_time, query_context) = self._query_contexts.get_nowait()
-            if time.time() - last_query_time < self._query_interval:
-                self._query_contexts.put((last_query_time, query_context))
-                continue
+        now = time.time()
+        while self._thread_pool.free() > 0:
+            items = []
+            max_items = self._batch_size if self._batch_size > 0 else 1
+
+            while len(items) < max_items:
+                item = self._query_contexts.get_due(now=now)
+
+                if not item:
+                    break
+
+                (due_time, query_context, interval) = item
+                self._last_lag = now - due_time
+                self._max_lag = max(self._max_lag, self._last_lag)
+                items.append((query_context, interval))
+
+            if not items:
+                break
+
+            self._queries_count += 1
+
+            if self._batch_size > 0:
+                self._thread_pool.spawn(self._query_and_save_batch_results, items)
             else:
-                self._thread_pool.spawn(self._query_and_save_results, query_context)
+                (query_context, interval) = items[0]
+                self._thread_pool.spawn(self._query_and_save_results, query_context, interval)
+
+    def _get_next_interval(self, interval):
+        return min(interval * self._query_backoff_factor, self._max_query_interval)
 
-    def _query_and_save_results(self, query_context):
+    def _query_and_save_results(self, query_context, interval=None):
         execution_id = query_context.execution_id
         actual_query_context = query_context.query_context
 
@@ -95,6 +269,50 @@ class Querier(object):
             LOG.debug('Remove state object %s.', query_context)
             return
 
+        self._save_results(query_context, interval, status, results)
+
+    def _query_and_save_batch_results(self, items):
+        """
+        Query results for multiple query contexts using a single batch query.
+
+        :param items: List of (query_context, interval) tuples.
+        :type items: ``list``
+        """
+        query_contexts = [query_context for (query_context, _) in items]
+
+        LOG.debug('Querying external service for results of %d executions.', len(items))
+        try:
+            batch_results = self.query_batch(query_contexts)
+        except:
+            # Failure of a single batch query is most likely transient so contexts are
+            # re-scheduled instead of being removed like in the single query case
+            LOG.exception('Failed querying results for %d executions.', len(items))
+            for (query_context, interval) in items:
+                self._reschedule(query_context, interval)
+            return
+
+        for (query_context, interval) in items:
+            execution_id = query_context.execution_id
+            result = batch_results.get(execution_id, None)
+
+            if result is None:
+                # Nothing has changed since the last query
+                self._reschedule(query_context, interval)
+                continue
+
+            if isinstance(result, Exception):
+                LOG.error('Failed querying results for liveaction_id %s: %s', execution_id,
+                          str(result))
+                self._delete_state_object(query_context)
+                LOG.debug('Remove state object %s.', query_context)
+                continue
+
+            (status, results) = result
+            self._save_results(query_context, interval, status, results)
+
+    def _save_results(self, query_context, interval, status, results):
+        execution_id = query_context.execution_id
+
         liveaction_db = None
         try:
             liveaction_db = self._update_action_results(execution_id, status, results)
@@ -104,6 +322,8 @@ class Querier(object):
             return
 
         if status in action_constants.LIVEACTION_COMPLETED_STATES:
+            self._revoke_auth_tokens(liveaction_db)
+
             action_db = get_action_by_ref(liveaction_db.action)
             if not action_db:
                 LOG.exception('Unable to invoke post run. Action %s '
@@ -115,7 +335,18 @@ class Querier(object):
             self._delete_state_object(query_context)
             return
 
-        self._query_contexts.put((time.time(), query_context))
+        self._reschedule(query_context, interval)
+
+    def _reschedule(self, query_context, interval=None):
+        if query_context.id not in self._tracked_query_contexts:
+            # Query context has been removed while it was being queried
+            return
+
+        interval = self._get_next_interval(interval or self._query_interval)
+        self._query_contexts.put(query_context, time.time() + interval, interval)
+
+        if not self._wakeup_event.ready():
+            self._wakeup_event.send(True)
 
     def _update_action_results(self, execution_id, status, results):
         liveaction_db = LiveAction.get_by_id(execution_id)
@@ -139,6 +370,19 @@ class Querier(object):
 
         return updated_liveaction
 
+    def _revoke_auth_tokens(self, liveaction_db):
+        """
+        Revoke signed tokens which have been issued for the completed async execution.
+        """
+        if not access.execution_tokens_enabled():
+            return
+
+        try:
+            execution_db = ActionExecution.get(liveaction__id=str(liveaction_db.id))
+            access.revoke_execution_tokens(str(execution_db.id))
+        except Exception:
+            LOG.exception('Unable to revoke auth tokens for liveaction %s.', liveaction_db.id)
+
     def _invoke_post_run(self, actionexec_db, action_db):
         LOG.info('Invoking post run for action execution %s. Action=%s; Runner=%s',
                  actionexec_db.id, action_db.name, action_db.runner_type['name'])
@@ -163,6 +407,8 @@ class Querier(object):
         runner.post_run(actionexec_db.status, actionexec_db.result)
 
     def _delete_state_object(self, query_context):
+        self._tracked_query_contexts.pop(query_context.id, None)
+        self._forget_query_context(query_context)
         state_db = ActionExecutionState.get_by_id(query_context.id)
         if state_db is not None:
             try:
@@ -171,6 +417,13 @@ class Querier(object):
             except:
                 LOG.exception('Failed clearing state object: %s', state_db)
 
+    def _forget_query_context(self, query_context):
+        """
+        Called when the query context is not tracked anymore. Queriers which keep additional
+        per query context state should remove it here.
+        """
+        pass
+
     def query(self, execution_id, query_context):
         """
         This is the method individual queriers must implement.
@@ -181,9 +434,27 @@ class Querier(object):
         """
         pass
 
+    def query_batch(self, query_contexts):
+        """
+        Queriers which support batch mode need to implement this method.
+
+        It should return a dictionary which maps execution id to (status, results) tuple or to an
+        exception if querying that particular execution failed. Query contexts for which nothing
+        has changed since the last query can be omitted and are re-scheduled.
+
+        :param query_contexts: List of query contexts.
+        :type query_contexts: ``list`` of :class:`QueryContext`
+
+        :rtype: ``dict``
+        """
+        raise NotImplementedError('Querier %s doesn\'t support batch queries' %
+                                  (self.__class__.__name__))
+
     def print_stats(self):
-        LOG.info('\t --- Name: %s, pending queuries: %d', self.__class__.__name__,
-                 self._query_contexts.qsize())
+        stats = self.get_stats()
+        LOG.info('\t --- Name: %s, pending queries: %d, dispatched queries: %d, lag: %.3fs, '
+                 'max lag: %.3fs', self.__class__.__name__, stats['queue_depth'],
+                 stats['queries_count'], stats['lag'], stats['max_lag'])
 
 
 class QueryContext(object):
@@ -1,3 +1,4 @@
+import urllib
 import uuid
 
 from mistralclient.api import client as mistral
@@ -24,7 +25,7 @@ DONE_STATES = {
 
 
 def get_query_instance():
-    return MistralResultsQuerier(str(uuid.uuid4()))
+    return MistralResultsQuerier(str(uuid.uuid4()), batch_size=cfg.CONF.mistral.query_batch_size)
 
 
 class MistralResultsQuerier(Querier):
@@ -40,6 +41,10 @@ class MistralResultsQuerier(Querier):
             cacert=cfg.CONF.mistral.cacert,
             insecure=cfg.CONF.mistral.insecure)
 
+        # Maps mistral workflow execution id to the ("updated_at", "state") tuple seen during the
+        # last batch query. Used to skip executions which haven't changed since then.
+        self._last_seen = {}
+
     @retrying.retry(
         retry_on_exception=utils.retry_on_exceptions,
         wait_exponential_multiplier=cfg.CONF.mistral.retry_exp_msec,
@@ -76,15 +81,123 @@ class MistralResultsQuerier(Querier):
 
         return (status, result)
 
-    def _get_workflow_result(self, exec_id):
+    def query_batch(self, query_contexts):
+        """
+        Queries mistral for the status of multiple workflow executions using a single list call.
+
+        Task details are only retrieved for workflow executions which have changed since the
+        last batch query.
+
+        :param query_contexts: List of query contexts.
+        :type query_contexts: ``list``
+        :rtype: ``dict``
+        """
+        batch_results = {}
+        query_contexts_by_exec_id = {}
+
+        for query_context in query_contexts:
+            mistral_exec_id = query_context.query_context.get('mistral', {}).get('execution_id',
+                                                                                 None)
+            if not mistral_exec_id:
+                batch_results[query_context.execution_id] = Exception(
+                    'Missing mistral workflow execution ID in query context. %s' %
+                    (query_context.query_context))
+                continue
+
+            query_contexts_by_exec_id[mistral_exec_id] = query_context
+
+        if not query_contexts_by_exec_id:
+            return batch_results
+
+        exec_ids = sorted(query_contexts_by_exec_id.keys())
+
+        # If all the executions have been seen before, only the ones which have been updated
+        # since then need to be returned
+        updated_since = None
+        if all([exec_id in self._last_seen for exec_id in exec_ids]):
+            updated_since = min([self._last_seen[exec_id][0] for exec_id in exec_ids])
+
+        wf_executions = self._list_workflow_executions(exec_ids=exec_ids,
+                                                       updated_since=updated_since)
+        wf_executions = dict([(wf_execution.id, wf_execution) for wf_execution in wf_executions])
+
+        for exec_id in exec_ids:
+            query_context = query_contexts_by_exec_id[exec_id]
+            execution_id = query_context.execution_id
+            wf_execution = wf_executions.get(exec_id, None)
+            last_seen = self._last_seen.get(exec_id, None)
+
+            if wf_execution is None and last_seen:
+                # Not updated since the last query
+                continue
+
+            # Note: updated_at has a one second resolution so the execution could have been
+            # updated again in the same second. State also needs to be compared to make sure
+            # completion is never missed.
+            if wf_execution is not None and \
+                    last_seen == (wf_execution.updated_at, wf_execution.state):
+                continue
+
+            try:
+                result = self._get_workflow_result(exec_id, execution=wf_execution)
+                result['tasks'] = self._get_workflow_tasks(exec_id)
+                status = self._determine_execution_status(
+                    execution_id, result['extra']['state'], result['tasks'])
+            except Exception as e:
+                LOG.exception('[%s] Unable to fetch mistral workflow result and tasks. %s',
+                              execution_id, query_context.query_context)
+                self._last_seen.pop(exec_id, None)
+                batch_results[execution_id] = e
+                continue
+
+            if status in action_constants.LIVEACTION_COMPLETED_STATES:
+                self._last_seen.pop(exec_id, None)
+            elif wf_execution is not None and getattr(wf_execution, 'updated_at', None):
+                self._last_seen[exec_id] = (wf_execution.updated_at, wf_execution.state)
+
+            LOG.debug('[%s] mistral workflow execution status: %s' % (execution_id, status))
+            batch_results[execution_id] = (status, result)
+
+        return batch_results
+
+    def _forget_query_context(self, query_context):
+        mistral_exec_id = query_context.query_context.get('mistral', {}).get('execution_id',
+                                                                             None)
+        self._last_seen.pop(mistral_exec_id, None)
+
+    def _list_workflow_executions(self, exec_ids, updated_since=None):
+        """
+        Returns workflow executions with the provided ids. If updated_since is provided, only
+        executions which have been updated at or after that time are returned.
+        :param exec_ids: Mistral execution IDs
+        :type exec_ids: ``list``
+        :rtype: ``list``
+        """
+        qparams = [
+            ('id', 'in:%s' % (','.join(exec_ids))),
+            ('limit', len(exec_ids))
+        ]
+
+        if updated_since:
+            qparams.append(('updated_at', 'gte:%s' % (updated_since)))
+
+        url = '/executions?%s' % (urllib.urlencode(qparams))
+        return executions.ExecutionManager(self._client)._list(url, response_key='executions')
+
+    def _get_workflow_result(self, exec_id, execution=None):
         """
         Returns the workflow status and output. Mistral workflow status will be converted
         to st2 action status.
         :param exec_id: Mistral execution ID
         :type exec_id: ``str``
+        :param execution: Already retrieved execution. If it doesn't include the workflow output
+                          which is needed, execution is retrieved again.
+        :type execution: :class:`executions.Execution`
         :rtype: (``str``, ``dict``)
         """
-        execution = executions.ExecutionManager(self._client).get(exec_id)
+        if (not execution or
+                (execution.state in DONE_STATES and getattr(execution, 'output', None) is None)):
+            execution = executions.ExecutionManager(self._client).get(exec_id)
 
         result = jsonify.try_loads(execution.output) if execution.state in DONE_STATES else {}
 
@@ -149,4 +262,4 @@ class MistralResultsQuerier(Querier):
 
 
 def get_instance():
-    return MistralResultsQuerier(str(uuid.uuid4()))
+    return MistralResultsQuerier(str(uuid.uuid4()), batch_size=cfg.CONF.mistral.query_batch_size)
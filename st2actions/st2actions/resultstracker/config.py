@@ -42,7 +42,15 @@ def _register_common_opts():
 def _register_results_tracker_opts():
     resultstracker_opts = [
         cfg.StrOpt('logging', default='conf/logging.resultstracker.conf',
-                   help='Location of the logging configuration file.')
+                   help='Location of the logging configuration file.'),
+        cfg.IntOpt('partitions', default=0,
+                   help=('Number of partitions tracked executions are divided into. When set, '
+                         'each results tracker instance only tracks executions in the '
+                         'partitions it holds a lease for. Requires coordination service. 0 '
+                         'means every instance tracks all the executions.')),
+        cfg.IntOpt('partitions_refresh_interval', default=10,
+                   help=('How often (in seconds) to renew partition leases and take over '
+                         'partitions of results trackers which are not running anymore.'))
     ]
     CONF.register_opts(resultstracker_opts, group='resultstracker')
 
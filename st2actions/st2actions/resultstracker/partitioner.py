@@ -0,0 +1,162 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import math
+
+from st2common import log as logging
+from st2common.models.db.executionstate import STATE_BUCKETS_COUNT
+from st2common.services import coordination
+
+__all__ = [
+    'PartitionLeaseManager'
+]
+
+LOG = logging.getLogger(__name__)
+
+GROUP_ID = 'st2.resultstracker'
+PARTITION_LOCK_NAME = 'st2.resultstracker.partition.%s'
+
+
+class PartitionLeaseManager(object):
+    """
+    Divides action execution state objects between results tracker instances.
+
+    State buckets are split into a fixed number of partitions. Each results tracker holds a
+    lease (coordination service lock) for a fair share of the partitions and only tracks states
+    which belong to those partitions. Leases are kept alive by heartbeats so partitions of a
+    tracker which has died are taken over by other trackers once its leases expire.
+    """
+
+    def __init__(self, partitions_count, coordinator=None):
+        if partitions_count > STATE_BUCKETS_COUNT:
+            raise ValueError('Number of partitions can\'t be larger than %s' %
+                             (STATE_BUCKETS_COUNT))
+
+        self._partitions_count = partitions_count
+        self._coordinator = coordinator
+        self._locks = {}
+
+    @property
+    def owned_partitions(self):
+        return sorted(self._locks.keys())
+
+    def start(self):
+        if not self._coordinator:
+            self._coordinator = coordination.get_coordinator()
+
+        if not coordination.configured():
+            LOG.warn('Coordination backend is not configured. This results tracker will track '
+                     'all the partitions.')
+            return
+
+        try:
+            self._coordinator.create_group(GROUP_ID).get()
+        except Exception:
+            # Group already exists
+            pass
+
+        self._coordinator.join_group(GROUP_ID).get()
+
+    def stop(self):
+        for partition in self.owned_partitions:
+            self._release(partition)
+
+        if not coordination.configured():
+            return
+
+        try:
+            self._coordinator.leave_group(GROUP_ID).get()
+        except Exception:
+            LOG.exception('Failed to leave group %s.', GROUP_ID)
+
+    def refresh(self):
+        """
+        Renew the leases and re-balance the partitions.
+
+        Partitions over the fair share are released and free partitions (including the ones
+        whose lease has expired) are acquired until the fair share is reached.
+
+        :return: Tuple of (acquired partitions, released partitions).
+        :rtype: ``tuple``
+        """
+        if not coordination.configured():
+            acquired = [partition for partition in range(0, self._partitions_count)
+                        if partition not in self._locks]
+            for partition in acquired:
+                self._locks[partition] = None
+            return (acquired, [])
+
+        self._coordinator.heartbeat()
+
+        fair_share = self._get_fair_share()
+        acquired = []
+        released = []
+
+        for partition in self.owned_partitions[fair_share:]:
+            self._release(partition)
+            released.append(partition)
+
+        for partition in range(0, self._partitions_count):
+            if len(self._locks) >= fair_share:
+                break
+
+            if partition in self._locks:
+                continue
+
+            lock = self._coordinator.get_lock(PARTITION_LOCK_NAME % (partition))
+
+            if lock.acquire(blocking=False):
+                LOG.info('Acquired results tracker partition %s.', partition)
+                self._locks[partition] = lock
+                acquired.append(partition)
+
+        return (acquired, released)
+
+    def get_partition(self, bucket):
+        """
+        Return partition the provided state bucket belongs to.
+        """
+        return (bucket * self._partitions_count) // STATE_BUCKETS_COUNT
+
+    def get_bucket_range(self, partition):
+        """
+        Return (start, end) range of the state buckets which belong to the provided partition.
+        Start is inclusive and end is exclusive.
+        """
+        start = int(math.ceil(float(partition * STATE_BUCKETS_COUNT) / self._partitions_count))
+        end = int(math.ceil(float((partition + 1) * STATE_BUCKETS_COUNT) /
+                            self._partitions_count))
+        return (start, end)
+
+    def owns(self, bucket):
+        return self.get_partition(bucket) in self._locks
+
+    def _get_fair_share(self):
+        members = self._coordinator.get_members(GROUP_ID).get() or []
+        members_count = max(len(members), 1)
+        return int(math.ceil(float(self._partitions_count) / members_count))
+
+    def _release(self, partition):
+        lock = self._locks.pop(partition)
+
+        if not lock:
+            return
+
+        LOG.info('Releasing results tracker partition %s.', partition)
+
+        try:
+            lock.release()
+        except Exception:
+            LOG.exception('Failed to release lock for partition %s.', partition)
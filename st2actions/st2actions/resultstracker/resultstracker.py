@@ -16,13 +16,17 @@
 import eventlet
 import importlib
 import six
+import uuid
 
 from collections import defaultdict
 from kombu import Connection
+from oslo_config import cfg
 
 from st2actions.query.base import QueryContext
+from st2actions.resultstracker.partitioner import PartitionLeaseManager
 from st2common import log as logging
 from st2common.models.db.executionstate import ActionExecutionStateDB
+from st2common.models.db.executionstate import get_state_bucket
 from st2common.persistence.executionstate import ActionExecutionState
 from st2common.transport import actionexecutionstate, consumers, publishers
 from st2common.transport import utils as transport_utils
@@ -33,18 +37,28 @@ LOG = logging.getLogger(__name__)
 ACTIONSTATE_WORK_Q = actionexecutionstate.get_queue('st2.resultstracker.work',
                                                     routing_key=publishers.CREATE_RK)
 
+# Number of state objects which are retrieved from the database at once
+STATES_PAGE_SIZE = 500
+
 
 class ResultsTracker(consumers.MessageHandler):
     message_type = ActionExecutionStateDB
 
-    def __init__(self, connection, queues):
+    def __init__(self, connection, queues, partitioner=None):
         super(ResultsTracker, self).__init__(connection, queues)
         self._queriers = {}
         self._query_threads = []
         self._failed_imports = set()
+        self._partitioner = partitioner
+        self._partitioner_thread = None
 
     def start(self, wait=False):
-        self._bootstrap()
+        if self._partitioner:
+            self._partitioner.start()
+            self._refresh_partitions()
+            self._partitioner_thread = eventlet.spawn(self._refresh_partitions_loop)
+        else:
+            self._bootstrap()
         super(ResultsTracker, self).start(wait=wait)
 
     def wait(self):
@@ -54,6 +68,14 @@ class ResultsTracker(consumers.MessageHandler):
 
     def shutdown(self):
         super(ResultsTracker, self).shutdown()
+
+        if self._partitioner_thread is not None:
+            self._partitioner_thread.kill()
+            self._partitioner_thread = None
+
+        if self._partitioner:
+            self._partitioner.stop()
+
         LOG.info('Stats from queriers:')
         self._print_stats()
 
@@ -62,12 +84,20 @@ class ResultsTracker(consumers.MessageHandler):
             if querier:
                 querier.print_stats()
 
-    def _bootstrap(self):
-        all_states = ActionExecutionState.get_all()
-        LOG.info('Found %d pending states in db.' % len(all_states))
+    def _bootstrap(self, buckets_range=None):
+        """
+        Load pending states from the database and add them to the queriers.
 
+        :param buckets_range: If provided, only states in (start, end) range of buckets are
+                              loaded.
+        :type buckets_range: ``tuple``
+        """
         query_contexts_dict = defaultdict(list)
-        for state_db in all_states:
+        states_count = 0
+
+        for state_db in self._get_states(buckets_range=buckets_range):
+            states_count += 1
+
             try:
                 context = QueryContext.from_model(state_db)
             except:
@@ -79,16 +109,94 @@ class ResultsTracker(consumers.MessageHandler):
             if querier is not None:
                 query_contexts_dict[querier].append(context)
 
+        LOG.info('Found %d pending states in db.' % states_count)
+
         for querier, contexts in six.iteritems(query_contexts_dict):
             LOG.info('Found %d pending actions for query module %s', len(contexts), querier)
             querier.add_queries(query_contexts=contexts)
 
+    def _get_states(self, buckets_range=None):
+        """
+        Retrieve state objects page by page ordered by id.
+        """
+        filters = {}
+
+        if buckets_range:
+            filters['bucket__gte'] = buckets_range[0]
+            filters['bucket__lt'] = buckets_range[1]
+
+        for state_db in self._get_states_pages(filters=filters):
+            yield state_db
+
+        if buckets_range:
+            # State objects created before buckets were introduced
+            for state_db in self._get_states_pages(filters={'bucket__exists': False}):
+                if buckets_range[0] <= self._get_bucket(state_db) < buckets_range[1]:
+                    yield state_db
+
+    def _get_states_pages(self, filters):
+        last_id = None
+
+        while True:
+            page_filters = dict(filters)
+
+            if last_id:
+                page_filters['id__gt'] = last_id
+
+            states = list(ActionExecutionState.query(order_by=['id'], limit=STATES_PAGE_SIZE,
+                                                     **page_filters))
+
+            for state_db in states:
+                yield state_db
+
+            if len(states) < STATES_PAGE_SIZE:
+                break
+
+            last_id = states[-1].id
+
+    def _refresh_partitions_loop(self):
+        while True:
+            eventlet.greenthread.sleep(cfg.CONF.resultstracker.partitions_refresh_interval)
+
+            try:
+                self._refresh_partitions()
+            except Exception:
+                LOG.exception('Failed to refresh results tracker partitions.')
+
+    def _refresh_partitions(self):
+        (acquired, released) = self._partitioner.refresh()
+
+        if released:
+            def is_released(query_context):
+                bucket = get_state_bucket(query_context.execution_id)
+                return self._partitioner.get_partition(bucket) in released
+
+            for querier in six.itervalues(self._queriers):
+                if querier:
+                    querier.remove_queries(is_released)
+
+        for partition in acquired:
+            self._bootstrap(buckets_range=self._partitioner.get_bucket_range(partition))
+
     def process(self, query_context):
+        if self._partitioner and not self._partitioner.owns(self._get_bucket(query_context)):
+            LOG.debug('State %s belongs to a partition owned by another results tracker.',
+                      query_context)
+            return
+
         querier = self.get_querier(query_context.query_module)
         context = QueryContext.from_model(query_context)
         querier.add_queries(query_contexts=[context])
         return
 
+    @staticmethod
+    def _get_bucket(state_db):
+        # Note: State objects and messages created before buckets were introduced have no bucket
+        if state_db.bucket is None:
+            return get_state_bucket(state_db.execution_id)
+
+        return state_db.bucket
+
     def get_querier(self, query_module_name):
         if (query_module_name not in self._queriers and
                 query_module_name not in self._failed_imports):
@@ -110,5 +218,17 @@ class ResultsTracker(consumers.MessageHandler):
 
 
 def get_tracker():
+    partitions_count = cfg.CONF.resultstracker.partitions
+
+    if not partitions_count:
+        with Connection(transport_utils.get_messaging_urls()) as conn:
+            return ResultsTracker(conn, [ACTIONSTATE_WORK_Q])
+
+    # Each partitioned tracker needs to see all the new states so it can pick the ones which
+    # belong to its partitions
+    queue = actionexecutionstate.get_queue('st2.resultstracker.work.%s' % (uuid.uuid4().hex),
+                                           routing_key=publishers.CREATE_RK, exclusive=True)
+    partitioner = PartitionLeaseManager(partitions_count=partitions_count)
+
     with Connection(transport_utils.get_messaging_urls()) as conn:
-        return ResultsTracker(conn, [ACTIONSTATE_WORK_Q])
+        return ResultsTracker(conn, [queue], partitioner=partitioner)
@@ -13,12 +13,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
 import eventlet
+import eventlet.semaphore
 import traceback
 import uuid
 import datetime
 
 from jsonschema import exceptions as json_schema_exceptions
+from oslo_config import cfg
 
 from st2actions.runners import ActionRunner
 from st2common import log as logging
@@ -40,6 +43,7 @@ from st2common.models.system import actionchain
 from st2common.models.utils import action_param_utils
 from st2common.persistence.execution import ActionExecution
 from st2common.services import action as action_service
+from st2common.services import liveaction_watcher
 from st2common.services.keyvalues import KeyValueLookup
 from st2common.util import action_db as action_db_util
 from st2common.util import isotime
@@ -54,12 +58,72 @@ JINJA_START_MARKERS = [
     '{%'
 ]
 PUBLISHED_VARS_KEY = 'published'
+DEFAULT_CONCURRENCY = 10
+
+# Maximum number of parsed chain definitions kept in the process wide definition cache
+CHAIN_DEFINITION_CACHE_MAX_SIZE = 500
+
+
+class ChainDefinitionCache(object):
+    """
+    Process wide cache of parsed and validated action chain definitions.
+
+    Entries are keyed by the chain definition file path and are invalidated as soon as the file
+    modification time or size changes.
+    """
+
+    def __init__(self, max_size=CHAIN_DEFINITION_CACHE_MAX_SIZE):
+        self._max_size = max_size
+        self._entries = {}
+
+    def get_file_key(self, file_path):
+        """
+        Return a key which identifies the current version of the provided file or None if the
+        file can't be accessed.
+        """
+        try:
+            stat = os.stat(file_path)
+        except (OSError, TypeError):
+            return None
+
+        return (stat.st_mtime, stat.st_size)
+
+    def get(self, file_path, file_key):
+        if not file_key:
+            return None
+
+        entry = self._entries.get(file_path, None)
+
+        if not entry or entry[0] != file_key:
+            return None
+
+        return entry[1]
+
+    def set(self, file_path, file_key, chain):
+        if not file_key:
+            return
+
+        if file_path not in self._entries and len(self._entries) >= self._max_size:
+            self._entries.clear()
+
+        self._entries[file_path] = (file_key, chain)
+
+    def clear(self):
+        self._entries.clear()
+
+
+CHAIN_DEFINITION_CACHE = ChainDefinitionCache()
 
 
 class ChainHolder(object):
 
-    def __init__(self, chainspec, chainname):
-        self.actionchain = actionchain.ActionChain(**chainspec)
+    def __init__(self, chainspec, chainname, chain=None):
+        """
+        :param chain: Already parsed chain definition. If provided, ``chainspec`` is ignored and
+                      the definition is shared (it's never mutated during a run).
+        :type chain: :class:`actionchain.ActionChain`
+        """
+        self.actionchain = chain or actionchain.ActionChain(**chainspec)
         self.chainname = chainname
 
         if not self.actionchain.default:
@@ -87,24 +151,23 @@ class ChainHolder(object):
         all_nodes = self._get_all_nodes(action_chain=self.actionchain)
 
         for node in self.actionchain.chain:
-            on_success_node_name = node.on_success
-            on_failure_node_name = node.on_failure
-
             # Check "on-success" path
-            valid_name = self._is_valid_node_name(all_node_names=all_nodes,
-                                                  node_name=on_success_node_name)
-            if not valid_name:
-                msg = ('Unable to find node with name "%s" referenced in "on-success" in '
-                       'task "%s".' % (on_success_node_name, node.name))
-                raise ValueError(msg)
+            for on_success_node_name in node.get_next_node_names(condition='on-success'):
+                valid_name = self._is_valid_node_name(all_node_names=all_nodes,
+                                                      node_name=on_success_node_name)
+                if not valid_name:
+                    msg = ('Unable to find node with name "%s" referenced in "on-success" in '
+                           'task "%s".' % (on_success_node_name, node.name))
+                    raise ValueError(msg)
 
             # Check "on-failure" path
-            valid_name = self._is_valid_node_name(all_node_names=all_nodes,
-                                                  node_name=on_failure_node_name)
-            if not valid_name:
-                msg = ('Unable to find node with name "%s" referenced in "on-failure" in '
-                       'task "%s".' % (on_failure_node_name, node.name))
-                raise ValueError(msg)
+            for on_failure_node_name in node.get_next_node_names(condition='on-failure'):
+                valid_name = self._is_valid_node_name(all_node_names=all_nodes,
+                                                      node_name=on_failure_node_name)
+                if not valid_name:
+                    msg = ('Unable to find node with name "%s" referenced in "on-failure" in '
+                           'task "%s".' % (on_failure_node_name, node.name))
+                    raise ValueError(msg)
 
         # check if node specified in default is valid.
         if self.actionchain.default:
@@ -157,7 +220,8 @@ class ChainHolder(object):
         """
         Return names for all the tasks referenced in "on-success".
         """
-        on_success_nodes = set([node.on_success for node in action_chain.chain])
+        on_success_nodes = set([name for node in action_chain.chain
+                                for name in node.get_next_node_names(condition='on-success')])
         return on_success_nodes
 
     @staticmethod
@@ -165,7 +229,8 @@ class ChainHolder(object):
         """
         Return names for all the tasks referenced in "on-failure".
         """
-        on_failure_nodes = set([node.on_failure for node in action_chain.chain])
+        on_failure_nodes = set([name for node in action_chain.chain
+                                for name in node.get_next_node_names(condition='on-failure')])
         return on_failure_nodes
 
     def _is_valid_node_name(self, all_node_names, node_name):
@@ -208,14 +273,57 @@ class ChainHolder(object):
         return None
 
     def get_next_node(self, curr_node_name=None, condition='on-success'):
+        next_nodes = self.get_next_nodes(curr_node_name=curr_node_name, condition=condition)
+        return next_nodes[0] if next_nodes else None
+
+    def get_next_nodes(self, curr_node_name=None, condition='on-success'):
+        """
+        Return a list of nodes to invoke next. If the list contains more than one node, the nodes
+        should be invoked in parallel.
+
+        :rtype: ``list`` of :class:`Node`
+        """
         if not curr_node_name:
-            return self.get_node(self.actionchain.default)
+            node = self.get_node(self.actionchain.default)
+            return [node] if node else []
         current_node = self.get_node(curr_node_name)
-        if condition == 'on-success':
-            return self.get_node(current_node.on_success, raise_on_failure=True)
-        elif condition == 'on-failure':
-            return self.get_node(current_node.on_failure, raise_on_failure=True)
-        raise runnerexceptions.ActionRunnerException('Unknown condition %s.' % condition)
+        if condition not in ['on-success', 'on-failure']:
+            raise runnerexceptions.ActionRunnerException('Unknown condition %s.' % condition)
+        node_names = current_node.get_next_node_names(condition=condition)
+        return [self.get_node(node_name, raise_on_failure=True) for node_name in node_names]
+
+
+class ChainBranchState(object):
+    """
+    Holds the outcome of a (sequential) branch of the chain.
+    """
+
+    def __init__(self, context_result=None, chain_vars=None):
+        self.fail = False
+        self.timeout = False
+        self.top_level_error = None
+
+        # Join node which was reached by this branch (if any)
+        self.join_node = None
+
+        # Each branch works on its own copy of the results and variables so parallel branches
+        # don't see each other's results. Those are merged back once the branches are joined.
+        self.context_result = dict(context_result or {})
+        self.vars = dict(chain_vars or {})
+        self.published_vars = {}
+        self.tasks = []
+
+    def merge(self, branch):
+        """
+        Merge results of the provided (completed) parallel branch into this branch.
+        """
+        self.context_result.update(branch.context_result)
+
+        # Note: Only variables published by the branch are merged, the rest of the branch variables
+        # are copies of the values which were available when the branch has started
+        self.vars.update(branch.published_vars)
+        self.published_vars.update(branch.published_vars)
+        self.tasks.extend(branch.tasks)
 
 
 class ActionChainRunner(ActionRunner):
@@ -228,6 +336,8 @@ class ActionChainRunner(ActionRunner):
         self._skip_notify_tasks = []
         self._display_published = False
         self._chain_notify = None
+        self._concurrency = DEFAULT_CONCURRENCY
+        self._task_semaphore = None
 
     def pre_run(self):
         super(ActionChainRunner, self).pre_run()
@@ -236,6 +346,33 @@ class ActionChainRunner(ActionRunner):
         LOG.debug('Reading action chain from %s for action %s.', chainspec_file,
                   self.action)
 
+        # Runner attributes are set lazily. So these steps
+        # should happen outside the constructor.
+        if getattr(self, 'liveaction', None):
+            self._chain_notify = getattr(self.liveaction, 'notify', None)
+        if self.runner_parameters:
+            self._skip_notify_tasks = self.runner_parameters.get('skip_notify', [])
+            self._display_published = self.runner_parameters.get('display_published', False)
+            self._concurrency = self.runner_parameters.get('concurrency', DEFAULT_CONCURRENCY)
+
+        if self._concurrency is None:
+            self._concurrency = DEFAULT_CONCURRENCY
+
+        if self._concurrency < 1:
+            # Semaphore with value lower than 1 would block the first parallel branch forever
+            message = ('Invalid value "%s" for "concurrency" parameter. Value needs to be 1 or '
+                       'greater.' % (self._concurrency))
+            raise runnerexceptions.ActionRunnerPreRunError(message)
+
+        # Parsing and validating the chain definition is relatively expensive so already
+        # validated definitions are reused until the definition file changes
+        file_key = CHAIN_DEFINITION_CACHE.get_file_key(chainspec_file)
+        cached_chain = CHAIN_DEFINITION_CACHE.get(chainspec_file, file_key)
+
+        if cached_chain:
+            self.chain_holder = ChainHolder(None, self.action_name, chain=cached_chain)
+            return
+
         try:
             chainspec = self._meta_loader.load(file_path=chainspec_file,
                                                expected_type=dict)
@@ -258,30 +395,23 @@ class ActionChainRunner(ActionRunner):
             LOG.exception('Failed to instantiate ActionChain.')
             raise runnerexceptions.ActionRunnerPreRunError(message)
 
-        # Runner attributes are set lazily. So these steps
-        # should happen outside the constructor.
-        if getattr(self, 'liveaction', None):
-            self._chain_notify = getattr(self.liveaction, 'notify', None)
-        if self.runner_parameters:
-            self._skip_notify_tasks = self.runner_parameters.get('skip_notify', [])
-            self._display_published = self.runner_parameters.get('display_published', False)
-
         # Perform some pre-run chain validation
         try:
             self.chain_holder.validate()
         except Exception as e:
             raise runnerexceptions.ActionRunnerPreRunError(e.message)
 
+        CHAIN_DEFINITION_CACHE.set(chainspec_file, file_key, self.chain_holder.actionchain)
+
     def run(self, action_parameters):
         # holds final result we store.
         result = {'tasks': []}
         # published variables are to be stored for display.
         if self._display_published:
             result[PUBLISHED_VARS_KEY] = {}
-        context_result = {}  # holds result which is used for the template context purposes
-        top_level_error = None  # stores a reference to a top level error
-        fail = True
         action_node = None
+        branch = ChainBranchState()
+        branch.fail = True
 
         try:
             # initialize vars once we have the action_parameters. This allows
@@ -294,7 +424,7 @@ class ActionChainRunner(ActionRunner):
             error = ('Failed to get starting node "%s". Lookup failed: %s' %
                      (action_node.name, str(e)))
             trace = traceback.format_exc(10)
-            top_level_error = {
+            branch.top_level_error = {
                 'error': error,
                 'traceback': trace
             }
@@ -305,9 +435,60 @@ class ActionChainRunner(ActionRunner):
         if getattr(self.liveaction, 'context', None):
             parent_context.update(self.liveaction.context)
 
+        # Limits the number of tasks which run at the same time in parallel branches
+        self._task_semaphore = eventlet.semaphore.Semaphore(self._concurrency)
+
+        if action_node:
+            branch = ChainBranchState(chain_vars=self.chain_holder.vars)
+            self._run_branch(action_node=action_node, parent_context=parent_context,
+                             action_parameters=action_parameters, branch=branch)
+
+        result['tasks'] = branch.tasks
+        if self._display_published:
+            result[PUBLISHED_VARS_KEY] = branch.published_vars
+
+        if self._stopped:
+            LOG.info('Chain execution (%s) canceled by user.', self.liveaction_id)
+            status = LIVEACTION_STATUS_CANCELED
+            return (status, result, None)
+
+        if branch.fail:
+            status = LIVEACTION_STATUS_FAILED
+        elif branch.timeout:
+            status = LIVEACTION_STATUS_TIMED_OUT
+        else:
+            status = LIVEACTION_STATUS_SUCCEEDED
+
+        if branch.top_level_error:
+            # Include top level error information
+            result['error'] = branch.top_level_error['error']
+            result['traceback'] = branch.top_level_error['traceback']
+
+        return (status, result, None)
+
+    def _run_branch(self, action_node, parent_context, action_parameters, branch,
+                    in_fan_out=False):
+        """
+        Run tasks sequentially starting with the provided node.
+
+        If a task fans out to multiple next tasks, those are run in parallel and the branch
+        continues with the join node (if any) once all the parallel branches have completed.
+
+        :param branch: State of this branch. Task results and published variables are recorded
+                       in it.
+        :type branch: :class:`ChainBranchState`
+
+        :param in_fan_out: True if this branch is one of the parallel branches of a fan-out. Such
+                           branch stops when it reaches a join node.
+        :type in_fan_out: ``bool``
+
+        :rtype: :class:`ChainBranchState`
+        """
+        context_result = branch.context_result
+
         while action_node:
-            fail = False
-            timeout = False
+            branch.fail = False
+            branch.timeout = False
             error = None
             liveaction = None
 
@@ -316,35 +497,37 @@ class ActionChainRunner(ActionRunner):
             try:
                 liveaction = self._get_next_action(
                     action_node=action_node, parent_context=parent_context,
-                    action_params=action_parameters, context_result=context_result)
+                    action_params=action_parameters, context_result=context_result,
+                    chain_vars=branch.vars)
             except InvalidActionReferencedException as e:
                 error = ('Failed to run task "%s". Action with reference "%s" doesn\'t exist.' %
                          (action_node.name, action_node.ref))
                 LOG.exception(error)
 
-                fail = True
-                top_level_error = {
+                branch.fail = True
+                branch.top_level_error = {
                     'error': error,
                     'traceback': traceback.format_exc(10)
                 }
-                break
+                return branch
             except ParameterRenderingFailedException as e:
                 # Rendering parameters failed before we even got to running this action, abort and
                 # fail the whole action chain
                 LOG.exception('Failed to run action "%s".', action_node.name)
 
-                fail = True
+                branch.fail = True
                 error = ('Failed to run task "%s". Parameter rendering failed: %s' %
                          (action_node.name, str(e)))
                 trace = traceback.format_exc(10)
-                top_level_error = {
+                branch.top_level_error = {
                     'error': error,
                     'traceback': trace
                 }
-                break
+                return branch
 
             try:
-                liveaction = self._run_action(liveaction)
+                with self._task_semaphore:
+                    liveaction = self._run_action(liveaction)
             except Exception as e:
                 # Save the traceback and error message
                 LOG.exception('Failure in running action "%s".', action_node.name)
@@ -362,12 +545,11 @@ class ActionChainRunner(ActionRunner):
                 rendered_publish_vars = ActionChainRunner._render_publish_vars(
                     action_node=action_node, action_parameters=action_parameters,
                     execution_result=liveaction.result, previous_execution_results=context_result,
-                    chain_vars=self.chain_holder.vars)
+                    chain_vars=branch.vars)
 
                 if rendered_publish_vars:
-                    self.chain_holder.vars.update(rendered_publish_vars)
-                    if self._display_published:
-                        result[PUBLISHED_VARS_KEY].update(rendered_publish_vars)
+                    branch.vars.update(rendered_publish_vars)
+                    branch.published_vars.update(rendered_publish_vars)
             finally:
                 # Record result and resolve a next node based on the task success or failure
                 updated_at = date_utils.get_datetime_utc_now()
@@ -379,28 +561,27 @@ class ActionChainRunner(ActionRunner):
                     format_kwargs['error'] = error
 
                 task_result = self._format_action_exec_result(**format_kwargs)
-                result['tasks'].append(task_result)
+                branch.tasks.append(task_result)
 
-                if self.liveaction_id:
+                if self.liveaction_id and not self._stopped:
                     self._stopped = action_service.is_action_canceled_or_canceling(
                         self.liveaction_id)
 
                 if self._stopped:
-                    LOG.info('Chain execution (%s) canceled by user.', self.liveaction_id)
-                    status = LIVEACTION_STATUS_CANCELED
-                    return (status, result, None)
+                    return branch
 
+                next_nodes = []
                 try:
                     if not liveaction:
-                        fail = True
-                        action_node = self.chain_holder.get_next_node(action_node.name,
+                        branch.fail = True
+                        next_nodes = self.chain_holder.get_next_nodes(action_node.name,
                                                                       condition='on-failure')
                     elif liveaction.status in LIVEACTION_FAILED_STATES:
                         if liveaction and liveaction.status == LIVEACTION_STATUS_TIMED_OUT:
-                            timeout = True
+                            branch.timeout = True
                         else:
-                            fail = True
-                        action_node = self.chain_holder.get_next_node(action_node.name,
+                            branch.fail = True
+                        next_nodes = self.chain_holder.get_next_nodes(action_node.name,
                                                                       condition='on-failure')
                     elif liveaction.status == LIVEACTION_STATUS_CANCELED:
                         # User canceled an action (task) in the workflow - cancel the execution of
@@ -408,41 +589,114 @@ class ActionChainRunner(ActionRunner):
                         self._stopped = True
                         LOG.info('Chain execution (%s) canceled by user.', self.liveaction_id)
                     elif liveaction.status == LIVEACTION_STATUS_SUCCEEDED:
-                        action_node = self.chain_holder.get_next_node(action_node.name,
+                        next_nodes = self.chain_holder.get_next_nodes(action_node.name,
                                                                       condition='on-success')
                 except Exception as e:
                     LOG.exception('Failed to get next node "%s".', action_node.name)
 
-                    fail = True
+                    branch.fail = True
                     error = ('Failed to get next node "%s". Lookup failed: %s' %
                              (action_node.name, str(e)))
                     trace = traceback.format_exc(10)
-                    top_level_error = {
+                    branch.top_level_error = {
                         'error': error,
                         'traceback': trace
                     }
-                    # reset action_node here so that chain breaks on failure.
-                    action_node = None
-                    break
+                    return branch
 
                 if self._stopped:
-                    LOG.info('Chain execution (%s) canceled by user.', self.liveaction_id)
-                    status = LIVEACTION_STATUS_CANCELED
-                    return (status, result, None)
+                    return branch
+
+            if len(next_nodes) > 1:
+                join_node = self._run_fan_out(action_nodes=next_nodes,
+                                              parent_context=parent_context,
+                                              action_parameters=action_parameters,
+                                              branch=branch)
+
+                if self._stopped or branch.fail or branch.timeout or not join_node:
+                    return branch
+
+                # All the parallel branches have reached the join node, continue with it
+                action_node = join_node
+            elif next_nodes:
+                action_node = next_nodes[0]
+
+                if in_fan_out and action_node.join:
+                    # Join node is invoked by the branch which started the fan-out
+                    branch.join_node = action_node
+                    return branch
+            else:
+                action_node = None
 
-        if fail:
-            status = LIVEACTION_STATUS_FAILED
-        elif timeout:
-            status = LIVEACTION_STATUS_TIMED_OUT
-        else:
-            status = LIVEACTION_STATUS_SUCCEEDED
+        return branch
 
-        if top_level_error:
-            # Include top level error information
-            result['error'] = top_level_error['error']
-            result['traceback'] = top_level_error['traceback']
+    def _run_fan_out(self, action_nodes, parent_context, action_parameters, branch):
+        """
+        Run a branch for each of the provided nodes in parallel, wait for all of them to
+        complete and merge their results into the provided (parent) branch.
 
-        return (status, result, None)
+        Results of the parallel branches are merged in the order in which the nodes are listed
+        in the chain definition so the end result doesn't depend on the order in which the
+        branches complete.
+
+        :return: Join node which all the parallel branches have reached (if any).
+        :rtype: :class:`Node`
+        """
+        LOG.debug('Fanning out to tasks: %s', [node.name for node in action_nodes])
+
+        # Note: Number of tasks which run at the same time is limited by the task semaphore
+        threads = []
+        for action_node in action_nodes:
+            parallel_branch = ChainBranchState(context_result=branch.context_result,
+                                               chain_vars=branch.vars)
+            thread = eventlet.spawn(self._run_branch, action_node=action_node,
+                                    parent_context=parent_context,
+                                    action_parameters=action_parameters,
+                                    branch=parallel_branch, in_fan_out=True)
+            threads.append(thread)
+
+        parallel_branches = [branch_thread.wait() for branch_thread in threads]
+
+        for parallel_branch in parallel_branches:
+            branch.merge(parallel_branch)
+
+        branch.fail = any([item.fail for item in parallel_branches])
+        branch.timeout = any([item.timeout for item in parallel_branches])
+
+        for parallel_branch in parallel_branches:
+            if parallel_branch.top_level_error:
+                branch.top_level_error = parallel_branch.top_level_error
+                break
+
+        join_node_names = set([item.join_node.name for item in parallel_branches
+                               if item.join_node])
+
+        if not join_node_names:
+            return None
+
+        error = None
+        if len(join_node_names) > 1:
+            error = ('Parallel branches of tasks "%s" lead to multiple join tasks: %s' %
+                     ('", "'.join([node.name for node in action_nodes]),
+                      ', '.join(sorted(join_node_names))))
+        elif not all([item.join_node for item in parallel_branches]):
+            # Join node only runs once all the parallel branches have reached it
+            not_joined = [node.name for node, item in zip(action_nodes, parallel_branches)
+                          if not item.join_node]
+            error = ('Parallel branches of tasks "%s" didn\'t reach join task "%s"' %
+                     ('", "'.join(not_joined), list(join_node_names)[0]))
+
+        if error:
+            LOG.error(error)
+
+            branch.fail = True
+            branch.top_level_error = branch.top_level_error or {
+                'error': error,
+                'traceback': ''
+            }
+            return None
+
+        return self.chain_holder.get_node(join_node_names.pop(), raise_on_failure=True)
 
     @staticmethod
     def _render_publish_vars(action_node, action_parameters, execution_result,
@@ -501,7 +755,8 @@ class ActionChainRunner(ActionRunner):
         LOG.debug('Rendered params: %s: Type: %s', rendered_params, type(rendered_params))
         return rendered_params
 
-    def _get_next_action(self, action_node, parent_context, action_params, context_result):
+    def _get_next_action(self, action_node, parent_context, action_params, context_result,
+                         chain_vars=None):
         # Verify that the referenced action exists
         # TODO: We do another lookup in cast_param, refactor to reduce number of lookups
         task_name = action_node.name
@@ -514,7 +769,8 @@ class ActionChainRunner(ActionRunner):
 
         resolved_params = ActionChainRunner._resolve_params(
             action_node=action_node, original_parameters=action_params,
-            results=context_result, chain_vars=self.chain_holder.vars,
+            results=context_result,
+            chain_vars=chain_vars if chain_vars is not None else self.chain_holder.vars,
             chain_context={'parent': parent_context})
 
         liveaction = self._build_liveaction_object(
@@ -526,7 +782,8 @@ class ActionChainRunner(ActionRunner):
 
     def _run_action(self, liveaction, wait_for_completion=True, sleep_delay=1.0):
         """
-        :param sleep_delay: Number of seconds to wait during "is completed" polls.
+        :param sleep_delay: Number of seconds to wait during "is completed" polls. Only used if
+                            completion notifications are disabled.
         :type sleep_delay: ``float``
         """
         try:
@@ -537,12 +794,49 @@ class ActionChainRunner(ActionRunner):
             LOG.exception('Failed to schedule liveaction.')
             raise e
 
-        while (wait_for_completion and liveaction.status not in LIVEACTION_COMPLETED_STATES):
+        if not wait_for_completion:
+            return liveaction
+
+        if cfg.CONF.actionrunner.chain_completion_notifications:
+            return self._wait_for_completion(liveaction)
+
+        while liveaction.status not in LIVEACTION_COMPLETED_STATES:
             eventlet.sleep(sleep_delay)
             liveaction = action_db_util.get_liveaction_by_id(liveaction.id)
 
         return liveaction
 
+    def _wait_for_completion(self, liveaction):
+        """
+        Wait for the liveaction completion message and fall back to the database lookup every
+        "chain_completion_poll_interval" seconds in case the message was lost.
+        """
+        if liveaction.status in LIVEACTION_COMPLETED_STATES:
+            return liveaction
+
+        watcher = liveaction_watcher.get_watcher()
+        poll_interval = cfg.CONF.actionrunner.chain_completion_poll_interval
+        liveaction_id = liveaction.id
+
+        event = watcher.register(liveaction_id)
+
+        try:
+            # Liveaction could have completed before the waiter was registered
+            liveaction = action_db_util.get_liveaction_by_id(liveaction_id)
+
+            while liveaction.status not in LIVEACTION_COMPLETED_STATES:
+                completed_liveaction = watcher.wait(liveaction_id=liveaction_id,
+                                                    timeout=poll_interval, event=event)
+
+                if completed_liveaction:
+                    liveaction = completed_liveaction
+                else:
+                    liveaction = action_db_util.get_liveaction_by_id(liveaction_id)
+        finally:
+            watcher.unregister(liveaction_id, event)
+
+        return liveaction
+
     def _build_liveaction_object(self, action_node, resolved_params, parent_context):
         liveaction = LiveActionDB(action=action_node.ref)
 
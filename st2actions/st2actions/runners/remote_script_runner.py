@@ -14,13 +14,16 @@
 # limitations under the License.
 
 import os
+import posixpath
 import sys
+import time
 import traceback
 import uuid
 
 from oslo_config import cfg
 
 from st2common import log as logging
+from st2common.util.file_system import get_content_hash
 from st2actions.runners.ssh.paramiko_ssh_runner import RUNNER_REMOTE_DIR
 from st2actions.runners.ssh.paramiko_ssh_runner import BaseParallelSSHRunner
 from st2common.models.system.paramiko_script_action import ParamikoRemoteScriptAction
@@ -33,12 +36,20 @@ __all__ = [
 
 LOG = logging.getLogger(__name__)
 
+# Maps remote host to the timestamp of the last remote script cache prune on that host
+_LAST_CACHE_PRUNE_TIMESTAMPS = {}
+
 
 def get_runner():
     return ParamikoRemoteScriptRunner(str(uuid.uuid4()))
 
 
 class ParamikoRemoteScriptRunner(BaseParallelSSHRunner):
+    def __init__(self, runner_id):
+        super(ParamikoRemoteScriptRunner, self).__init__(runner_id=runner_id)
+        self._use_remote_cache = cfg.CONF.ssh_runner.use_remote_script_cache
+        self._content_hash = None
+
     def run(self, action_parameters):
         remote_action = self._get_remote_action(action_parameters)
 
@@ -50,6 +61,9 @@ class ParamikoRemoteScriptRunner(BaseParallelSSHRunner):
         return (status, result, None)
 
     def _run(self, remote_action):
+        if self._use_remote_cache:
+            return self._run_cached(remote_action)
+
         try:
             copy_results = self._copy_artifacts(remote_action)
         except:
@@ -80,6 +94,72 @@ class ParamikoRemoteScriptRunner(BaseParallelSSHRunner):
             exec_results = self._generate_error_results(' '.join([error, str(ex)]), tb)
             return exec_results
 
+    def _run_cached(self, remote_action):
+        try:
+            self._copy_artifacts_to_cache(remote_action)
+        except:
+            error = 'Failed copying content to remote boxes.'
+            LOG.exception(error)
+            _, ex, tb = sys.exc_info()
+            copy_results = self._generate_error_results(' '.join([error, str(ex)]), tb)
+            return copy_results
+
+        try:
+            exec_results = self._run_script_on_remote_host(remote_action)
+        except:
+            error = 'Failed executing script on remote boxes.'
+            LOG.exception(error, extra={'_action_params': remote_action})
+            _, ex, tb = sys.exc_info()
+            exec_results = self._generate_error_results(' '.join([error, str(ex)]), tb)
+            return exec_results
+
+        # Cache entries are shared between executions so we don't delete them here, stale ones
+        # are periodically pruned instead
+        try:
+            self._prune_remote_cache()
+        except:
+            LOG.exception('Failed pruning remote cache dir.')
+
+        return exec_results
+
+    def _copy_artifacts_to_cache(self, remote_action):
+        local_paths = [remote_action.get_local_script_abs_path()]
+
+        local_libs_path = remote_action.get_local_libs_path_abs()
+        if local_libs_path and os.path.exists(local_libs_path):
+            local_paths.append(local_libs_path)
+
+        cache_dir = cfg.CONF.ssh_runner.remote_script_cache_dir
+        file_mode = 0744
+        extra = {'_local_paths': local_paths, '_cache_dir': cache_dir,
+                 '_content_hash': self._content_hash, 'mode': file_mode}
+        LOG.debug('Copying local script and libs to remote cache dir.', extra=extra)
+        result = self._parallel_ssh_client.put_cached(local_paths=local_paths,
+                                                      cache_dir=cache_dir,
+                                                      content_hash=self._content_hash,
+                                                      mode=file_mode)
+        LOG.debug('Copied local script and libs to remote cache dir.', extra={'_result': result})
+        return result
+
+    def _prune_remote_cache(self):
+        now = time.time()
+        interval = cfg.CONF.ssh_runner.remote_script_cache_prune_interval
+
+        is_due = any([(now - _LAST_CACHE_PRUNE_TIMESTAMPS.get(host, 0)) >= interval
+                      for host in self._hosts])
+        if not is_due:
+            return None
+
+        for host in self._hosts:
+            _LAST_CACHE_PRUNE_TIMESTAMPS[host] = now
+
+        cache_dir = cfg.CONF.ssh_runner.remote_script_cache_dir
+        ttl = cfg.CONF.ssh_runner.remote_script_cache_ttl
+        LOG.debug('Pruning remote cache dir.', extra={'_cache_dir': cache_dir, '_ttl': ttl})
+        result = self._parallel_ssh_client.prune_cache(cache_dir=cache_dir, ttl=ttl)
+        LOG.debug('Pruned remote cache dir.', extra={'_result': result})
+        return result
+
     def _copy_artifacts(self, remote_action):
         # First create remote execution directory.
         remote_dir = remote_action.get_remote_base_dir()
@@ -128,9 +208,20 @@ class ParamikoRemoteScriptRunner(BaseParallelSSHRunner):
         pos_args, named_args = self._get_script_args(action_parameters)
         named_args = self._transform_named_args(named_args)
         env_vars = self._get_env_vars()
-        remote_dir = self.runner_parameters.get(RUNNER_REMOTE_DIR,
-                                                cfg.CONF.ssh_runner.remote_dir)
-        remote_dir = os.path.join(remote_dir, self.liveaction_id)
+
+        if self._use_remote_cache:
+            # Note: Cache entries are shared between executions (and actions) and need to live in
+            # a directory which is only accessible by the SSH user so "dir" runner parameter
+            # (per execution working directory) doesn't apply here
+            self._content_hash = get_content_hash(paths=[script_local_path_abs,
+                                                         self.libs_dir_path])
+            remote_dir = posixpath.join(cfg.CONF.ssh_runner.remote_script_cache_dir,
+                                        self._content_hash)
+        else:
+            remote_dir = self.runner_parameters.get(RUNNER_REMOTE_DIR,
+                                                    cfg.CONF.ssh_runner.remote_dir)
+            remote_dir = os.path.join(remote_dir, self.liveaction_id)
+
         return ParamikoRemoteScriptAction(self.action_name,
                                           str(self.liveaction_id),
                                           script_local_path_abs,
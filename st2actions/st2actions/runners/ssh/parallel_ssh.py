@@ -147,6 +147,59 @@ class ParallelSSHClient(object):
 
         return self._execute_in_pool(self._put_files, **options)
 
+    def put_cached(self, local_paths, cache_dir, content_hash, mode=None):
+        """
+        Copy files and folders to a content addressed cache directory on remote hosts. Hosts
+        which already have the content cached are skipped.
+
+        :param local_paths: List of local file and dir paths. Must be shlex quoted.
+        :type local_paths: ``list`` of ``str``
+
+        :param cache_dir: Base cache dir on remote hosts. Must be shlex quoted.
+        :type cache_dir: ``str``
+
+        :param content_hash: Hash of the local content.
+        :type content_hash: ``str``
+
+        :param mode: Optional mode to use for the files.
+        :type mode: ``int``
+
+        :rtype: ``dict`` of ``str`` to ``dict``
+        """
+
+        for local_path in local_paths:
+            if not os.path.exists(local_path):
+                raise Exception('Local path %s does not exist.' % local_path)
+
+        options = {
+            'local_paths': local_paths,
+            'cache_dir': cache_dir,
+            'content_hash': content_hash,
+            'mode': mode
+        }
+
+        return self._execute_in_pool(self._put_cached_files, **options)
+
+    def prune_cache(self, cache_dir, ttl, timeout=None):
+        """
+        Remove stale entries from the cache directory on remote hosts.
+
+        :param cache_dir: Base cache dir on remote hosts. Must be shlex quoted.
+        :type cache_dir: ``str``
+
+        :param ttl: Entries which haven't been used in ttl seconds are removed.
+        :type ttl: ``int``
+
+        :rtype: ``dict`` of ``str`` to ``dict``
+        """
+
+        options = {
+            'cache_dir': cache_dir,
+            'ttl': ttl,
+            'timeout': timeout
+        }
+        return self._execute_in_pool(self._prune_cache, **options)
+
     def mkdir(self, path):
         """
         Create a directory on remote hosts.
@@ -285,6 +338,30 @@ class ParallelSSHClient(object):
             LOG.exception(error)
             results[host] = self._generate_error_result(exc=ex, message=error)
 
+    def _put_cached_files(self, local_paths, cache_dir, content_hash, host, results, mode=None):
+        try:
+            LOG.debug('Copying files to cache dir on host: %s' % host)
+            result = self._hosts_client[host].put_cached(local_paths=local_paths,
+                                                         cache_dir=cache_dir,
+                                                         content_hash=content_hash,
+                                                         mode=mode)
+            LOG.debug('Result of cached copy: %s' % result)
+            results[host] = result
+        except Exception as ex:
+            error = 'Failed sending file(s) in paths %s to host %s' % (local_paths, host)
+            LOG.exception(error)
+            results[host] = self._generate_error_result(exc=ex, message=error)
+
+    def _prune_cache(self, host, cache_dir, ttl, results, timeout=None):
+        try:
+            result = self._hosts_client[host].prune_cache(cache_dir=cache_dir, ttl=ttl,
+                                                          timeout=timeout)
+            results[host] = result
+        except Exception as ex:
+            error = 'Failed pruning cache dir %s on host %s.' % (cache_dir, host)
+            LOG.exception(error)
+            results[host] = self._generate_error_result(exc=ex, message=error)
+
     def _mkdir(self, host, path, results):
         try:
             result = self._hosts_client[host].mkdir(path)
@@ -15,8 +15,10 @@
 
 import os
 import posixpath
+import stat
 from StringIO import StringIO
 import time
+import uuid
 
 import eventlet
 from oslo_config import cfg
@@ -30,12 +32,15 @@ import paramiko
 from st2common.log import logging
 from st2common.util.misc import strip_shell_chars
 from st2common.util.shell import quote_unix
+from st2common.util.shell import quote_unix_path
+from st2common.util.shell import HOME_DIR_PREFIX
 from st2common.constants.runners import REMOTE_RUNNER_PRIVATE_KEY_HEADER
 
 __all__ = [
     'ParamikoSSHClient',
 
-    'SSHCommandTimeoutError'
+    'SSHCommandTimeoutError',
+    'InsecureRemoteCacheError'
 ]
 
 
@@ -67,6 +72,14 @@ class SSHCommandTimeoutError(Exception):
         return self.message
 
 
+class InsecureRemoteCacheError(Exception):
+    """
+    Exception which is raised when a remote cache directory or entry is not owned by the SSH user
+    or is accessible by other users.
+    """
+    pass
+
+
 class ParamikoSSHClient(object):
     """
     A SSH Client powered by Paramiko.
@@ -81,6 +94,12 @@ class ParamikoSSHClient(object):
     # Connect socket timeout
     CONNECT_TIMEOUT = 60
 
+    # Name of the file which marks a fully uploaded remote cache entry
+    CACHE_ENTRY_MARKER = '.st2-cache-complete'
+
+    # Mode of the remote cache directory and cache entries
+    CACHE_DIR_MODE = 0700
+
     def __init__(self, hostname, port=22, username=None, password=None, bastion_host=None,
                  key_files=None, key_material=None, timeout=None, passphrase=None):
         """
@@ -123,6 +142,9 @@ class ParamikoSSHClient(object):
         self.bastion_client = None
         self.bastion_socket = None
 
+        self._home_dir = None
+        self._remote_uid = None
+
     def connect(self):
         """
         Connect to the remote node over SSH.
@@ -253,6 +275,104 @@ class ParamikoSSHClient(object):
 
         return remote_paths
 
+    def put_cached(self, local_paths, cache_dir, content_hash, mode=None):
+        """
+        Upload files and dirs to a content addressed cache directory on the remote node.
+
+        Content is stored in ``<cache_dir>/<content_hash>/``. If a complete entry for the provided
+        hash already exists on the remote node, nothing is transferred and only the access time of
+        the entry is refreshed (so it's not removed by :meth:`prune_cache`).
+
+        Cache dir and entries are created with 0700 mode. Existing cache dir and entries are only
+        used if they are owned by the SSH user and not accessible by other users, otherwise
+        :class:`InsecureRemoteCacheError` is raised.
+
+        :param local_paths: List of local file and dir paths to upload. Files are uploaded to the
+                            root of the cache entry and dirs are uploaded recursively with the
+                            local mode mirrored.
+        :type local_paths: ``list`` of ``str``
+
+        :param cache_dir: Base cache directory on the remote node. Path which starts with "~/" is
+                          relative to the home directory of the SSH user.
+        :type cache_dir: ``str``
+
+        :param content_hash: Hash of the local content (see
+                             :func:`st2common.util.file_system.get_content_hash`).
+        :type content_hash: ``str``
+
+        :param mode: Optional permissions mode for the uploaded files. E.g. 0744.
+        :type mode: ``int``
+
+        :return: Dictionary with the remote entry path and a flag indicating if the content was
+                 already present on the remote node.
+        :rtype: ``dict``
+        """
+        cache_dir = self._get_absolute_path(cache_dir)
+        entry_path = posixpath.join(cache_dir, content_hash)
+        marker_path = posixpath.join(entry_path, self.CACHE_ENTRY_MARKER)
+
+        extra = {'_local_paths': local_paths, '_entry_path': entry_path}
+
+        self._ensure_private_dir(cache_dir)
+
+        if self.exists(marker_path):
+            self._verify_private_dir(entry_path)
+            self.logger.debug('Remote cache hit, skipping upload', extra=extra)
+            self.sftp.utime(entry_path, None)
+            return {'path': entry_path, 'cached': True}
+
+        self.logger.debug('Remote cache miss, uploading content', extra=extra)
+
+        # Content is uploaded to a temporary dir which is then atomically renamed to make sure
+        # concurrent executions never see a partially uploaded entry
+        tmp_path = '%s.tmp-%s' % (entry_path, uuid.uuid4().hex)
+        self.sftp.mkdir(tmp_path, mode=self.CACHE_DIR_MODE)
+        self.sftp.chmod(tmp_path, self.CACHE_DIR_MODE)
+
+        try:
+            for local_path in local_paths:
+                if os.path.isdir(local_path):
+                    self.put_dir(local_path=local_path, remote_path=tmp_path,
+                                 mirror_local_mode=True)
+                else:
+                    remote_path = posixpath.join(tmp_path, os.path.basename(local_path))
+                    self.put(local_path=local_path, remote_path=remote_path, mode=mode)
+
+            self.sftp.open(posixpath.join(tmp_path, self.CACHE_ENTRY_MARKER), 'w').close()
+            self.sftp.rename(tmp_path, entry_path)
+        except IOError:
+            # Another execution might have populated the same entry in the mean time
+            self.delete_dir(tmp_path, force=True)
+
+            if not self.exists(marker_path):
+                raise
+
+            self._verify_private_dir(entry_path)
+
+        return {'path': entry_path, 'cached': False}
+
+    def prune_cache(self, cache_dir, ttl, timeout=None):
+        """
+        Remove entries which haven't been used in the last ``ttl`` seconds from the remote cache
+        directory.
+
+        :param cache_dir: Base cache directory on the remote node.
+        :type cache_dir: ``str``
+
+        :param ttl: Entry TTL in seconds.
+        :type ttl: ``int``
+
+        :param timeout: Optional Time to wait for the command to finish.
+        :type timeout: ``int``
+        """
+        ttl_minutes = max(int(ttl / 60), 1)
+        command = ('test ! -d %(dir)s || find %(dir)s -mindepth 1 -maxdepth 1 -mmin +%(ttl)s '
+                   '-exec rm -rf {} +' % {'dir': quote_unix_path(cache_dir), 'ttl': ttl_minutes})
+
+        extra = {'_cache_dir': cache_dir, '_command': command}
+        self.logger.debug('Pruning remote cache', extra=extra)
+        return self.run(command, timeout=timeout)
+
     def exists(self, remote_path):
         """
         Validate whether a remote file or directory exists.
@@ -423,6 +543,84 @@ class ParamikoSSHClient(object):
 
         return [stdout, stderr, status]
 
+    def _get_absolute_path(self, path):
+        """
+        Resolve path which is relative to the home directory of the SSH user (starts with "~/").
+        """
+        if not path.startswith(HOME_DIR_PREFIX):
+            return path
+
+        if self._home_dir is None:
+            # SFTP session starts in the home directory of the user
+            self._home_dir = self.sftp.normalize('.')
+
+        return posixpath.join(self._home_dir, path[len(HOME_DIR_PREFIX):])
+
+    def _get_remote_uid(self):
+        if self._remote_uid is None:
+            stdout, stderr, exit_code = self.run('id -u')
+
+            if exit_code != 0:
+                raise Exception('Failed to retrieve id of the remote user: %s' % (stderr))
+
+            self._remote_uid = int(stdout.strip())
+
+        return self._remote_uid
+
+    def _ensure_private_dir(self, dir_path):
+        """
+        Create a directory which is only accessible by the SSH user (if it doesn't exist yet) and
+        verify it's owner and mode.
+        """
+        if not self.exists(dir_path):
+            self._mkdir_recursive(posixpath.dirname(dir_path.rstrip('/')))
+
+            try:
+                self.sftp.mkdir(dir_path, mode=self.CACHE_DIR_MODE)
+                self.sftp.chmod(dir_path, self.CACHE_DIR_MODE)
+            except IOError:
+                # Directory could have been created by a concurrent upload
+                if not self.exists(dir_path):
+                    raise
+
+        self._verify_private_dir(dir_path)
+
+    def _verify_private_dir(self, dir_path):
+        """
+        Verify that the provided path is a directory which is owned by the SSH user and which is
+        not accessible by other users.
+        """
+        attributes = self.sftp.lstat(dir_path)
+
+        if not stat.S_ISDIR(attributes.st_mode):
+            raise InsecureRemoteCacheError('Remote cache path "%s" is not a directory' %
+                                           (dir_path))
+
+        if attributes.st_uid != self._get_remote_uid():
+            raise InsecureRemoteCacheError('Remote cache directory "%s" is not owned by user "%s"' %
+                                           (dir_path, self.username))
+
+        if stat.S_IMODE(attributes.st_mode) & 0077:
+            raise InsecureRemoteCacheError('Remote cache directory "%s" is accessible by other '
+                                           'users (mode %o)' %
+                                           (dir_path, stat.S_IMODE(attributes.st_mode)))
+
+    def _mkdir_recursive(self, dir_path):
+        """
+        Create a remote directory and all the missing parent directories.
+        """
+        if not dir_path or dir_path == '/' or self.exists(dir_path):
+            return
+
+        self._mkdir_recursive(posixpath.dirname(dir_path.rstrip('/')))
+
+        try:
+            self.sftp.mkdir(dir_path)
+        except IOError:
+            # Directory could have been created by a concurrent upload
+            if not self.exists(dir_path):
+                raise
+
     def close(self):
         self.logger.debug('Closing server connection')
 
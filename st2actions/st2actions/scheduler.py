@@ -18,6 +18,7 @@ from kombu import Connection
 from st2common import log as logging
 from st2common.constants import action as action_constants
 from st2common.exceptions.db import StackStormDBObjectNotFoundError
+from st2common.metrics import base as metrics
 from st2common.models.db.liveaction import LiveActionDB
 from st2common.services import action as action_service
 from st2common.persistence.liveaction import LiveAction
@@ -63,7 +64,8 @@ class ActionExecutionScheduler(consumers.MessageHandler):
             raise
 
         # Apply policies defined for the action.
-        liveaction_db = self._apply_pre_run_policies(liveaction_db=liveaction_db)
+        with metrics.Timer('action.schedule.policies'):
+            liveaction_db = self._apply_pre_run_policies(liveaction_db=liveaction_db)
 
         # Exit if the status of the request is no longer runnable.
         # The status could have be changed by one of the policies.
@@ -77,6 +79,7 @@ class ActionExecutionScheduler(consumers.MessageHandler):
         if liveaction_db.status == action_constants.LIVEACTION_STATUS_REQUESTED:
             liveaction_db = action_service.update_status(
                 liveaction_db, action_constants.LIVEACTION_STATUS_SCHEDULED, publish=False)
+            metrics.inc_counter('action.scheduled')
 
         # Publish the "scheduled" status here manually. Otherwise, there could be a
         # race condition with the update of the action_execution_db if the execution
@@ -23,6 +23,7 @@ from st2common import log as logging
 from st2common.constants import action as action_constants
 from st2common.exceptions.actionrunner import ActionRunnerException
 from st2common.exceptions.db import StackStormDBObjectNotFoundError
+from st2common.metrics import base as metrics
 from st2common.models.db.liveaction import LiveActionDB
 from st2common.persistence.execution import ActionExecution
 from st2common.services import executions
@@ -123,7 +124,8 @@ class ActionExecutionDispatcher(consumers.MessageHandler):
 
         extra = {'liveaction_db': liveaction_db}
         try:
-            result = self.container.dispatch(liveaction_db)
+            with metrics.Timer('action.run'):
+                result = self.container.dispatch(liveaction_db)
             LOG.debug('Runner dispatch produced result: %s', result)
             if not result:
                 raise ActionRunnerException('Failed to execute action.')
@@ -13,7 +13,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import bson
+import eventlet
 import mock
+from oslo_config import cfg
 
 from st2actions.runners import actionchainrunner as acr
 from st2actions.container.service import RunnerContainerService
@@ -30,6 +33,7 @@ from st2common.models.system.common import ResourceReference
 from st2common.persistence.keyvalue import KeyValuePair
 from st2common.persistence.runner import RunnerType
 from st2common.services import action as action_service
+from st2common.services import liveaction_watcher
 from st2common.util import action_db as action_db_util
 from st2common.exceptions.action import ParameterRenderingFailedException
 from st2tests import DbTestCase
@@ -110,6 +114,13 @@ CHAIN_ACTION_PARAMETERS_ATTRIBUTE = FixturesLoader().get_fixture_file_path_abs(
 CHAIN_ACTION_INVALID_PARAMETER_TYPE = FixturesLoader().get_fixture_file_path_abs(
     FIXTURES_PACK, 'actionchains', 'chain_invalid_parameter_type_passed_to_action.yaml')
 
+CHAIN_WITH_PARALLEL_BRANCHES = FixturesLoader().get_fixture_file_path_abs(
+    FIXTURES_PACK, 'actionchains', 'chain_with_parallel_branches.yaml')
+CHAIN_WITH_PARALLEL_BRANCHES_PUBLISH = FixturesLoader().get_fixture_file_path_abs(
+    FIXTURES_PACK, 'actionchains', 'chain_with_parallel_branches_publish.yaml')
+CHAIN_WITH_PARALLEL_BRANCHES_MISSING_JOIN = FixturesLoader().get_fixture_file_path_abs(
+    FIXTURES_PACK, 'actionchains', 'chain_with_parallel_branches_missing_join.yaml')
+
 CHAIN_NOTIFY_API = {'notify': {'on-complete': {'message': 'foo happened.'}}}
 CHAIN_NOTIFY_DB = NotificationsHelper.to_model(CHAIN_NOTIFY_API)
 
@@ -152,6 +163,44 @@ class TestActionChainRunner(DbTestCase):
         # based on the chain the callcount is known to be 3. Not great but works.
         self.assertEqual(request.call_count, 3)
 
+    def test_chain_definition_is_cached_between_runs(self):
+        acr.CHAIN_DEFINITION_CACHE.clear()
+
+        chain_runner_1 = acr.get_runner()
+        chain_runner_1.entry_point = CHAIN_1_PATH
+        chain_runner_1.action = ACTION_1
+        chain_runner_1.container_service = RunnerContainerService()
+        chain_runner_1.pre_run()
+
+        chain_runner_2 = acr.get_runner()
+        chain_runner_2.entry_point = CHAIN_1_PATH
+        chain_runner_2.action = ACTION_1
+        chain_runner_2.container_service = RunnerContainerService()
+
+        with mock.patch.object(chain_runner_2._meta_loader, 'load') as mock_load:
+            chain_runner_2.pre_run()
+            self.assertFalse(mock_load.called)
+
+        # Definition is shared, but the per-run state isn't
+        self.assertTrue(chain_runner_1.chain_holder.actionchain is
+                        chain_runner_2.chain_holder.actionchain)
+        self.assertFalse(chain_runner_1.chain_holder is chain_runner_2.chain_holder)
+
+        # Definition is reloaded once the file changes
+        file_key = acr.CHAIN_DEFINITION_CACHE.get_file_key(CHAIN_1_PATH)
+        changed_file_key = (file_key[0] + 1, file_key[1])
+
+        with mock.patch.object(acr.CHAIN_DEFINITION_CACHE, 'get_file_key',
+                               mock.Mock(return_value=changed_file_key)):
+            chain_runner_3 = acr.get_runner()
+            chain_runner_3.entry_point = CHAIN_1_PATH
+            chain_runner_3.action = ACTION_1
+            chain_runner_3.container_service = RunnerContainerService()
+            chain_runner_3.pre_run()
+
+        self.assertFalse(chain_runner_1.chain_holder.actionchain is
+                         chain_runner_3.chain_holder.actionchain)
+
     @mock.patch.object(action_db_util, 'get_action_by_ref',
                        mock.MagicMock(return_value=ACTION_1))
     @mock.patch.object(action_service, 'request', return_value=(DummyActionExecution(), None))
@@ -185,6 +234,104 @@ class TestActionChainRunner(DbTestCase):
         # based on the chain the callcount is known to be 3. Not great but works.
         self.assertEqual(request.call_count, 3)
 
+    @mock.patch.object(action_db_util, 'get_action_by_ref',
+                       mock.MagicMock(return_value=ACTION_1))
+    @mock.patch.object(action_service, 'request', return_value=(DummyActionExecution(), None))
+    def test_chain_runner_parallel_branches(self, request):
+        chain_runner = acr.get_runner()
+        chain_runner.entry_point = CHAIN_WITH_PARALLEL_BRANCHES
+        chain_runner.action = ACTION_1
+        chain_runner.runner_parameters = {'concurrency': 2}
+        chain_runner.container_service = RunnerContainerService()
+        chain_runner.pre_run()
+        status, result, _ = chain_runner.run({})
+
+        self.assertEqual(status, LIVEACTION_STATUS_SUCCEEDED)
+        # c1, three parallel branches and the join task
+        self.assertEqual(request.call_count, 5)
+        # Results of the parallel branches are recorded in the definition order
+        task_names = [task['name'] for task in result['tasks']]
+        self.assertEqual(task_names, ['c1', 'c2', 'c3', 'c4', 'c5'])
+
+    @mock.patch.object(action_db_util, 'get_action_by_ref',
+                       mock.MagicMock(return_value=ACTION_1))
+    @mock.patch.object(action_service, 'request', return_value=(DummyActionExecution(), None))
+    def test_chain_runner_parallel_branches_publish_vars_isolation(self, request):
+        chain_runner = acr.get_runner()
+        chain_runner.entry_point = CHAIN_WITH_PARALLEL_BRANCHES_PUBLISH
+        chain_runner.action = ACTION_1
+        chain_runner.runner_parameters = {'display_published': True}
+        chain_runner.container_service = RunnerContainerService()
+        chain_runner.pre_run()
+        status, result, _ = chain_runner.run({})
+
+        self.assertEqual(status, LIVEACTION_STATUS_SUCCEEDED)
+        self.assertEqual(request.call_count, 4)
+
+        # Variables published by one parallel branch are not visible to the other branches
+        parameters = [call[0][0].parameters['p1'] for call in request.call_args_list]
+        self.assertEqual(parameters[1:3], ['initial', 'initial'])
+
+        # Join task sees variables published by all the branches
+        self.assertEqual(parameters[3], 'c2 c3')
+        self.assertEqual(result['published'], {'branch': 'c2', 'other': 'c3'})
+
+    @mock.patch.object(action_db_util, 'get_action_by_ref',
+                       mock.MagicMock(return_value=ACTION_1))
+    @mock.patch.object(action_service, 'request', return_value=(DummyActionExecution(), None))
+    def test_chain_runner_parallel_branch_doesnt_reach_join(self, request):
+        chain_runner = acr.get_runner()
+        chain_runner.entry_point = CHAIN_WITH_PARALLEL_BRANCHES_MISSING_JOIN
+        chain_runner.action = ACTION_1
+        chain_runner.container_service = RunnerContainerService()
+        chain_runner.pre_run()
+        status, result, _ = chain_runner.run({})
+
+        # Join task doesn't run since branch "c3" ended before reaching it
+        self.assertEqual(status, LIVEACTION_STATUS_FAILED)
+        self.assertEqual(request.call_count, 3)
+        self.assertEqual([task['name'] for task in result['tasks']], ['c1', 'c2', 'c3'])
+        self.assertIn('Parallel branches of tasks "c3" didn\'t reach join task "c4"',
+                      result['error'])
+
+    def test_chain_runner_invalid_concurrency(self):
+        for concurrency in [0, -1]:
+            chain_runner = acr.get_runner()
+            chain_runner.entry_point = CHAIN_WITH_PARALLEL_BRANCHES
+            chain_runner.action = ACTION_1
+            chain_runner.runner_parameters = {'concurrency': concurrency}
+            chain_runner.container_service = RunnerContainerService()
+            self.assertRaisesRegexp(runnerexceptions.ActionRunnerPreRunError,
+                                    'Value needs to be 1 or greater', chain_runner.pre_run)
+
+    @mock.patch.object(action_db_util, 'get_action_by_ref',
+                       mock.MagicMock(return_value=ACTION_1))
+    @mock.patch.object(action_service, 'request', return_value=(DummyActionExecution(), None))
+    def test_chain_runner_parallel_branch_failure_skips_join(self, request):
+        chain_runner = acr.get_runner()
+        chain_runner.entry_point = CHAIN_WITH_PARALLEL_BRANCHES
+        chain_runner.action = ACTION_1
+
+        original_run_action = chain_runner._run_action
+
+        def mock_run_action(*args, **kwargs):
+            original_live_action = args[0]
+            liveaction = original_run_action(*args, **kwargs)
+            if original_live_action.context['chain']['name'] == 'c3':
+                liveaction = DummyActionExecution(status=LIVEACTION_STATUS_FAILED)
+            return liveaction
+
+        chain_runner._run_action = mock_run_action
+        chain_runner.container_service = RunnerContainerService()
+        chain_runner.pre_run()
+        status, result, _ = chain_runner.run({})
+
+        self.assertEqual(status, LIVEACTION_STATUS_FAILED)
+        # Join task shouldn't run since one of the branches failed
+        self.assertEqual(request.call_count, 4)
+        task_names = [task['name'] for task in result['tasks']]
+        self.assertTrue('c5' not in task_names)
+
     @mock.patch.object(action_db_util, 'get_action_by_ref',
                        mock.MagicMock(return_value=ACTION_1))
     @mock.patch.object(action_service, 'request', return_value=(DummyActionExecution(), None))
@@ -311,6 +458,103 @@ class TestActionChainRunner(DbTestCase):
         # based on the chain the callcount is known to be 3. Not great but works.
         self.assertEqual(request.call_count, 3)
 
+    @mock.patch.object(action_db_util, 'get_liveaction_by_id', mock.MagicMock(
+        return_value=DummyActionExecution(status=LIVEACTION_STATUS_RUNNING)))
+    @mock.patch.object(action_db_util, 'get_action_by_ref',
+                       mock.MagicMock(return_value=ACTION_1))
+    @mock.patch.object(action_service, 'request',
+                       return_value=(DummyActionExecution(status=LIVEACTION_STATUS_RUNNING), None))
+    def test_chain_runner_success_path_with_completion_notifications(self, request):
+        self._enable_completion_notifications()
+
+        watcher = mock.Mock()
+        watcher.wait.return_value = DummyActionExecution()
+
+        with mock.patch.object(liveaction_watcher, 'get_watcher',
+                               mock.MagicMock(return_value=watcher)):
+            chain_runner, _ = self._run_chain(CHAIN_1_PATH)
+
+        self.assertEqual(request.call_count, 3)
+
+        # Completion should be detected via notifications, database is only checked once after
+        # registering the waiter
+        self.assertEqual(watcher.register.call_count, 3)
+        self.assertEqual(watcher.unregister.call_count, 3)
+        self.assertEqual(watcher.wait.call_count, 3)
+        self.assertEqual(action_db_util.get_liveaction_by_id.call_count, 3)
+        self.assertNotEqual(chain_runner.chain_holder.actionchain, None)
+
+    @mock.patch.object(action_db_util, 'get_action_by_ref',
+                       mock.MagicMock(return_value=ACTION_1))
+    def test_chain_runner_completion_notification(self):
+        self._enable_completion_notifications()
+
+        watcher = liveaction_watcher.LiveActionWatcher()
+        liveaction_id = bson.ObjectId()
+
+        def mock_get_liveaction_by_id(liveaction_id):
+            # Completion message arrives after the waiter has been registered
+            completed = DummyActionExecution()
+            completed.id = liveaction_id
+            eventlet.spawn(watcher.process_task, completed, mock.Mock())
+
+            running = DummyActionExecution(status=LIVEACTION_STATUS_RUNNING)
+            running.id = liveaction_id
+            return running
+
+        running = DummyActionExecution(status=LIVEACTION_STATUS_RUNNING)
+        running.id = liveaction_id
+
+        with mock.patch.object(liveaction_watcher, 'get_watcher',
+                               mock.MagicMock(return_value=watcher)), \
+                mock.patch.object(action_service, 'request',
+                                  mock.MagicMock(return_value=(running, None))) as request, \
+                mock.patch.object(action_db_util, 'get_liveaction_by_id',
+                                  mock.MagicMock(side_effect=mock_get_liveaction_by_id)) \
+                as get_liveaction_by_id, \
+                eventlet.Timeout(5):
+            _, status = self._run_chain(CHAIN_1_PATH)
+
+        self.assertEqual(status, LIVEACTION_STATUS_SUCCEEDED)
+        self.assertEqual(request.call_count, 3)
+        self.assertEqual(get_liveaction_by_id.call_count, 3)
+        self.assertEqual(watcher._waiters, {})
+
+    @mock.patch.object(action_db_util, 'get_action_by_ref',
+                       mock.MagicMock(return_value=ACTION_1))
+    def test_chain_runner_completion_notification_before_wait(self):
+        self._enable_completion_notifications()
+
+        watcher = liveaction_watcher.LiveActionWatcher()
+        liveaction_id = bson.ObjectId()
+
+        completed = DummyActionExecution()
+        completed.id = liveaction_id
+
+        def mock_request(liveaction):
+            # Completion message arrives before the runner starts waiting and is lost, runner
+            # should pick up the completed status from the database without waiting for the
+            # poll interval
+            watcher.process_task(completed, mock.Mock())
+
+            running = DummyActionExecution(status=LIVEACTION_STATUS_RUNNING)
+            running.id = liveaction_id
+            return running, None
+
+        with mock.patch.object(liveaction_watcher, 'get_watcher',
+                               mock.MagicMock(return_value=watcher)), \
+                mock.patch.object(action_service, 'request',
+                                  mock.MagicMock(side_effect=mock_request)), \
+                mock.patch.object(action_db_util, 'get_liveaction_by_id',
+                                  mock.MagicMock(return_value=completed)), \
+                mock.patch.object(watcher, 'wait', mock.MagicMock()) as wait, \
+                eventlet.Timeout(5):
+            _, status = self._run_chain(CHAIN_1_PATH)
+
+        self.assertEqual(status, LIVEACTION_STATUS_SUCCEEDED)
+        self.assertEqual(wait.call_count, 0)
+        self.assertEqual(watcher._waiters, {})
+
     @mock.patch.object(action_db_util, 'get_action_by_ref',
                        mock.MagicMock(return_value=ACTION_1))
     @mock.patch.object(action_service, 'request',
@@ -759,6 +1003,21 @@ class TestActionChainRunner(DbTestCase):
         status, output, _ = chain_runner.run(action_parameters=action_parameters)
         self.assertEqual(status, LIVEACTION_STATUS_SUCCEEDED)
 
+    def _enable_completion_notifications(self):
+        cfg.CONF.set_override(name='chain_completion_notifications', override=True,
+                              group='actionrunner')
+        self.addCleanup(cfg.CONF.set_override, name='chain_completion_notifications',
+                        override=False, group='actionrunner')
+
+    def _run_chain(self, entry_point):
+        chain_runner = acr.get_runner()
+        chain_runner.entry_point = entry_point
+        chain_runner.action = ACTION_1
+        chain_runner.container_service = RunnerContainerService()
+        chain_runner.pre_run()
+        status, _, _ = chain_runner.run({})
+        return chain_runner, status
+
     @classmethod
     def tearDownClass(cls):
         FixturesLoader().delete_models_from_db(MODELS)
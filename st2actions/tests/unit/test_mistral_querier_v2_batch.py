@@ -0,0 +1,233 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import BaseHTTPServer
+import json
+import threading
+import urlparse
+
+import mock
+import unittest2
+from oslo_config import cfg
+
+import st2tests.config as tests_config
+tests_config.parse_args()
+
+from st2actions.query.base import QueryContext
+from st2actions.query.mistral import v2 as mistral
+from st2common.constants import action as action_constants
+from st2common.services import action as action_service
+
+
+class FakeMistralHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """
+    Handler which serves workflow executions and tasks from the server "executions" and "tasks"
+    dictionaries.
+    """
+
+    def do_GET(self):
+        url = urlparse.urlparse(self.path)
+        params = dict(urlparse.parse_qsl(url.query))
+        self.server.requests.append((url.path, params))
+
+        parts = url.path.strip('/').split('/')
+
+        if parts == ['v2', 'executions']:
+            ids = params['id'].replace('in:', '').split(',')
+            updated_since = params.get('updated_at', '').replace('gte:', '')
+            items = [dict(self.server.executions[exec_id]) for exec_id in ids
+                     if exec_id in self.server.executions and
+                     self.server.executions[exec_id]['updated_at'] >= updated_since]
+
+            # Listed executions don't include workflow output
+            for item in items:
+                item.pop('output', None)
+
+            return self._send(200, {'executions': items})
+        elif len(parts) == 3 and parts[:2] == ['v2', 'executions']:
+            if parts[2] not in self.server.executions:
+                return self._send(404, {'faultstring': 'Not found'})
+            return self._send(200, self.server.executions[parts[2]])
+        elif len(parts) == 4 and parts[3] == 'tasks':
+            return self._send(200, {'tasks': self.server.tasks.get(parts[2], [])})
+
+        return self._send(404, {'faultstring': 'Not found'})
+
+    def _send(self, status, body):
+        body = json.dumps(body)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args, **kwargs):
+        pass
+
+
+def get_execution(exec_id, state, updated_at, output=None):
+    return {
+        'id': exec_id,
+        'workflow_name': 'main',
+        'state': state,
+        'state_info': None,
+        'output': json.dumps(output or {}),
+        'updated_at': updated_at
+    }
+
+
+def get_task(exec_id, name, state):
+    return {
+        'id': '%s-%s' % (exec_id, name),
+        'name': name,
+        'workflow_execution_id': exec_id,
+        'workflow_name': 'main',
+        'state': state,
+        'input': '{}',
+        'result': '{}',
+        'published': '{}'
+    }
+
+
+def get_query_context(exec_id):
+    return QueryContext(obj_id='state-%s' % (exec_id), execution_id='st2-%s' % (exec_id),
+                        query_context={'mistral': {'execution_id': exec_id}},
+                        query_module='mistral_v2')
+
+
+@mock.patch.object(action_service, 'is_action_canceled_or_canceling',
+                   mock.MagicMock(return_value=False))
+class MistralQuerierBatchTest(unittest2.TestCase):
+
+    def setUp(self):
+        super(MistralQuerierBatchTest, self).setUp()
+
+        self.server = BaseHTTPServer.HTTPServer(('127.0.0.1', 0), FakeMistralHandler)
+        self.server.requests = []
+        self.server.executions = {}
+        self.server.tasks = {}
+        self.server_thread = threading.Thread(target=self.server.serve_forever)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+
+        base_url = 'http://127.0.0.1:%s/v2' % (self.server.server_address[1])
+        cfg.CONF.set_override(name='v2_base_url', override=base_url, group='mistral')
+        cfg.CONF.set_override(name='query_batch_size', override=10, group='mistral')
+        self.querier = mistral.get_instance()
+
+    def tearDown(self):
+        super(MistralQuerierBatchTest, self).tearDown()
+        cfg.CONF.clear_override(name='v2_base_url', group='mistral')
+        cfg.CONF.clear_override(name='query_batch_size', group='mistral')
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _get_task_requests(self):
+        return [path for (path, _) in self.server.requests if path.endswith('/tasks')]
+
+    def test_query_batch_uses_single_list_call(self):
+        self.server.executions['wf1'] = get_execution('wf1', 'RUNNING', '2016-07-01 10:00:00')
+        self.server.executions['wf2'] = get_execution('wf2', 'SUCCESS', '2016-07-01 10:00:00',
+                                                      output={'k1': 'v1'})
+        self.server.tasks['wf1'] = [get_task('wf1', 'task1', 'RUNNING')]
+        self.server.tasks['wf2'] = [get_task('wf2', 'task1', 'SUCCESS')]
+
+        results = self.querier.query_batch([get_query_context('wf1'), get_query_context('wf2')])
+
+        self.assertEqual(results['st2-wf1'][0], action_constants.LIVEACTION_STATUS_RUNNING)
+        self.assertEqual(results['st2-wf1'][1]['tasks'][0]['name'], 'task1')
+        self.assertEqual(results['st2-wf2'][0], action_constants.LIVEACTION_STATUS_SUCCEEDED)
+        self.assertEqual(results['st2-wf2'][1]['k1'], 'v1')
+
+        list_requests = [params for (path, params) in self.server.requests
+                         if path == '/v2/executions']
+        self.assertEqual(len(list_requests), 1)
+        self.assertEqual(list_requests[0]['id'], 'in:wf1,wf2')
+        self.assertTrue('updated_at' not in list_requests[0])
+
+        # Output of the completed execution is not included in the list response so it's
+        # retrieved separately
+        self.assertTrue(('/v2/executions/wf2', {}) in self.server.requests)
+        self.assertTrue(('/v2/executions/wf1', {}) not in self.server.requests)
+
+    def test_query_batch_only_fetches_tasks_for_changed_executions(self):
+        self.server.executions['wf1'] = get_execution('wf1', 'RUNNING', '2016-07-01 10:00:00')
+        self.server.executions['wf2'] = get_execution('wf2', 'RUNNING', '2016-07-01 10:00:00')
+        query_contexts = [get_query_context('wf1'), get_query_context('wf2')]
+
+        results = self.querier.query_batch(query_contexts)
+        self.assertEqual(len(results), 2)
+        self.assertEqual(len(self._get_task_requests()), 2)
+
+        # Nothing has changed
+        del self.server.requests[:]
+        results = self.querier.query_batch(query_contexts)
+        self.assertEqual(results, {})
+        self.assertEqual(self._get_task_requests(), [])
+        self.assertEqual(self.server.requests[0][1]['updated_at'], 'gte:2016-07-01 10:00:00')
+
+        # Only second execution has changed
+        del self.server.requests[:]
+        self.server.executions['wf2'] = get_execution('wf2', 'SUCCESS', '2016-07-01 10:05:00')
+        results = self.querier.query_batch(query_contexts)
+        self.assertEqual(results.keys(), ['st2-wf2'])
+        self.assertEqual(results['st2-wf2'][0], action_constants.LIVEACTION_STATUS_SUCCEEDED)
+        self.assertEqual(self._get_task_requests(), ['/v2/executions/wf2/tasks'])
+
+    def test_query_batch_completion_in_the_same_second(self):
+        self.server.executions['wf1'] = get_execution('wf1', 'RUNNING', '2016-07-01 10:00:00')
+        query_contexts = [get_query_context('wf1')]
+
+        results = self.querier.query_batch(query_contexts)
+        self.assertEqual(results['st2-wf1'][0], action_constants.LIVEACTION_STATUS_RUNNING)
+
+        # Execution has completed in the same second as the previous update
+        self.server.executions['wf1'] = get_execution('wf1', 'SUCCESS', '2016-07-01 10:00:00')
+        results = self.querier.query_batch(query_contexts)
+        self.assertEqual(results['st2-wf1'][0], action_constants.LIVEACTION_STATUS_SUCCEEDED)
+        self.assertEqual(self.querier._last_seen, {})
+
+    def test_removed_query_contexts_are_forgotten(self):
+        self.server.executions['wf1'] = get_execution('wf1', 'RUNNING', '2016-07-01 10:00:00')
+        self.server.executions['wf2'] = get_execution('wf2', 'RUNNING', '2016-07-01 10:00:00')
+        query_contexts = [get_query_context('wf1'), get_query_context('wf2')]
+        self.querier.add_queries(query_contexts)
+
+        self.querier.query_batch(query_contexts)
+        self.assertEqual(sorted(self.querier._last_seen.keys()), ['wf1', 'wf2'])
+
+        self.querier.remove_queries(lambda query_context: query_context.id == 'state-wf1')
+        self.assertEqual(self.querier._last_seen.keys(), ['wf2'])
+
+    def test_query_batch_missing_execution(self):
+        results = self.querier.query_batch([get_query_context('wf1')])
+        self.assertTrue(isinstance(results['st2-wf1'], Exception))
+
+        query_context = get_query_context('wf2')
+        query_context.query_context = {}
+        results = self.querier.query_batch([query_context])
+        self.assertTrue(isinstance(results['st2-wf2'], Exception))
+
+    def test_fire_queries_batches_due_query_contexts(self):
+        self.querier._thread_pool = mock.Mock()
+        self.querier._thread_pool.free.return_value = 10
+        self.querier.add_queries([get_query_context('wf%s' % (i)) for i in range(15)])
+        self.querier._fire_queries()
+
+        calls = self.querier._thread_pool.spawn.call_args_list
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(calls[0][0][0], self.querier._query_and_save_batch_results)
+        self.assertEqual(len(calls[0][0][1]), 10)
+        self.assertEqual(len(calls[1][0][1]), 5)
@@ -30,7 +30,9 @@ from st2common.models.db.liveaction import LiveActionDB
 from st2common.models.db.notification import NotificationSchema
 from st2common.models.db.notification import NotificationSubSchema
 from st2common.models.db.runner import RunnerTypeDB
+from st2common.models.db.policy import PolicyDB
 from st2common.persistence.action import Action
+from st2common.persistence.execution import ActionExecution
 from st2common.persistence.policy import Policy
 from st2common.models.system.common import ResourceReference
 from st2common.util import date as date_utils
@@ -41,6 +43,21 @@ NOTIFY_TRIGGER_TYPE = INTERNAL_TRIGGER_TYPES['action'][1]
 MOCK_EXECUTION = ActionExecutionDB(id=bson.ObjectId(), result={'stdout': 'stuff happens'})
 
 
+def get_liveaction(status='succeeded', notify=None, action='core.local'):
+    liveaction = LiveActionDB(id=bson.ObjectId(), action=action)
+    liveaction.status = status
+    liveaction.parameters = {}
+    liveaction.notify = notify
+    liveaction.start_timestamp = date_utils.get_datetime_utc_now()
+    liveaction.end_timestamp = liveaction.start_timestamp + datetime.timedelta(seconds=50)
+    return liveaction
+
+
+def get_execution(liveaction):
+    return ActionExecutionDB(id=bson.ObjectId(), liveaction={'id': str(liveaction.id)},
+                             result={'stdout': 'stuff happens'})
+
+
 class NotifierTestCase(unittest2.TestCase):
 
     class MockDispatcher(object):
@@ -150,3 +167,84 @@ class NotifierTestCase(unittest2.TestCase):
         dispatch.assert_called_once_with('core.st2.generic.notifytrigger', payload=exp,
                                          trace_context={})
         notifier.process(liveaction)
+
+
+class NotifierBatchTestCase(unittest2.TestCase):
+
+    def setUp(self):
+        super(NotifierBatchTestCase, self).setUp()
+        on_success = NotificationSubSchema(message='Action {{action_results.stdout}}.',
+                                           routes=['slack', 'email'])
+        self.liveactions = [
+            get_liveaction(notify=NotificationSchema(on_success=on_success)),
+            get_liveaction(status='running'),
+            get_liveaction(status='failed', action='core.remote'),
+            get_liveaction()
+        ]
+        # Execution for the last liveaction doesn't exist
+        self.executions = [get_execution(liveaction) for liveaction in self.liveactions[:3]]
+        self.policy = PolicyDB(pack='core', name='local_retry', resource_ref='core.local',
+                               policy_type='action.retry', parameters={})
+        self.dispatcher = mock.Mock()
+
+    def _process_batch(self):
+        action_dbs = [
+            ActionDB(pack='core', name='local', runner_type={'name': 'local-shell-cmd'}),
+            ActionDB(pack='core', name='remote', runner_type={'name': 'remote-shell-cmd'})
+        ]
+
+        with mock.patch.object(ActionExecution, 'query',
+                               mock.Mock(return_value=self.executions)) as execution_query, \
+                mock.patch.object(Policy, 'query',
+                                  mock.Mock(return_value=[self.policy])) as policy_query, \
+                mock.patch.object(Action, 'query',
+                                  mock.Mock(return_value=action_dbs)) as action_query, \
+                mock.patch.object(Notifier, '_get_trace_context', mock.Mock(return_value=None)), \
+                mock.patch.object(LiveActionDB, 'get_masked_parameters',
+                                  mock.Mock(return_value={})), \
+                mock.patch('st2common.policies.get_driver') as get_driver:
+            notifier = Notifier(connection=None, queues=[], trigger_dispatcher=self.dispatcher)
+            notifier.process_batch(self.liveactions)
+
+        return (execution_query, policy_query, action_query, get_driver)
+
+    def test_process_batch(self):
+        (execution_query, policy_query, action_query, get_driver) = self._process_batch()
+
+        # Single query for all the liveactions
+        liveaction_ids = execution_query.call_args[1]['liveaction__id__in']
+        self.assertEqual(sorted(liveaction_ids),
+                         sorted([str(self.liveactions[index].id) for index in [0, 2, 3]]))
+        self.assertEqual(policy_query.call_count, 1)
+        self.assertEqual(sorted(policy_query.call_args[1]['resource_ref__in']),
+                         ['core.local', 'core.remote'])
+        self.assertEqual(action_query.call_count, 1)
+
+        # Policy is only applied to the liveaction of the action it belongs to
+        self.assertEqual(get_driver.return_value.apply_after.call_count, 1)
+        get_driver.return_value.apply_after.assert_called_once_with(self.liveactions[0])
+
+        # All the triggers are dispatched at once in the order of liveactions
+        self.assertFalse(self.dispatcher.dispatch.called)
+        self.assertEqual(self.dispatcher.dispatch_many.call_count, 1)
+        triggers = self.dispatcher.dispatch_many.call_args[0][0]
+        self.assertEqual([(trigger, payload['execution_id'], payload.get('route', None))
+                          for (trigger, payload, _) in triggers], [
+            ('core.st2.generic.notifytrigger', str(self.executions[0].id), 'slack'),
+            ('core.st2.generic.notifytrigger', str(self.executions[0].id), 'email'),
+            ('core.st2.generic.actiontrigger', str(self.executions[0].id), None),
+            ('core.st2.generic.actiontrigger', str(self.executions[2].id), None)
+        ])
+        self.assertEqual(triggers[0][1]['message'], 'Action stuff happens.')
+        self.assertEqual(triggers[0][1]['runner_ref'], 'local-shell-cmd')
+        self.assertEqual(triggers[3][1]['runner_ref'], 'remote-shell-cmd')
+
+    def test_process_batch_dispatch_failure_falls_back_to_single_dispatch(self):
+        self.dispatcher.dispatch_many.side_effect = Exception('Connection failed')
+        self.dispatcher.dispatch.side_effect = [Exception('Connection failed'), None, None, None]
+
+        self._process_batch()
+
+        self.assertEqual(self.dispatcher.dispatch.call_count, 4)
+        self.assertEqual(self.dispatcher.dispatch.call_args_list[3][0][0],
+                         'core.st2.generic.actiontrigger')
@@ -15,6 +15,7 @@
 
 import bson
 from mock import patch, Mock, MagicMock
+from oslo_config import cfg
 import unittest2
 
 # XXX: There is an import dependency. Config needs to setup
@@ -23,6 +24,7 @@ import st2tests.config as tests_config
 tests_config.parse_args()
 
 from st2common.util import jsonify
+from st2actions.runners import remote_script_runner
 from st2actions.runners.remote_script_runner import ParamikoRemoteScriptRunner
 from st2actions.runners.ssh.parallel_ssh import ParallelSSHClient
 from st2common.exceptions.ssh import InvalidCredentialsException
@@ -111,3 +113,43 @@ class ParamikoScriptRunnerTestCase(unittest2.TestCase):
         self.assertEqual(result['failed'], True)
         self.assertEqual(result['succeeded'], False)
         self.assertTrue('Failed copying content to remote boxes' in result['error'])
+
+    @patch('st2actions.runners.ssh.parallel_ssh.ParallelSSHClient', Mock)
+    @patch.object(ParallelSSHClient, 'run', MagicMock(return_value={}))
+    @patch.object(ParallelSSHClient, 'connect', MagicMock(return_value={}))
+    @patch.object(ParallelSSHClient, 'put_cached', MagicMock(return_value={}))
+    @patch.object(ParallelSSHClient, 'prune_cache', MagicMock(return_value={}))
+    @patch.object(ParallelSSHClient, 'delete_dir', MagicMock(return_value={}))
+    @patch.object(remote_script_runner, 'get_content_hash', MagicMock(return_value='abcd'))
+    def test_remote_script_cache_is_used(self):
+        cfg.CONF.set_override(name='use_remote_script_cache', override=True, group='ssh_runner')
+        self.addCleanup(cfg.CONF.clear_override, name='use_remote_script_cache',
+                        group='ssh_runner')
+        remote_script_runner._LAST_CACHE_PRUNE_TIMESTAMPS.clear()
+
+        paramiko_runner = ParamikoRemoteScriptRunner('runner_1')
+        paramiko_runner.runner_parameters = {}
+        paramiko_runner.action = ACTION_1
+        paramiko_runner.liveaction_id = 'foo'
+        paramiko_runner.entry_point = '/opt/stackstorm/packs/foo/actions/script.sh'
+        paramiko_runner.libs_dir_path = '/opt/stackstorm/packs/foo/actions/lib'
+        paramiko_runner.context = {}
+        paramiko_runner._hosts = ['127.0.0.1']
+        paramiko_runner._cwd = '/tmp'
+        paramiko_runner._parallel_ssh_client = ParallelSSHClient(['127.0.0.1'], 'stanley')
+
+        for index in range(0, 2):
+            paramiko_runner.run(action_parameters={})
+
+        # Script is executed from the cache entry dir which is never deleted
+        cache_dir = cfg.CONF.ssh_runner.remote_script_cache_dir
+        ParallelSSHClient.put_cached.assert_called_with(
+            local_paths=['/opt/stackstorm/packs/foo/actions/script.sh'],
+            cache_dir=cache_dir, content_hash='abcd', mode=0744)
+        cmd = ParallelSSHClient.run.call_args[0][0]
+        self.assertEqual(cache_dir, '~/.st2-script-cache')
+        self.assertTrue(cmd.endswith('cd /tmp && "$HOME"/.st2-script-cache/abcd/script.sh'))
+        self.assertEqual(ParallelSSHClient.delete_dir.call_count, 0)
+
+        # Cache should only be pruned once per prune interval
+        self.assertEqual(ParallelSSHClient.prune_cache.call_count, 1)
@@ -14,6 +14,7 @@
 # limitations under the License.
 
 import os
+import stat
 from StringIO import StringIO
 import unittest2
 
@@ -22,6 +23,7 @@ from mock import (call, patch, Mock, MagicMock)
 import paramiko
 
 from st2actions.runners.ssh.paramiko_ssh import ParamikoSSHClient
+from st2actions.runners.ssh.paramiko_ssh import InsecureRemoteCacheError
 from st2tests.fixturesloader import get_resources_base_path
 import st2tests.config as tests_config
 tests_config.parse_args()
@@ -453,6 +455,127 @@ class ParamikoSSHClientTests(unittest2.TestCase):
         calls = [call(local_file, remote_file)]
         mock_cli.open_sftp().put.assert_has_calls(calls, any_order=True)
 
+    @patch('paramiko.SSHClient', Mock)
+    @patch.object(ParamikoSSHClient, '_is_key_file_needs_passphrase',
+                  MagicMock(return_value=False))
+    @patch.object(ParamikoSSHClient, 'exists', MagicMock(return_value=True))
+    @patch.object(ParamikoSSHClient, 'run', MagicMock(return_value=['1000', '', 0]))
+    def test_put_cached_content_already_present(self):
+        mock = self.ssh_cli
+        mock.connect()
+        mock.client.open_sftp().lstat.return_value = Mock(st_mode=stat.S_IFDIR | 0700,
+                                                          st_uid=1000)
+
+        local_dir = os.path.join(get_resources_base_path(), 'packs')
+        result = mock.put_cached(local_paths=[local_dir], cache_dir='/tmp/cache',
+                                 content_hash='abcd')
+        self.assertEqual(result, {'path': '/tmp/cache/abcd', 'cached': True})
+
+        # Nothing should have been uploaded, only the entry access time is refreshed
+        mock_cli = mock.client
+        self.assertEqual(mock_cli.open_sftp().put.call_count, 0)
+        self.assertEqual(mock_cli.open_sftp().mkdir.call_count, 0)
+        mock_cli.open_sftp().utime.assert_called_once_with('/tmp/cache/abcd', None)
+
+    @patch('paramiko.SSHClient', Mock)
+    @patch.object(ParamikoSSHClient, '_is_key_file_needs_passphrase',
+                  MagicMock(return_value=False))
+    @patch.object(ParamikoSSHClient, 'exists', MagicMock(return_value=False))
+    @patch.object(ParamikoSSHClient, 'run', MagicMock(return_value=['1000', '', 0]))
+    def test_put_cached_content_not_present(self):
+        mock = self.ssh_cli
+        mock.connect()
+        mock.client.open_sftp().lstat.return_value = Mock(st_mode=stat.S_IFDIR | 0700,
+                                                          st_uid=1000)
+
+        local_file = os.path.join(get_resources_base_path(),
+                                  'packs/pythonactions/actions/pascal_row.py')
+        result = mock.put_cached(local_paths=[local_file], cache_dir='/tmp/cache',
+                                 content_hash='abcd')
+        self.assertEqual(result, {'path': '/tmp/cache/abcd', 'cached': False})
+
+        # Content should be uploaded to a temporary dir which is then renamed
+        mock_cli = mock.client
+        sftp = mock_cli.open_sftp()
+        self.assertEqual(sftp.put.call_count, 1)
+        tmp_path = sftp.rename.call_args[0][0]
+        self.assertTrue(tmp_path.startswith('/tmp/cache/abcd.tmp-'))
+        sftp.rename.assert_called_once_with(tmp_path, '/tmp/cache/abcd')
+        sftp.put.assert_called_once_with(local_file, tmp_path + '/pascal_row.py')
+        sftp.open.assert_called_once_with(tmp_path + '/.st2-cache-complete', 'w')
+
+        # Cache dir and entry are only accessible by the SSH user
+        sftp.mkdir.assert_any_call('/tmp/cache', mode=0700)
+        sftp.mkdir.assert_any_call(tmp_path, mode=0700)
+        sftp.chmod.assert_any_call('/tmp/cache', 0700)
+        sftp.chmod.assert_any_call(tmp_path, 0700)
+
+    @patch('paramiko.SSHClient', Mock)
+    @patch.object(ParamikoSSHClient, '_is_key_file_needs_passphrase',
+                  MagicMock(return_value=False))
+    @patch.object(ParamikoSSHClient, 'exists', MagicMock(return_value=True))
+    @patch.object(ParamikoSSHClient, 'run', MagicMock(return_value=['1000', '', 0]))
+    def test_put_cached_insecure_cache_is_not_used(self):
+        mock = self.ssh_cli
+        mock.connect()
+        sftp = mock.client.open_sftp()
+        local_dir = os.path.join(get_resources_base_path(), 'packs')
+
+        # Cache dir owned by a different user
+        sftp.lstat.return_value = Mock(st_mode=stat.S_IFDIR | 0700, st_uid=1001)
+        self.assertRaises(InsecureRemoteCacheError, mock.put_cached, local_paths=[local_dir],
+                          cache_dir='/tmp/cache', content_hash='abcd')
+
+        # Cache dir writable by other users
+        sftp.lstat.return_value = Mock(st_mode=stat.S_IFDIR | 0777, st_uid=1000)
+        self.assertRaises(InsecureRemoteCacheError, mock.put_cached, local_paths=[local_dir],
+                          cache_dir='/tmp/cache', content_hash='abcd')
+
+        # Cache dir is a symlink
+        sftp.lstat.return_value = Mock(st_mode=stat.S_IFLNK | 0700, st_uid=1000)
+        self.assertRaises(InsecureRemoteCacheError, mock.put_cached, local_paths=[local_dir],
+                          cache_dir='/tmp/cache', content_hash='abcd')
+
+        self.assertEqual(sftp.utime.call_count, 0)
+        self.assertEqual(sftp.put.call_count, 0)
+
+    @patch('paramiko.SSHClient', Mock)
+    @patch.object(ParamikoSSHClient, '_is_key_file_needs_passphrase',
+                  MagicMock(return_value=False))
+    @patch.object(ParamikoSSHClient, 'exists', MagicMock(return_value=True))
+    @patch.object(ParamikoSSHClient, 'run', MagicMock(return_value=['1000', '', 0]))
+    def test_put_cached_cache_dir_relative_to_home_dir(self):
+        mock = self.ssh_cli
+        mock.connect()
+        sftp = mock.client.open_sftp()
+        sftp.normalize.return_value = '/home/ubuntu'
+        sftp.lstat.return_value = Mock(st_mode=stat.S_IFDIR | 0700, st_uid=1000)
+
+        local_dir = os.path.join(get_resources_base_path(), 'packs')
+        result = mock.put_cached(local_paths=[local_dir], cache_dir='~/.st2-script-cache',
+                                 content_hash='abcd')
+        self.assertEqual(result, {'path': '/home/ubuntu/.st2-script-cache/abcd',
+                                  'cached': True})
+        sftp.normalize.assert_called_once_with('.')
+
+    @patch('paramiko.SSHClient', Mock)
+    @patch.object(ParamikoSSHClient, '_is_key_file_needs_passphrase',
+                  MagicMock(return_value=False))
+    @patch.object(ParamikoSSHClient, 'run', MagicMock(return_value=['', '', 0]))
+    def test_prune_cache(self):
+        mock = self.ssh_cli
+        mock.connect()
+
+        mock.prune_cache(cache_dir='/tmp/cache', ttl=3600)
+        expected_cmd = ('test ! -d /tmp/cache || find /tmp/cache -mindepth 1 -maxdepth 1 '
+                        '-mmin +60 -exec rm -rf {} +')
+        mock.run.assert_called_once_with(expected_cmd, timeout=None)
+
+        mock.prune_cache(cache_dir='~/.st2-script-cache', ttl=3600)
+        expected_cmd = ('test ! -d "$HOME"/.st2-script-cache || find "$HOME"/.st2-script-cache '
+                        '-mindepth 1 -maxdepth 1 -mmin +60 -exec rm -rf {} +')
+        mock.run.assert_called_with(expected_cmd, timeout=None)
+
     @patch('paramiko.SSHClient', Mock)
     @patch.object(ParamikoSSHClient, '_is_key_file_needs_passphrase',
                   MagicMock(return_value=False))
@@ -0,0 +1,174 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+
+import mock
+import unittest2
+
+import st2tests.config as tests_config
+tests_config.parse_args()
+
+from st2actions.query.base import Querier
+from st2actions.query.base import QueryContext
+from st2actions.query.base import QuerySchedule
+from st2common.constants import action as action_constants
+
+
+class TestQuerier(Querier):
+    def query(self, execution_id, query_context):
+        return (action_constants.LIVEACTION_STATUS_RUNNING, {})
+
+
+def get_query_context(index):
+    return QueryContext(obj_id='state%s' % (index), execution_id='exec%s' % (index),
+                        query_context={}, query_module='test')
+
+
+class QueryScheduleTestCase(unittest2.TestCase):
+
+    def test_get_due_returns_items_in_due_time_order(self):
+        schedule = QuerySchedule()
+        schedule.put('c', 30, 1)
+        schedule.put('a', 10, 1)
+        schedule.put('b', 20, 1)
+        schedule.put('a2', 10, 1)
+
+        self.assertEqual(schedule.qsize(), 4)
+        self.assertEqual(schedule.get_next_due_time(), 10)
+
+        self.assertEqual(schedule.get_due(now=5), None)
+        self.assertEqual(schedule.get_due(now=25), (10, 'a', 1))
+        self.assertEqual(schedule.get_due(now=25), (10, 'a2', 1))
+        self.assertEqual(schedule.get_due(now=25), (20, 'b', 1))
+        self.assertEqual(schedule.get_due(now=25), None)
+        self.assertEqual(schedule.qsize(), 1)
+        self.assertFalse(schedule.empty())
+
+
+class QuerierTestCase(unittest2.TestCase):
+
+    def test_fire_queries_only_dispatches_due_query_contexts(self):
+        querier = TestQuerier(query_interval=1)
+        querier._thread_pool = mock.Mock()
+        querier._thread_pool.free.return_value = 10
+
+        now = time.time()
+        querier._query_contexts.put(get_query_context(1), now - 2, 1)
+        querier._query_contexts.put(get_query_context(2), now + 100, 1)
+        querier._fire_queries()
+
+        self.assertEqual(querier._thread_pool.spawn.call_count, 1)
+        self.assertEqual(querier._thread_pool.spawn.call_args[0][1].id, 'state1')
+        self.assertEqual(querier._query_contexts.qsize(), 1)
+
+        stats = querier.get_stats()
+        self.assertEqual(stats['queue_depth'], 1)
+        self.assertEqual(stats['queries_count'], 1)
+        self.assertTrue(stats['lag'] >= 2)
+        self.assertEqual(stats['max_lag'], stats['lag'])
+
+    def test_fire_queries_respects_free_workers(self):
+        querier = TestQuerier(query_interval=1)
+        querier._thread_pool = mock.Mock()
+        querier._thread_pool.free.side_effect = [2, 1, 0]
+
+        querier.add_queries(query_contexts=[get_query_context(i) for i in range(5)])
+        querier._fire_queries()
+
+        self.assertEqual(querier._thread_pool.spawn.call_count, 2)
+        self.assertEqual(querier._query_contexts.qsize(), 3)
+
+    @mock.patch.object(TestQuerier, '_update_action_results', mock.Mock())
+    def test_query_interval_backs_off_for_running_jobs(self):
+        querier = TestQuerier(query_interval=1, max_query_interval=3, query_backoff_factor=2)
+        query_context = get_query_context(1)
+        querier.add_queries(query_contexts=[query_context])
+        (_, _, interval) = querier._query_contexts.get_due(now=time.time() + 100)
+
+        intervals = []
+        for _ in range(4):
+            querier._query_and_save_results(query_context, interval)
+            (_, _, interval) = querier._query_contexts.get_due(now=time.time() + 100)
+            intervals.append(interval)
+
+        self.assertEqual(intervals, [2, 3, 3, 3])
+
+    @mock.patch.object(TestQuerier, '_update_action_results', mock.Mock())
+    def test_removed_query_contexts_are_not_rescheduled(self):
+        querier = TestQuerier(query_interval=1)
+        query_contexts = [get_query_context(i) for i in range(4)]
+        querier.add_queries(query_contexts=query_contexts)
+        querier.add_queries(query_contexts=[get_query_context(1)])
+        self.assertEqual(querier._query_contexts.qsize(), 4)
+
+        # Query context which is being queried
+        (_, in_flight_query_context, _) = querier._query_contexts.get_due(now=time.time() + 1)
+        self.assertEqual(in_flight_query_context.id, 'state0')
+
+        querier.remove_queries(lambda query_context: query_context.id in ['state0', 'state2'])
+        self.assertEqual(querier._query_contexts.qsize(), 2)
+        self.assertFalse(querier.is_tracked(in_flight_query_context))
+        self.assertFalse(querier.is_tracked(query_contexts[2]))
+        self.assertTrue(querier.is_tracked(query_contexts[3]))
+
+        querier._query_and_save_results(in_flight_query_context)
+        self.assertEqual(querier._query_contexts.qsize(), 2)
+
+    def test_add_queries_wakes_up_dispatch_loop(self):
+        querier = TestQuerier(empty_q_sleep_time=100)
+        self.assertFalse(querier._wakeup_event.ready())
+
+        querier.add_queries(query_contexts=[get_query_context(1)])
+        self.assertTrue(querier._wakeup_event.ready())
+
+        # Query context is already due so there should be no waiting
+        start = time.time()
+        querier._wait_for_next_due_query()
+        self.assertTrue(time.time() - start < 1)
+        self.assertFalse(querier._wakeup_event.ready())
+
+    @mock.patch.object(TestQuerier, '_delete_state_object', mock.Mock())
+    @mock.patch.object(TestQuerier, '_save_results', mock.Mock())
+    def test_query_and_save_batch_results(self):
+        querier = TestQuerier(query_interval=1, batch_size=10)
+        results = {
+            'exec1': (action_constants.LIVEACTION_STATUS_RUNNING, {}),
+            'exec2': Exception('Not found')
+        }
+        querier.query_batch = mock.Mock(return_value=results)
+
+        items = [(get_query_context(i), 1) for i in range(1, 4)]
+        querier._tracked_query_contexts = dict([(item[0].id, item[0]) for item in items])
+        querier._query_and_save_batch_results(items)
+
+        # exec1 has been updated, exec2 failed and exec3 hasn't changed
+        self.assertEqual(querier._save_results.call_count, 1)
+        self.assertEqual(querier._save_results.call_args[0][0].id, 'state1')
+        self.assertEqual(querier._delete_state_object.call_count, 1)
+        self.assertEqual(querier._delete_state_object.call_args[0][0].id, 'state2')
+        self.assertEqual(querier._query_contexts.qsize(), 1)
+
+    @mock.patch.object(TestQuerier, '_delete_state_object', mock.Mock())
+    def test_query_and_save_batch_results_failure_reschedules(self):
+        querier = TestQuerier(query_interval=1, batch_size=10)
+        querier.query_batch = mock.Mock(side_effect=Exception('Connection refused'))
+
+        items = [(get_query_context(i), 1) for i in range(1, 4)]
+        querier._tracked_query_contexts = dict([(item[0].id, item[0]) for item in items])
+        querier._query_and_save_batch_results(items)
+
+        self.assertFalse(querier._delete_state_object.called)
+        self.assertEqual(querier._query_contexts.qsize(), 3)
@@ -0,0 +1,247 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import bson
+import mock
+import unittest2
+
+import st2tests.config as tests_config
+tests_config.parse_args()
+
+from st2actions.query.base import QueryContext
+from st2actions.resultstracker import partitioner as partitioner_module
+from st2actions.resultstracker import resultstracker
+from st2actions.resultstracker.partitioner import PartitionLeaseManager
+from st2actions.resultstracker.resultstracker import ResultsTracker
+from st2common.models.db.executionstate import ActionExecutionStateDB
+from st2common.models.db.executionstate import STATE_BUCKETS_COUNT
+from st2common.models.db.executionstate import get_state_bucket
+from st2common.persistence.executionstate import ActionExecutionState
+from st2common.services import coordination
+
+
+class FakeLock(object):
+    def __init__(self, name, held_locks):
+        self.name = name
+        self._held_locks = held_locks
+
+    def acquire(self, blocking=True):
+        if self.name in self._held_locks:
+            return False
+
+        self._held_locks.add(self.name)
+        return True
+
+    def release(self):
+        self._held_locks.discard(self.name)
+
+
+class FakeCoordinator(object):
+    """
+    Coordinator where all the instances share the same locks and group members.
+    """
+
+    def __init__(self, member_id, held_locks, members):
+        self.member_id = member_id
+        self._held_locks = held_locks
+        self._members = members
+
+    def create_group(self, group_id):
+        return mock.Mock()
+
+    def join_group(self, group_id):
+        self._members.add(self.member_id)
+        return mock.Mock()
+
+    def leave_group(self, group_id):
+        self._members.discard(self.member_id)
+        return mock.Mock()
+
+    def get_members(self, group_id):
+        return mock.Mock(get=mock.Mock(return_value=set(self._members)))
+
+    def get_lock(self, name):
+        return FakeLock(name, self._held_locks)
+
+    def heartbeat(self):
+        pass
+
+
+@mock.patch.object(coordination, 'configured', mock.Mock(return_value=True))
+class PartitionLeaseManagerTestCase(unittest2.TestCase):
+
+    def setUp(self):
+        super(PartitionLeaseManagerTestCase, self).setUp()
+        self.held_locks = set()
+        self.members = set()
+
+    def _get_manager(self, member_id, partitions_count=4):
+        coordinator = FakeCoordinator(member_id, self.held_locks, self.members)
+        return PartitionLeaseManager(partitions_count=partitions_count, coordinator=coordinator)
+
+    def test_bucket_ranges_cover_all_buckets(self):
+        for partitions_count in [1, 3, 4, 7, 16]:
+            manager = self._get_manager('a', partitions_count=partitions_count)
+            buckets = []
+
+            for partition in range(0, partitions_count):
+                (start, end) = manager.get_bucket_range(partition)
+                for bucket in range(start, end):
+                    self.assertEqual(manager.get_partition(bucket), partition)
+                    buckets.append(bucket)
+
+            self.assertEqual(buckets, range(0, STATE_BUCKETS_COUNT))
+
+    def test_partitions_are_divided_between_members(self):
+        manager_1 = self._get_manager('a')
+        manager_1.start()
+        self.assertEqual(manager_1.refresh(), ([0, 1, 2, 3], []))
+
+        # Second member joins, first one releases half of the partitions which are then
+        # acquired by the second one
+        manager_2 = self._get_manager('b')
+        manager_2.start()
+        self.assertEqual(manager_2.refresh(), ([], []))
+        self.assertEqual(manager_1.refresh(), ([], [2, 3]))
+        self.assertEqual(manager_2.refresh(), ([2, 3], []))
+
+        self.assertTrue(manager_1.owns(0))
+        self.assertFalse(manager_1.owns(STATE_BUCKETS_COUNT - 1))
+        self.assertTrue(manager_2.owns(STATE_BUCKETS_COUNT - 1))
+
+    def test_partitions_of_dead_member_are_taken_over(self):
+        manager_1 = self._get_manager('a')
+        manager_2 = self._get_manager('b')
+        manager_1.start()
+        manager_2.start()
+        manager_1.refresh()
+        manager_2.refresh()
+        self.assertEqual(manager_1.owned_partitions, [0, 1])
+        self.assertEqual(manager_2.owned_partitions, [2, 3])
+
+        # Second member dies and its leases expire
+        self.members.discard('b')
+        self.held_locks.difference_update([partitioner_module.PARTITION_LOCK_NAME % (2),
+                                           partitioner_module.PARTITION_LOCK_NAME % (3)])
+
+        self.assertEqual(manager_1.refresh(), ([2, 3], []))
+        self.assertEqual(manager_1.owned_partitions, [0, 1, 2, 3])
+
+    def test_stop_releases_leases(self):
+        manager = self._get_manager('a')
+        manager.start()
+        manager.refresh()
+        manager.stop()
+
+        self.assertEqual(manager.owned_partitions, [])
+        self.assertEqual(self.held_locks, set())
+        self.assertEqual(self.members, set())
+
+
+class PartitionedResultsTrackerTestCase(unittest2.TestCase):
+
+    def _get_state(self, partition, partitioner):
+        while True:
+            state_db = ActionExecutionStateDB(id=bson.ObjectId(),
+                                              execution_id=bson.ObjectId(),
+                                              query_module='test_querymodule',
+                                              query_context={})
+            if partitioner.get_partition(state_db.bucket) == partition:
+                return state_db
+
+    def test_state_bucket(self):
+        state_db = ActionExecutionStateDB(execution_id=bson.ObjectId(), query_module='test',
+                                          query_context={})
+        self.assertEqual(state_db.bucket, get_state_bucket(state_db.execution_id))
+
+    def test_refresh_partitions(self):
+        partitioner = PartitionLeaseManager(partitions_count=2, coordinator=mock.Mock())
+        partitioner.refresh = mock.Mock(return_value=([0, 1], []))
+        partitioner._locks = {0: None, 1: None}
+
+        querier = mock.Mock()
+        tracker = ResultsTracker(mock.Mock(), [], partitioner=partitioner)
+        tracker.get_querier = mock.Mock(return_value=querier)
+        tracker._get_states = mock.Mock(return_value=[])
+        tracker._queriers = {'test_querymodule': querier}
+
+        tracker._refresh_partitions()
+        self.assertEqual(tracker._get_states.call_args_list, [
+            mock.call(buckets_range=(0, 512)),
+            mock.call(buckets_range=(512, 1024))
+        ])
+
+        # Partition 1 is released
+        state_1 = self._get_state(0, partitioner)
+        state_2 = self._get_state(1, partitioner)
+        partitioner.refresh = mock.Mock(return_value=([], [1]))
+        partitioner._locks = {0: None}
+        tracker._refresh_partitions()
+
+        filter_func = querier.remove_queries.call_args[0][0]
+        self.assertFalse(filter_func(QueryContext.from_model(state_1)))
+        self.assertTrue(filter_func(QueryContext.from_model(state_2)))
+
+        # Only states which belong to the owned partitions are tracked
+        querier.add_queries.reset_mock()
+        tracker.process(state_1)
+        tracker.process(state_2)
+        self.assertEqual(querier.add_queries.call_count, 1)
+        self.assertEqual(querier.add_queries.call_args[1]['query_contexts'][0].id,
+                         str(state_1.id))
+
+    def test_process_legacy_state_without_bucket(self):
+        partitioner = PartitionLeaseManager(partitions_count=2, coordinator=mock.Mock())
+        partitioner._locks = {0: None}
+
+        querier = mock.Mock()
+        tracker = ResultsTracker(mock.Mock(), [], partitioner=partitioner)
+        tracker.get_querier = mock.Mock(return_value=querier)
+
+        # Messages published before buckets were introduced have no bucket
+        state_1 = self._get_state(0, partitioner)
+        state_1.bucket = None
+        state_2 = self._get_state(1, partitioner)
+        state_2.bucket = None
+
+        tracker.process(state_1)
+        tracker.process(state_2)
+        self.assertEqual(querier.add_queries.call_count, 1)
+        self.assertEqual(querier.add_queries.call_args[1]['query_contexts'][0].id,
+                         str(state_1.id))
+
+    @mock.patch.object(resultstracker, 'STATES_PAGE_SIZE', 2)
+    def test_get_states_is_paged(self):
+        states = [mock.Mock(id=index, bucket=index) for index in range(0, 5)]
+        legacy_states = [mock.Mock(id=10, bucket=1), mock.Mock(id=11, bucket=700)]
+
+        def mock_query(order_by, limit, **filters):
+            items = legacy_states if 'bucket__exists' in filters else states
+            items = [item for item in items if item.id > filters.get('id__gt', -1)]
+            return items[:limit]
+
+        tracker = ResultsTracker(mock.Mock(), [])
+
+        with mock.patch.object(ActionExecutionState, 'query',
+                               mock.Mock(side_effect=mock_query)) as query:
+            result = list(tracker._get_states())
+            self.assertEqual([state.id for state in result], [0, 1, 2, 3, 4])
+            self.assertEqual(query.call_count, 3)
+
+            query.reset_mock()
+            result = list(tracker._get_states(buckets_range=(0, 512)))
+            self.assertEqual([state.id for state in result], [0, 1, 2, 3, 4, 10])
+            self.assertEqual(query.call_args_list[0][1]['bucket__gte'], 0)
+            self.assertEqual(query.call_args_list[0][1]['bucket__lt'], 512)
@@ -20,14 +20,18 @@ from oslo_config import cfg
 
 from st2common.constants import action as action_constants
 from st2actions.runners import get_runner
+from st2actions.runners import AsyncActionRunner
 from st2actions.runners.localrunner import LocalShellRunner
 from st2common.exceptions.actionrunner import ActionRunnerCreateError
+from st2common.exceptions.auth import TokenExpiredError
 from st2common.models.system.common import ResourceReference
 from st2common.models.db.liveaction import LiveActionDB
 from st2common.models.db.runner import RunnerTypeDB
 from st2common.persistence.liveaction import LiveAction
 from st2common.persistence.executionstate import ActionExecutionState
+from st2common.services import access
 from st2common.services import executions
+from st2common.util import auth as auth_utils
 from st2common.util import date as date_utils
 from st2common.transport.publishers import PoolPublisher
 from st2tests.base import DbTestCase
@@ -40,6 +44,7 @@ from st2tests.fixturesloader import FixturesLoader
 # RunnerContainer. Do not move this until you fix config
 # dependencies.
 from st2actions.container.base import get_runner_container
+from st2actions.container.base import EXECUTION_TOKEN_TIMEOUT_GRACE_PERIOD
 
 TEST_FIXTURES = {
     'runners': ['run-local.yaml', 'testrunner1.yaml', 'testfailingrunner1.yaml',
@@ -196,6 +201,65 @@ class RunnerContainerTest(DbTestCase):
         self.assertTrue(found.query_context is not None)
         self.assertTrue(found.query_module is not None)
 
+    def test_dispatch_execution_token_revoked_on_completion(self):
+        cfg.CONF.set_override(name='execution_token_signing_keys', override=['key1:secret1'],
+                              group='auth')
+        self.addCleanup(cfg.CONF.clear_override, name='execution_token_signing_keys',
+                        group='auth')
+
+        tokens = []
+        create_execution_token = access.create_execution_token
+
+        def mock_create_execution_token(*args, **kwargs):
+            token = create_execution_token(*args, **kwargs)
+
+            # Token is valid while the execution is running
+            self.assertEqual(auth_utils.validate_token(token.token).user, token.user)
+            tokens.append(token)
+            return token
+
+        runner_container = get_runner_container()
+        params = {
+            'actionstr': 'bar'
+        }
+        liveaction_db = self._get_liveaction_model(RunnerContainerTest.action_db, params)
+        liveaction_db = LiveAction.add_or_update(liveaction_db)
+        executions.create_execution_object(liveaction_db)
+
+        with mock.patch.object(access, 'create_execution_token',
+                               mock.Mock(side_effect=mock_create_execution_token)):
+            runner_container.dispatch(liveaction_db)
+
+        liveaction_db = LiveAction.get_by_id(liveaction_db.id)
+        self.assertEqual(liveaction_db.status, action_constants.LIVEACTION_STATUS_SUCCEEDED)
+        self.assertEqual(len(tokens), 1)
+
+        # Token stops validating once the execution has completed
+        self.assertRaises(TokenExpiredError, auth_utils.validate_token, tokens[0].token)
+
+    def test_get_auth_token_ttl(self):
+        runner_container = get_runner_container()
+        runner = get_runner(RunnerContainerTest.runnertype_db.runner_module)
+
+        runner.runner_parameters = {}
+        self.assertEqual(runner_container._get_auth_token_ttl(runner),
+                         cfg.CONF.auth.execution_token_ttl)
+
+        # Token for an action with a timeout expires shortly after the timeout
+        runner.runner_parameters = {'timeout': 60}
+        self.assertEqual(runner_container._get_auth_token_ttl(runner),
+                         60 + EXECUTION_TOKEN_TIMEOUT_GRACE_PERIOD)
+
+        runner.runner_parameters = {'timeout': cfg.CONF.auth.execution_token_ttl * 2}
+        self.assertEqual(runner_container._get_auth_token_ttl(runner),
+                         cfg.CONF.auth.execution_token_ttl)
+
+        # Async actions keep using the token after the runner returns
+        async_runner = mock.Mock(spec=AsyncActionRunner)
+        async_runner.runner_parameters = {'timeout': 60}
+        self.assertEqual(runner_container._get_auth_token_ttl(async_runner),
+                         cfg.CONF.auth.execution_token_ttl)
+
     def _get_liveaction_model(self, action_db, params):
         status = action_constants.LIVEACTION_STATUS_REQUESTED
         start_timestamp = date_utils.get_datetime_utc_now()
@@ -27,6 +27,7 @@ from st2common.util.monkey_patch import monkey_patch
 from st2api import config
 config.register_opts()
 from st2api import app
+from st2api.controllers.v1 import webhooks
 
 __all__ = [
     'main'
@@ -60,6 +61,8 @@ def _run_server():
 
 
 def _teardown():
+    # Note: Buffered webhook triggers need to be published before the connections are closed
+    webhooks.shutdown()
     common_teardown()
 
 
@@ -68,3 +68,14 @@ def _register_app_opts():
                    help='location of the logging.conf file')
     ]
     CONF.register_opts(logging_opts, group='api')
+
+    webhook_opts = [
+        cfg.IntOpt('webhook_buffer_size', default=1000,
+                   help='Maximum number of webhook triggers which are buffered before they are '
+                        'published in the background. Requests are rejected with 429 when the '
+                        'buffer is full. 0 to publish triggers synchronously.'),
+        cfg.IntOpt('webhook_batch_size', default=100,
+                   help='Maximum number of buffered webhook triggers which are published at '
+                        'once.')
+    ]
+    CONF.register_opts(webhook_opts, group='api')
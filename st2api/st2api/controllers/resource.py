@@ -25,10 +25,12 @@ import six
 from six.moves import http_client
 
 from st2common.models.api.base import jsexpose
+from st2common.models.api.base import StreamingListResult
 from st2common import log as logging
 from st2common.models.system.common import InvalidResourceReferenceError
 from st2common.models.system.common import ResourceReference
 from st2common.exceptions.db import StackStormDBObjectNotFoundError
+from st2common.util import pagination as pagination_utils
 
 LOG = logging.getLogger(__name__)
 
@@ -61,6 +63,24 @@ class ResourceController(rest.RestController):
     # A list of attributes which can be specified using ?exclude_attributes filter
     valid_exclude_attributes = []
 
+    # A list of fields which are always retrieved from the database when ?include_attributes
+    # filter is specified (e.g. fields which are needed by "APIClass.from_model")
+    mandatory_include_fields_retrieve = []
+
+    # A list of fields which are always included in the response when ?include_attributes filter
+    # is specified
+    mandatory_include_fields_response = ['id']
+
+    # True if the resource supports cursor based pagination (?after=<cursor>). Unlike offset
+    # based pagination, this mode doesn't skip over the documents on the database side and the
+    # total count is only computed when explicitly requested (?include_count=true)
+    supports_cursor_pagination = False
+
+    # True to serialize and send items returned by "get_all" one at a time as they are retrieved
+    # from the database instead of building the whole response in memory. This should only be
+    # enabled for controllers which don't post-process the "_get_all" result
+    stream_list_response = False
+
     # Method responsible for retrieving an instance of the corresponding model DB object
     # Note: This method should throw StackStormDBObjectNotFoundError if the corresponding DB
     # object doesn't exist
@@ -76,20 +96,38 @@ class ResourceController(rest.RestController):
         return self._get_all(**kwargs)
 
     @jsexpose(arg_types=[str])
-    def get_one(self, id):
-        return self._get_one_by_id(id=id)
+    def get_one(self, id, include_attributes=None):
+        include_fields = self._get_include_fields(include_attributes=include_attributes)
+        return self._get_one_by_id(id=id, include_fields=include_fields)
 
     def _get_all(self, exclude_fields=None, sort=None, offset=0, limit=None, query_options=None,
-                 from_model_kwargs=None, **kwargs):
+                 from_model_kwargs=None, after=None, include_count=None, include_attributes=None,
+                 **kwargs):
         """
         :param exclude_fields: A list of object fields to exclude.
         :type exclude_fields: ``list``
+
+        :param include_attributes: Comma delimited string of attributes to include in the
+                                   response. Only those attributes are retrieved from the
+                                   database.
+        :type include_attributes: ``str``
+
+        :param after: Cursor returned in the "X-Next-Cursor" header of the previous page. Empty
+                      value retrieves the first page in the cursor pagination mode.
+        :type after: ``str``
         """
         kwargs = copy.deepcopy(kwargs)
 
         exclude_fields = exclude_fields or []
         query_options = query_options if query_options else self.query_options
 
+        include_fields = self._get_include_fields(include_attributes=include_attributes)
+        only_fields = self._get_only_fields(include_fields=include_fields)
+
+        if include_fields and exclude_fields:
+            msg = 'exclude_attributes and include_attributes arguments are mutually exclusive.'
+            raise ValueError(msg)
+
         # TODO: Why do we use comma delimited string, user can just specify
         # multiple values using ?sort=foo&sort=bar and we get a list back
         sort = sort.split(',') if sort else []
@@ -144,7 +182,20 @@ class ResourceController(rest.RestController):
         }
         LOG.info('GET all %s with filters=%s' % (pecan.request.path, filters), extra=extra)
 
-        instances = self.access.query(exclude_fields=exclude_fields, **filters)
+        if after is not None:
+            if not self.supports_cursor_pagination:
+                msg = 'Cursor pagination is not supported for this resource.'
+                pecan.abort(http_client.BAD_REQUEST, msg)
+                return
+
+            return self._get_all_after_cursor(filters=filters, exclude_fields=exclude_fields,
+                                              include_fields=include_fields,
+                                              sort=kwargs['sort'], limit=limit, after=after,
+                                              include_count=include_count,
+                                              from_model_kwargs=from_model_kwargs)
+
+        instances = self.access.query(exclude_fields=exclude_fields, only_fields=only_fields,
+                                      **filters)
         if limit == 1:
             # Perform the filtering on the DB side
             instances = instances.limit(limit)
@@ -156,26 +207,126 @@ class ResourceController(rest.RestController):
         from_model_kwargs = from_model_kwargs or {}
         from_model_kwargs.update(self._get_from_model_kwargs_for_request(request=pecan.request))
 
-        result = []
-        for instance in instances[offset:eop]:
-            item = self.model.from_model(instance, **from_model_kwargs)
-            result.append(item)
+        return self._get_list_result(instances=instances[offset:eop],
+                                     from_model_kwargs=from_model_kwargs,
+                                     include_fields=include_fields)
+
+    def _get_all_after_cursor(self, filters, exclude_fields, sort, limit, after, include_count,
+                              from_model_kwargs=None, include_fields=None):
+        """
+        Retrieve a page of resources using cursor (keyset) pagination.
+
+        Page is ordered by the first sort key and the id and it starts after the document the
+        cursor points to.
+        """
+        order_by = pagination_utils.get_cursor_order_by(sort_key=sort[0] if sort else None)
+        filters['order_by'] = order_by
+        limit = int(limit) if limit else self.max_limit
+
+        # Sort key is needed to generate the cursor
+        only_fields = self._get_only_fields(include_fields=include_fields,
+                                            extra_fields=[order_by[0].lstrip('+-')])
+
+        instances = self.access.query(exclude_fields=exclude_fields, only_fields=only_fields,
+                                      **filters)
+
+        if include_count and str(include_count).lower() in ['1', 'true']:
+            pecan.response.headers['X-Total-Count'] = str(instances.count())
+
+        if after:
+            try:
+                cursor_filter = pagination_utils.get_cursor_filter(cursor=after,
+                                                                   order_by=order_by)
+            except pagination_utils.InvalidCursorError as e:
+                pecan.abort(http_client.BAD_REQUEST, str(e))
+                return
+
+            instances = instances.filter(cursor_filter)
+
+        # Note: Datetime range filters can change the ordering so we make sure the ordering
+        # matches the one the cursor is based on
+        instances = instances.order_by(*order_by)
+
+        # Retrieve one more item so we know if there is a next page
+        instances = list(instances.limit(limit + 1))
+
+        pecan.response.headers['X-Limit'] = str(limit)
+
+        if len(instances) > limit:
+            instances = instances[:limit]
+            next_cursor = pagination_utils.get_cursor_for_instance(instance=instances[-1],
+                                                                   order_by=order_by)
+            pecan.response.headers['X-Next-Cursor'] = next_cursor
+
+        from_model_kwargs = from_model_kwargs or {}
+        from_model_kwargs.update(self._get_from_model_kwargs_for_request(request=pecan.request))
+
+        return self._get_list_result(instances=instances, from_model_kwargs=from_model_kwargs,
+                                     include_fields=include_fields)
+
+    def _get_list_result(self, instances, from_model_kwargs, include_fields=None):
+        """
+        Convert database objects to API objects.
+
+        :param instances: Queryset or a list of database objects.
+
+        :rtype: ``list`` or :class:`StreamingListResult`
+        """
+        if not self.stream_list_response:
+            return [self._from_model(instance, from_model_kwargs=from_model_kwargs,
+                                     include_fields=include_fields)
+                    for instance in instances]
+
+        if hasattr(instances, 'no_cache'):
+            # Make sure queryset doesn't hold on to the already retrieved objects
+            instances = instances.no_cache()
+
+        items = (self._from_model(instance, from_model_kwargs=from_model_kwargs,
+                                  include_fields=include_fields)
+                 for instance in instances)
+        return StreamingListResult(items)
+
+    def _from_model(self, instance, from_model_kwargs=None, include_fields=None):
+        """
+        Convert database object to API object.
+
+        :param include_fields: Fields to include in the API object. If specified, all the other
+                               attributes are removed (those are not retrieved from the database
+                               and hold default values).
+        :type include_fields: ``list``
+        """
+        from_model_kwargs = from_model_kwargs or {}
+        result = self.model.from_model(instance, **from_model_kwargs)
+
+        if include_fields:
+            include_fields = set(include_fields + self.mandatory_include_fields_response)
+
+            for attribute in list(vars(result).keys()):
+                if attribute not in include_fields:
+                    delattr(result, attribute)
 
         return result
 
-    def _get_one(self, id, exclude_fields=None):
+    def _get_one(self, id, exclude_fields=None, include_fields=None):
         # Note: This is here for backward compatibility reasons
-        return self._get_one_by_id(id=id, exclude_fields=exclude_fields)
+        return self._get_one_by_id(id=id, exclude_fields=exclude_fields,
+                                   include_fields=include_fields)
 
-    def _get_one_by_id(self, id, exclude_fields=None, from_model_kwargs=None):
+    def _get_one_by_id(self, id, exclude_fields=None, from_model_kwargs=None,
+                       include_fields=None):
         """
         :param exclude_fields: A list of object fields to exclude.
         :type exclude_fields: ``list``
+
+        :param include_fields: A list of object fields to include.
+        :type include_fields: ``list``
         """
 
         LOG.info('GET %s with id=%s', pecan.request.path, id)
 
-        instance = self._get_by_id(resource_id=id, exclude_fields=exclude_fields)
+        only_fields = self._get_only_fields(include_fields=include_fields)
+        instance = self._get_by_id(resource_id=id, exclude_fields=exclude_fields,
+                                   only_fields=only_fields)
 
         if not instance:
             msg = 'Unable to identify resource with id "%s".' % id
@@ -183,20 +334,27 @@ class ResourceController(rest.RestController):
 
         from_model_kwargs = from_model_kwargs or {}
         from_model_kwargs.update(self._get_from_model_kwargs_for_request(request=pecan.request))
-        result = self.model.from_model(instance, **from_model_kwargs)
+        result = self._from_model(instance, from_model_kwargs=from_model_kwargs,
+                                  include_fields=include_fields)
         LOG.debug('GET %s with id=%s, client_result=%s', pecan.request.path, id, result)
 
         return result
 
-    def _get_one_by_name_or_id(self, name_or_id, exclude_fields=None, from_model_kwargs=None):
+    def _get_one_by_name_or_id(self, name_or_id, exclude_fields=None, from_model_kwargs=None,
+                               include_fields=None):
         """
         :param exclude_fields: A list of object fields to exclude.
         :type exclude_fields: ``list``
+
+        :param include_fields: A list of object fields to include.
+        :type include_fields: ``list``
         """
 
         LOG.info('GET %s with name_or_id=%s', pecan.request.path, name_or_id)
 
-        instance = self._get_by_name_or_id(name_or_id=name_or_id, exclude_fields=exclude_fields)
+        only_fields = self._get_only_fields(include_fields=include_fields)
+        instance = self._get_by_name_or_id(name_or_id=name_or_id, exclude_fields=exclude_fields,
+                                           only_fields=only_fields)
 
         if not instance:
             msg = 'Unable to identify resource with name_or_id "%s".' % (name_or_id)
@@ -204,15 +362,19 @@ class ResourceController(rest.RestController):
 
         from_model_kwargs = from_model_kwargs or {}
         from_model_kwargs.update(self._get_from_model_kwargs_for_request(request=pecan.request))
-        result = self.model.from_model(instance, **from_model_kwargs)
+        result = self._from_model(instance, from_model_kwargs=from_model_kwargs,
+                                  include_fields=include_fields)
         LOG.debug('GET %s with name_or_id=%s, client_result=%s', pecan.request.path, id, result)
 
         return result
 
-    def _get_one_by_pack_ref(self, pack_ref, exclude_fields=None, from_model_kwargs=None):
+    def _get_one_by_pack_ref(self, pack_ref, exclude_fields=None, from_model_kwargs=None,
+                             include_fields=None):
         LOG.info('GET %s with pack_ref=%s', pecan.request.path, pack_ref)
 
-        instance = self._get_by_pack_ref(pack_ref=pack_ref, exclude_fields=exclude_fields)
+        only_fields = self._get_only_fields(include_fields=include_fields)
+        instance = self._get_by_pack_ref(pack_ref=pack_ref, exclude_fields=exclude_fields,
+                                         only_fields=only_fields)
 
         if not instance:
             msg = 'Unable to identify resource with pack_ref "%s".' % (pack_ref)
@@ -220,44 +382,51 @@ class ResourceController(rest.RestController):
 
         from_model_kwargs = from_model_kwargs or {}
         from_model_kwargs.update(self._get_from_model_kwargs_for_request(request=pecan.request))
-        result = self.model.from_model(instance, **from_model_kwargs)
+        result = self._from_model(instance, from_model_kwargs=from_model_kwargs,
+                                  include_fields=include_fields)
         LOG.debug('GET %s with pack_ref=%s, client_result=%s', pecan.request.path, id, result)
 
         return result
 
-    def _get_by_id(self, resource_id, exclude_fields=None):
+    def _get_by_id(self, resource_id, exclude_fields=None, only_fields=None):
         try:
-            resource_db = self.access.get(id=resource_id, exclude_fields=exclude_fields)
+            resource_db = self.access.get(id=resource_id, exclude_fields=exclude_fields,
+                                          only_fields=only_fields)
         except ValidationError:
             resource_db = None
 
         return resource_db
 
-    def _get_by_name(self, resource_name, exclude_fields=None):
+    def _get_by_name(self, resource_name, exclude_fields=None, only_fields=None):
         try:
-            resource_db = self.access.get(name=resource_name, exclude_fields=exclude_fields)
+            resource_db = self.access.get(name=resource_name, exclude_fields=exclude_fields,
+                                          only_fields=only_fields)
         except Exception:
             resource_db = None
 
         return resource_db
 
-    def _get_by_pack_ref(self, pack_ref, exclude_fields=None):
+    def _get_by_pack_ref(self, pack_ref, exclude_fields=None, only_fields=None):
         try:
-            resource_db = self.access.get(pack=pack_ref, exclude_fields=exclude_fields)
+            resource_db = self.access.get(pack=pack_ref, exclude_fields=exclude_fields,
+                                          only_fields=only_fields)
         except Exception:
             resource_db = None
 
         return resource_db
 
-    def _get_by_name_or_id(self, name_or_id, exclude_fields=None):
+    def _get_by_name_or_id(self, name_or_id, exclude_fields=None, only_fields=None):
         """
         Retrieve resource object by an id of a name.
         """
-        resource_db = self._get_by_id(resource_id=name_or_id, exclude_fields=exclude_fields)
+        resource_db = self._get_by_id(resource_id=name_or_id, exclude_fields=exclude_fields,
+                                      only_fields=only_fields)
 
         if not resource_db:
             # Try name
-            resource_db = self._get_by_name(resource_name=name_or_id, exclude_fields=exclude_fields)
+            resource_db = self._get_by_name(resource_name=name_or_id,
+                                            exclude_fields=exclude_fields,
+                                            only_fields=only_fields)
 
         if not resource_db:
             msg = 'Resource with a name or id "%s" not found' % (name_or_id)
@@ -295,6 +464,59 @@ class ResourceController(rest.RestController):
 
         return result
 
+    def _get_include_fields(self, include_attributes):
+        """
+        Parse and validate ?include_attributes filter value.
+
+        :param include_attributes: Comma delimited string of attributes.
+        :type include_attributes: ``str``
+
+        :rtype: ``list``
+        """
+        if not include_attributes:
+            return None
+
+        include_fields = [field.strip() for field in include_attributes.split(',')
+                          if field.strip()]
+        valid_fields = self.access._get_impl().model._fields
+
+        for field in include_fields:
+            if field.split('.')[0] not in valid_fields:
+                msg = 'Invalid or unsupported include attribute specified: %s' % (field)
+                raise ValueError(msg)
+
+        return include_fields
+
+    def _get_only_fields(self, include_fields, extra_fields=None):
+        """
+        Return fields which need to be retrieved from the database for the provided include
+        fields.
+
+        :param extra_fields: Additional fields which are needed by the caller (e.g. sort key).
+        :type extra_fields: ``list``
+
+        :rtype: ``list``
+        """
+        if not include_fields:
+            return None
+
+        only_fields = set(include_fields + self.mandatory_include_fields_retrieve +
+                          self.mandatory_include_fields_response + (extra_fields or []))
+
+        # Nested fields are redundant (and MongoDB rejects a projection which contains both) if
+        # one of the parent fields is also retrieved
+        result = []
+        for field in sorted(only_fields):
+            path = field.split('.')
+            parents = ['.'.join(path[:index]) for index in range(1, len(path))]
+
+            if any(parent in only_fields for parent in parents):
+                continue
+
+            result.append(field)
+
+        return result
+
     def _validate_exclude_fields(self, exclude_fields):
         """
         Validate that provided exclude fields are valid.
@@ -318,26 +540,33 @@ class ContentPackResourceController(ResourceController):
         self.get_one_db_method = self._get_by_ref_or_id
 
     @jsexpose(arg_types=[str])
-    def get_one(self, ref_or_id):
-        return self._get_one(ref_or_id)
+    def get_one(self, ref_or_id, include_attributes=None):
+        include_fields = self._get_include_fields(include_attributes=include_attributes)
+        return self._get_one(ref_or_id, include_fields=include_fields)
 
     @jsexpose()
     def get_all(self, **kwargs):
         return self._get_all(**kwargs)
 
-    def _get_one(self, ref_or_id, exclude_fields=None):
+    def _get_one(self, ref_or_id, exclude_fields=None, include_fields=None):
         LOG.info('GET %s with ref_or_id=%s', pecan.request.path, ref_or_id)
 
+        only_fields = self._get_only_fields(include_fields=include_fields)
+
         try:
-            instance = self._get_by_ref_or_id(ref_or_id=ref_or_id, exclude_fields=exclude_fields)
+            instance = self._get_by_ref_or_id(ref_or_id=ref_or_id, exclude_fields=exclude_fields,
+                                              only_fields=only_fields)
         except Exception as e:
             LOG.exception(e.message)
             pecan.abort(http_client.NOT_FOUND, e.message)
             return
 
         from_model_kwargs = self._get_from_model_kwargs_for_request(request=pecan.request)
-        result = self.model.from_model(instance, **from_model_kwargs)
-        if result and self.include_reference:
+        result = self._from_model(instance, from_model_kwargs=from_model_kwargs,
+                                  include_fields=include_fields)
+        # Note: Reference can't be generated if pack and name have been excluded using
+        # ?include_attributes filter
+        if result and self.include_reference and self._has_reference_attributes(result):
             pack = getattr(result, 'pack', None)
             name = getattr(result, 'name', None)
             result.ref = ResourceReference(pack=pack, name=name).ref
@@ -352,13 +581,19 @@ class ContentPackResourceController(ResourceController):
 
         if self.include_reference:
             for item in result:
+                if not self._has_reference_attributes(item):
+                    continue
+
                 pack = getattr(item, 'pack', None)
                 name = getattr(item, 'name', None)
                 item.ref = ResourceReference(pack=pack, name=name).ref
 
         return result
 
-    def _get_by_ref_or_id(self, ref_or_id, exclude_fields=None):
+    def _has_reference_attributes(self, item):
+        return hasattr(item, 'pack') and hasattr(item, 'name')
+
+    def _get_by_ref_or_id(self, ref_or_id, exclude_fields=None, only_fields=None):
         """
         Retrieve resource object by an id of a reference.
 
@@ -373,9 +608,11 @@ class ContentPackResourceController(ResourceController):
             is_reference = False
 
         if is_reference:
-            resource_db = self._get_by_ref(resource_ref=ref_or_id, exclude_fields=exclude_fields)
+            resource_db = self._get_by_ref(resource_ref=ref_or_id, exclude_fields=exclude_fields,
+                                           only_fields=only_fields)
         else:
-            resource_db = self._get_by_id(resource_id=ref_or_id, exclude_fields=exclude_fields)
+            resource_db = self._get_by_id(resource_id=ref_or_id, exclude_fields=exclude_fields,
+                                          only_fields=only_fields)
 
         if not resource_db:
             msg = 'Resource with a reference or id "%s" not found' % (ref_or_id)
@@ -383,14 +620,15 @@ class ContentPackResourceController(ResourceController):
 
         return resource_db
 
-    def _get_by_ref(self, resource_ref, exclude_fields=None):
+    def _get_by_ref(self, resource_ref, exclude_fields=None, only_fields=None):
         try:
             ref = ResourceReference.from_string_reference(ref=resource_ref)
         except Exception:
             return None
 
         resource_db = self.access.query(name=ref.name, pack=ref.pack,
-                                        exclude_fields=exclude_fields).first()
+                                        exclude_fields=exclude_fields,
+                                        only_fields=only_fields).first()
         return resource_db
 
     def _get_filters(self, **kwargs):
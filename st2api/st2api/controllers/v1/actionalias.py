@@ -55,8 +55,10 @@ class ActionAliasController(resource.ContentPackResourceController):
 
     @request_user_has_resource_db_permission(permission_type=PermissionType.ACTION_ALIAS_VIEW)
     @jsexpose(arg_types=[str])
-    def get_one(self, ref_or_id):
-        return super(ActionAliasController, self)._get_one(ref_or_id)
+    def get_one(self, ref_or_id, include_attributes=None):
+        include_fields = self._get_include_fields(include_attributes=include_attributes)
+        return super(ActionAliasController, self)._get_one(ref_or_id,
+                                                           include_fields=include_fields)
 
     @jsexpose(body_cls=ActionAliasAPI, status_code=http_client.CREATED)
     @request_user_has_resource_api_permission(permission_type=PermissionType.ACTION_ALIAS_CREATE)
@@ -346,6 +346,12 @@ class ActionExecutionsController(ActionExecutionsControllerMixin, ResourceContro
         'sort': ['-start_timestamp', 'action.ref']
     }
     supported_filters = SUPPORTED_EXECUTIONS_FILTERS
+    supports_cursor_pagination = True
+
+    # Note: Action and runner parameters definitions are needed to mask secret parameters
+    mandatory_include_fields_retrieve = ['start_timestamp', 'action.parameters',
+                                         'runner.runner_parameters']
+    stream_list_response = True
     filter_transform_functions = {
         'timestamp_gt': lambda value: isotime.parse(value=value),
         'timestamp_lt': lambda value: isotime.parse(value=value)
@@ -383,15 +389,19 @@ class ActionExecutionsController(ActionExecutionsControllerMixin, ResourceContro
 
     @request_user_has_resource_db_permission(permission_type=PermissionType.EXECUTION_VIEW)
     @jsexpose(arg_types=[str])
-    def get_one(self, id, exclude_attributes=None, **kwargs):
+    def get_one(self, id, exclude_attributes=None, include_attributes=None, **kwargs):
         """
         Retrieve a single execution.
 
         Handles requests:
             GET /executions/<id>[?exclude_attributes=result,trigger_instance]
+            GET /executions/<id>[?include_attributes=id,status]
 
         :param exclude_attributes: Comma delimited string of attributes to exclude from the object.
         :type exclude_attributes: ``str``
+
+        :param include_attributes: Comma delimited string of attributes to include in the object.
+        :type include_attributes: ``str``
         """
         if exclude_attributes:
             exclude_fields = exclude_attributes.split(',')
@@ -399,8 +409,9 @@ class ActionExecutionsController(ActionExecutionsControllerMixin, ResourceContro
             exclude_fields = None
 
         exclude_fields = self._validate_exclude_fields(exclude_fields=exclude_fields)
+        include_fields = self._get_include_fields(include_attributes=include_attributes)
 
-        return self._get_one(id=id, exclude_fields=exclude_fields)
+        return self._get_one(id=id, exclude_fields=exclude_fields, include_fields=include_fields)
 
     @jsexpose(body_cls=LiveActionCreateAPI, status_code=http_client.CREATED)
     def post(self, liveaction_api):
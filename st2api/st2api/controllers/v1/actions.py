@@ -75,6 +75,8 @@ class ActionsController(resource.ContentPackResourceController):
         'notify'
     ]
 
+    mandatory_include_fields_retrieve = ['runner_type.name']
+
     include_reference = True
 
     def __init__(self, *args, **kwargs):
@@ -94,8 +96,9 @@ class ActionsController(resource.ContentPackResourceController):
 
     @request_user_has_resource_db_permission(permission_type=PermissionType.ACTION_VIEW)
     @jsexpose(arg_types=[str])
-    def get_one(self, ref_or_id):
-        return super(ActionsController, self)._get_one(ref_or_id)
+    def get_one(self, ref_or_id, include_attributes=None):
+        include_fields = self._get_include_fields(include_attributes=include_attributes)
+        return super(ActionsController, self)._get_one(ref_or_id, include_fields=include_fields)
 
     @jsexpose(body_cls=ActionCreateAPI, status_code=http_client.CREATED)
     @request_user_has_resource_api_permission(permission_type=PermissionType.ACTION_CREATE)
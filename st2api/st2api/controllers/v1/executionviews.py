@@ -18,7 +18,7 @@ import six
 
 from st2common import log as logging
 from st2common.models.api.base import jsexpose
-from st2common.persistence.execution import ActionExecution
+from st2common.persistence.execution import ActionExecutionFilterValue
 
 LOG = logging.getLogger(__name__)
 
@@ -46,6 +46,8 @@ SUPPORTED_FILTERS = {
 
 # List of filters that are too broad to distinct by them and are very likely to represent 1 to 1
 # relation between filter and particular history record.
+# Note: Distinct values for the remaining filters are maintained in a separate collection (see
+# st2common.models.db.execution.FILTER_VALUE_FIELDS) so the mappings need to be kept in sync.
 IGNORE_FILTERS = ['parent', 'timestamp', 'liveaction', 'trigger_instance']
 
 
@@ -65,13 +67,16 @@ class FiltersController(RestController):
             :param types: Comma delimited string of filter types to output.
             :type types: ``str``
         """
-        filters = {}
+        filter_names = [name for name in six.iterkeys(SUPPORTED_FILTERS)
+                        if name not in IGNORE_FILTERS and (not types or name in types)]
 
-        for name, field in six.iteritems(SUPPORTED_FILTERS):
-            if name not in IGNORE_FILTERS and (not types or name in types):
-                filters[name] = ActionExecution.distinct(field=field)
+        if not filter_names:
+            return {}
 
-        return filters
+        # Note: Values are maintained incrementally when executions are stored and purged so
+        # this only needs to read a small collection instead of running distinct over all the
+        # executions
+        return ActionExecutionFilterValue.get_values(filter_names=filter_names)
 
 
 class ExecutionViewsController(RestController):
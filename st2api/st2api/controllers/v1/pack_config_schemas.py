@@ -54,11 +54,12 @@ class PackConfigSchemasController(ResourceController):
 
     @request_user_has_resource_db_permission(permission_type=PermissionType.PACK_VIEW)
     @jsexpose(arg_types=[str])
-    def get_one(self, pack_ref):
+    def get_one(self, pack_ref, include_attributes=None):
         """
         Retrieve config schema for a particular pack.
 
         Handles requests:
             GET /config_schema/<pack_ref>
         """
-        return self._get_one_by_pack_ref(pack_ref=pack_ref)
+        include_fields = self._get_include_fields(include_attributes=include_attributes)
+        return self._get_one_by_pack_ref(pack_ref=pack_ref, include_fields=include_fields)
@@ -54,7 +54,7 @@ class PackConfigsController(ResourceController):
 
     @request_user_has_resource_db_permission(permission_type=PermissionType.PACK_VIEW)
     @jsexpose(arg_types=[str])
-    def get_one(self, pack_ref):
+    def get_one(self, pack_ref, include_attributes=None):
         """
         Retrieve config for a particular pack.
 
@@ -62,4 +62,5 @@ class PackConfigsController(ResourceController):
             GET /configs/<pack_ref>
         """
         # TODO: Make sure secret values are masked
-        return self._get_one_by_pack_ref(pack_ref=pack_ref)
+        include_fields = self._get_include_fields(include_attributes=include_attributes)
+        return self._get_one_by_pack_ref(pack_ref=pack_ref, include_fields=include_fields)
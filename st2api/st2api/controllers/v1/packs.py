@@ -37,10 +37,12 @@ class BasePacksController(ResourceController):
     model = PackAPI
     access = Pack
 
-    def _get_one_by_ref_or_id(self, ref_or_id, exclude_fields=None):
+    def _get_one_by_ref_or_id(self, ref_or_id, exclude_fields=None, include_fields=None):
         LOG.info('GET %s with ref_or_id=%s', pecan.request.path, ref_or_id)
 
-        instance = self._get_by_ref_or_id(ref_or_id=ref_or_id, exclude_fields=exclude_fields)
+        only_fields = self._get_only_fields(include_fields=include_fields)
+        instance = self._get_by_ref_or_id(ref_or_id=ref_or_id, exclude_fields=exclude_fields,
+                                          only_fields=only_fields)
 
         if not instance:
             msg = 'Unable to identify resource with ref_or_id "%s".' % (ref_or_id)
@@ -48,26 +50,30 @@ class BasePacksController(ResourceController):
             return
 
         from_model_kwargs = self._get_from_model_kwargs_for_request(request=pecan.request)
-        result = self.model.from_model(instance, **from_model_kwargs)
+        result = self._from_model(instance, from_model_kwargs=from_model_kwargs,
+                                  include_fields=include_fields)
         LOG.debug('GET %s with ref_or_id=%s, client_result=%s', pecan.request.path, ref_or_id,
                   result)
 
         return result
 
-    def _get_by_ref_or_id(self, ref_or_id, exclude_fields=None):
-        resource_db = self._get_by_id(resource_id=ref_or_id, exclude_fields=exclude_fields)
+    def _get_by_ref_or_id(self, ref_or_id, exclude_fields=None, only_fields=None):
+        resource_db = self._get_by_id(resource_id=ref_or_id, exclude_fields=exclude_fields,
+                                      only_fields=only_fields)
 
         if not resource_db:
             # Try ref
-            resource_db = self._get_by_ref(ref=ref_or_id, exclude_fields=exclude_fields)
+            resource_db = self._get_by_ref(ref=ref_or_id, exclude_fields=exclude_fields,
+                                           only_fields=only_fields)
 
         return resource_db
 
-    def _get_by_ref(self, ref, exclude_fields=None):
+    def _get_by_ref(self, ref, exclude_fields=None, only_fields=None):
         """
         Note: In this case "ref" is pack name and not StackStorm's ResourceReference.
         """
-        resource_db = self.access.query(ref=ref, exclude_fields=exclude_fields).first()
+        resource_db = self.access.query(ref=ref, exclude_fields=exclude_fields,
+                                        only_fields=only_fields).first()
         return resource_db
 
 
@@ -95,5 +101,6 @@ class PacksController(BasePacksController):
 
     @request_user_has_resource_db_permission(permission_type=PermissionType.PACK_VIEW)
     @jsexpose(arg_types=[str])
-    def get_one(self, ref_or_id):
-        return self._get_one_by_ref_or_id(ref_or_id=ref_or_id)
+    def get_one(self, ref_or_id, include_attributes=None):
+        include_fields = self._get_include_fields(include_attributes=include_attributes)
+        return self._get_one_by_ref_or_id(ref_or_id=ref_or_id, include_fields=include_fields)
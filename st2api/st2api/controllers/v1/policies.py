@@ -50,20 +50,25 @@ class PolicyTypeController(resource.ResourceController):
     include_reference = False
 
     @jsexpose(arg_types=[str])
-    def get_one(self, ref_or_id):
-        return self._get_one(ref_or_id)
+    def get_one(self, ref_or_id, include_attributes=None):
+        include_fields = self._get_include_fields(include_attributes=include_attributes)
+        return self._get_one(ref_or_id, include_fields=include_fields)
 
     @jsexpose()
     def get_all(self, **kwargs):
         return self._get_all(**kwargs)
 
-    def _get_one(self, ref_or_id):
+    def _get_one(self, ref_or_id, include_fields=None):
         LOG.info('GET %s with ref_or_id=%s', pecan.request.path, ref_or_id)
 
-        instance = self._get_by_ref_or_id(ref_or_id=ref_or_id)
-        result = self.model.from_model(instance)
+        only_fields = self._get_only_fields(include_fields=include_fields)
+        instance = self._get_by_ref_or_id(ref_or_id=ref_or_id, only_fields=only_fields)
+        result = self._from_model(instance, include_fields=include_fields)
 
-        if result and self.include_reference:
+        # Note: Reference can't be generated if resource_type and name have been excluded using
+        # ?include_attributes filter
+        if result and self.include_reference and hasattr(result, 'resource_type') and \
+                hasattr(result, 'name'):
             resource_type = getattr(result, 'resource_type', None)
             name = getattr(result, 'name', None)
             result.ref = PolicyTypeReference(resource_type=resource_type, name=name).ref
@@ -84,11 +89,11 @@ class PolicyTypeController(resource.ResourceController):
 
         return result
 
-    def _get_by_ref_or_id(self, ref_or_id):
+    def _get_by_ref_or_id(self, ref_or_id, only_fields=None):
         if PolicyTypeReference.is_reference(ref_or_id):
-            resource_db = self._get_by_ref(resource_ref=ref_or_id)
+            resource_db = self._get_by_ref(resource_ref=ref_or_id, only_fields=only_fields)
         else:
-            resource_db = self._get_by_id(resource_id=ref_or_id)
+            resource_db = self._get_by_id(resource_id=ref_or_id, only_fields=only_fields)
 
         if not resource_db:
             msg = 'PolicyType with a reference of id "%s" not found.' % (ref_or_id)
@@ -96,21 +101,23 @@ class PolicyTypeController(resource.ResourceController):
 
         return resource_db
 
-    def _get_by_id(self, resource_id):
+    def _get_by_id(self, resource_id, exclude_fields=None, only_fields=None):
         try:
-            resource_db = self.access.get_by_id(resource_id)
+            resource_db = self.access.get(id=resource_id, exclude_fields=exclude_fields,
+                                          only_fields=only_fields)
         except Exception:
             resource_db = None
 
         return resource_db
 
-    def _get_by_ref(self, resource_ref):
+    def _get_by_ref(self, resource_ref, only_fields=None):
         try:
             ref = PolicyTypeReference.from_string_reference(ref=resource_ref)
         except Exception:
             return None
 
-        resource_db = self.access.query(name=ref.name, resource_type=ref.resource_type).first()
+        resource_db = self.access.query(name=ref.name, resource_type=ref.resource_type,
+                                        only_fields=only_fields).first()
         return resource_db
 
     def _get_filters(self, **kwargs):
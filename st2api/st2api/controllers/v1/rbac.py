@@ -49,8 +49,9 @@ class RolesController(ResourceController):
 
     @request_user_is_admin()
     @jsexpose(arg_types=[str])
-    def get_one(self, name_or_id):
-        return self._get_one_by_name_or_id(name_or_id=name_or_id)
+    def get_one(self, name_or_id, include_attributes=None):
+        include_fields = self._get_include_fields(include_attributes=include_attributes)
+        return self._get_one_by_name_or_id(name_or_id=name_or_id, include_fields=include_fields)
 
 
 class PermissionTypesController(rest.RestController):
@@ -53,6 +53,9 @@ class RuleEnforcementController(resource.ResourceController):
     }
 
     supported_filters = SUPPORTED_FILTERS
+    mandatory_include_fields_retrieve = ['enforced_at']
+    supports_cursor_pagination = True
+    stream_list_response = True
     filter_transform_functions = {
         'enforced_at': lambda value: isotime.parse(value=value),
         'enforced_at_gt': lambda value: isotime.parse(value=value),
@@ -66,5 +69,7 @@ class RuleEnforcementController(resource.ResourceController):
 
     @request_user_has_resource_db_permission(permission_type=PermissionType.RULE_ENFORCEMENT_VIEW)
     @jsexpose(arg_types=[str])
-    def get_one(self, ref_or_id):
-        return super(RuleEnforcementController, self)._get_one(ref_or_id)
+    def get_one(self, ref_or_id, include_attributes=None):
+        include_fields = self._get_include_fields(include_attributes=include_attributes)
+        return super(RuleEnforcementController, self)._get_one(ref_or_id,
+                                                               include_fields=include_fields)
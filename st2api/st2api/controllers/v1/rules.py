@@ -65,6 +65,8 @@ class RuleController(resource.ContentPackResourceController):
         'sort': ['pack', 'name']
     }
 
+    mandatory_include_fields_retrieve = ['trigger']
+
     include_reference = True
 
     @request_user_has_permission(permission_type=PermissionType.RULE_LIST)
@@ -74,8 +76,9 @@ class RuleController(resource.ContentPackResourceController):
 
     @request_user_has_resource_db_permission(permission_type=PermissionType.RULE_VIEW)
     @jsexpose(arg_types=[str])
-    def get_one(self, ref_or_id):
-        return super(RuleController, self)._get_one(ref_or_id)
+    def get_one(self, ref_or_id, include_attributes=None):
+        include_fields = self._get_include_fields(include_attributes=include_attributes)
+        return super(RuleController, self)._get_one(ref_or_id, include_fields=include_fields)
 
     @jsexpose(body_cls=RuleAPI, status_code=http_client.CREATED)
     @request_user_has_resource_api_permission(permission_type=PermissionType.RULE_CREATE)
@@ -54,8 +54,10 @@ class RunnerTypesController(ResourceController):
 
     @request_user_has_resource_db_permission(permission_type=PermissionType.RUNNER_VIEW)
     @jsexpose(arg_types=[str])
-    def get_one(self, name_or_id):
-        return super(RunnerTypesController, self)._get_one_by_name_or_id(name_or_id)
+    def get_one(self, name_or_id, include_attributes=None):
+        include_fields = self._get_include_fields(include_attributes=include_attributes)
+        return super(RunnerTypesController, self)._get_one_by_name_or_id(
+            name_or_id, include_fields=include_fields)
 
     @request_user_has_resource_db_permission(permission_type=PermissionType.RUNNER_MODIFY)
     @jsexpose(arg_types=[str], body_cls=RunnerTypeAPI)
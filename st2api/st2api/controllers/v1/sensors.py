@@ -54,8 +54,10 @@ class SensorTypeController(resource.ContentPackResourceController):
 
     @request_user_has_resource_db_permission(permission_type=PermissionType.SENSOR_VIEW)
     @jsexpose(arg_types=[str])
-    def get_one(self, ref_or_id):
-        return super(SensorTypeController, self)._get_one(ref_or_id)
+    def get_one(self, ref_or_id, include_attributes=None):
+        include_fields = self._get_include_fields(include_attributes=include_attributes)
+        return super(SensorTypeController, self)._get_one(ref_or_id,
+                                                          include_fields=include_fields)
 
     @request_user_has_resource_db_permission(permission_type=PermissionType.SENSOR_MODIFY)
     @jsexpose(arg_types=[str], body_cls=SensorTypeAPI)
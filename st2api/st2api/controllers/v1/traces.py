@@ -35,3 +35,7 @@ class TracesController(ResourceController):
     query_options = {
         'sort': ['trace_tag']
     }
+
+    mandatory_include_fields_retrieve = ['start_timestamp']
+    supports_cursor_pagination = True
+    stream_list_response = True
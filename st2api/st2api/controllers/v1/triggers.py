@@ -370,18 +370,24 @@ class TriggerInstanceController(TriggerInstanceControllerMixin, resource.Resourc
         'sort': ['-occurrence_time', 'trigger']
     }
 
+    supports_cursor_pagination = True
+    stream_list_response = True
+
+    mandatory_include_fields_retrieve = ['occurrence_time']
+
     def __init__(self):
         super(TriggerInstanceController, self).__init__()
 
     @jsexpose(arg_types=[str])
-    def get_one(self, instance_id):
+    def get_one(self, instance_id, include_attributes=None):
         """
             List triggerinstance by instance_id.
 
             Handle:
                 GET /triggerinstances/1
         """
-        return self._get_one(instance_id)
+        include_fields = self._get_include_fields(include_attributes=include_attributes)
+        return self._get_one(instance_id, include_fields=include_fields)
 
     @jsexpose()
     def get_all(self, **kw):
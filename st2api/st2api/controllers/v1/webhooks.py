@@ -18,9 +18,15 @@ try:
 except ImportError:
     import json
 
+import time
+import weakref
+from collections import OrderedDict
+
+import jsonschema
 import six
 import pecan
 import uuid
+from oslo_config import cfg
 from pecan import abort
 from pecan.rest import RestController
 from six.moves.urllib import parse as urlparse  # pylint: disable=import-error
@@ -28,13 +34,16 @@ urljoin = urlparse.urljoin
 
 from st2common import log as logging
 from st2common.constants.triggers import WEBHOOK_TRIGGER_TYPES
+from st2common.exceptions.triggers import TriggerBufferFullException
 from st2common.models.api.base import jsexpose
 from st2common.models.api.trace import TraceContext
 from st2common.models.api.trigger import TriggerAPI
 import st2common.services.triggers as trigger_service
 from st2common.services.triggerwatcher import TriggerWatcher
+from st2common.transport.reactor import BufferedTriggerDispatcher
 from st2common.transport.reactor import TriggerDispatcher
 from st2common.util.http import parse_content_type_header
+from st2common.util import schema as util_schema
 from st2common.rbac.types import PermissionType
 from st2common.rbac.decorators import request_user_has_webhook_permission
 
@@ -44,6 +53,20 @@ LOG = logging.getLogger(__name__)
 
 TRACE_TAG_HEADER = 'St2-Trace-Tag'
 
+# How long (in seconds) compiled payload schema validators for the triggers dispatched using the
+# generic "st2" webhook are cached
+PAYLOAD_VALIDATOR_CACHE_TTL = 60
+
+# Maximum number of cached payload schema validators for the triggers dispatched using the
+# generic "st2" webhook. Least recently used validators are evicted once the cache is full.
+PAYLOAD_VALIDATOR_CACHE_MAX_SIZE = 1000
+
+# Note: httplib doesn't contain a constant for this status code
+TOO_MANY_REQUESTS = 429
+
+# Controllers whose buffered triggers need to be published on shutdown
+_CONTROLLERS = weakref.WeakSet()
+
 
 class HooksHolder(object):
     """
@@ -92,7 +115,23 @@ class WebhooksController(RestController):
         self._base_url = '/webhooks/'
         self._trigger_types = WEBHOOK_TRIGGER_TYPES.keys()
 
-        self._trigger_dispatcher = TriggerDispatcher(LOG)
+        # Maps webhook trigger type reference to a compiled validator
+        self._webhook_payload_validators = {}
+
+        # Maps trigger reference to a tuple of (expiration time, compiled validator). Ordered so
+        # the least recently used entry can be evicted once the cache is full.
+        self._payload_validators = OrderedDict()
+
+        if cfg.CONF.api.webhook_buffer_size > 0:
+            # Triggers are buffered and published in batches in the background so requests
+            # don't need to wait for the message bus
+            self._trigger_dispatcher = BufferedTriggerDispatcher(
+                LOG, buffer_size=cfg.CONF.api.webhook_buffer_size,
+                batch_size=cfg.CONF.api.webhook_batch_size)
+            self._trigger_dispatcher.start()
+        else:
+            self._trigger_dispatcher = TriggerDispatcher(LOG)
+
         queue_suffix = self.__class__.__name__
         self._trigger_watcher = TriggerWatcher(create_handler=self._handle_create_trigger,
                                                update_handler=self._handle_update_trigger,
@@ -103,6 +142,15 @@ class WebhooksController(RestController):
         self._trigger_watcher.start()
         self._register_webhook_trigger_types()
 
+        _CONTROLLERS.add(self)
+
+    def shutdown(self):
+        """
+        Publish the buffered triggers and stop the background dispatcher.
+        """
+        if isinstance(self._trigger_dispatcher, BufferedTriggerDispatcher):
+            self._trigger_dispatcher.stop()
+
     @jsexpose()
     def get_all(self):
         # Return only the hooks known by this controller.
@@ -155,10 +203,12 @@ class WebhooksController(RestController):
 
         payload['headers'] = headers
         payload['body'] = body
-        # Dispatch trigger instance for each of the trigger found
+
         for trigger in triggers:
-            self._trigger_dispatcher.dispatch(trigger, payload=payload,
-                trace_context=trace_context)
+            self._validate_payload(trigger_type_ref=trigger['type'], payload=payload)
+
+        # Dispatch trigger instance for each of the trigger found
+        self._dispatch_triggers([(trigger, payload, trace_context) for trigger in triggers])
 
         return body
 
@@ -180,12 +230,103 @@ class WebhooksController(RestController):
         if not trigger:
             msg = 'Trigger not specified.'
             return pecan.abort(http_client.BAD_REQUEST, msg)
-        self._trigger_dispatcher.dispatch(trigger, payload=payload, trace_context=trace_context)
+
+        self._validate_payload(trigger_ref=trigger, payload=payload)
+        self._dispatch_triggers([(trigger, payload, trace_context)])
 
         return body
 
+    def _dispatch_triggers(self, triggers):
+        """
+        :param triggers: List of (trigger, payload, trace_context) tuples.
+        :type triggers: ``list``
+        """
+        if not isinstance(self._trigger_dispatcher, BufferedTriggerDispatcher):
+            for (trigger, payload, trace_context) in triggers:
+                self._trigger_dispatcher.dispatch(trigger, payload=payload,
+                                                  trace_context=trace_context)
+            return
+
+        try:
+            self._trigger_dispatcher.dispatch_many(triggers)
+        except TriggerBufferFullException as e:
+            self._log_request('Failed to buffer triggers: %s' % (str(e)), pecan.request,
+                              log_method=LOG.warning)
+            msg = 'Too many webhook requests, please try again later.'
+            return pecan.abort(TOO_MANY_REQUESTS, msg, headers={'Retry-After': '1'})
+
+    def _validate_payload(self, payload, trigger_type_ref=None, trigger_ref=None):
+        """
+        Validate trigger payload against the trigger type payload schema and abort the request
+        if it's not valid.
+        """
+        if trigger_type_ref:
+            validator = self._get_webhook_payload_validator(trigger_type_ref=trigger_type_ref)
+        else:
+            validator = self._get_payload_validator(trigger_ref=trigger_ref)
+
+        if not validator:
+            return
+
+        try:
+            validator.validate(payload)
+        except jsonschema.ValidationError as e:
+            self._log_request('Invalid payload: %s.' % (str(e)), pecan.request)
+            msg = 'Trigger payload validation failed: %s' % (e.message)
+            return pecan.abort(http_client.BAD_REQUEST, msg)
+
+    def _get_webhook_payload_validator(self, trigger_type_ref):
+        """
+        Retrieve compiled validator for the webhook trigger type (those are static so validators
+        are cached forever).
+        """
+        if trigger_type_ref not in self._webhook_payload_validators:
+            trigger_type = WEBHOOK_TRIGGER_TYPES.get(trigger_type_ref, {})
+            validator = self._get_validator(schema=trigger_type.get('payload_schema', None))
+            self._webhook_payload_validators[trigger_type_ref] = validator
+
+        return self._webhook_payload_validators[trigger_type_ref]
+
+    def _get_payload_validator(self, trigger_ref):
+        """
+        Retrieve compiled validator for the trigger dispatched using the generic webhook.
+        """
+        now = time.time()
+        cached = self._payload_validators.pop(trigger_ref, None)
+
+        if cached and cached[0] > now:
+            self._payload_validators[trigger_ref] = cached
+            return cached[1]
+
+        try:
+            trigger_db = trigger_service.get_trigger_db_by_ref(trigger_ref)
+            trigger_type_db = trigger_service.get_trigger_type_db(trigger_db.type) \
+                if trigger_db else None
+        except Exception:
+            LOG.debug('Failed to retrieve payload schema for trigger "%s".', trigger_ref,
+                      exc_info=True)
+            return None
+
+        validator = self._get_validator(schema=getattr(trigger_type_db, 'payload_schema', None))
+
+        # Note: Unknown triggers are not cached so arbitrary references can't fill the cache
+        if not trigger_type_db:
+            return validator
+
+        while len(self._payload_validators) >= PAYLOAD_VALIDATOR_CACHE_MAX_SIZE:
+            self._payload_validators.popitem(last=False)
+
+        self._payload_validators[trigger_ref] = (now + PAYLOAD_VALIDATOR_CACHE_TTL, validator)
+        return validator
+
+    def _get_validator(self, schema):
+        if not schema:
+            return None
+
+        validator_cls = util_schema.get_validator()
+        return validator_cls(schema)
+
     def _is_valid_hook(self, hook):
-        # TODO: Validate hook payload with payload_schema.
         return hook in self._hooks
 
     def _register_webhook_trigger_types(self):
@@ -257,3 +398,14 @@ class WebhooksController(RestController):
     def _sanitize_trigger(self, trigger):
         sanitized = TriggerAPI.from_model(trigger).to_dict()
         return sanitized
+
+
+def shutdown():
+    """
+    Publish the buffered webhook triggers. Needs to be called before the service exits.
+    """
+    for controller in list(_CONTROLLERS):
+        try:
+            controller.shutdown()
+        except Exception:
+            LOG.exception('Failed to shut down webhooks controller.')
@@ -34,3 +34,9 @@ is_gunicorn = True
 app = {
     'modules': ['st2api']
 }
+
+
+def worker_exit(server, worker):
+    # Publish the buffered webhook triggers before the worker exits
+    from st2api.controllers.v1 import webhooks
+    webhooks.shutdown()
@@ -115,6 +115,41 @@ class TestActionExecutionFilters(FunctionalTest):
         self.assertEqual(response.status_int, 200)
         self.assertFalse('result' in response.json[0])
 
+    def test_get_all_include_attributes(self):
+        path = '/v1/executions?limit=5&include_attributes=status,start_timestamp'
+        response = self.app.get(path)
+
+        self.assertEqual(response.status_int, 200)
+        self.assertEqual(len(response.json), 5)
+
+        for item in response.json:
+            self.assertEqual(sorted(item.keys()), ['id', 'start_timestamp', 'status'])
+
+        obj_id = random.choice(self.refs.keys())
+        response = self.app.get('/v1/executions/%s?include_attributes=status' % (obj_id))
+        self.assertEqual(response.status_int, 200)
+        self.assertEqual(response.json, {'id': obj_id, 'status': self.refs[obj_id].status})
+
+        # Invalid attribute
+        response = self.app.get('/v1/executions?include_attributes=invalid', expect_errors=True)
+        self.assertEqual(response.status_int, 400)
+
+        # Include and exclude attributes can't be used together
+        path = '/v1/executions?include_attributes=status&exclude_attributes=result'
+        response = self.app.get(path, expect_errors=True)
+        self.assertEqual(response.status_int, 400)
+
+    def test_only_fields_skip_fields_covered_by_parent_field(self):
+        controller = ActionExecutionsController()
+
+        only_fields = controller._get_only_fields(include_fields=['action', 'runner.name'],
+                                                  extra_fields=['action.ref', 'runner'])
+        self.assertEqual(only_fields, ['action', 'id', 'runner', 'start_timestamp'])
+
+        only_fields = controller._get_only_fields(include_fields=['action.parameters.cmd'])
+        self.assertEqual(only_fields, ['action.parameters', 'id',
+                                       'runner.runner_parameters', 'start_timestamp'])
+
     def test_get_one(self):
         obj_id = random.choice(self.refs.keys())
         response = self.app.get('/v1/executions/%s' % obj_id)
@@ -228,6 +263,38 @@ class TestActionExecutionFilters(FunctionalTest):
         self.assertEqual(len(response.json), limit)
         self.assertTrue(response.headers['X-Total-Count'] > limit)
 
+    def test_cursor_pagination(self):
+        limit = 30
+        retrieved = []
+        url = '/v1/executions?limit=%s&after=' % (limit)
+
+        while True:
+            response = self.app.get(url)
+            self.assertEqual(response.status_int, 200)
+            self.assertNotIn('X-Total-Count', response.headers)
+            retrieved += response.json
+
+            next_cursor = response.headers.get('X-Next-Cursor', None)
+            if not next_cursor:
+                break
+
+            self.assertEqual(len(response.json), limit)
+            url = '/v1/executions?limit=%s&after=%s' % (limit, next_cursor)
+
+        self.assertEqual(len(retrieved), self.num_records)
+        self.assertListEqual(sorted([item['id'] for item in retrieved]),
+                             sorted(self.refs.keys()))
+
+        timestamps = [isotime.parse(item['start_timestamp']) for item in retrieved]
+        self.assertListEqual(timestamps, sorted(timestamps, reverse=True))
+
+        # Count is only included when requested
+        response = self.app.get('/v1/executions?limit=10&after=&include_count=true')
+        self.assertEqual(response.headers['X-Total-Count'], str(self.num_records))
+
+        response = self.app.get('/v1/executions?after=invalid', expect_errors=True)
+        self.assertEqual(response.status_int, 400)
+
     def test_datetime_range(self):
         dt_range = '2014-12-25T00:00:10Z..2014-12-25T00:00:19Z'
         response = self.app.get('/v1/executions?timestamp=%s' % dt_range)
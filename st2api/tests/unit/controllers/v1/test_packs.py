@@ -47,6 +47,16 @@ class PacksControllerTestCase(FunctionalTest):
         self.assertEqual(resp.json['ref'], self.pack_db_1.ref)
         self.assertEqual(resp.json['name'], self.pack_db_1.name)
 
+    def test_get_one_include_attributes(self):
+        resp = self.app.get('/v1/packs/%s?include_attributes=name,version' % (self.pack_db_1.ref))
+        self.assertEqual(resp.status_int, 200)
+        self.assertEqual(resp.json, {'id': str(self.pack_db_1.id), 'name': 'pack1',
+                                     'version': '0.1.0'})
+
+        resp = self.app.get('/v1/packs/%s?include_attributes=invalid' % (self.pack_db_1.ref),
+                            expect_errors=True)
+        self.assertEqual(resp.status_int, 400)
+
     def test_get_one_doesnt_exist(self):
         resp = self.app.get('/v1/packs/doesntexistfoo', expect_errors=True)
         self.assertEqual(resp.status_int, 404)
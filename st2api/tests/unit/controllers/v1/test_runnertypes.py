@@ -34,6 +34,12 @@ class TestRunnerTypesController(FunctionalTest):
         self.assertEqual(resp.status_int, 200)
         self.assertTrue(len(resp.json) > 0, '/v1/runnertypes did not return correct runnertypes.')
 
+    def test_get_one_include_attributes(self):
+        resp = self.app.get('/v1/runnertypes/action-chain?include_attributes=name,enabled')
+        self.assertEqual(resp.status_int, 200)
+        self.assertEqual(sorted(resp.json.keys()), ['enabled', 'id', 'name'])
+        self.assertEqual(resp.json['name'], 'action-chain')
+
     def test_get_one_fail_doesnt_exist(self):
         resp = self.app.get('/v1/runnertypes/1', expect_errors=True)
         self.assertEqual(resp.status_int, 404)
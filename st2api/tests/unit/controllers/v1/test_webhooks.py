@@ -19,9 +19,13 @@ import mock
 import six
 from tests import FunctionalTest
 
+from st2api.controllers.v1 import webhooks
 from st2api.controllers.v1.webhooks import WebhooksController, HooksHolder
 from st2common.constants.triggers import WEBHOOK_TRIGGER_TYPES
 from st2common.models.db.trigger import TriggerDB
+from st2common.models.db.trigger import TriggerTypeDB
+import st2common.services.triggers as trigger_service
+from st2common.transport.reactor import BufferedTriggerDispatcher
 from st2common.transport.reactor import TriggerInstancePublisher
 
 http_client = six.moves.http_client
@@ -41,6 +45,16 @@ ST2_WEBHOOK = {
 DUMMY_TRIGGER = TriggerDB(name='pr-merged', pack='git')
 DUMMY_TRIGGER.type = WEBHOOK_TRIGGER_TYPES.keys()[0]
 
+DUMMY_TRIGGER_TYPE = TriggerTypeDB(name='bar', pack='foo', payload_schema={
+    'type': 'object',
+    'properties': {
+        'ponies': {
+            'type': 'string',
+            'required': True
+        }
+    }
+})
+
 
 class TestWebhooksController(FunctionalTest):
 
@@ -101,6 +115,111 @@ class TestWebhooksController(FunctionalTest):
         self.assertTrue('Trigger not specified.' in post_resp)
         self.assertEqual(post_resp.status_int, http_client.BAD_REQUEST)
 
+    @mock.patch.object(TriggerInstancePublisher, 'publish_trigger', mock.MagicMock(
+        return_value=True))
+    @mock.patch.object(trigger_service, 'get_trigger_db_by_ref', mock.MagicMock(
+        return_value=TriggerDB(name='bar', pack='foo', type='foo.bar')))
+    @mock.patch.object(trigger_service, 'get_trigger_type_db', mock.MagicMock(
+        return_value=DUMMY_TRIGGER_TYPE))
+    @mock.patch('st2common.transport.reactor.TriggerDispatcher.dispatch')
+    def test_st2_webhook_payload_validation(self, dispatch_mock):
+        controller = self.__get_controller()
+        controller._payload_validators.clear()
+
+        post_resp = self.__do_post('st2', ST2_WEBHOOK)
+        self.assertEqual(post_resp.status_int, http_client.ACCEPTED)
+
+        data = {'trigger': 'foo.bar', 'payload': {'ponies': 1}}
+        post_resp = self.__do_post('st2', data, expect_errors=True)
+        self.assertEqual(post_resp.status_int, http_client.BAD_REQUEST)
+        self.assertTrue('Trigger payload validation failed' in post_resp)
+        self.assertEqual(dispatch_mock.call_count, 1)
+
+        # Compiled validator is cached
+        self.assertEqual(trigger_service.get_trigger_type_db.call_count, 1)
+        controller._payload_validators.clear()
+
+    @mock.patch.object(TriggerInstancePublisher, 'publish_trigger', mock.MagicMock(
+        return_value=True))
+    @mock.patch.object(trigger_service, 'get_trigger_db_by_ref', mock.MagicMock(
+        return_value=None))
+    @mock.patch.object(trigger_service, 'get_trigger_type_db', mock.MagicMock(
+        return_value=DUMMY_TRIGGER_TYPE))
+    @mock.patch('st2common.transport.reactor.TriggerDispatcher.dispatch')
+    def test_st2_webhook_unknown_trigger_validator_is_not_cached(self, dispatch_mock):
+        controller = self.__get_controller()
+        controller._payload_validators.clear()
+
+        data = {'trigger': 'foo.unknown', 'payload': {}}
+        post_resp = self.__do_post('st2', data)
+        self.assertEqual(post_resp.status_int, http_client.ACCEPTED)
+        self.assertEqual(len(controller._payload_validators), 0)
+
+    @mock.patch.object(trigger_service, 'get_trigger_db_by_ref', mock.MagicMock(
+        return_value=TriggerDB(name='bar', pack='foo', type='foo.bar')))
+    @mock.patch.object(trigger_service, 'get_trigger_type_db', mock.MagicMock(
+        return_value=DUMMY_TRIGGER_TYPE))
+    @mock.patch.object(webhooks, 'PAYLOAD_VALIDATOR_CACHE_MAX_SIZE', 2)
+    def test_payload_validator_cache_is_bounded(self):
+        controller = self.__get_controller()
+        controller._payload_validators.clear()
+
+        for trigger_ref in ['foo.bar1', 'foo.bar2', 'foo.bar1', 'foo.bar3']:
+            self.assertTrue(controller._get_payload_validator(trigger_ref=trigger_ref))
+
+        # Least recently used validator has been evicted
+        self.assertEqual(list(controller._payload_validators.keys()), ['foo.bar1', 'foo.bar3'])
+        controller._payload_validators.clear()
+
+    @mock.patch.object(TriggerInstancePublisher, 'publish_trigger', mock.MagicMock(
+        return_value=True))
+    @mock.patch.object(WebhooksController, '_is_valid_hook', mock.MagicMock(
+        return_value=True))
+    @mock.patch.object(HooksHolder, 'get_triggers_for_hook', mock.MagicMock(
+        return_value=[DUMMY_TRIGGER]))
+    def test_buffered_triggers_are_published_on_shutdown(self):
+        mock_dispatcher = mock.Mock()
+        dispatcher = BufferedTriggerDispatcher(buffer_size=10, dispatcher=mock_dispatcher)
+
+        with mock.patch.object(self.__get_controller(), '_trigger_dispatcher', dispatcher):
+            for index in range(0, 3):
+                post_resp = self.__do_post('git', WEBHOOK_1)
+                self.assertEqual(post_resp.status_int, http_client.ACCEPTED)
+
+            # Background thread is not running so triggers are still buffered
+            self.assertFalse(mock_dispatcher.dispatch_many.called)
+
+            webhooks.shutdown()
+
+        triggers = mock_dispatcher.dispatch_many.call_args[0][0]
+        self.assertEqual(len(triggers), 3)
+        self.assertEqual([trigger for (trigger, _, _) in triggers], [DUMMY_TRIGGER] * 3)
+
+    @mock.patch.object(TriggerInstancePublisher, 'publish_trigger', mock.MagicMock(
+        return_value=True))
+    @mock.patch.object(WebhooksController, '_is_valid_hook', mock.MagicMock(
+        return_value=True))
+    @mock.patch.object(HooksHolder, 'get_triggers_for_hook', mock.MagicMock(
+        return_value=[DUMMY_TRIGGER]))
+    def test_post_trigger_buffer_full(self):
+        dispatcher = BufferedTriggerDispatcher(buffer_size=1, dispatcher=mock.Mock())
+
+        with mock.patch.object(self.__get_controller(), '_trigger_dispatcher', dispatcher):
+            post_resp = self.__do_post('git', WEBHOOK_1)
+            self.assertEqual(post_resp.status_int, http_client.ACCEPTED)
+
+            # Buffer is full, client should retry later
+            post_resp = self.__do_post('git', WEBHOOK_1, expect_errors=True)
+            self.assertEqual(post_resp.status_int, 429)
+            self.assertEqual(post_resp.headers['Retry-After'], '1')
+
+            # Buffered trigger is published by the background thread
+            dispatcher._dispatch_batch()
+            self.assertEqual(dispatcher._dispatcher.dispatch_many.call_count, 1)
+
+            post_resp = self.__do_post('git', WEBHOOK_1)
+            self.assertEqual(post_resp.status_int, http_client.ACCEPTED)
+
     @mock.patch.object(TriggerInstancePublisher, 'publish_trigger', mock.MagicMock(
         return_value=True))
     @mock.patch.object(WebhooksController, '_is_valid_hook', mock.MagicMock(
@@ -199,6 +318,11 @@ class TestWebhooksController(FunctionalTest):
         self.assertTrue(controller._is_valid_hook('with_leading_trailing_slash'))
         self.assertTrue(controller._is_valid_hook('with/mixed/slash'))
 
+    def __get_controller(self):
+        # Note: Controller is instantiated when the app is set up (after config is parsed)
+        from st2api.controllers.v1.root import RootController
+        return RootController.webhooks
+
     def __do_post(self, hook, webhook, expect_errors=False, headers=None):
         return self.app.post_json('/v1/webhooks/' + hook,
                                   params=webhook,
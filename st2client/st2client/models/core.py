@@ -22,10 +22,14 @@ import six
 
 from six.moves import urllib
 from st2client.utils import httpclient
+from st2client.utils import jsonstream
 
 
 LOG = logging.getLogger(__name__)
 
+# Size of the chunks in which list responses are read
+LIST_RESPONSE_CHUNK_SIZE = 64 * 1024
+
 
 def add_auth_token_to_kwargs_from_env(func):
     @wraps(func)
@@ -162,6 +166,18 @@ class ResourceManager(object):
                                 'from the HTTP response. %s\n' % str(e))
         response.raise_for_status()
 
+    @staticmethod
+    def _get_list_response_items(response):
+        """
+        Return items of a list response. Items are parsed as the response body is being received
+        so the whole serialized response is never held in memory.
+        """
+        if not hasattr(response, 'iter_content'):
+            return response.json()
+
+        chunks = response.iter_content(chunk_size=LIST_RESPONSE_CHUNK_SIZE)
+        return jsonstream.iter_json_list(chunks)
+
     @add_auth_token_to_kwargs_from_env
     def get_all(self, **kwargs):
         # TODO: This is ugly, stop abusing kwargs
@@ -186,11 +202,11 @@ class ResourceManager(object):
         if user:
             params['user'] = user
 
-        response = self.client.get(url=url, params=params, **kwargs)
+        response = self.client.get(url=url, params=params, stream=True, **kwargs)
         if response.status_code != 200:
             self.handle_error(response)
         return [self.resource.deserialize(item)
-                for item in response.json()]
+                for item in self._get_list_response_items(response)]
 
     @add_auth_token_to_kwargs_from_env
     def get_by_id(self, id, **kwargs):
@@ -248,12 +264,15 @@ class ResourceManager(object):
                 params[k] = v
         url = '/%s/?%s' % (self.resource.get_url_path_name(),
                            urllib.parse.urlencode(params))
-        response = self.client.get(url, token=token) if token else self.client.get(url)
+        if token:
+            response = self.client.get(url, token=token, stream=True)
+        else:
+            response = self.client.get(url, stream=True)
         if response.status_code == 404:
             return []
         if response.status_code != 200:
             self.handle_error(response)
-        items = response.json()
+        items = self._get_list_response_items(response)
         instances = [self.resource.deserialize(item) for item in items]
         return instances
 
@@ -0,0 +1,208 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Incremental parser for JSON lists which is used to process list responses as they are being
+received instead of reading and parsing the whole response at once.
+"""
+
+import codecs
+import json
+import re
+
+import six
+
+__all__ = [
+    'JSONListParser',
+
+    'iter_json_list'
+]
+
+# Characters which are significant outside of a string
+STRUCTURE_CHARS_RE = re.compile(r'["\[\]{}]')
+
+# Characters which are significant inside a string
+STRING_CHARS_RE = re.compile(r'["\\]')
+
+# Characters which terminate a scalar list item (number, boolean, null)
+SCALAR_END_RE = re.compile(r'[,\]\s]')
+
+WHITESPACE = ' \t\n\r'
+
+
+class JSONListParser(object):
+    """
+    Parser which is fed chunks of a serialized JSON list and returns list items as soon as they
+    are complete.
+
+    Only item boundaries are tracked while scanning the data so each item is only decoded once
+    (using the standard JSON decoder) no matter in how many chunks it was received.
+    """
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = u''
+        self._position = 0
+
+        self._started = False
+        self._finished = False
+
+        # Start position of the item which is currently being parsed
+        self._item_start = None
+        self._depth = 0
+        self._in_string = False
+        self._in_scalar = False
+
+    @property
+    def finished(self):
+        return self._finished
+
+    def feed(self, data):
+        """
+        Feed a chunk of data to the parser.
+
+        :param data: Chunk of a serialized list.
+        :type data: ``str`` or ``unicode``
+
+        :return: List items which have been completed by this chunk.
+        :rtype: ``list``
+        """
+        if isinstance(data, six.binary_type):
+            data = self._decoder.decode(data)
+
+        self._buffer += data
+        items = self._parse()
+
+        # Discard the data which has already been processed
+        offset = self._item_start if self._item_start is not None else self._position
+        self._buffer = self._buffer[offset:]
+        self._position -= offset
+
+        if self._item_start is not None:
+            self._item_start = 0
+
+        return items
+
+    def close(self):
+        """
+        Signal that there is no more data.
+        """
+        if not self._finished:
+            raise ValueError('Incomplete JSON list')
+
+    def _parse(self):
+        result = []
+        data = self._buffer
+        length = len(data)
+
+        while self._position < length and not self._finished:
+            if self._in_string:
+                match = STRING_CHARS_RE.search(data, self._position)
+
+                if not match:
+                    self._position = length
+                elif match.group() == '\\':
+                    if match.end() == length:
+                        # Need the escaped character before we can continue
+                        self._position = match.start()
+                        break
+
+                    self._position = match.end() + 1
+                else:
+                    self._in_string = False
+                    self._position = match.end()
+
+                    if self._depth == 0:
+                        result.append(self._decode_item(end=self._position))
+            elif self._in_scalar:
+                match = SCALAR_END_RE.search(data, self._position)
+
+                if not match:
+                    self._position = length
+                    break
+
+                self._in_scalar = False
+                self._position = match.start()
+                result.append(self._decode_item(end=self._position))
+            elif self._depth > 0:
+                match = STRUCTURE_CHARS_RE.search(data, self._position)
+
+                if not match:
+                    self._position = length
+                    break
+
+                char = match.group()
+                self._position = match.end()
+
+                if char == '"':
+                    self._in_string = True
+                elif char in '[{':
+                    self._depth += 1
+                else:
+                    self._depth -= 1
+
+                    if self._depth == 0:
+                        result.append(self._decode_item(end=self._position))
+            else:
+                char = data[self._position]
+
+                if char in WHITESPACE:
+                    self._position += 1
+                elif not self._started:
+                    if char != '[':
+                        raise ValueError('Expected a JSON list')
+
+                    self._started = True
+                    self._position += 1
+                elif char == ',':
+                    self._position += 1
+                elif char == ']':
+                    self._finished = True
+                    self._position += 1
+                else:
+                    self._item_start = self._position
+                    self._position += 1
+
+                    if char == '"':
+                        self._in_string = True
+                    elif char in '[{':
+                        self._depth = 1
+                    else:
+                        self._in_scalar = True
+
+        return result
+
+    def _decode_item(self, end):
+        item = json.loads(self._buffer[self._item_start:end])
+        self._item_start = None
+        return item
+
+
+def iter_json_list(chunks):
+    """
+    Return generator which yields items of a JSON list serialized in the provided chunks.
+
+    :param chunks: Iterable which returns chunks of a serialized list (e.g. as returned by
+                   ``requests.Response.iter_content``).
+
+    :rtype: ``generator``
+    """
+    parser = JSONListParser()
+
+    for chunk in chunks:
+        for item in parser.feed(chunk):
+            yield item
+
+    parser.close()
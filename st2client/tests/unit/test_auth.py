@@ -133,20 +133,20 @@ class TestAuthToken(base.BaseCLITestCase):
 
         # Test without token.
         self.shell.run(['rule', 'list'])
-        kwargs = {}
+        kwargs = {'stream': True}
         requests.get.assert_called_with(url, **kwargs)
 
         # Test with token from  cli.
         token = uuid.uuid4().hex
         self.shell.run(['rule', 'list', '-t', token])
-        kwargs = {'headers': {'X-Auth-Token': token}}
+        kwargs = {'headers': {'X-Auth-Token': token}, 'stream': True}
         requests.get.assert_called_with(url, **kwargs)
 
         # Test with token from env.
         token = uuid.uuid4().hex
         os.environ['ST2_AUTH_TOKEN'] = token
         self.shell.run(['rule', 'list'])
-        kwargs = {'headers': {'X-Auth-Token': token}}
+        kwargs = {'headers': {'X-Auth-Token': token}, 'stream': True}
         requests.get.assert_called_with(url, **kwargs)
 
     @mock.patch.object(
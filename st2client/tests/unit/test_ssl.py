@@ -95,14 +95,14 @@ class TestHttps(base.BaseCLITestCase):
         mock.MagicMock(return_value=base.FakeResponse(json.dumps([]), 200, 'OK')))
     def test_decorate_http_without_cacert(self):
         self.shell.run(['rule', 'list'])
-        requests.get.assert_called_with(GET_RULES_URL)
+        requests.get.assert_called_with(GET_RULES_URL, stream=True)
 
     @mock.patch.object(
         requests, 'get',
         mock.MagicMock(return_value=base.FakeResponse(json.dumps({}), 200, 'OK')))
     def test_decorate_http_with_cacert_from_cli(self):
         self.shell.run(['--cacert', self.cacert_path, 'rule', 'list'])
-        requests.get.assert_called_with(GET_RULES_URL)
+        requests.get.assert_called_with(GET_RULES_URL, stream=True)
 
     @mock.patch.object(
         requests, 'get',
@@ -110,4 +110,4 @@ class TestHttps(base.BaseCLITestCase):
     def test_decorate_http_with_cacert_from_env(self):
         os.environ['ST2_CACERT'] = self.cacert_path
         self.shell.run(['rule', 'list'])
-        requests.get.assert_called_with(GET_RULES_URL)
+        requests.get.assert_called_with(GET_RULES_URL, stream=True)
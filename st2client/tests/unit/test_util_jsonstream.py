@@ -0,0 +1,60 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+import unittest2
+
+from st2client.utils import jsonstream
+
+ITEMS = [
+    {'id': 1, 'result': {'stdout': 'a "quoted" [value] with {braces}', 'items': [1, 2, [3]]}},
+    {'id': 2, 'result': {'stdout': u'unicode \u2603 and escaped \\" quote\\\\'}},
+    'string',
+    10.5,
+    None,
+    True,
+    [],
+    {}
+]
+
+
+class TestJSONListParser(unittest2.TestCase):
+
+    def _get_chunks(self, data, size):
+        return [data[i:i + size] for i in range(0, len(data), size)]
+
+    def test_iter_json_list(self):
+        data = json.dumps(ITEMS, indent=4, ensure_ascii=False).encode('utf-8')
+
+        for chunk_size in [1, 2, 3, 7, 64, len(data)]:
+            chunks = self._get_chunks(data, chunk_size)
+            self.assertEqual(list(jsonstream.iter_json_list(chunks)), ITEMS)
+
+        self.assertEqual(list(jsonstream.iter_json_list(['[', ']'])), [])
+
+    def test_items_are_returned_as_soon_as_they_are_complete(self):
+        parser = jsonstream.JSONListParser()
+
+        self.assertEqual(parser.feed('[{"id": 1}, {"id"'), [{'id': 1}])
+        self.assertEqual(parser.feed(': 2}'), [{'id': 2}])
+        self.assertFalse(parser.finished)
+        self.assertEqual(parser.feed(']'), [])
+        self.assertTrue(parser.finished)
+        parser.close()
+
+    def test_invalid_data(self):
+        self.assertRaises(ValueError, list, jsonstream.iter_json_list(['{"id": 1}']))
+        self.assertRaises(ValueError, list, jsonstream.iter_json_list(['[{"id": 1}, ']))
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Populate execution filter values (used by the executions filters view) from the existing
+executions. Values for new executions are maintained automatically so this only needs to be run
+once after upgrade.
+"""
+
+import sys
+import traceback as tb
+
+from st2common import config
+from st2common.persistence.execution import ActionExecutionFilterValue
+from st2common.service_setup import db_setup
+from st2common.service_setup import db_teardown
+
+
+def migrate_execution_filter_values():
+    try:
+        ActionExecutionFilterValue.rebuild()
+    except:
+        print('ERROR: Failed populating execution filter values.')
+        tb.print_exc()
+        raise
+
+
+def main():
+    config.parse_args()
+
+    # Connect to db.
+    db_setup()
+
+    # Populate filter values.
+    try:
+        migrate_execution_filter_values()
+        print('SUCCESS: Execution filter values migrated successfully.')
+        exit_code = 0
+    except:
+        print('ABORTED: Execution filter values migration aborted on first failure.')
+        exit_code = 1
+
+    # Disconnect from db.
+    db_teardown()
+    sys.exit(exit_code)
+
+if __name__ == '__main__':
+    main()
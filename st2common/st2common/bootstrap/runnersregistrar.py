@@ -384,6 +384,13 @@ RUNNER_TYPES = [
                 'description': 'Intermediate published variables will be stored and displayed.',
                 'type': 'boolean',
                 'default': False
+            },
+            'concurrency': {
+                'description': 'Maximum number of tasks which run at the same time when the '
+                               'chain fans out to parallel branches.',
+                'type': 'integer',
+                'minimum': 1,
+                'default': 10
             }
         },
         'runner_module': 'st2actions.runners.actionchainrunner'
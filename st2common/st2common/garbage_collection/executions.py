@@ -25,6 +25,7 @@ from mongoengine.errors import InvalidQueryError
 from st2common.constants import action as action_constants
 from st2common.persistence.liveaction import LiveAction
 from st2common.persistence.execution import ActionExecution
+from st2common.persistence.execution import ActionExecutionFilterValue
 
 __all__ = [
     'purge_executions'
@@ -94,6 +95,13 @@ def purge_executions(logger, timestamp, action_ref=None, purge_incomplete=False)
         logger.exception('Deletion of liveaction models failed for query with filters: %s.',
                          liveaction_filters)
 
+    # Remove filter values which are not used by any of the remaining executions anymore
+    try:
+        deleted_count = ActionExecutionFilterValue.delete_unused_values(timestamp=timestamp)
+        logger.info('Deleted %s unused execution filter values.', deleted_count)
+    except:
+        logger.exception('Deletion of unused execution filter values failed.')
+
     zombie_execution_instances = len(ActionExecution.query(**exec_filters))
     zombie_liveaction_instances = len(LiveAction.query(**liveaction_filters))
 
@@ -16,6 +16,7 @@
 import httplib
 import re
 import traceback
+import types
 import uuid
 
 import webob
@@ -31,7 +32,9 @@ from st2common.exceptions import auth as auth_exceptions
 from st2common.exceptions import rbac as rbac_exceptions
 from st2common.exceptions.db import StackStormDBObjectNotFoundError
 from st2common.exceptions.apivalidation import ValueValidationException
+from st2common.services import auth_cache
 from st2common.util import auth as auth_utils
+from st2common.util import signed_token
 from st2common.util.jsonify import json_encode
 from st2common.util.debugging import is_enabled as is_debugging_enabled
 from st2common.constants.api import REQUEST_ID_HEADER
@@ -61,6 +64,14 @@ RESPONSE_LOGGING_CONTROLLER_NAME_BLACKLIST = [
 AUTH_TOKENS_URL_REGEX = '^(?:/tokens|/v\d+/tokens)$'
 
 
+def is_streaming_response(response):
+    """
+    Return True if the response body is generated while the response is being sent (in which case
+    the body shouldn't be accessed).
+    """
+    return isinstance(getattr(response, 'app_iter', None), types.GeneratorType)
+
+
 class CorsHook(PecanHook):
 
     def after(self, state):
@@ -95,7 +106,7 @@ class CorsHook(PecanHook):
         methods_allowed = ['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS']
         request_headers_allowed = ['Content-Type', 'Authorization', 'X-Auth-Token',
                                    HEADER_API_KEY_ATTRIBUTE_NAME, REQUEST_ID_HEADER]
-        response_headers_allowed = ['Content-Type', 'X-Limit', 'X-Total-Count',
+        response_headers_allowed = ['Content-Type', 'X-Limit', 'X-Total-Count', 'X-Next-Cursor',
                                     REQUEST_ID_HEADER]
 
         headers['Access-Control-Allow-Origin'] = origin_allowed
@@ -103,7 +114,8 @@ class CorsHook(PecanHook):
         headers['Access-Control-Allow-Headers'] = ','.join(request_headers_allowed)
         headers['Access-Control-Expose-Headers'] = ','.join(response_headers_allowed)
         if not headers.get('Content-Length') \
-                and not headers.get('Content-type', '').startswith('text/event-stream'):
+                and not headers.get('Content-type', '').startswith('text/event-stream') \
+                and not is_streaming_response(state.response):
             headers['Content-Length'] = str(len(state.response.body))
 
     def on_error(self, state, e):
@@ -208,13 +220,26 @@ class AuthHook(PecanHook):
             raise auth_exceptions.MultipleAuthSourcesError(
                 'Only one of Token or API key expected.')
 
+        credential = (token_in_headers or token_in_query_params or api_key_in_headers or
+                      api_key_in_query_params)
+        cache = auth_cache.get_auth_cache()
+
+        if credential and cache.enabled:
+            user_db = cache.get(credential)
+
+            if user_db:
+                return user_db
+
         user = None
+        expiry = None
+        token_db = None
 
         if token_in_headers or token_in_query_params:
             token_db = auth_utils.validate_token_and_source(
                 token_in_headers=token_in_headers,
                 token_in_query_params=token_in_query_params)
             user = token_db.user
+            expiry = token_db.expiry
         elif api_key_in_headers or api_key_in_query_params:
             api_key_db = auth_utils.validate_api_key_and_source(
                 api_key_in_headers=api_key_in_headers,
@@ -228,13 +253,21 @@ class AuthHook(PecanHook):
             return None
 
         try:
-            return User.get(user)
+            user_db = User.get(user)
         except StackStormDBObjectNotFoundError:
             # User doesn't exist - we should probably also invalidate token/apikey if
             # this happens.
             LOG.warn('User %s not found.', user)
             return None
 
+        # Signed execution tokens are invalidated by revoking all the tokens of the execution
+        execution_id = None
+        if token_db and signed_token.is_signed_token(token_db.token):
+            execution_id = (token_db.metadata or {}).get('execution_id', None)
+
+        cache.set(credential, user=user_db, expiry=expiry, execution_id=execution_id)
+        return user_db
+
 
 class JSONErrorResponseHook(PecanHook):
     """
@@ -339,7 +372,7 @@ class LoggingHook(PecanHook):
         else:
             log_result = False
 
-        if log_result:
+        if log_result and not is_streaming_response(state.response):
             values['result'] = state.response.body
             log_msg = '%(request_id)s - %(method)s %(path)s result=%(result)s' % values
         else:
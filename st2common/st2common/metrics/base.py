@@ -0,0 +1,203 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Metrics instrumentation (counters, gauges and timers).
+
+Metrics are sent using the driver which is configured using "metrics.driver" option. By default
+the no-op driver is used which discards all the metrics.
+"""
+
+import abc
+import importlib
+import inspect
+import re
+import time
+from functools import wraps
+
+import six
+from oslo_config import cfg
+
+from st2common import log as logging
+
+__all__ = [
+    'BaseMetricsDriver',
+    'NoopDriver',
+    'Timer',
+
+    'get_driver',
+    'reset_driver',
+    'format_key',
+    'inc_counter',
+    'set_gauge',
+    'timing'
+]
+
+LOG = logging.getLogger(__name__)
+
+# Maps driver name to the module which contains the driver
+DRIVER_MODULES = {
+    'noop': 'st2common.metrics.base',
+    'statsd': 'st2common.metrics.drivers.statsd_driver'
+}
+
+# Characters which are not allowed in the metric key parts
+INVALID_KEY_CHARS_RE = re.compile(r'[^a-zA-Z0-9_\-]')
+
+_DRIVER = None
+
+
+@six.add_metaclass(abc.ABCMeta)
+class BaseMetricsDriver(object):
+    """
+    Base class for all the metrics drivers.
+    """
+
+    def __init__(self, host=None, port=None, prefix=None):
+        self._prefix = prefix
+
+    @abc.abstractmethod
+    def inc_counter(self, key, amount=1):
+        """
+        Increment counter by the provided amount.
+        """
+        pass
+
+    @abc.abstractmethod
+    def set_gauge(self, key, value):
+        """
+        Set gauge to the provided value.
+        """
+        pass
+
+    @abc.abstractmethod
+    def timing(self, key, duration):
+        """
+        Record a duration.
+
+        :param duration: Duration in seconds.
+        :type duration: ``float``
+        """
+        pass
+
+
+class NoopDriver(BaseMetricsDriver):
+    """
+    Driver which discards all the metrics.
+    """
+
+    def inc_counter(self, key, amount=1):
+        pass
+
+    def set_gauge(self, key, value):
+        pass
+
+    def timing(self, key, duration):
+        pass
+
+
+class Timer(object):
+    """
+    Context manager and decorator which records how long the wrapped code took to execute.
+
+    .. code-block:: python
+
+        with Timer('rules.enforce'):
+            enforcer.enforce()
+    """
+
+    def __init__(self, key):
+        self._key = key
+        self._start_time = None
+
+    def __enter__(self):
+        self._start_time = time.time()
+        return self
+
+    def __exit__(self, *args):
+        timing(self._key, time.time() - self._start_time)
+
+    def __call__(self, func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with Timer(self._key):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+
+def get_driver():
+    """
+    Return instance of the configured metrics driver.
+
+    :rtype: :class:`BaseMetricsDriver`
+    """
+    global _DRIVER
+
+    if _DRIVER is None:
+        _DRIVER = _load_driver()
+
+    return _DRIVER
+
+
+def reset_driver():
+    """
+    Reset the driver instance so the driver is loaded again (e.g. after the config has changed).
+    """
+    global _DRIVER
+    _DRIVER = None
+
+
+def format_key(*parts):
+    """
+    Compose metric key from the provided parts. Characters which have a special meaning in the
+    metric keys are replaced in each of the parts.
+
+    :rtype: ``str``
+    """
+    return '.'.join([INVALID_KEY_CHARS_RE.sub('_', str(part)) for part in parts])
+
+
+def inc_counter(key, amount=1):
+    get_driver().inc_counter(key, amount)
+
+
+def set_gauge(key, value):
+    get_driver().set_gauge(key, value)
+
+
+def timing(key, duration):
+    get_driver().timing(key, duration)
+
+
+def _load_driver():
+    try:
+        config = cfg.CONF.metrics
+        name = config.driver
+    except cfg.NoSuchOptError:
+        # Metrics options are not registered (e.g. in a standalone script)
+        return NoopDriver()
+
+    module_name = DRIVER_MODULES.get(name, name)
+
+    try:
+        module = importlib.import_module(module_name)
+        driver_cls = [obj for (_, obj) in inspect.getmembers(module)
+                      if inspect.isclass(obj) and issubclass(obj, BaseMetricsDriver) and
+                      not inspect.isabstract(obj) and obj.__module__ == module.__name__][0]
+        return driver_cls(host=config.host, port=config.port, prefix=config.prefix)
+    except Exception:
+        LOG.exception('Failed to load metrics driver "%s", metrics are disabled.', name)
+        return NoopDriver()
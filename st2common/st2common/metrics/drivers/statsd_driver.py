@@ -0,0 +1,65 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Metrics driver which sends metrics to a statsd compatible server over UDP.
+"""
+
+import socket
+
+from st2common import log as logging
+from st2common.metrics.base import BaseMetricsDriver
+
+__all__ = [
+    'StatsdDriver'
+]
+
+LOG = logging.getLogger(__name__)
+
+
+class StatsdDriver(BaseMetricsDriver):
+    """
+    Driver which sends metrics using the statsd protocol.
+
+    Each metric is sent in a separate (fire and forget) UDP datagram so sending a metric never
+    blocks the caller on the statsd server.
+    """
+
+    def __init__(self, host='127.0.0.1', port=8125, prefix=None):
+        super(StatsdDriver, self).__init__(host=host, port=port, prefix=prefix)
+
+        # Note: Host name is only resolved once
+        self._address = (socket.gethostbyname(host), int(port))
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def inc_counter(self, key, amount=1):
+        self._send(key=key, value=amount, metric_type='c')
+
+    def set_gauge(self, key, value):
+        self._send(key=key, value=value, metric_type='g')
+
+    def timing(self, key, duration):
+        self._send(key=key, value='%.3f' % (duration * 1000), metric_type='ms')
+
+    def _send(self, key, value, metric_type):
+        if self._prefix:
+            key = '%s.%s' % (self._prefix, key)
+
+        data = '%s:%s|%s' % (key, value, metric_type)
+
+        try:
+            self._socket.sendto(data, self._address)
+        except socket.error as e:
+            LOG.debug('Failed to send metric "%s": %s', data, str(e))
@@ -38,12 +38,17 @@ __all__ = [
 
     'APIUIDMixin',
 
+    'StreamingListResult',
+
     'jsexpose'
 ]
 
 
 LOG = logging.getLogger(__name__)
 
+# Serialized items are sent to the client in chunks of (at least) this size
+STREAMING_RESPONSE_CHUNK_SIZE = 64 * 1024
+
 
 @six.add_metaclass(abc.ABCMeta)
 class BaseAPI(object):
@@ -195,6 +200,66 @@ def get_controller_args_for_types(func, arg_types, args, kwargs):
     return result_args, result_kwargs
 
 
+class StreamingListResult(object):
+    """
+    Wrapper for a list result which is serialized and sent to the client one item at a time.
+
+    Items are retrieved from the provided iterable (e.g. generator which converts database objects
+    from a cursor) while the response is being sent so the whole result is never held in memory.
+    """
+
+    def __init__(self, items):
+        self._items = items
+
+    def __iter__(self):
+        return iter(self._items)
+
+
+def get_json_list_response_iterator(items, indent=None,
+                                    chunk_size=STREAMING_RESPONSE_CHUNK_SIZE):
+    """
+    Return generator which serializes provided items as a JSON list.
+
+    :rtype: ``generator``
+    """
+    chunk = ['[']
+    chunk_length = 1
+    separator = ''
+    chunk_sent = False
+
+    try:
+        for item in items:
+            value = separator + json_encode(item, indent=indent)
+            separator = ','
+
+            chunk.append(value)
+            chunk_length += len(value)
+
+            if chunk_length >= chunk_size:
+                yield ''.join(chunk)
+                chunk_sent = True
+                chunk = []
+                chunk_length = 0
+    except Exception:
+        if not chunk_sent:
+            raise
+
+        # Response status and headers have already been sent so all we can do is log the error
+        # and end the response early
+        LOG.exception('Failed to serialize streaming response.')
+        return
+
+    chunk.append(']')
+    yield ''.join(chunk)
+
+
+def _prepend_chunk(chunk, chunks):
+    yield chunk
+
+    for chunk in chunks:
+        yield chunk
+
+
 def jsexpose(arg_types=None, body_cls=None, status_code=None, content_type='application/json'):
     """
     :param arg_types: A list of types for the function arguments (e.g. [str, str, int, bool]).
@@ -291,6 +356,20 @@ def jsexpose(arg_types=None, body_cls=None, status_code=None, content_type='appl
                     indent = 4
                 else:
                     indent = None
+
+                if isinstance(result, StreamingListResult):
+                    # Note: First chunk is serialized here so errors which happen early on are
+                    # still handled by the error hooks. Content length is unknown so the rest of
+                    # the response is sent in chunks.
+                    chunks = get_json_list_response_iterator(items=result, indent=indent)
+                    first_chunk = next(chunks)
+
+                    response = pecan.response
+                    response.content_type = content_type
+                    response.app_iter = _prepend_chunk(first_chunk, chunks)
+                    response.content_length = None
+                    return response
+
                 return json_encode(result, indent=indent)
             else:
                 return result
@@ -106,6 +106,8 @@ class ActionExecutionAPI(BaseAPI):
                 "items": {"type": "string"},
                 "uniqueItems": True
             },
+            "root": {"type": "string"},
+            "depth": {"type": "integer"},
             "log": {
                 "description": "Contains information about execution state transitions.",
                 "type": "array",
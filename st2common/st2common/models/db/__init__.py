@@ -25,6 +25,7 @@ from st2common import log as logging
 from st2common.util import isotime
 from st2common.models.db import stormbase
 from st2common.models.utils.profiling import log_query_and_profile_data_for_queryset
+from st2common.models.utils.query_metrics import register_listener as register_query_listener
 from st2common.exceptions.db import StackStormDBObjectNotFoundError
 
 
@@ -72,6 +73,9 @@ def db_setup(db_name, db_host, db_port, username=None, password=None,
                                  ssl_cert_reqs=ssl_cert_reqs, ssl_ca_certs=ssl_ca_certs,
                                  ssl_match_hostname=ssl_match_hostname)
 
+    # Note: Listener needs to be registered before the connection is established
+    register_query_listener()
+
     connection = mongoengine.connection.connect(db_name, host=db_host,
                                                 port=db_port, tz_aware=True,
                                                 username=username, password=password,
@@ -178,7 +182,7 @@ class MongoDBAccess(object):
     def get_by_pack(self, value):
         return self.get(pack=value, raise_exception=True)
 
-    def get(self, exclude_fields=None, *args, **kwargs):
+    def get(self, exclude_fields=None, only_fields=None, *args, **kwargs):
         raise_exception = kwargs.pop('raise_exception', False)
 
         instances = self.model.objects(**kwargs)
@@ -186,6 +190,9 @@ class MongoDBAccess(object):
         if exclude_fields:
             instances = instances.exclude(*exclude_fields)
 
+        if only_fields:
+            instances = instances.only(*only_fields)
+
         instance = instances[0] if instances else None
         log_query_and_profile_data_for_queryset(queryset=instances)
 
@@ -203,10 +210,11 @@ class MongoDBAccess(object):
         log_query_and_profile_data_for_queryset(queryset=result)
         return result
 
-    def query(self, offset=0, limit=None, order_by=None, exclude_fields=None,
+    def query(self, offset=0, limit=None, order_by=None, exclude_fields=None, only_fields=None,
               **filters):
         order_by = order_by or []
         exclude_fields = exclude_fields or []
+        only_fields = only_fields or []
         eop = offset + int(limit) if limit else None
 
         # Process the filters
@@ -220,6 +228,9 @@ class MongoDBAccess(object):
         if exclude_fields:
             result = result.exclude(*exclude_fields)
 
+        if only_fields:
+            result = result.only(*only_fields)
+
         result = result.order_by(*order_by)
         result = result[offset:eop]
         log_query_and_profile_data_for_queryset(queryset=result)
@@ -26,6 +26,7 @@ from st2common.util import date as date_utils
 __all__ = [
     'UserDB',
     'TokenDB',
+    'RevokedTokenDB',
     'ApiKeyDB'
 ]
 
@@ -55,6 +56,25 @@ class TokenDB(stormbase.StormFoundationDB):
                             help_text='Arbitrary metadata associated with this token')
 
 
+class RevokedTokenDB(stormbase.StormFoundationDB):
+    """
+    Revocation entry for the signed execution tokens. Signed tokens are not stored in the
+    database so all the tokens issued for a particular execution are revoked at once. Entries
+    are automatically removed once all the tokens they cover have expired.
+    """
+    execution_id = me.StringField(required=True, unique=True)
+    expiry = me.DateTimeField(required=True)
+
+    meta = {
+        'indexes': [
+            {
+                'fields': ['expiry'],
+                'expireAfterSeconds': 0
+            }
+        ]
+    }
+
+
 class ApiKeyDB(stormbase.StormFoundationDB, stormbase.UIDFieldMixin):
     """
     """
@@ -92,4 +112,4 @@ class ApiKeyDB(stormbase.StormFoundationDB, stormbase.UIDFieldMixin):
         return result
 
 
-MODELS = [UserDB, TokenDB, ApiKeyDB]
+MODELS = [UserDB, TokenDB, RevokedTokenDB, ApiKeyDB]
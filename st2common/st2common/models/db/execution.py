@@ -26,12 +26,29 @@ from st2common.util.secrets import mask_secret_parameters
 from st2common.constants.types import ResourceType
 
 __all__ = [
-    'ActionExecutionDB'
+    'ActionExecutionDB',
+    'ActionExecutionFilterValueDB',
+
+    'FILTER_VALUE_FIELDS'
 ]
 
 
 LOG = logging.getLogger(__name__)
 
+# Execution attributes for which distinct values are maintained in the
+# ActionExecutionFilterValueDB collection. Those values are used by the executions filters view
+# so the mapping (filter name -> execution attribute) needs to be kept in sync with the filters
+# in st2api which are not ignored by the view.
+FILTER_VALUE_FIELDS = {
+    'action': 'action.ref',
+    'status': 'status',
+    'rule': 'rule.name',
+    'runner': 'runner.name',
+    'trigger': 'trigger.name',
+    'trigger_type': 'trigger_type.name',
+    'user': 'context.user'
+}
+
 
 class ActionExecutionDB(stormbase.StormFoundationDB):
     RESOURCE_TYPE = ResourceType.EXECUTION
@@ -65,6 +82,11 @@ class ActionExecutionDB(stormbase.StormFoundationDB):
         help_text='Contextual information on the action execution.')
     parent = me.StringField()
     children = me.ListField(field=me.StringField())
+    root = me.StringField(
+        help_text='Id of the top-level execution in the workflow this execution belongs to.')
+    depth = me.IntField(
+        default=0,
+        help_text='Nesting level of this execution in the workflow (0 for top-level ones).')
     log = me.ListField(field=me.DictField())
 
     meta = {
@@ -76,6 +98,7 @@ class ActionExecutionDB(stormbase.StormFoundationDB):
             {'fields': ['end_timestamp']},
             {'fields': ['status']},
             {'fields': ['parent']},
+            {'fields': ['root', 'depth']},
             {'fields': ['-start_timestamp', 'action.ref', 'status']}
         ]
     }
@@ -109,4 +132,34 @@ class ActionExecutionDB(stormbase.StormFoundationDB):
         return serializable_dict['parameters']
 
 
-MODELS = [ActionExecutionDB]
+class ActionExecutionFilterValueDB(stormbase.StormFoundationDB):
+    """
+    Distinct value of an execution attribute which can be used to filter executions.
+
+    Values are added when executions are stored and removed when executions are purged so the
+    filters view doesn't need to run distinct over the whole executions collection.
+
+    :param filter_name: Name of the filter (e.g. action, status, user).
+    :type filter_name: ``str``
+
+    :param value: Attribute value.
+    :type value: ``str``
+
+    :param last_seen: Start timestamp of the most recent execution with this value.
+    :type last_seen: ``datetime.datetime``
+    """
+    filter_name = me.StringField(required=True)
+    value = me.StringField(required=True)
+    last_seen = ComplexDateTimeField(
+        default=date_utils.get_datetime_utc_now,
+        help_text='Start timestamp of the most recent execution with this value.')
+
+    meta = {
+        'indexes': [
+            {'fields': ['filter_name', 'value'], 'unique': True},
+            {'fields': ['last_seen']}
+        ]
+    }
+
+
+MODELS = [ActionExecutionDB, ActionExecutionFilterValueDB]
@@ -13,6 +13,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import zlib
+
 import mongoengine as me
 
 from st2common import log as logging
@@ -21,6 +23,7 @@ from st2common.models.db import stormbase
 
 __all__ = [
     'ActionExecutionStateDB',
+    'get_state_bucket'
 ]
 
 
@@ -28,6 +31,19 @@ LOG = logging.getLogger(__name__)
 
 PACK_SEPARATOR = '.'
 
+# Number of buckets state objects are divided into. Results tracker partitions are contiguous
+# ranges of buckets.
+STATE_BUCKETS_COUNT = 1024
+
+
+def get_state_bucket(execution_id):
+    """
+    Return bucket for the state object of the provided execution.
+
+    :rtype: ``int``
+    """
+    return (zlib.crc32(str(execution_id)) & 0xffffffff) % STATE_BUCKETS_COUNT
+
 
 class ActionExecutionStateDB(stormbase.StormFoundationDB):
     """
@@ -43,11 +59,19 @@ class ActionExecutionStateDB(stormbase.StormFoundationDB):
     query_context = me.DictField(
         required=True,
         help_text='Context about the action execution that is needed for results query.')
+    bucket = me.IntField(
+        help_text='Bucket used to partition state objects between results trackers.')
 
     meta = {
-        'indexes': ['query_module']
+        'indexes': ['query_module', 'bucket']
     }
 
+    def __init__(self, *args, **values):
+        super(ActionExecutionStateDB, self).__init__(*args, **values)
+
+        if self.bucket is None and self.execution_id:
+            self.bucket = get_state_bucket(self.execution_id)
+
 # specialized access objects
 actionexecstate_access = MongoDBAccess(ActionExecutionStateDB)
 
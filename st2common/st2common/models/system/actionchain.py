@@ -49,17 +49,28 @@ class Node(object):
                 "default": {}
             },
             "on-success": {
-                "type": "string",
+                "type": ["string", "array"],
+                "items": {"type": "string"},
                 "description": "Name of the node to invoke on successful completion of action"
-                               " executed for this node.",
+                               " executed for this node. If a list of names is provided, all the"
+                               " nodes are invoked in parallel.",
                 "default": ""
             },
             "on-failure": {
-                "type": "string",
+                "type": ["string", "array"],
+                "items": {"type": "string"},
                 "description": "Name of the node to invoke on failure of action executed for this"
-                               " node.",
+                               " node. If a list of names is provided, all the nodes are invoked"
+                               " in parallel.",
                 "default": ""
             },
+            "join": {
+                "type": "boolean",
+                "description": "True if this node joins parallel branches. Join node is only"
+                               " invoked once all the branches of the parallel fan-out which"
+                               " lead to it have completed successfully.",
+                "default": False
+            },
             "publish": {
                 "description": "The variables to publish from the result. Should be of the form"
                                " name.foo. o1: {{node_name.foo}} will result in creation of a"
@@ -103,6 +114,23 @@ class Node(object):
 
         return self
 
+    def get_next_node_names(self, condition='on-success'):
+        """
+        Return a list of node names referenced in the provided condition ("on-success" or
+        "on-failure").
+
+        :rtype: ``list`` of ``str``
+        """
+        value = getattr(self, string.replace(condition, '-', '_'), None)
+
+        if not value:
+            return []
+
+        if isinstance(value, six.string_types):
+            return [value]
+
+        return [name for name in value if name]
+
     def get_parameters(self):
         # Note: "params" is old deprecated attribute which will be removed in a future release
         params = getattr(self, 'params', {})
@@ -119,7 +147,7 @@ class ActionChain(object):
 
     schema = {
         "title": "ActionChain",
-        "description": "A chain of sequentially executed actions.",
+        "description": "A chain of actions which are executed sequentially or in parallel.",
         "type": "object",
         "properties": {
             "chain": {
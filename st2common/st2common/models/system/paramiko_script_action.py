@@ -16,6 +16,7 @@
 from st2common import log as logging
 from st2common.models.system.action import RemoteScriptAction
 from st2common.util.shell import quote_unix
+from st2common.util.shell import quote_unix_path
 
 __all__ = [
     'ParamikoRemoteScriptAction',
@@ -24,6 +25,9 @@ __all__ = [
 
 LOG = logging.getLogger(__name__)
 
+# Placeholder for the home directory of the SSH user in the commands which are run using sudo
+HOME_DIR_PLACEHOLDER = '__ST2_SSH_USER_HOME_DIR__'
+
 
 class ParamikoRemoteScriptAction(RemoteScriptAction):
 
@@ -32,7 +36,12 @@ class ParamikoRemoteScriptAction(RemoteScriptAction):
                                                       positional_args=self.positional_args)
         env_str = self._get_env_vars_export_string()
         cwd = quote_unix(self.get_cwd())
-        script_path = quote_unix(self.remote_script)
+
+        if self.sudo:
+            script_path = quote_unix_path(self.remote_script,
+                                          home_dir='"%s"' % (HOME_DIR_PLACEHOLDER))
+        else:
+            script_path = quote_unix_path(self.remote_script)
 
         if self.sudo:
             if script_arguments:
@@ -50,6 +59,10 @@ class ParamikoRemoteScriptAction(RemoteScriptAction):
                     command = quote_unix('cd %s && %s' % (cwd, script_path))
 
             command = 'sudo -E -- bash -c %s' % (command)
+
+            # Script can live in the home directory of the SSH user (remote script cache) so the
+            # home directory needs to be expanded before switching to a different user
+            command = command.replace(HOME_DIR_PLACEHOLDER, '\'"$HOME"\'')
         else:
             if script_arguments:
                 if env_str:
@@ -15,6 +15,9 @@
 
 """
 Module containing MongoDB profiling related functionality.
+
+Note: Latency of the queries is always tracked (see st2common.models.utils.query_metrics), this
+module is only meant to be used for debugging since it runs "explain" for each query.
 """
 
 from mongoengine.queryset import QuerySet
@@ -0,0 +1,377 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Module containing MongoDB command listener which records latency of the database operations per
+collection and operation (command) type.
+
+Listener is always enabled and only does a constant amount of work per command so (unlike the
+profiling mode) it's suitable for production use. It:
+
+1. Records "db.<collection>.<command>" timer metric for each command
+2. Maintains latency histograms per collection and command which are periodically summarized in
+   the log
+3. Logs commands which took longer than ``database.slow_query_threshold_ms`` milliseconds. Only
+   the filter shape (field names and operators) is logged, the values are omitted.
+"""
+
+import bisect
+import json
+import time
+
+import eventlet
+import six
+from oslo_config import cfg
+from pymongo import monitoring
+
+from st2common import log as logging
+from st2common.metrics import base as metrics
+
+__all__ = [
+    'LatencyHistogram',
+    'QueryMetricsListener',
+    'QueryStatsReporter',
+
+    'register_listener',
+    'get_query_stats',
+    'start_reporter',
+    'get_collection_name',
+    'get_query_shape'
+]
+
+LOG = logging.getLogger(__name__)
+
+# Upper bounds (in milliseconds) of the latency histogram buckets. Last bucket contains all the
+# values which are larger than the last bound.
+BUCKET_BOUNDS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Value which replaces all the literal values in the query shape
+SHAPE_VALUE_PLACEHOLDER = '?'
+
+# Maximum number of (collection, command) entries included in the periodic summary
+SUMMARY_MAX_ENTRIES = 20
+
+_LISTENER = None
+_REPORTER = None
+
+
+class LatencyHistogram(object):
+    """
+    Latency histogram with fixed bucket bounds.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+
+    def add(self, duration_ms):
+        self.count += 1
+        self.total += duration_ms
+        self.max = max(self.max, duration_ms)
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS, duration_ms)] += 1
+
+    def percentile(self, percent):
+        """
+        Return upper bound of the bucket which contains the provided percentile (values in the
+        last bucket are approximated with the maximum value).
+
+        :rtype: ``float``
+        """
+        if not self.count:
+            return 0.0
+
+        threshold = self.count * percent / 100.0
+        cumulative = 0
+
+        for index, bucket_count in enumerate(self.buckets):
+            cumulative += bucket_count
+
+            if cumulative >= threshold:
+                break
+
+        if index < len(BUCKET_BOUNDS):
+            return min(float(BUCKET_BOUNDS[index]), self.max)
+
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'total_ms': self.total,
+            'avg_ms': (self.total / self.count) if self.count else 0.0,
+            'max_ms': self.max,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'buckets': dict(zip([str(bound) for bound in BUCKET_BOUNDS] + ['inf'],
+                                self.buckets))
+        }
+
+
+class QueryMetricsListener(monitoring.CommandListener):
+    """
+    Listener which records latency of each database command.
+    """
+
+    def __init__(self, slow_query_threshold_ms=0):
+        """
+        :param slow_query_threshold_ms: Commands which take longer than this many milliseconds are
+                                        logged (0 to disable the slow query log).
+        :type slow_query_threshold_ms: ``int``
+        """
+        self._slow_query_threshold_ms = slow_query_threshold_ms
+
+        # Maps (connection id, request id) to the (collection, command) tuple for the commands in
+        # progress
+        self._commands = {}
+
+        # Maps (collection, command name) to LatencyHistogram
+        self._histograms = {}
+        self._since = time.time()
+
+    def started(self, event):
+        collection = get_collection_name(command=event.command, command_name=event.command_name)
+
+        if collection:
+            self._commands[(event.connection_id, event.request_id)] = (collection, event.command)
+
+    def succeeded(self, event):
+        self._record(event=event)
+
+    def failed(self, event):
+        collection = self._record(event=event)
+
+        if collection:
+            metrics.inc_counter(metrics.format_key('db', collection, event.command_name,
+                                                   'failed'))
+
+    def get_stats(self, reset=False):
+        """
+        Return latency statistics per collection and command.
+
+        :param reset: True to reset the statistics after they have been retrieved.
+        :type reset: ``bool``
+
+        :return: Dictionary with "since" timestamp and "collections" which maps collection name to
+                 a dictionary with statistics per command.
+        :rtype: ``dict``
+        """
+        histograms, since = self._histograms, self._since
+
+        if reset:
+            self._histograms = {}
+            self._since = time.time()
+
+        result = {}
+        for (collection, command_name), histogram in six.iteritems(histograms):
+            result.setdefault(collection, {})[command_name] = histogram.to_dict()
+
+        return {'since': since, 'collections': result}
+
+    def _record(self, event):
+        item = self._commands.pop((event.connection_id, event.request_id), None)
+
+        if not item:
+            return None
+
+        collection, command = item
+        duration_ms = event.duration_micros / 1000.0
+
+        metrics.timing(metrics.format_key('db', collection, event.command_name),
+                       duration_ms / 1000.0)
+
+        key = (collection, event.command_name)
+        histogram = self._histograms.get(key, None)
+
+        if histogram is None:
+            histogram = LatencyHistogram()
+            self._histograms[key] = histogram
+
+        histogram.add(duration_ms)
+
+        if self._slow_query_threshold_ms and duration_ms >= self._slow_query_threshold_ms:
+            self._log_slow_query(collection=collection, command=command,
+                                 command_name=event.command_name, duration_ms=duration_ms)
+
+        return collection
+
+    def _log_slow_query(self, collection, command, command_name, duration_ms):
+        query_filter = get_command_filter(command=command, command_name=command_name)
+        query_shape = get_query_shape(query_filter) if query_filter is not None else None
+        sort = command.get('sort', None)
+
+        extra = {
+            'collection': collection,
+            'command': command_name,
+            'duration_ms': duration_ms,
+            'query_shape': query_shape,
+            'sort': list(sort.keys()) if isinstance(sort, dict) else None
+        }
+        LOG.warning('Slow MongoDB query (%.3f ms): db.%s.%s(%s)', duration_ms, collection,
+                    command_name, json.dumps(query_shape, sort_keys=True), extra=extra)
+
+
+class QueryStatsReporter(object):
+    """
+    Periodically logs summary of the database command latencies (since the last summary).
+    """
+
+    def __init__(self, listener, interval):
+        """
+        :param interval: How often to log the summary (in seconds).
+        :type interval: ``int``
+        """
+        self._listener = listener
+        self._interval = interval
+        self._thread = None
+
+    def start(self):
+        self._thread = eventlet.spawn(self._run)
+
+    def stop(self):
+        if self._thread:
+            self._thread = eventlet.kill(self._thread)
+
+    def _run(self):
+        while True:
+            eventlet.sleep(self._interval)
+
+            try:
+                self.report()
+            except Exception:
+                LOG.exception('Failed to report MongoDB query stats.')
+
+    def report(self):
+        stats = self._listener.get_stats(reset=True)
+        entries = []
+
+        for collection, commands in six.iteritems(stats['collections']):
+            for command_name, command_stats in six.iteritems(commands):
+                entries.append((collection, command_name, command_stats))
+
+        if not entries:
+            return
+
+        # Entries which spend the most time in the database are listed first
+        entries = sorted(entries, key=lambda entry: entry[2]['total_ms'], reverse=True)
+
+        lines = []
+        for collection, command_name, command_stats in entries[:SUMMARY_MAX_ENTRIES]:
+            lines.append('%s.%s: count=%s total=%.1fms avg=%.2fms p50=%.0fms p95=%.0fms '
+                         'p99=%.0fms max=%.1fms' %
+                         (collection, command_name, command_stats['count'],
+                          command_stats['total_ms'], command_stats['avg_ms'],
+                          command_stats['p50_ms'], command_stats['p95_ms'],
+                          command_stats['p99_ms'], command_stats['max_ms']))
+
+        LOG.info('MongoDB query stats for the last %d seconds:\n%s',
+                 time.time() - stats['since'], '\n'.join(lines), extra={'query_stats': stats})
+
+
+def get_collection_name(command, command_name):
+    """
+    Return name of the collection the provided command operates on or None for the commands which
+    don't operate on a collection (e.g. "ismaster").
+
+    :rtype: ``str``
+    """
+    if command_name == 'getMore':
+        return command.get('collection', None)
+
+    value = command.get(command_name, None)
+    return value if isinstance(value, six.string_types) else None
+
+
+def get_command_filter(command, command_name):
+    """
+    Return filter (or aggregation pipeline) which is used by the provided command.
+    """
+    if command_name == 'find':
+        return command.get('filter', {})
+    elif command_name in ['count', 'distinct', 'findAndModify']:
+        return command.get('query', {})
+    elif command_name == 'aggregate':
+        return command.get('pipeline', [])
+    elif command_name in ['update', 'delete']:
+        statements = command.get('updates' if command_name == 'update' else 'deletes', [])
+        return statements[0].get('q', {}) if statements else {}
+
+    return None
+
+
+def get_query_shape(value):
+    """
+    Return shape of the provided query - field names and operators are preserved and all the
+    literal values are replaced with a placeholder.
+
+    For example, shape of {'status': {'$in': ['failed', 'timeout']}} is {'status': {'$in': '?'}}.
+    """
+    if isinstance(value, dict):
+        return dict([(key, get_query_shape(item)) for key, item in six.iteritems(value)])
+    elif isinstance(value, (list, tuple)) and value and \
+            all([isinstance(item, dict) for item in value]):
+        # Sub-queries (e.g. "$or") and aggregation pipeline stages
+        return [get_query_shape(item) for item in value]
+
+    return SHAPE_VALUE_PLACEHOLDER
+
+
+def register_listener():
+    """
+    Register the listener. Note: Listener only applies to the connections which are established
+    after it has been registered.
+    """
+    global _LISTENER
+
+    if _LISTENER is None:
+        _LISTENER = QueryMetricsListener(
+            slow_query_threshold_ms=_get_config_value('slow_query_threshold_ms', 0))
+        monitoring.register(_LISTENER)
+
+    return _LISTENER
+
+
+def get_query_stats(reset=False):
+    """
+    Return latency statistics for all the database commands executed by this process.
+
+    :rtype: ``dict``
+    """
+    return register_listener().get_stats(reset=reset)
+
+
+def start_reporter():
+    """
+    Start reporter which periodically logs the query stats summary (if enabled using
+    ``database.query_stats_interval_s`` option).
+    """
+    global _REPORTER
+
+    interval = _get_config_value('query_stats_interval_s', 0)
+
+    if _REPORTER is None and interval > 0:
+        _REPORTER = QueryStatsReporter(listener=register_listener(), interval=interval)
+        _REPORTER.start()
+
+    return _REPORTER
+
+
+def _get_config_value(name, default):
+    try:
+        return getattr(cfg.CONF.database, name)
+    except (cfg.NoSuchOptError, AttributeError):
+        return default
@@ -13,10 +13,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from oslo_config import cfg
+
+from st2common import transport
 from st2common.exceptions.auth import TokenNotFoundError, ApiKeyNotFoundError
 from st2common.models.db import MongoDBAccess
-from st2common.models.db.auth import UserDB, TokenDB, ApiKeyDB
+from st2common.models.db.auth import UserDB, TokenDB, RevokedTokenDB, ApiKeyDB
 from st2common.persistence.base import Access
+from st2common.transport import utils as transport_utils
 from st2common.util import hash as hash_utils
 
 
@@ -40,11 +44,36 @@ class User(Access):
 
 class Token(Access):
     impl = MongoDBAccess(TokenDB)
+    publisher = None
 
     @classmethod
     def _get_impl(cls):
         return cls.impl
 
+    @classmethod
+    def _get_publisher(cls):
+        if not cls.publisher:
+            cls.publisher = transport.auth.TokenCUDPublisher(
+                urls=transport_utils.get_messaging_urls())
+        return cls.publisher
+
+    @classmethod
+    def publish_update(cls, model_object):
+        # Events are only used to invalidate cached token validation results so only the cache
+        # key (hash of the token) is published and only if the validation cache is enabled
+        if cls._is_validation_cache_enabled():
+            super(Token, cls).publish_update(hash_utils.hash(model_object.token))
+
+    @classmethod
+    def publish_delete(cls, model_object):
+        if cls._is_validation_cache_enabled():
+            super(Token, cls).publish_delete(hash_utils.hash(model_object.token))
+
+    @staticmethod
+    def _is_validation_cache_enabled():
+        return (cfg.CONF.auth.validation_cache_ttl > 0 and
+                cfg.CONF.auth.validation_cache_max_size > 0)
+
     @classmethod
     def add_or_update(cls, model_object, publish=True):
         if not getattr(model_object, 'user', None):
@@ -65,13 +94,29 @@ class Token(Access):
         return result
 
 
+class RevokedToken(Access):
+    impl = MongoDBAccess(RevokedTokenDB)
+
+    @classmethod
+    def _get_impl(cls):
+        return cls.impl
+
+
 class ApiKey(Access):
     impl = MongoDBAccess(ApiKeyDB)
+    publisher = None
 
     @classmethod
     def _get_impl(cls):
         return cls.impl
 
+    @classmethod
+    def _get_publisher(cls):
+        if not cls.publisher:
+            cls.publisher = transport.auth.ApiKeyCUDPublisher(
+                urls=transport_utils.get_messaging_urls())
+        return cls.publisher
+
     @classmethod
     def get(cls, value):
         # DB does not contain key but the key_hash.
@@ -13,11 +13,26 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import six
+from mongoengine.queryset.transform import UPDATE_OPERATORS
+from pymongo import UpdateOne
+
+from st2common import log as logging
 from st2common import transport
 from st2common.models.db import MongoDBAccess
 from st2common.models.db.execution import ActionExecutionDB
+from st2common.models.db.execution import ActionExecutionFilterValueDB
+from st2common.models.db.execution import FILTER_VALUE_FIELDS
 from st2common.persistence.base import Access
 from st2common.transport import utils as transport_utils
+from st2common.util import date as date_utils
+
+__all__ = [
+    'ActionExecution',
+    'ActionExecutionFilterValue'
+]
+
+LOG = logging.getLogger(__name__)
 
 
 class ActionExecution(Access):
@@ -35,6 +50,265 @@ class ActionExecution(Access):
                 urls=transport_utils.get_messaging_urls())
         return cls.publisher
 
+    @classmethod
+    def add_or_update(cls, model_object, publish=True, dispatch_trigger=True,
+                      log_not_unique_error_as_debug=False):
+        # Note: Changes are reset on save so they need to be retrieved beforehand
+        changed_fields = cls._get_changed_fields(model_object=model_object)
+        model_object = super(ActionExecution, cls).add_or_update(
+            model_object, publish=publish, dispatch_trigger=dispatch_trigger,
+            log_not_unique_error_as_debug=log_not_unique_error_as_debug)
+        ActionExecutionFilterValue.add_execution_values(model_object,
+                                                        changed_fields=changed_fields)
+        return model_object
+
+    @classmethod
+    def update(cls, model_object, publish=True, dispatch_trigger=True, **kwargs):
+        changed_fields = [cls._get_update_field(key) for key in kwargs.keys()]
+        model_object = super(ActionExecution, cls).update(model_object, publish=publish,
+                                                          dispatch_trigger=dispatch_trigger,
+                                                          **kwargs)
+        ActionExecutionFilterValue.add_execution_values(model_object,
+                                                        changed_fields=changed_fields)
+        return model_object
+
     @classmethod
     def delete_by_query(cls, **query):
         return cls._get_impl().delete_by_query(**query)
+
+    @staticmethod
+    def _get_changed_fields(model_object):
+        """
+        Return fields which will be written when the provided execution is saved.
+
+        :return: List of fields (dot notation) or None if the whole execution will be written
+                 (execution is being created).
+        :rtype: ``list``
+        """
+        if not model_object.id or getattr(model_object, '_created', True):
+            return None
+
+        # Note: Removed fields are ignored since they don't add any values
+        set_data, _ = model_object._delta()
+        return list(set_data.keys())
+
+    @staticmethod
+    def _get_update_field(key):
+        """
+        Return field (dot notation) for the provided update keyword argument
+        (e.g. set__status -> status).
+        """
+        parts = key.split('__')
+
+        if len(parts) > 1 and parts[0] in UPDATE_OPERATORS:
+            parts = parts[1:]
+
+        return '.'.join(parts)
+
+
+class ActionExecutionFilterValue(Access):
+    """
+    Distinct values of the execution attributes which are used by the executions filters view.
+
+    Values are upserted (using a single bulk write) each time an execution is stored and values
+    which are not used by any execution anymore are deleted when executions are purged.
+    """
+    impl = MongoDBAccess(ActionExecutionFilterValueDB)
+    publisher = None
+
+    @classmethod
+    def _get_impl(cls):
+        return cls.impl
+
+    @classmethod
+    def get_values(cls, filter_names=None):
+        """
+        Retrieve values for the provided filters.
+
+        :param filter_names: Names of the filters to retrieve the values for (defaults to all).
+        :type filter_names: ``list``
+
+        :return: Dictionary which maps filter name to a list of values.
+        :rtype: ``dict``
+        """
+        filter_names = filter_names or list(FILTER_VALUE_FIELDS.keys())
+
+        result = dict([(filter_name, []) for filter_name in filter_names])
+        value_dbs = cls.query(filter_name__in=filter_names, only_fields=['filter_name', 'value'])
+
+        for value_db in value_dbs:
+            result[value_db.filter_name].append(value_db.value)
+
+        return result
+
+    @classmethod
+    def add_execution_values(cls, execution_db, changed_fields=None):
+        """
+        Add filter values of the provided execution.
+
+        Note: Failure to do so is logged and not propagated since it should never affect storing
+        of the execution.
+
+        :param changed_fields: Execution fields (dot notation) which have changed. If provided,
+                               only values of the filters which depend on those fields are
+                               added (e.g. status on update). Defaults to all the filters.
+        :type changed_fields: ``list``
+        """
+        last_seen = execution_db.start_timestamp or date_utils.get_datetime_utc_now()
+        values = [(filter_name, value, last_seen) for (filter_name, value) in
+                  six.iteritems(cls._get_execution_values(execution_db=execution_db))
+                  if changed_fields is None or
+                  cls._is_field_changed(field=FILTER_VALUE_FIELDS[filter_name],
+                                        changed_fields=changed_fields)]
+
+        try:
+            cls._upsert_values(values=values)
+        except Exception:
+            LOG.exception('Failed to store filter values for execution "%s".', execution_db.id)
+
+    @classmethod
+    def delete_unused_values(cls, timestamp):
+        """
+        Delete values which are not used by any execution anymore. Only values which have been
+        last seen before the provided timestamp (e.g. the purge timestamp) are checked.
+
+        :return: Number of deleted values.
+        :rtype: ``int``
+        """
+        value_dbs = list(cls.query(last_seen__lt=timestamp, only_fields=['filter_name', 'value']))
+
+        if not value_dbs:
+            return 0
+
+        candidates = {}
+        for value_db in value_dbs:
+            candidates.setdefault(value_db.filter_name, []).append(value_db.value)
+
+        # Values which are still used are retrieved using a single aggregation (single pass over
+        # the executions collection) instead of a query per value since most of the filter
+        # fields are not indexed
+        used_values = cls._get_used_values(candidates=candidates)
+
+        ids = [value_db.id for value_db in value_dbs
+               if value_db.value not in used_values.get(value_db.filter_name, [])]
+
+        if ids:
+            cls._get_impl().delete_by_query(id__in=ids)
+
+        return len(ids)
+
+    @staticmethod
+    def _get_used_values(candidates):
+        """
+        Return candidate values which are used by at least one execution.
+
+        :param candidates: Dictionary which maps filter name to a list of values.
+        :type candidates: ``dict``
+
+        :return: Dictionary which maps filter name to a set of used values.
+        :rtype: ``dict``
+        """
+        fields = dict([(filter_name, FILTER_VALUE_FIELDS[filter_name])
+                       for filter_name in candidates.keys()
+                       if filter_name in FILTER_VALUE_FIELDS])
+
+        if not fields:
+            return {}
+
+        match = [{field: {'$in': candidates[filter_name]}}
+                 for filter_name, field in six.iteritems(fields)]
+        group = {'_id': None}
+        for filter_name, field in six.iteritems(fields):
+            group[filter_name] = {'$addToSet': '$' + field}
+
+        pipeline = [{'$match': {'$or': match}}, {'$group': group}]
+
+        candidate_values = dict([(filter_name, set(candidates[filter_name]))
+                                 for filter_name in fields.keys()])
+        result = dict([(filter_name, set()) for filter_name in fields.keys()])
+        for item in ActionExecution.aggregate(pipeline):
+            for filter_name in fields.keys():
+                # Note: Values of the other fields of the matched executions are collected as
+                # well so only the candidate values are kept
+                result[filter_name].update([value for value in item.get(filter_name, [])
+                                            if value in candidate_values[filter_name]])
+
+        return result
+
+    @classmethod
+    def rebuild(cls):
+        """
+        (Re)build values from all the existing executions.
+        """
+        field_class = cls._get_impl().model._fields['last_seen']
+
+        for filter_name, field in six.iteritems(FILTER_VALUE_FIELDS):
+            pipeline = [{'$group': {'_id': '$' + field, 'last_seen': {'$max': '$start_timestamp'}}}]
+            values = []
+
+            for item in ActionExecution.aggregate(pipeline):
+                if not item['_id'] or not isinstance(item['_id'], six.string_types):
+                    continue
+
+                last_seen = field_class.to_python(item['last_seen'])
+                values.append((filter_name, item['_id'], last_seen))
+
+            cls._upsert_values(values=values)
+
+    @classmethod
+    def _upsert_values(cls, values):
+        """
+        :param values: List of (filter name, value, last seen timestamp) tuples.
+        :type values: ``list``
+        """
+        if not values:
+            return
+
+        model = cls._get_impl().model
+        field_class = model._fields['last_seen']
+
+        requests = []
+        for filter_name, value, last_seen in values:
+            query = {'filter_name': filter_name, 'value': value}
+            update = {'$max': {'last_seen': field_class.to_mongo(last_seen)}}
+            requests.append(UpdateOne(query, update, upsert=True))
+
+        model._get_collection().bulk_write(requests, ordered=False)
+
+    @staticmethod
+    def _is_field_changed(field, changed_fields):
+        """
+        Return True if the provided field, one of its parents or one of its children has
+        changed.
+        """
+        for changed_field in changed_fields:
+            if (field == changed_field or field.startswith(changed_field + '.') or
+                    changed_field.startswith(field + '.')):
+                return True
+
+        return False
+
+    @staticmethod
+    def _get_execution_values(execution_db):
+        """
+        :return: Dictionary which maps filter name to the execution attribute value.
+        :rtype: ``dict``
+        """
+        result = {}
+
+        for filter_name, field in six.iteritems(FILTER_VALUE_FIELDS):
+            value = execution_db
+
+            for attribute in field.split('.'):
+                if isinstance(value, dict):
+                    value = value.get(attribute, None)
+                else:
+                    value = getattr(value, attribute, None)
+
+                if value is None:
+                    break
+
+            if value and isinstance(value, six.string_types):
+                result[filter_name] = value
+
+        return result
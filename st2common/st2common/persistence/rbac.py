@@ -25,7 +25,35 @@ __all__ = [
 ]
 
 
-class Role(base.Access):
+class RBACAccess(base.Access):
+    """
+    Base access class for the RBAC models.
+
+    Cached user permission snapshots are invalidated each time one of the RBAC models is written
+    through the persistence layer so changes made outside of the RBAC service functions (e.g. by
+    the definitions syncer) take effect immediately.
+    """
+
+    @classmethod
+    def publish_create(cls, model_object):
+        cls._invalidate_permissions_cache()
+
+    @classmethod
+    def publish_update(cls, model_object):
+        cls._invalidate_permissions_cache()
+
+    @classmethod
+    def publish_delete(cls, model_object):
+        cls._invalidate_permissions_cache()
+
+    @staticmethod
+    def _invalidate_permissions_cache():
+        # Note: Imported here since permissions cache module depends on this module
+        from st2common.rbac.permissions_cache import invalidate_permissions_cache
+        invalidate_permissions_cache()
+
+
+class Role(RBACAccess):
     impl = role_access
 
     @classmethod
@@ -33,7 +61,7 @@ class Role(base.Access):
         return cls.impl
 
 
-class UserRoleAssignment(base.Access):
+class UserRoleAssignment(RBACAccess):
     impl = user_role_assignment_access
 
     @classmethod
@@ -41,7 +69,7 @@ class UserRoleAssignment(base.Access):
         return cls.impl
 
 
-class PermissionGrant(base.Access):
+class PermissionGrant(RBACAccess):
     impl = permission_grant_access
 
     @classmethod
@@ -0,0 +1,231 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Module containing per user permission snapshots which allow RBAC checks to be performed without
+querying the database for each check.
+
+Snapshot contains names of the roles assigned to the user and all the permission grants of those
+roles indexed by the resource uid. Snapshots are cached for ``rbac.permissions_cache_ttl``
+seconds and the whole cache is invalidated when RBAC definitions change (either in this process
+or in a different one, e.g. by st2-apply-rbac-definitions).
+"""
+
+import time
+from collections import defaultdict
+
+import eventlet
+from kombu.mixins import ConsumerMixin
+from kombu import Connection
+from oslo_config import cfg
+
+from st2common import log as logging
+from st2common.persistence.rbac import Role
+from st2common.persistence.rbac import UserRoleAssignment
+from st2common.persistence.rbac import PermissionGrant
+from st2common.transport import rbac as rbac_transport
+from st2common.transport import serializers
+from st2common.transport import utils as transport_utils
+import st2common.util.queues as queue_utils
+
+__all__ = [
+    'UserPermissions',
+    'PermissionsCacheInvalidator',
+
+    'get_user_permissions',
+    'invalidate_permissions_cache'
+]
+
+LOG = logging.getLogger(__name__)
+
+# Maps user name to a tuple of (expiration time, UserPermissions)
+_USER_PERMISSIONS_CACHE = {}
+
+_INVALIDATOR = None
+_PUBLISHER = None
+
+
+class UserPermissions(object):
+    """
+    Snapshot of the roles and permission grants for a particular user.
+    """
+
+    def __init__(self, role_names, permission_grant_dbs):
+        """
+        :param role_names: Names of the roles assigned to the user.
+        :type role_names: ``list`` of ``str``
+
+        :param permission_grant_dbs: Permission grants of all the roles assigned to the user.
+        :type permission_grant_dbs: ``list`` of :class:`PermissionGrantDB`
+        """
+        self.role_names = set(role_names)
+
+        # Maps resource uid to a list of (resource type, permission types) tuples
+        self._grants_by_resource_uid = defaultdict(list)
+
+        # All the permission types granted to the user (on any resource)
+        self._permission_types = set()
+
+        for permission_grant_db in permission_grant_dbs:
+            permission_types = set(permission_grant_db.permission_types or [])
+            self._grants_by_resource_uid[permission_grant_db.resource_uid].append(
+                (permission_grant_db.resource_type, permission_types))
+            self._permission_types.update(permission_types)
+
+    def has_permission_grant(self, resource_uid=None, resource_types=None,
+                             permission_types=None):
+        """
+        Return True if the user has at least one permission grant which matches the provided
+        filters. This method mirrors "get_all_permission_grants_for_user" filtering.
+
+        :rtype: ``bool``
+        """
+        if not resource_uid and not resource_types:
+            if not permission_types:
+                return bool(self._permission_types)
+
+            return bool(self._permission_types.intersection(permission_types))
+
+        if resource_uid:
+            grants = self._grants_by_resource_uid.get(resource_uid, [])
+        else:
+            grants = sum(self._grants_by_resource_uid.values(), [])
+
+        for (resource_type, grant_permission_types) in grants:
+            if resource_types and resource_type not in resource_types:
+                continue
+
+            if permission_types and not grant_permission_types.intersection(permission_types):
+                continue
+
+            return True
+
+        return False
+
+
+class PermissionsCacheInvalidator(ConsumerMixin):
+    """
+    Listens for RBAC change events and invalidates the permissions cache.
+    """
+
+    def __init__(self, queue_suffix=None):
+        queue_name = queue_utils.get_queue_name(queue_name_base='st2.rbac.watch',
+                                                queue_name_suffix=queue_suffix,
+                                                add_random_uuid_to_suffix=True)
+        self._queue = rbac_transport.get_rbac_change_queue(queue_name, routing_key='#',
+                                                           exclusive=True)
+
+        self.connection = None
+        self._updates_thread = None
+
+    def get_consumers(self, Consumer, channel):
+        return [Consumer(queues=[self._queue], accept=serializers.ACCEPT_CONTENT,
+                         callbacks=[self.process])]
+
+    def process(self, body, message):
+        try:
+            LOG.debug('RBAC definitions have changed, invalidating permissions cache.')
+            _USER_PERMISSIONS_CACHE.clear()
+        finally:
+            message.ack()
+
+    def start(self):
+        try:
+            self.connection = Connection(transport_utils.get_messaging_urls())
+            self._updates_thread = eventlet.spawn(self.run)
+        except:
+            LOG.exception('Failed to start permissions cache invalidator.')
+            self.connection.release()
+
+    def stop(self):
+        try:
+            if self._updates_thread is not None:
+                self._updates_thread = eventlet.kill(self._updates_thread)
+        finally:
+            if self.connection:
+                self.connection.release()
+
+
+def get_user_permissions(user_db):
+    """
+    Retrieve permissions snapshot for the provided user. Snapshot is built using a single query
+    per RBAC model and cached.
+
+    :param user_db: User to retrieve the permissions for.
+    :type user_db: :class:`UserDB`
+
+    :rtype: :class:`UserPermissions`
+    """
+    ttl = cfg.CONF.rbac.permissions_cache_ttl
+    now = time.time()
+
+    if ttl > 0:
+        _start_invalidator()
+
+        cached = _USER_PERMISSIONS_CACHE.get(user_db.name, None)
+
+        if cached and cached[0] > now:
+            return cached[1]
+
+    role_names = list(UserRoleAssignment.query(user=user_db.name).only('role').scalar('role'))
+    role_dbs = list(Role.query(name__in=role_names)) if role_names else []
+    permission_grant_ids = sum([role_db.permission_grants for role_db in role_dbs], [])
+
+    if permission_grant_ids:
+        permission_grant_dbs = PermissionGrant.query(id__in=permission_grant_ids)
+    else:
+        permission_grant_dbs = []
+
+    # Note: Role assignment can reference a role which doesn't exist (anymore) so only names of
+    # the existing roles are used
+    user_permissions = UserPermissions(role_names=[role_db.name for role_db in role_dbs],
+                                       permission_grant_dbs=permission_grant_dbs)
+
+    if ttl > 0:
+        _USER_PERMISSIONS_CACHE[user_db.name] = (now + ttl, user_permissions)
+
+    return user_permissions
+
+
+def invalidate_permissions_cache(publish=True):
+    """
+    Invalidate permissions cache in this process and (if publish is True) notify other processes
+    that the RBAC definitions have changed.
+    """
+    global _PUBLISHER
+
+    _USER_PERMISSIONS_CACHE.clear()
+
+    if not publish:
+        return
+
+    try:
+        if _PUBLISHER is None:
+            _PUBLISHER = rbac_transport.RBACChangePublisher(
+                urls=transport_utils.get_messaging_urls())
+
+        _PUBLISHER.publish_change()
+    except Exception:
+        LOG.exception('Failed to publish RBAC change event.')
+
+
+def _start_invalidator():
+    global _INVALIDATOR
+
+    if _INVALIDATOR is not None:
+        return
+
+    _INVALIDATOR = PermissionsCacheInvalidator(queue_suffix='permissions_cache')
+    _INVALIDATOR.start()
@@ -29,8 +29,7 @@ from st2common.constants.triggers import WEBHOOK_TRIGGER_TYPE
 from st2common.rbac.types import PermissionType
 from st2common.rbac.types import ResourceType
 from st2common.rbac.types import SystemRole
-from st2common.services.rbac import get_roles_for_user
-from st2common.services.rbac import get_all_permission_grants_for_user
+from st2common.rbac.permissions_cache import get_user_permissions
 
 LOG = logging.getLogger(__name__)
 
@@ -113,9 +112,9 @@ class PermissionsResolver(object):
         permission_types = [permission_type]
 
         # Check direct grants
-        permission_grants = get_all_permission_grants_for_user(user_db=user_db,
+        has_permission_grant = self._user_has_permission_grant(user_db=user_db,
                                                                permission_types=permission_types)
-        if len(permission_grants) >= 1:
+        if has_permission_grant:
             self._log('Found a direct grant', extra=log_context)
             return True
 
@@ -129,9 +128,7 @@ class PermissionsResolver(object):
         :rtype: ``bool``
         """
         permission_name = PermissionType.get_permission_name(permission_type)
-
-        user_role_dbs = get_roles_for_user(user_db=user_db)
-        user_role_names = [role_db.name for role_db in user_role_dbs]
+        user_role_names = get_user_permissions(user_db=user_db).role_names
 
         if SystemRole.SYSTEM_ADMIN in user_role_names:
             # System admin has all the permissions
@@ -145,6 +142,21 @@ class PermissionsResolver(object):
 
         return False
 
+    def _user_has_permission_grant(self, user_db, resource_uid=None, resource_types=None,
+                                   permission_types=None):
+        """
+        Check if the user has at least one permission grant which matches the provided filters.
+
+        Note: Permissions are checked against the (cached) user permissions snapshot instead of
+        querying the database.
+
+        :rtype: ``bool``
+        """
+        user_permissions = get_user_permissions(user_db=user_db)
+        return user_permissions.has_permission_grant(resource_uid=resource_uid,
+                                                     resource_types=resource_types,
+                                                     permission_types=permission_types)
+
     def _matches_permission_grant(self, resource_db, permission_grant, permission_type,
                                   all_permission_type):
         """
@@ -227,22 +239,22 @@ class ContentPackResourcePermissionsResolver(PermissionsResolver):
 
         # Check direct grants on the specified resource
         resource_types = [self.resource_type]
-        permission_grants = get_all_permission_grants_for_user(user_db=user_db,
+        has_permission_grant = self._user_has_permission_grant(user_db=user_db,
                                                                resource_uid=resource_uid,
                                                                resource_types=resource_types,
                                                                permission_types=permission_types)
-        if len(permission_grants) >= 1:
+        if has_permission_grant:
             self._log('Found a direct grant on the action', extra=log_context)
             return True
 
         # Check grants on the parent pack
         resource_types = [ResourceType.PACK]
-        permission_grants = get_all_permission_grants_for_user(user_db=user_db,
+        has_permission_grant = self._user_has_permission_grant(user_db=user_db,
                                                                resource_uid=pack_uid,
                                                                resource_types=resource_types,
                                                                permission_types=permission_types)
 
-        if len(permission_grants) >= 1:
+        if has_permission_grant:
             self._log('Found a grant on the action parent pack', extra=log_context)
             return True
 
@@ -281,12 +293,12 @@ class RunnerPermissionsResolver(PermissionsResolver):
         resource_uid = resource_db.get_uid()
         resource_types = [ResourceType.RUNNER]
         permission_types = [permission_type]
-        permission_grants = get_all_permission_grants_for_user(user_db=user_db,
+        has_permission_grant = self._user_has_permission_grant(user_db=user_db,
                                                                resource_uid=resource_uid,
                                                                resource_types=resource_types,
                                                                permission_types=permission_types)
 
-        if len(permission_grants) >= 1:
+        if has_permission_grant:
             self._log('Found a direct grant on the runner type', extra=log_context)
             return True
 
@@ -326,12 +338,12 @@ class PackPermissionsResolver(PermissionsResolver):
         resource_uid = resource_db.get_uid()
         resource_types = [ResourceType.PACK]
         permission_types = [permission_type]
-        permission_grants = get_all_permission_grants_for_user(user_db=user_db,
+        has_permission_grant = self._user_has_permission_grant(user_db=user_db,
                                                                resource_uid=resource_uid,
                                                                resource_types=resource_types,
                                                                permission_types=permission_types)
 
-        if len(permission_grants) >= 1:
+        if has_permission_grant:
             self._log('Found a direct grant on the pack', extra=log_context)
             return True
 
@@ -574,23 +586,23 @@ class RuleEnforcementPermissionsResolver(PermissionsResolver):
 
         # Check grants on the pack of the rule to which enforcement belongs to
         resource_types = [ResourceType.PACK]
-        permission_grants = get_all_permission_grants_for_user(user_db=user_db,
+        has_permission_grant = self._user_has_permission_grant(user_db=user_db,
                                                                resource_uid=rule_pack_uid,
                                                                resource_types=resource_types,
                                                                permission_types=permission_types)
 
-        if len(permission_grants) >= 1:
+        if has_permission_grant:
             self._log('Found a grant on the enforcement rule parent pack', extra=log_context)
             return True
 
         # Check grants on the rule the enforcement belongs to
         resource_types = [ResourceType.RULE]
-        permission_grants = get_all_permission_grants_for_user(user_db=user_db,
+        has_permission_grant = self._user_has_permission_grant(user_db=user_db,
                                                                resource_uid=rule_uid,
                                                                resource_types=resource_types,
                                                                permission_types=permission_types)
 
-        if len(permission_grants) >= 1:
+        if has_permission_grant:
             self._log('Found a grant on the enforcement\'s rule.', extra=log_context)
             return True
 
@@ -665,24 +677,24 @@ class ExecutionPermissionsResolver(PermissionsResolver):
         # Check grants on the pack of the action to which execution belongs to
         resource_types = [ResourceType.PACK]
         permission_types = [PermissionType.ACTION_ALL, action_permission_type]
-        permission_grants = get_all_permission_grants_for_user(user_db=user_db,
+        has_permission_grant = self._user_has_permission_grant(user_db=user_db,
                                                                resource_uid=action_pack_uid,
                                                                resource_types=resource_types,
                                                                permission_types=permission_types)
 
-        if len(permission_grants) >= 1:
+        if has_permission_grant:
             self._log('Found a grant on the execution action parent pack', extra=log_context)
             return True
 
         # Check grants on the action the execution belongs to
         resource_types = [ResourceType.ACTION]
         permission_types = [PermissionType.ACTION_ALL, action_permission_type]
-        permission_grants = get_all_permission_grants_for_user(user_db=user_db,
+        has_permission_grant = self._user_has_permission_grant(user_db=user_db,
                                                                resource_uid=action_uid,
                                                                resource_types=resource_types,
                                                                permission_types=permission_types)
 
-        if len(permission_grants) >= 1:
+        if has_permission_grant:
             self._log('Found a grant on the execution action', extra=log_context)
             return True
 
@@ -721,12 +733,12 @@ class WebhookPermissionsResolver(PermissionsResolver):
         # Check direct grants on the webhook
         resource_types = [ResourceType.WEBHOOK]
         permission_types = [PermissionType.WEBHOOK_ALL, permission_type]
-        permission_grants = get_all_permission_grants_for_user(user_db=user_db,
+        has_permission_grant = self._user_has_permission_grant(user_db=user_db,
                                                                resource_uid=webhook_uid,
                                                                resource_types=resource_types,
                                                                permission_types=permission_types)
 
-        if len(permission_grants) >= 1:
+        if has_permission_grant:
             self._log('Found a grant on the webhook', extra=log_context)
             return True
 
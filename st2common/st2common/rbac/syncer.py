@@ -23,6 +23,7 @@ from st2common.persistence.auth import User
 from st2common.persistence.rbac import Role
 from st2common.persistence.rbac import UserRoleAssignment
 from st2common.persistence.rbac import PermissionGrant
+from st2common.rbac.permissions_cache import invalidate_permissions_cache
 from st2common.services import rbac as rbac_services
 from st2common.util.uid import parse_uid
 
@@ -59,6 +60,9 @@ class RBACDefinitionsDBSyncer(object):
         result['roles'] = self.sync_roles(role_definition_apis)
         result['role_assignments'] = self.sync_users_role_assignments(role_assignment_apis)
 
+        # Notify running services that cached user permissions are stale
+        invalidate_permissions_cache()
+
         return result
 
     def sync_roles(self, role_definition_apis):
@@ -28,7 +28,7 @@ from st2common.rbac.types import PermissionType
 from st2common.rbac.types import ResourceType
 from st2common.rbac.types import SystemRole
 from st2common.rbac import resolvers
-from st2common.services import rbac as rbac_services
+from st2common.rbac.permissions_cache import get_user_permissions
 from st2common.util import action_db as action_utils
 from st2common.util.api import get_requester
 
@@ -344,9 +344,7 @@ def user_has_role(user_db, role):
     if not cfg.CONF.rbac.enable:
         return True
 
-    user_role_dbs = rbac_services.get_roles_for_user(user_db=user_db)
-    user_role_names = [role_db.name for role_db in user_role_dbs]
-
+    user_role_names = get_user_permissions(user_db=user_db).role_names
     return role in user_role_names
 
 
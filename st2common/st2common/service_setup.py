@@ -31,6 +31,7 @@ from st2common.transport.bootstrap_utils import register_exchanges
 from st2common.signal_handlers import register_common_signal_handlers
 from st2common.util.debugging import enable_debugging
 from st2common.models.utils.profiling import enable_profiling
+from st2common.models.utils.query_metrics import start_reporter as start_query_stats_reporter
 from st2common import triggers
 
 from st2common.rbac.migrations import run_all as run_all_rbac_migrations
@@ -97,6 +98,7 @@ def setup(service, config, setup_db=True, register_mq_exchanges=True,
     # be correctly setup.
     if setup_db:
         db_setup()
+        start_query_stats_reporter()
 
     if register_mq_exchanges:
         register_exchanges()
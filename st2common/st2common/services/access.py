@@ -13,6 +13,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import calendar
+import time
 import uuid
 import datetime
 
@@ -22,17 +24,32 @@ from st2common.util import isotime
 from st2common.util import date as date_utils
 from st2common.exceptions.auth import TokenNotFoundError
 from st2common.exceptions.auth import TTLTooLargeException
-from st2common.models.db.auth import TokenDB, UserDB
-from st2common.persistence.auth import Token, User
+from st2common.models.db.auth import TokenDB, UserDB, RevokedTokenDB
+from st2common.persistence.auth import Token, User, RevokedToken
+from st2common.util import signed_token
 from st2common import log as logging
 
 __all__ = [
     'create_token',
-    'delete_token'
+    'delete_token',
+    'execution_tokens_enabled',
+    'create_execution_token',
+    'revoke_execution_tokens',
+    'is_execution_revoked'
 ]
 
 LOG = logging.getLogger(__name__)
 
+# Users which are known to exist. Used to avoid a database lookup each time an execution token is
+# issued.
+_REGISTERED_USERS = set()
+
+# Ids of the executions whose tokens have been revoked and the time the list has been retrieved
+_REVOKED_EXECUTIONS = {
+    'execution_ids': set(),
+    'refreshed_at': 0
+}
+
 
 def create_token(username, ttl=None, metadata=None):
     """
@@ -57,19 +74,14 @@ def create_token(username, ttl=None, metadata=None):
         ttl = cfg.CONF.auth.token_ttl
 
     if username:
-        try:
-            User.get_by_name(username)
-        except:
-            user = UserDB(name=username)
-            User.add_or_update(user)
-
-            extra = {'username': username, 'user': user}
-            LOG.audit('Registered new user "%s".' % (username), extra=extra)
+        _register_user(username)
 
     token = uuid.uuid4().hex
     expiry = date_utils.get_datetime_utc_now() + datetime.timedelta(seconds=ttl)
     token = TokenDB(user=username, token=token, expiry=expiry, metadata=metadata)
-    Token.add_or_update(token)
+    # Token create events are not consumed by anything, only update and delete events are (to
+    # invalidate cached token validation results)
+    Token.add_or_update(token, publish=False)
 
     username_string = username if username else 'an anonymous user'
     token_expire_string = isotime.format(expiry, offset=False)
@@ -89,3 +101,107 @@ def delete_token(token):
         pass
     except Exception:
         raise
+
+
+def execution_tokens_enabled():
+    """
+    Return True if stateless signed tokens should be used for the action executions.
+    """
+    return bool(cfg.CONF.auth.execution_token_signing_keys)
+
+
+def create_execution_token(username, execution_id, ttl=None):
+    """
+    Create a token for the provided action execution.
+
+    The token is signed with the first configured signing key and it's not stored in the
+    database. It can be validated without a database lookup and it can only be invalidated by
+    revoking all the tokens for the execution using :func:`revoke_execution_tokens`.
+
+    :param username: Username of the user to create the token for.
+    :type username: ``str``
+
+    :param execution_id: ID of the execution the token is issued for.
+    :type execution_id: ``str``
+
+    :param ttl: Token TTL (in seconds).
+    :type ttl: ``int``
+
+    :rtype: :class:`TokenDB`
+    """
+    if not username:
+        raise ValueError('Username is not provided.')
+
+    ttl = ttl or cfg.CONF.auth.execution_token_ttl
+
+    if username not in _REGISTERED_USERS:
+        _register_user(username)
+        _REGISTERED_USERS.add(username)
+
+    expiry = date_utils.get_datetime_utc_now() + datetime.timedelta(seconds=ttl)
+    payload = {
+        'user': username,
+        'execution_id': str(execution_id),
+        'expiry': calendar.timegm(expiry.timetuple())
+    }
+
+    key_id, key = signed_token.get_signing_keys()[0]
+    token = signed_token.sign_token(payload=payload, key_id=key_id, key=key)
+
+    LOG.debug('Issued execution token for execution "%s" to "%s".', execution_id, username)
+
+    return TokenDB(user=username, token=token, expiry=expiry,
+                   metadata={'execution_id': str(execution_id)})
+
+
+def revoke_execution_tokens(execution_id):
+    """
+    Revoke all the signed tokens which have been issued for the provided execution.
+    """
+    expiry = (date_utils.get_datetime_utc_now() +
+              datetime.timedelta(seconds=cfg.CONF.auth.execution_token_ttl))
+    revoked_token_db = RevokedToken.query(execution_id=str(execution_id)).first()
+
+    if not revoked_token_db:
+        revoked_token_db = RevokedTokenDB(execution_id=str(execution_id))
+
+    revoked_token_db.expiry = expiry
+    RevokedToken.add_or_update(revoked_token_db, publish=False)
+
+    _REVOKED_EXECUTIONS['execution_ids'].add(str(execution_id))
+    LOG.audit('Revoked tokens for execution "%s".' % (execution_id),
+              extra={'execution_id': str(execution_id)})
+
+
+def is_execution_revoked(execution_id):
+    """
+    Return True if the tokens for the provided execution have been revoked.
+
+    Revocation list is cached in memory and re-retrieved from the database at most once per
+    ``auth.execution_token_revocation_refresh_interval`` seconds so a revocation which has
+    happened in a different process can take that long to take effect.
+    """
+    now = time.time()
+    refresh_interval = cfg.CONF.auth.execution_token_revocation_refresh_interval
+
+    if now - _REVOKED_EXECUTIONS['refreshed_at'] >= refresh_interval:
+        revoked_token_dbs = RevokedToken.query(expiry__gt=date_utils.get_datetime_utc_now())
+        _REVOKED_EXECUTIONS['execution_ids'] = set([revoked_token_db.execution_id for
+                                                    revoked_token_db in revoked_token_dbs])
+        _REVOKED_EXECUTIONS['refreshed_at'] = now
+
+    return str(execution_id) in _REVOKED_EXECUTIONS['execution_ids']
+
+
+def _register_user(username):
+    """
+    Create user account for the provided username if it doesn't exist yet.
+    """
+    try:
+        User.get_by_name(username)
+    except:
+        user = UserDB(name=username)
+        User.add_or_update(user)
+
+        extra = {'username': username, 'user': user}
+        LOG.audit('Registered new user "%s".' % (username), extra=extra)
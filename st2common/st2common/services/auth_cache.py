@@ -0,0 +1,260 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# pylint: disable=assignment-from-none
+
+import time
+from collections import OrderedDict
+
+import eventlet
+import six
+from kombu.mixins import ConsumerMixin
+from kombu import Connection
+from oslo_config import cfg
+
+from st2common import log as logging
+from st2common.services import access
+from st2common.transport import auth as auth_transport
+from st2common.transport import publishers
+from st2common.transport import serializers
+from st2common.transport import utils as transport_utils
+from st2common.util import date as date_utils
+from st2common.util import hash as hash_utils
+import st2common.util.queues as queue_utils
+
+__all__ = [
+    'AuthCache',
+    'AuthCacheInvalidator',
+
+    'get_auth_cache'
+]
+
+LOG = logging.getLogger(__name__)
+
+# How often (number of lookups) to log cache statistics
+STATS_LOG_INTERVAL = 1000
+
+_AUTH_CACHE = None
+
+
+class AuthCache(object):
+    """
+    Short lived cache for token and API key validation results.
+
+    Entries are keyed by a hash of the credential (which for API keys matches the key hash stored
+    in the database) so raw credentials are not kept in memory. Each entry contains the user the
+    credential belongs to and the credential expiry.
+    """
+
+    def __init__(self, ttl, max_size):
+        """
+        :param ttl: How long (in seconds) the validation result is cached for.
+        :type ttl: ``int``
+
+        :param max_size: Maximum number of entries. Least recently used entries are evicted
+                         once the cache is full.
+        :type max_size: ``int``
+        """
+        self._ttl = ttl
+        self._max_size = max_size
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def enabled(self):
+        return self._ttl > 0 and self._max_size > 0
+
+    def get(self, credential):
+        """
+        Return cached user for the provided credential or None if the credential is not cached
+        or the cached entry is not valid anymore.
+
+        :rtype: :class:`UserDB`
+        """
+        key = self.get_key(credential)
+        entry = self._entries.pop(key, None)
+
+        if entry and not self._is_valid(entry):
+            entry = None
+
+        if entry:
+            self._entries[key] = entry
+            self._hits += 1
+        else:
+            self._misses += 1
+
+        if (self._hits + self._misses) % STATS_LOG_INTERVAL == 0:
+            LOG.debug('Auth cache stats: %s', self.get_stats())
+
+        return entry['user'] if entry else None
+
+    def set(self, credential, user, expiry=None, execution_id=None):
+        """
+        Cache the validation result for the provided credential.
+
+        :param user: User the credential belongs to.
+        :type user: :class:`UserDB`
+
+        :param expiry: Credential expiry (if any).
+        :type expiry: ``datetime.datetime``
+
+        :param execution_id: ID of the execution the credential has been issued for (signed
+                             execution tokens only). Entry is evicted once the tokens for the
+                             execution are revoked.
+        :type execution_id: ``str``
+        """
+        if not self.enabled:
+            return
+
+        key = self.get_key(credential)
+        self._entries.pop(key, None)
+
+        while len(self._entries) >= self._max_size:
+            self._entries.popitem(last=False)
+
+        self._entries[key] = {
+            'user': user,
+            'expiry': expiry,
+            'execution_id': execution_id,
+            'cached_until': time.time() + self._ttl
+        }
+
+    def invalidate(self, key):
+        """
+        Remove entry for the provided key (hash of the credential).
+        """
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def get_stats(self):
+        lookups = self._hits + self._misses
+
+        return {
+            'size': len(self._entries),
+            'hits': self._hits,
+            'misses': self._misses,
+            'hit_rate': (float(self._hits) / lookups) if lookups else 0.0
+        }
+
+    @staticmethod
+    def get_key(credential):
+        return hash_utils.hash(credential)
+
+    def _is_valid(self, entry):
+        if entry['cached_until'] <= time.time():
+            return False
+
+        expiry = entry['expiry']
+
+        if expiry and date_utils.add_utc_tz(expiry) <= date_utils.get_datetime_utc_now():
+            return False
+
+        # Note: Revocation list is cached in memory so this doesn't result in a database lookup
+        execution_id = entry['execution_id']
+
+        if execution_id and access.is_execution_revoked(execution_id):
+            return False
+
+        return True
+
+
+class AuthCacheInvalidator(ConsumerMixin):
+    """
+    Listens for Token and ApiKey update and delete events and removes corresponding entries from
+    the cache.
+    """
+
+    def __init__(self, cache, queue_suffix=None):
+        self._cache = cache
+        self._token_queue = self._get_queue(auth_transport.get_token_cud_queue, 'st2.token.watch',
+                                            queue_suffix)
+        self._api_key_queue = self._get_queue(auth_transport.get_api_key_cud_queue,
+                                              'st2.apikey.watch', queue_suffix)
+
+        self.connection = None
+        self._updates_thread = None
+
+    def get_consumers(self, Consumer, channel):
+        return [
+            Consumer(queues=[self._token_queue], accept=serializers.ACCEPT_CONTENT,
+                     callbacks=[self.process_token]),
+            Consumer(queues=[self._api_key_queue], accept=serializers.ACCEPT_CONTENT,
+                     callbacks=[self.process_api_key])
+        ]
+
+    def process_token(self, body, message):
+        try:
+            if message.delivery_info.get('routing_key', '') != publishers.CREATE_RK:
+                # Body is the cache key (older versions published the whole TokenDB)
+                key = body if isinstance(body, six.string_types) else AuthCache.get_key(body.token)
+                self._cache.invalidate(key)
+        except Exception:
+            LOG.exception('Failed to invalidate cached token.')
+        finally:
+            message.ack()
+
+    def process_api_key(self, body, message):
+        try:
+            if message.delivery_info.get('routing_key', '') != publishers.CREATE_RK:
+                self._cache.invalidate(body.key_hash)
+        except Exception:
+            LOG.exception('Failed to invalidate cached API key.')
+        finally:
+            message.ack()
+
+    def start(self):
+        try:
+            self.connection = Connection(transport_utils.get_messaging_urls())
+            self._updates_thread = eventlet.spawn(self.run)
+        except:
+            LOG.exception('Failed to start auth cache invalidator.')
+            self.connection.release()
+
+    def stop(self):
+        try:
+            if self._updates_thread is not None:
+                self._updates_thread = eventlet.kill(self._updates_thread)
+        finally:
+            if self.connection:
+                self.connection.release()
+
+    @staticmethod
+    def _get_queue(get_queue_func, queue_name_base, queue_suffix):
+        queue_name = queue_utils.get_queue_name(queue_name_base=queue_name_base,
+                                                queue_name_suffix=queue_suffix,
+                                                add_random_uuid_to_suffix=True)
+        return get_queue_func(queue_name, routing_key='#', exclusive=True)
+
+
+def get_auth_cache():
+    """
+    Return process wide auth cache. Invalidator is started the first time the cache is retrieved
+    (if caching is enabled).
+
+    :rtype: :class:`AuthCache`
+    """
+    global _AUTH_CACHE
+
+    if _AUTH_CACHE is None:
+        _AUTH_CACHE = AuthCache(ttl=cfg.CONF.auth.validation_cache_ttl,
+                                max_size=cfg.CONF.auth.validation_cache_max_size)
+
+        if _AUTH_CACHE.enabled:
+            AuthCacheInvalidator(cache=_AUTH_CACHE, queue_suffix='auth_cache').start()
+
+    return _AUTH_CACHE
@@ -29,6 +29,7 @@
 # limitations under the License.
 
 import six
+from mongoengine import ValidationError
 
 from st2common import log as logging
 from st2common.util import date as date_utils
@@ -118,6 +119,12 @@ def create_execution_object(liveaction, publish=True):
     parent = _get_parent_execution(liveaction)
     if parent:
         attrs['parent'] = str(parent.id)
+        # Note: Root id and depth are stored so the whole workflow tree can be retrieved using a
+        # single query (see get_descendants). Root id is not known if the parent is a nested
+        # execution which was created before root id was stored.
+        if parent.root or not parent.parent:
+            attrs['root'] = parent.root or str(parent.id)
+            attrs['depth'] = (parent.depth or 0) + 1
 
     attrs['log'] = [_create_execution_log_entry(liveaction['status'])]
 
@@ -238,24 +245,94 @@ def get_descendants(actionexecution_id, descendant_depth=-1, result_fmt=None):
     """
     Returns all descendant executions upto the specified descendant_depth for
     the supplied actionexecution_id.
+
+    Descendants of a top-level execution are retrieved using a single query on the root id and
+    depth of the executions and the tree is assembled in memory. Descendants of nested executions
+    and of workflows which contain executions created before root id and depth were stored are
+    retrieved level by level.
+    """
+    try:
+        execution = ActionExecution.get(id=actionexecution_id,
+                                        only_fields=['id', 'parent', 'children', 'root', 'depth'])
+    except ValidationError:
+        execution = None
+
+    if not execution:
+        return DESCENDANT_VIEWS.get(result_fmt, DFSDescendantView)().result
+
+    if not execution.children:
+        return DESCENDANT_VIEWS.get(result_fmt, DFSDescendantView)().result
+
+    if execution.parent:
+        return _get_descendants_by_level(actionexecution_id=actionexecution_id,
+                                         descendant_depth=descendant_depth,
+                                         result_fmt=result_fmt)
+
+    filters = {'root': str(execution.id), 'depth__gt': 0}
+    if descendant_depth > 0:
+        filters['depth__lte'] = descendant_depth
+
+    executions = ActionExecution.query(order_by=['start_timestamp'], **filters)
+    LOG.debug('Found %s executions for root id %s.', len(executions), actionexecution_id)
+
+    if not _is_complete_tree(execution=execution, executions=executions,
+                             descendant_depth=descendant_depth):
+        LOG.debug('Executions without root id found in the tree of %s.', actionexecution_id)
+        return _get_descendants_by_level(actionexecution_id=actionexecution_id,
+                                         descendant_depth=descendant_depth,
+                                         result_fmt=result_fmt)
+
+    return _get_descendants_view(actionexecution_id=actionexecution_id, executions=executions,
+                                 result_fmt=result_fmt)
+
+
+def _is_complete_tree(execution, executions, descendant_depth=-1):
+    """
+    Return True if all the children referenced by the provided top-level execution and the
+    retrieved descendants (upto the descendant_depth) are present in the executions.
     """
+    execution_ids = set([str(child.id) for child in executions])
+    child_ids = set(execution.children)
+
+    for child in executions:
+        if descendant_depth > 0 and child.depth >= descendant_depth:
+            continue
+        child_ids.update(child.children)
+
+    return child_ids.issubset(execution_ids)
+
+
+def _get_descendants_by_level(actionexecution_id, descendant_depth=-1, result_fmt=None):
+    """
+    Retrieve descendants of the provided execution using one query per level of the tree.
+    """
+    executions = []
+    parent_ids = [actionexecution_id]
+    level = 0
+
+    while parent_ids and (descendant_depth <= 0 or level < descendant_depth):
+        children = ActionExecution.query(parent__in=parent_ids,
+                                         **{'order_by': ['start_timestamp']})
+        LOG.debug('Found %s children for ids %s.', len(children), parent_ids)
+        executions.extend(children)
+        parent_ids = [str(child.id) for child in children if child.children]
+        level += 1
+
+    return _get_descendants_view(actionexecution_id=actionexecution_id, executions=executions,
+                                 result_fmt=result_fmt)
+
+
+def _get_descendants_view(actionexecution_id, executions, result_fmt=None):
+    children_by_parent = {}
+    for child in executions:
+        children_by_parent.setdefault(child.parent, []).append(child)
+
     descendants = DESCENDANT_VIEWS.get(result_fmt, DFSDescendantView)()
-    children = ActionExecution.query(parent=actionexecution_id,
-                                     **{'order_by': ['start_timestamp']})
-    LOG.debug('Found %s children for id %s.', len(children), actionexecution_id)
-    current_level = [(child, 1) for child in children]
+    current_level = list(children_by_parent.get(actionexecution_id, []))
 
     while current_level:
-        parent, level = current_level.pop(0)
-        parent_id = str(parent.id)
+        parent = current_level.pop(0)
         descendants.add(parent)
-        if not parent.children:
-            continue
-        if level != -1 and level == descendant_depth:
-            continue
-        children = ActionExecution.query(parent=parent_id, **{'order_by': ['start_timestamp']})
-        LOG.debug('Found %s children for id %s.', len(children), parent_id)
         # prepend for DFS
-        for idx in range(len(children)):
-            current_level.insert(idx, (children[idx], level + 1))
+        current_level[0:0] = children_by_parent.get(str(parent.id), [])
     return descendants.result
@@ -0,0 +1,186 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Watcher which allows green threads to wait for a LiveAction to complete without polling the
+database.
+
+Completion is detected by consuming LiveAction update messages from the liveaction exchange.
+Callers should still periodically check the database since a message could be lost (e.g. if it
+was published before the watcher queue was bound).
+"""
+
+import eventlet
+from eventlet.event import Event
+from kombu.mixins import ConsumerMixin
+from kombu import Connection
+
+from st2common import log as logging
+from st2common.constants.action import LIVEACTION_COMPLETED_STATES
+from st2common.transport import liveaction, publishers
+from st2common.transport import serializers
+from st2common.transport import utils as transport_utils
+import st2common.util.queues as queue_utils
+
+__all__ = [
+    'LiveActionWatcher',
+
+    'get_watcher'
+]
+
+LOG = logging.getLogger(__name__)
+
+_watcher = None
+
+
+class LiveActionWatcher(ConsumerMixin):
+
+    def __init__(self, queue_suffix=None):
+        self._liveaction_watcher_q = self._get_queue(queue_suffix)
+
+        # Maps LiveAction id to a list of events waiting for that LiveAction to complete
+        self._waiters = {}
+
+        self.connection = None
+        self._updates_thread = None
+
+    def get_consumers(self, Consumer, channel):
+        consumers = [Consumer(queues=[self._liveaction_watcher_q],
+                              accept=serializers.ACCEPT_CONTENT,
+                              callbacks=[self.process_task])]
+        return consumers
+
+    def process_task(self, body, message):
+        try:
+            status = getattr(body, 'status', None)
+
+            if status in LIVEACTION_COMPLETED_STATES:
+                self.notify(liveaction_db=body)
+        except Exception as e:
+            LOG.exception('Handling failed. Message body: %s. Exception: %s', body, str(e))
+        finally:
+            message.ack()
+
+    def notify(self, liveaction_db):
+        """
+        Wake up all the green threads waiting for the provided LiveAction to complete.
+
+        :param liveaction_db: Completed LiveAction.
+        :type liveaction_db: :class:`LiveActionDB`
+        """
+        waiters = self._waiters.pop(str(liveaction_db.id), [])
+
+        for event in waiters:
+            if not event.ready():
+                event.send(liveaction_db)
+
+        return len(waiters)
+
+    def register(self, liveaction_id):
+        """
+        Register a waiter for the provided LiveAction.
+
+        Callers should register the waiter before checking the current LiveAction status in the
+        database, otherwise a completion message which arrives in between is missed.
+
+        :param liveaction_id: ID of the LiveAction to wait for.
+        :type liveaction_id: ``str``
+
+        :rtype: :class:`eventlet.event.Event`
+        """
+        event = Event()
+        self._waiters.setdefault(str(liveaction_id), []).append(event)
+        return event
+
+    def unregister(self, liveaction_id, event):
+        liveaction_id = str(liveaction_id)
+        waiters = self._waiters.get(liveaction_id, [])
+
+        if event in waiters:
+            waiters.remove(event)
+
+        if not waiters:
+            self._waiters.pop(liveaction_id, None)
+
+    def wait(self, liveaction_id, timeout=None, event=None):
+        """
+        Block the current green thread until the provided LiveAction completes or timeout is
+        reached.
+
+        :param liveaction_id: ID of the LiveAction to wait for.
+        :type liveaction_id: ``str``
+
+        :param timeout: Maximum number of seconds to wait.
+        :type timeout: ``float``
+
+        :param event: Waiter returned by :meth:`register`. If not provided, a new waiter is
+                      registered for the duration of this call.
+        :type event: :class:`eventlet.event.Event`
+
+        :return: Completed LiveAction or None if the timeout has been reached.
+        :rtype: :class:`LiveActionDB`
+        """
+        registered = event is None
+
+        if registered:
+            event = self.register(liveaction_id)
+
+        try:
+            with eventlet.Timeout(timeout, False):
+                return event.wait()
+
+            return None
+        finally:
+            if registered:
+                self.unregister(liveaction_id, event)
+
+    def start(self):
+        try:
+            self.connection = Connection(transport_utils.get_messaging_urls())
+            self._updates_thread = eventlet.spawn(self.run)
+        except:
+            LOG.exception('Failed to start liveaction_watcher.')
+
+            if self.connection:
+                self.connection.release()
+
+    def stop(self):
+        try:
+            if self._updates_thread:
+                self._updates_thread = eventlet.kill(self._updates_thread)
+        finally:
+            if self.connection:
+                self.connection.release()
+
+    @staticmethod
+    def _get_queue(queue_suffix):
+        queue_name = queue_utils.get_queue_name(queue_name_base='st2.liveaction.watch',
+                                                queue_name_suffix=queue_suffix,
+                                                add_random_uuid_to_suffix=True
+                                                )
+        return liveaction.get_queue(queue_name, routing_key=publishers.UPDATE_RK, exclusive=True)
+
+
+def get_watcher():
+    """
+    Return a process wide LiveActionWatcher instance, starting it on first use.
+
+    :rtype: :class:`LiveActionWatcher`
+    """
+    global _watcher
+    if not _watcher:
+        _watcher = LiveActionWatcher(queue_suffix='waiter')
+        _watcher.start()
+    return _watcher
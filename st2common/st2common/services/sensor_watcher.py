@@ -23,6 +23,7 @@ from kombu import Connection
 
 from st2common import log as logging
 from st2common.transport import reactor, publishers
+from st2common.transport import serializers
 from st2common.transport import utils as transport_utils
 import st2common.util.queues as queue_utils
 
@@ -60,7 +61,7 @@ class SensorWatcher(ConsumerMixin):
 
     def get_consumers(self, Consumer, channel):
         consumers = [Consumer(queues=[self._sensor_watcher_q],
-                              accept=['pickle'],
+                              accept=serializers.ACCEPT_CONTENT,
                               callbacks=[self.process_task])]
         return consumers
 
@@ -28,5 +28,5 @@ class ActionExecutionStatePublisher(publishers.CUDPublisher):
         super(ActionExecutionStatePublisher, self).__init__(urls, ACTIONEXECUTIONSTATE_XCHG)
 
 
-def get_queue(name, routing_key):
-    return Queue(name, ACTIONEXECUTIONSTATE_XCHG, routing_key=routing_key)
+def get_queue(name, routing_key, exclusive=False):
+    return Queue(name, ACTIONEXECUTIONSTATE_XCHG, routing_key=routing_key, exclusive=exclusive)
@@ -0,0 +1,58 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from kombu import Exchange, Queue
+
+from st2common.transport import publishers
+
+__all__ = [
+    'TokenCUDPublisher',
+    'ApiKeyCUDPublisher',
+
+    'get_token_cud_queue',
+    'get_api_key_cud_queue'
+]
+
+# Exchange for Token CUD events
+TOKEN_CUD_XCHG = Exchange('st2.token', type='topic')
+
+# Exchange for ApiKey CUD events
+API_KEY_CUD_XCHG = Exchange('st2.apikey', type='topic')
+
+
+class TokenCUDPublisher(publishers.CUDPublisher):
+    """
+    Publisher responsible for publishing Token model CUD events.
+    """
+
+    def __init__(self, urls):
+        super(TokenCUDPublisher, self).__init__(urls, TOKEN_CUD_XCHG)
+
+
+class ApiKeyCUDPublisher(publishers.CUDPublisher):
+    """
+    Publisher responsible for publishing ApiKey model CUD events.
+    """
+
+    def __init__(self, urls):
+        super(ApiKeyCUDPublisher, self).__init__(urls, API_KEY_CUD_XCHG)
+
+
+def get_token_cud_queue(name, routing_key, exclusive=False):
+    return Queue(name, TOKEN_CUD_XCHG, routing_key=routing_key, exclusive=exclusive)
+
+
+def get_api_key_cud_queue(name, routing_key, exclusive=False):
+    return Queue(name, API_KEY_CUD_XCHG, routing_key=routing_key, exclusive=exclusive)
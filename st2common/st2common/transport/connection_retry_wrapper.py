@@ -97,7 +97,7 @@ class ConnectionRetryWrapper(object):
     def errback(self, exc, interval):
         self._logger.error('Rabbitmq connection error: %s', exc.message)
 
-    def run(self, connection, wrapped_callback):
+    def run(self, connection, wrapped_callback, use_default_channel=False):
         """
         Run the wrapped_callback in a protective covering of retries and error handling.
 
@@ -107,12 +107,20 @@ class ConnectionRetryWrapper(object):
         :param wrapped_callback: Callback that will be wrapped by all the fine handling in this
                                  method. Expected signature of callback -
                                  ``def func(connection, channel)``
+
+        :param use_default_channel: True to use the long-lived default channel of the connection
+                                    instead of opening (and closing) a new channel. Default
+                                    channel is re-created when connection is re-established.
+        :type use_default_channel: ``bool``
         """
         should_stop = False
         channel = None
         while not should_stop:
             try:
-                channel = connection.channel()
+                if use_default_channel:
+                    channel = connection.default_channel
+                else:
+                    channel = connection.channel()
                 wrapped_callback(connection=connection, channel=channel)
                 should_stop = True
             except connection.connection_errors + connection.channel_errors as e:
@@ -143,7 +151,7 @@ class ConnectionRetryWrapper(object):
                 # Not being able to publish a message could be a significant issue for an app.
                 raise
             finally:
-                if should_stop and channel:
+                if should_stop and channel and not use_default_channel:
                     try:
                         channel.close()
                     except Exception:
@@ -18,8 +18,11 @@ import eventlet
 import six
 
 from kombu.mixins import ConsumerMixin
+from oslo_config import cfg
 
 from st2common import log as logging
+from st2common.metrics import base as metrics
+from st2common.transport import serializers
 from st2common.util.greenpooldispatch import BufferedDispatcher
 
 
@@ -29,15 +32,21 @@ LOG = logging.getLogger(__name__)
 class QueueConsumer(ConsumerMixin):
     def __init__(self, connection, queues, handler):
         self.connection = connection
-        self._dispatcher = BufferedDispatcher()
+        # Note: If buffer size is limited, consumer stops receiving new messages while the buffer
+        # is full
+        handler_name = handler.__class__.__name__
+        self._dispatcher = BufferedDispatcher(buffer_size=cfg.CONF.messaging.consumer_buffer_size,
+                                              name=handler_name)
         self._queues = queues
         self._handler = handler
+        self._metrics_prefix = metrics.format_key('messaging', 'consumer', handler_name)
 
     def shutdown(self):
         self._dispatcher.shutdown()
 
     def get_consumers(self, Consumer, channel):
-        consumer = Consumer(queues=self._queues, accept=['pickle'], callbacks=[self.process])
+        consumer = Consumer(queues=self._queues, accept=serializers.ACCEPT_CONTENT,
+                            callbacks=[self.process])
 
         # use prefetch_count=1 for fair dispatch. This way workers that finish an item get the next
         # task and the work does not get queued behind any single large item.
@@ -46,6 +55,8 @@ class QueueConsumer(ConsumerMixin):
         return [consumer]
 
     def process(self, body, message):
+        metrics.inc_counter(self._metrics_prefix + '.received')
+
         try:
             if not isinstance(body, self._handler.message_type):
                 raise TypeError('Received an unexpected type "%s" for payload.' % type(body))
@@ -59,7 +70,8 @@ class QueueConsumer(ConsumerMixin):
 
     def _process_message(self, body):
         try:
-            self._handler.process(body)
+            with metrics.Timer(self._metrics_prefix + '.process'):
+                self._handler.process(body)
         except:
             LOG.exception('%s failed to process message: %s', self.__class__.__name__, body)
 
@@ -70,6 +82,8 @@ class StagedQueueConsumer(QueueConsumer):
     """
 
     def process(self, body, message):
+        metrics.inc_counter(self._metrics_prefix + '.received')
+
         try:
             if not isinstance(body, self._handler.message_type):
                 raise TypeError('Received an unexpected type "%s" for payload.' % type(body))
@@ -82,6 +96,65 @@ class StagedQueueConsumer(QueueConsumer):
             message.ack()
 
 
+class BatchedQueueConsumer(QueueConsumer):
+    """
+    Used by ``BatchedMessageHandler`` to pass messages to the handler in batches.
+
+    Batch is processed once it contains batch_size messages or once batch_linger seconds have
+    passed since the first message in the batch has been received, whatever comes first.
+    """
+
+    def __init__(self, connection, queues, handler, batch_size, batch_linger):
+        super(BatchedQueueConsumer, self).__init__(connection, queues, handler)
+        self._batch_size = batch_size
+        self._batch_linger = batch_linger
+        self._batch = []
+        self._flush_timer = None
+
+    def shutdown(self):
+        self._flush_batch()
+        super(BatchedQueueConsumer, self).shutdown()
+
+    def process(self, body, message):
+        metrics.inc_counter(self._metrics_prefix + '.received')
+
+        try:
+            if not isinstance(body, self._handler.message_type):
+                raise TypeError('Received an unexpected type "%s" for payload.' % type(body))
+
+            self._batch.append(body)
+
+            if len(self._batch) >= self._batch_size:
+                self._flush_batch()
+            elif self._flush_timer is None:
+                # Note: Green thread which hasn't started yet evaluates to False
+                self._flush_timer = eventlet.spawn_after(self._batch_linger, self._flush_batch)
+        except:
+            LOG.exception('%s failed to process message: %s', self.__class__.__name__, body)
+        finally:
+            # At this point we will always ack a message.
+            message.ack()
+
+    def _flush_batch(self):
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+        batch = self._batch
+        self._batch = []
+
+        if batch:
+            self._dispatcher.dispatch(self._process_messages, batch)
+
+    def _process_messages(self, bodies):
+        try:
+            with metrics.Timer(self._metrics_prefix + '.process_batch'):
+                self._handler.process_batch(bodies)
+        except:
+            LOG.exception('%s failed to process %s messages.', self.__class__.__name__,
+                          len(bodies))
+
+
 @six.add_metaclass(abc.ABCMeta)
 class MessageHandler(object):
     message_type = None
@@ -137,3 +210,36 @@ class StagedMessageHandler(MessageHandler):
 
     def _get_queue_consumer(self, connection, queues):
         return StagedQueueConsumer(connection, queues, self)
+
+
+@six.add_metaclass(abc.ABCMeta)
+class BatchedMessageHandler(MessageHandler):
+    """
+    MessageHandler which processes messages in batches. This allows handler to amortize the cost
+    of database queries and other operations over multiple messages.
+
+    If batch_size is 1, each message is processed as soon as it's received.
+    """
+
+    def __init__(self, connection, queues, batch_size=1, batch_linger=0):
+        self._batch_size = batch_size
+        self._batch_linger = batch_linger
+        super(BatchedMessageHandler, self).__init__(connection, queues)
+
+    def process(self, message):
+        return self.process_batch([message])
+
+    @abc.abstractmethod
+    def process_batch(self, messages):
+        """
+        Process a list of messages. Messages are ordered in the same order in which they have
+        been received.
+        """
+        pass
+
+    def _get_queue_consumer(self, connection, queues):
+        if self._batch_size <= 1:
+            return QueueConsumer(connection, queues, self)
+
+        return BatchedQueueConsumer(connection, queues, self, batch_size=self._batch_size,
+                                    batch_linger=self._batch_linger)
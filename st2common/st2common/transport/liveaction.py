@@ -30,8 +30,8 @@ class LiveActionPublisher(publishers.CUDPublisher, publishers.StatePublisherMixi
         publishers.StatePublisherMixin.__init__(self, urls, LIVEACTION_STATUS_MGMT_XCHG)
 
 
-def get_queue(name, routing_key):
-    return Queue(name, LIVEACTION_XCHG, routing_key=routing_key)
+def get_queue(name, routing_key, exclusive=False):
+    return Queue(name, LIVEACTION_XCHG, routing_key=routing_key, exclusive=exclusive)
 
 
 def get_status_management_queue(name, routing_key):
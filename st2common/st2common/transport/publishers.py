@@ -14,12 +14,18 @@
 # limitations under the License.
 
 import copy
+import socket
+import time
 
 from kombu import Connection
+from kombu import serialization
 from kombu.messaging import Producer
+from oslo_config import cfg
 
 from st2common import log as logging
+from st2common.metrics import base as metrics
 from st2common.transport.connection_retry_wrapper import ConnectionRetryWrapper
+from st2common.transport import serializers  # noqa - registers the compact serializer
 
 ANY_RK = '*'
 CREATE_RK = 'create'
@@ -29,36 +35,218 @@ DELETE_RK = 'delete'
 LOG = logging.getLogger(__name__)
 
 
+class PublisherConfirms(object):
+    """
+    Keeps track of the publisher confirms (RabbitMQ extension) for a channel so confirmations for
+    multiple published messages can be awaited at once instead of after each message.
+    """
+
+    # Basic.Ack and Basic.Nack methods
+    CONFIRM_METHODS = [(60, 80), (60, 120)]
+
+    def __init__(self, channel):
+        self.channel = channel
+
+        # Delivery tag of the last published message (tags are assigned by the broker
+        # sequentially, starting with 1, once the channel is put in the confirm mode)
+        self._delivery_tag = 0
+        self._pending = set()
+        self._nacked = 0
+
+        channel.events['basic_ack'].add(self._on_ack)
+        channel.events['basic_nack'].add(self._on_nack)
+        channel.confirm_select()
+
+    def add_published(self):
+        self._delivery_tag += 1
+        self._pending.add(self._delivery_tag)
+
+    def wait(self, timeout=None):
+        """
+        Wait until all the published messages are confirmed by the broker.
+
+        :param timeout: Maximum time (in seconds) to wait for the confirmations. Messages which
+                        are not confirmed in time are treated as rejected.
+        :type timeout: ``float``
+
+        :return: Number of messages which were rejected (nacked) by the broker or not confirmed
+                 in time.
+        :rtype: ``int``
+        """
+        deadline = time.time() + timeout if timeout else None
+
+        while self._pending:
+            remaining = deadline - time.time() if deadline else None
+
+            if remaining is not None and remaining <= 0:
+                LOG.warning('%s published messages have not been confirmed in %s seconds.',
+                            len(self._pending), timeout)
+                self._nacked += len(self._pending)
+                self._pending.clear()
+                break
+
+            kwargs = {'timeout': remaining} if remaining is not None else {}
+
+            try:
+                self.channel.wait(allowed_methods=self.CONFIRM_METHODS, **kwargs)
+            except socket.timeout:
+                continue
+
+        nacked = self._nacked
+        self._nacked = 0
+        return nacked
+
+    def _on_ack(self, delivery_tag, multiple):
+        self._confirm(delivery_tag=delivery_tag, multiple=multiple)
+
+    def _on_nack(self, delivery_tag, multiple):
+        self._nacked += self._confirm(delivery_tag=delivery_tag, multiple=multiple)
+
+    def _confirm(self, delivery_tag, multiple):
+        if multiple:
+            confirmed = set([tag for tag in self._pending if tag <= delivery_tag])
+        else:
+            confirmed = self._pending.intersection([delivery_tag])
+
+        self._pending -= confirmed
+        return len(confirmed)
+
+
 class PoolPublisher(object):
     def __init__(self, urls):
-        self.pool = Connection(urls, failover_strategy='round-robin').Pool(limit=10)
+        pool_size = cfg.CONF.messaging.connection_pool_size
+        self.pool = Connection(urls, failover_strategy='round-robin').Pool(limit=pool_size)
         self.cluster_size = len(urls)
+        self.publisher_confirms = cfg.CONF.messaging.publisher_confirms
+        self.publisher_confirms_timeout = cfg.CONF.messaging.publisher_confirms_timeout
+        self.serializer = cfg.CONF.messaging.serializer
+        self.compression_threshold = cfg.CONF.messaging.compression_threshold
+
+        # Maps pooled connection to a producer bound to the long-lived default channel of that
+        # connection. Connection (and as such, the producer) is only used by a single green
+        # thread at a time (the one which has acquired it from the pool) so producers can be
+        # reused without any additional locking.
+        self._producers = {}
+
+        # Maps pooled connection to PublisherConfirms for the default channel of that connection
+        self._confirms = {}
 
     def errback(self, exc, interval):
         LOG.error('Rabbitmq connection error: %s', exc.message, exc_info=False)
 
     def publish(self, payload, exchange, routing_key=''):
+        self.publish_many(payloads=[payload], exchange=exchange, routing_key=routing_key)
+
+    def publish_many(self, payloads, exchange, routing_key=''):
+        """
+        Publish multiple messages using a single connection and producer.
+
+        If publisher confirms are enabled, confirmations are awaited once for all the messages.
+        """
+        metrics_prefix = metrics.format_key('messaging', 'publisher',
+                                            getattr(exchange, 'name', exchange))
+        metrics.inc_counter(metrics_prefix + '.published', len(payloads))
+
+        with metrics.Timer(metrics_prefix + '.publish'):
+            self._publish_many(payloads=payloads, exchange=exchange, routing_key=routing_key)
+
+    def _publish_many(self, payloads, exchange, routing_key):
+        # Note: Messages are serialized (and compressed) only once, before any retries
+        messages = [self._serialize(payload=payload) for payload in payloads]
+
         with self.pool.acquire(block=True) as connection:
             retry_wrapper = ConnectionRetryWrapper(cluster_size=self.cluster_size, logger=LOG)
+            # Number of messages which have already been published. Used so the messages which
+            # have been published before a connection failure are not published again on retry.
+            published = [0]
 
             def do_publish(connection, channel):
-                # ProducerPool ends up creating it own ConnectionPool which ends up completely
-                # invalidating this ConnectionPool. Also, a ConnectionPool for producer does not
-                # really solve any problems for us so better to create a Producer for each
-                # publish.
-                producer = Producer(channel)
-                kwargs = {
-                    'body': payload,
-                    'exchange': exchange,
-                    'routing_key': routing_key,
-                    'serializer': 'pickle'
-                }
-                retry_wrapper.ensured(connection=connection,
-                                      obj=producer,
-                                      to_ensure_func=producer.publish,
-                                      **kwargs)
-
-            retry_wrapper.run(connection=connection, wrapped_callback=do_publish)
+                producer = self._get_producer(connection=connection, channel=channel)
+
+                def publish_message(**kwargs):
+                    # Note: Channel needs to be put in the confirm mode before the first message
+                    # is published on it (channel can change when the producer is revived)
+                    confirms = None
+                    if self.publisher_confirms:
+                        confirms = self._get_confirms(connection=connection,
+                                                      channel=producer.channel)
+
+                    producer.publish(**kwargs)
+
+                    if confirms:
+                        confirms.add_published()
+
+                for message in messages[published[0]:]:
+                    kwargs = {
+                        'exchange': exchange,
+                        'routing_key': routing_key
+                    }
+                    kwargs.update(message)
+                    retry_wrapper.ensured(connection=connection,
+                                          obj=producer,
+                                          to_ensure_func=publish_message,
+                                          **kwargs)
+                    published[0] += 1
+
+                if self.publisher_confirms:
+                    self._wait_for_confirms(connection=connection, channel=producer.channel)
+
+            retry_wrapper.run(connection=connection, wrapped_callback=do_publish,
+                              use_default_channel=True)
+
+    def _serialize(self, payload):
+        """
+        Serialize the payload using the configured serializer and compress it if it's larger
+        than the compression threshold.
+
+        :return: Producer.publish keyword arguments.
+        :rtype: ``dict``
+        """
+        content_type, content_encoding, body = serialization.dumps(payload,
+                                                                   serializer=self.serializer)
+        result = {
+            'body': body,
+            'content_type': content_type,
+            'content_encoding': content_encoding
+        }
+
+        if self.compression_threshold > 0 and len(body) >= self.compression_threshold:
+            result['compression'] = 'zlib'
+
+        return result
+
+    def _get_producer(self, connection, channel):
+        """
+        Retrieve producer for the provided connection. New producer is only created if the
+        channel has changed (e.g. connection has been re-established).
+
+        Note: Exchanges are declared when the service starts (see "register_exchanges") so the
+        producer doesn't declare anything.
+        """
+        producer = self._producers.get(connection, None)
+
+        if not producer or producer.channel is not channel:
+            producer = Producer(channel, auto_declare=False)
+            self._producers[connection] = producer
+
+        return producer
+
+    def _get_confirms(self, connection, channel):
+        confirms = self._confirms.get(connection, None)
+
+        if not confirms or confirms.channel is not channel:
+            confirms = PublisherConfirms(channel=channel)
+            self._confirms[connection] = confirms
+
+        return confirms
+
+    def _wait_for_confirms(self, connection, channel):
+        confirms = self._get_confirms(connection=connection, channel=channel)
+        nacked = confirms.wait(timeout=self.publisher_confirms_timeout)
+
+        if nacked:
+            LOG.error('%s published messages have been rejected by the messaging server.',
+                      nacked)
 
 
 class SharedPoolPublishers(object):
@@ -0,0 +1,46 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from kombu import Exchange, Queue
+
+from st2common.transport import publishers
+
+__all__ = [
+    'RBACChangePublisher',
+
+    'get_rbac_change_queue'
+]
+
+# Exchange for RBAC definitions change events
+RBAC_XCHG = Exchange('st2.rbac', type='topic')
+
+CHANGE_RK = 'change'
+
+
+class RBACChangePublisher(object):
+    """
+    Publisher responsible for publishing events which indicate that roles, role assignments or
+    permission grants have changed.
+    """
+
+    def __init__(self, urls):
+        self._publisher = publishers.SharedPoolPublishers().get_publisher(urls=urls)
+
+    def publish_change(self, payload=None):
+        self._publisher.publish(payload or {}, RBAC_XCHG, CHANGE_RK)
+
+
+def get_rbac_change_queue(name, routing_key, exclusive=False):
+    return Queue(name, RBAC_XCHG, routing_key=routing_key, exclusive=exclusive)
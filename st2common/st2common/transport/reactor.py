@@ -13,10 +13,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import eventlet
 from kombu import Exchange, Queue
 
 from st2common import log as logging
 from st2common.constants.trace import TRACE_CONTEXT
+from st2common.exceptions.triggers import TriggerBufferFullException
 from st2common.models.api.trace import TraceContext
 from st2common.transport import publishers
 from st2common.transport import utils as transport_utils
@@ -26,6 +28,7 @@ __all__ = [
     'TriggerInstancePublisher',
 
     'TriggerDispatcher',
+    'BufferedTriggerDispatcher',
 
     'get_sensor_cud_queue',
     'get_trigger_cud_queue',
@@ -70,6 +73,9 @@ class TriggerInstancePublisher(object):
         # TODO: We should use trigger reference as a routing key
         self._publisher.publish(payload, TRIGGER_INSTANCE_XCHG, routing_key)
 
+    def publish_triggers(self, payloads=None, routing_key=None):
+        self._publisher.publish_many(payloads or [], TRIGGER_INSTANCE_XCHG, routing_key)
+
 
 class TriggerDispatcher(object):
     """
@@ -93,18 +99,138 @@ class TriggerDispatcher(object):
         :param trace_context: Trace context to associate with Trigger.
         :type trace_context: ``TraceContext``
         """
+        payload = self._get_message(trigger=trigger, payload=payload,
+                                    trace_context=trace_context)
+        routing_key = 'trigger_instance'
+
+        self._logger.debug('Dispatching trigger (trigger=%s,payload=%s)', trigger, payload)
+        self._publisher.publish_trigger(payload=payload, routing_key=routing_key)
+
+    def dispatch_many(self, triggers):
+        """
+        Method which dispatches multiple triggers at once.
+
+        :param triggers: List of (trigger, payload, trace_context) tuples.
+        :type triggers: ``list``
+        """
+        payloads = [self._get_message(trigger=trigger, payload=payload,
+                                      trace_context=trace_context)
+                    for (trigger, payload, trace_context) in triggers]
+        routing_key = 'trigger_instance'
+
+        self._logger.debug('Dispatching %s triggers', len(payloads))
+        self._publisher.publish_triggers(payloads=payloads, routing_key=routing_key)
+
+    def _get_message(self, trigger, payload, trace_context):
         assert isinstance(payload, (type(None), dict))
         assert isinstance(trace_context, (type(None), TraceContext))
 
-        payload = {
+        return {
             'trigger': trigger,
             'payload': payload,
             TRACE_CONTEXT: trace_context
         }
-        routing_key = 'trigger_instance'
 
-        self._logger.debug('Dispatching trigger (trigger=%s,payload=%s)', trigger, payload)
-        self._publisher.publish_trigger(payload=payload, routing_key=routing_key)
+
+class BufferedTriggerDispatcher(object):
+    """
+    Trigger dispatcher which puts triggers in a bounded in-memory buffer and publishes them in
+    batches from a background green thread so the caller doesn't need to wait for the message
+    bus.
+
+    When the buffer is full, TriggerBufferFullException is raised so the caller can signal
+    backpressure to its clients.
+    """
+
+    def __init__(self, logger=LOG, buffer_size=1000, batch_size=100, dispatcher=None):
+        self._logger = logger
+        self._buffer_size = buffer_size
+        self._batch_size = batch_size
+        self._dispatcher = dispatcher or TriggerDispatcher(logger=logger)
+
+        self._buffer = eventlet.queue.LightQueue(maxsize=buffer_size)
+        self._thread = None
+
+        # Batch which is currently being dispatched by the background thread
+        self._in_flight = []
+
+    def start(self):
+        if not self._thread:
+            self._thread = eventlet.spawn(self._run)
+
+    def stop(self):
+        """
+        Stop the background thread and publish all the remaining triggers.
+        """
+        if self._thread:
+            self._thread = eventlet.kill(self._thread)
+
+        # Batch which has been interrupted is dispatched again (triggers are delivered at least
+        # once)
+        triggers, self._in_flight = self._in_flight, []
+        if triggers:
+            self._dispatch_triggers(triggers)
+
+        # Publish the remaining triggers
+        while self._buffer.qsize():
+            self._dispatch_batch()
+
+    def dispatch(self, trigger, payload=None, trace_context=None):
+        self.dispatch_many([(trigger, payload, trace_context)])
+
+    def dispatch_many(self, triggers):
+        """
+        Put triggers in the buffer. Either all the triggers are buffered or none of them is.
+
+        :param triggers: List of (trigger, payload, trace_context) tuples.
+        :type triggers: ``list``
+
+        :raises: :class:`TriggerBufferFullException`
+        """
+        if self._buffer_size - self._buffer.qsize() < len(triggers):
+            raise TriggerBufferFullException('Trigger buffer is full (%s triggers).' %
+                                             (self._buffer.qsize()))
+
+        for trigger in triggers:
+            self._buffer.put_nowait(trigger)
+
+    def _run(self):
+        while True:
+            try:
+                self._dispatch_batch(block=True)
+            except Exception:
+                self._logger.exception('Failed to dispatch buffered triggers.')
+
+    def _dispatch_batch(self, block=False):
+        triggers = []
+
+        if block:
+            triggers.append(self._buffer.get())
+
+        while len(triggers) < self._batch_size and self._buffer.qsize():
+            triggers.append(self._buffer.get_nowait())
+
+        if not triggers:
+            return
+
+        # Note: Batch is not cleared if the thread is killed while dispatching it (stop)
+        self._in_flight = triggers
+        self._dispatch_triggers(triggers)
+        self._in_flight = []
+
+    def _dispatch_triggers(self, triggers):
+        try:
+            self._dispatcher.dispatch_many(triggers)
+            return
+        except Exception:
+            self._logger.exception('Failed to dispatch %s triggers at once, dispatching them one '
+                                   'by one.', len(triggers))
+
+        for (trigger, payload, trace_context) in triggers:
+            try:
+                self._dispatcher.dispatch(trigger, payload=payload, trace_context=trace_context)
+            except Exception:
+                self._logger.exception('Failed to dispatch trigger %s.', trigger)
 
 
 def get_trigger_cud_queue(name, routing_key, exclusive=False):
@@ -0,0 +1,178 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compact serializer for the messages which are published to the internal exchanges.
+
+Messages are serialized as JSON. Database models are serialized using the same representation
+as is used to store them in the database (``to_mongo``) so they can be restored without any loss
+of type information. Other internal objects (e.g. ``TraceContext``) are serialized field by field
+and only the types which are explicitly white listed can be restored. Values which can't be
+represented in this way are rejected - arbitrary objects are never pickled.
+
+User provided dictionaries which contain the type key are escaped so they can't be mistaken for
+an encoded object when the message is deserialized.
+
+Consumers accept messages serialized using pickle and using this serializer (content type is
+stored in the message) so the serializer used by the publishers can be changed without any
+downtime once all the consumers have been upgraded.
+"""
+
+import calendar
+import datetime
+import json
+
+import mongoengine as me
+import six
+from bson.objectid import ObjectId
+from kombu import serialization
+from mongoengine.base import get_document
+from mongoengine.errors import NotRegistered
+
+from st2common.models.api.trace import TraceContext
+from st2common.util import date as date_utils
+
+__all__ = [
+    'COMPACT_SERIALIZER',
+    'ACCEPT_CONTENT',
+
+    'dumps',
+    'loads'
+]
+
+COMPACT_SERIALIZER = 'st2json'
+COMPACT_CONTENT_TYPE = 'application/x-st2-json'
+
+# Serializers which are accepted by all the consumers
+ACCEPT_CONTENT = ['pickle', COMPACT_SERIALIZER]
+
+# Objects which can't be represented in JSON are encoded as {TYPE_KEY: <type>, VALUE_KEY: <value>}
+TYPE_KEY = '__st2_type__'
+VALUE_KEY = 'value'
+
+MODEL_TYPE = 'model'
+OBJECT_ID_TYPE = 'oid'
+DATETIME_TYPE = 'datetime'
+DATETIME_TZ_TYPE = 'datetime_tz'
+DICT_TYPE = 'dict'
+
+# Internal objects which are serialized field by field (type -> class). Constructor of the class
+# needs to accept all the instance attributes as keyword arguments. Only those types can be
+# restored when the message is deserialized.
+OBJECT_TYPES = {
+    'trace_context': TraceContext
+}
+
+JSON_TYPES = (six.string_types, bool, float, type(None)) + six.integer_types
+
+
+def dumps(value):
+    """
+    Serialize the provided value.
+
+    Note: Same as with JSON, tuples are serialized as lists and dictionary keys as strings.
+
+    :rtype: ``str``
+    """
+    return json.dumps(_encode_value(value), separators=(',', ':'))
+
+
+def loads(data):
+    return json.loads(data, object_hook=_decode_object)
+
+
+def _encode_value(value):
+    if isinstance(value, JSON_TYPES):
+        return value
+    elif isinstance(value, dict):
+        result = dict((key, _encode_value(item)) for key, item in six.iteritems(value))
+
+        if TYPE_KEY in result:
+            # Note: Items are stored as a list so the escaped dictionary itself is never passed
+            # to the object hook when the message is deserialized
+            return _encode_object(DICT_TYPE, [[key, item] for key, item in six.iteritems(result)])
+
+        return result
+    elif isinstance(value, (list, tuple)):
+        return [_encode_value(item) for item in value]
+    elif isinstance(value, me.Document):
+        return _encode_object(MODEL_TYPE, [value._class_name, _encode_value(value.to_mongo())])
+    elif isinstance(value, ObjectId):
+        return _encode_object(OBJECT_ID_TYPE, str(value))
+    elif isinstance(value, datetime.datetime):
+        # Note: Microseconds since the epoch are used to preserve the whole precision
+        value_type = DATETIME_TZ_TYPE if value.tzinfo else DATETIME_TYPE
+        encoded = calendar.timegm(value.utctimetuple()) * 1000000 + value.microsecond
+        return _encode_object(value_type, encoded)
+
+    for value_type, object_cls in six.iteritems(OBJECT_TYPES):
+        if type(value) is object_cls:
+            return _encode_object(value_type, _encode_value(vars(value)))
+
+    raise TypeError('Object of type "%s" is not serializable' % (type(value).__name__))
+
+
+def _encode_object(value_type, value):
+    return {TYPE_KEY: value_type, VALUE_KEY: value}
+
+
+def _decode_object(value):
+    if TYPE_KEY not in value:
+        return value
+
+    # Note: User provided dictionaries which contain the type key are always escaped so anything
+    # else is not a valid message
+    if len(value) != 2 or VALUE_KEY not in value:
+        raise ValueError('Invalid encoded object: %s' % (value))
+
+    value_type = value[TYPE_KEY]
+    encoded = value[VALUE_KEY]
+
+    if value_type == DICT_TYPE:
+        return dict(encoded)
+    elif value_type == MODEL_TYPE:
+        return _get_model_cls(encoded[0])._from_son(encoded[1])
+    elif value_type == OBJECT_ID_TYPE:
+        return ObjectId(encoded)
+    elif value_type in [DATETIME_TYPE, DATETIME_TZ_TYPE]:
+        seconds, microseconds = divmod(encoded, 1000000)
+        result = datetime.datetime.utcfromtimestamp(seconds).replace(microsecond=microseconds)
+
+        if value_type == DATETIME_TZ_TYPE:
+            result = date_utils.add_utc_tz(result)
+
+        return result
+    elif value_type in OBJECT_TYPES:
+        # Note: Fields are passed to the constructor so unknown fields are rejected
+        return OBJECT_TYPES[value_type](**encoded)
+
+    raise ValueError('Unsupported encoded object type: %s' % (value_type))
+
+
+def _get_model_cls(name):
+    try:
+        model_cls = get_document(name)
+    except NotRegistered:
+        model_cls = None
+
+    # Only top level documents can be published, embedded documents are part of their parents
+    if not model_cls or not issubclass(model_cls, me.Document):
+        raise ValueError('Unsupported model: %s' % (name))
+
+    return model_cls
+
+
+serialization.register(COMPACT_SERIALIZER, dumps, loads, content_type=COMPACT_CONTENT_TYPE,
+                       content_encoding='utf-8')
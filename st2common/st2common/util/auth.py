@@ -14,18 +14,23 @@
 # limitations under the License.
 
 import base64
+import datetime
 import hashlib
 import os
 import random
 
 from st2common import log as logging
+from st2common.models.db.auth import TokenDB
 from st2common.persistence.auth import Token, ApiKey
 from st2common.exceptions import auth as exceptions
+from st2common.services import access
 from st2common.util import date as date_utils
 from st2common.util import hash as hash_utils
+from st2common.util import signed_token
 
 __all__ = [
     'validate_token',
+    'validate_execution_token',
     'validate_token_and_source',
     'generate_api_key',
     'validate_api_key',
@@ -45,6 +50,9 @@ def validate_token(token_string):
     :return: TokenDB object on success.
     :rtype: :class:`.TokenDB`
     """
+    if signed_token.is_signed_token(token_string):
+        return validate_execution_token(token_string)
+
     token = Token.get(token_string)
 
     if token.expiry <= date_utils.get_datetime_utc_now():
@@ -57,6 +65,35 @@ def validate_token(token_string):
     return token
 
 
+def validate_execution_token(token_string):
+    """
+    Validate the provided signed execution token. Token is validated using the signing keys and
+    the cached revocation list without a database lookup.
+
+    :param token_string: Signed execution token provided.
+    :type token_string: ``str``
+
+    :return: TokenDB object (which is not stored in the database) on success.
+    :rtype: :class:`.TokenDB`
+    """
+    payload = signed_token.verify_token(token_string, keys=signed_token.get_signing_keys())
+    execution_id = payload['execution_id']
+    expiry = date_utils.add_utc_tz(datetime.datetime.utcfromtimestamp(payload['expiry']))
+
+    if expiry <= date_utils.get_datetime_utc_now():
+        LOG.audit('Token for execution "%s" has expired.' % (execution_id))
+        raise exceptions.TokenExpiredError('Token has expired.')
+
+    if access.is_execution_revoked(execution_id):
+        LOG.audit('Token for execution "%s" has been revoked.' % (execution_id))
+        raise exceptions.TokenExpiredError('Token has been revoked.')
+
+    LOG.audit('Token for execution "%s" is validated.' % (execution_id))
+
+    return TokenDB(user=payload['user'], token=token_string, expiry=expiry,
+                   metadata={'execution_id': execution_id})
+
+
 def validate_token_and_source(token_in_headers, token_in_query_params):
     """
     Validate the provided authentication token.
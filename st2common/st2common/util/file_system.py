@@ -20,11 +20,16 @@ File system related utility functions.
 import os
 import os.path
 import fnmatch
+import hashlib
 
 __all__ = [
-    'get_file_list'
+    'get_file_list',
+    'get_content_hash'
 ]
 
+# Maps local file path to a (size, mtime, sha256 digest) tuple
+_FILE_DIGEST_CACHE = {}
+
 
 def get_file_list(directory, exclude_patterns=None):
     """
@@ -69,3 +74,58 @@ def get_file_list(directory, exclude_patterns=None):
                 result.append(file_path)
 
     return result
+
+
+def get_content_hash(paths):
+    """
+    Calculate a hash of the content of the provided files and directories.
+
+    The hash covers both the file contents and the layout (relative file names) so it changes if
+    a file is renamed, added or removed. Digest of each file is cached by path, size and
+    modification time which means re-hashing unchanged files only costs a stat call.
+
+    :param paths: List of file and / or directory paths. Non-existent paths are ignored.
+    :type paths: ``list`` of ``str``
+
+    :return: Hex encoded sha256 digest.
+    :rtype: ``str``
+    """
+    result = hashlib.sha256()
+
+    for path in paths:
+        if not path or not os.path.exists(path):
+            continue
+
+        base_name = os.path.basename(os.path.normpath(path))
+
+        if os.path.isdir(path):
+            file_paths = sorted(get_file_list(directory=path))
+            file_paths = [(os.path.join(base_name, file_path), os.path.join(path, file_path))
+                          for file_path in file_paths]
+        else:
+            file_paths = [(base_name, path)]
+
+        for (relative_path, file_path) in file_paths:
+            result.update(relative_path.encode('utf-8'))
+            result.update(b'\0')
+            result.update(_get_file_digest(file_path=file_path).encode('utf-8'))
+            result.update(b'\0')
+
+    return result.hexdigest()
+
+
+def _get_file_digest(file_path):
+    stat = os.stat(file_path)
+
+    cached = _FILE_DIGEST_CACHE.get(file_path, None)
+    if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime:
+        return cached[2]
+
+    sha256 = hashlib.sha256()
+    with open(file_path, 'rb') as fp:
+        for chunk in iter(lambda: fp.read(64 * 1024), b''):
+            sha256.update(chunk)
+
+    digest = sha256.hexdigest()
+    _FILE_DIGEST_CACHE[file_path] = (stat.st_size, stat.st_mtime, digest)
+    return digest
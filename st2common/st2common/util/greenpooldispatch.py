@@ -13,39 +13,125 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import time
+
 import eventlet
-import Queue
+
+from st2common.metrics import base as metrics
+
+__all__ = [
+    'BufferedDispatcher'
+]
 
 
 class BufferedDispatcher(object):
+    """
+    Dispatches work items to a pool of green threads. Work items which can't be dispatched right
+    away (all the pool workers are busy) are put in a buffer.
+
+    Monitor thread blocks until there is an item in the buffer and a free worker in the pool so
+    buffered items are dispatched as soon as a worker becomes available.
+
+    If buffer size is limited, ``dispatch`` blocks while the buffer is full. This way the caller
+    (e.g. AMQP consumer) stops receiving new work until there is room for it.
+    """
+
+    def __init__(self, dispatch_pool_size=50, buffer_size=0, monitor_thread_empty_q_sleep_time=None,
+                 monitor_thread_no_workers_sleep_time=None, name=None):
+        """
+        :param buffer_size: Maximum number of buffered work items (0 means unlimited).
+        :type buffer_size: ``int``
+
+        :param name: Optional dispatcher name. If provided, dispatcher metrics are reported using
+                     the metrics driver (prefixed with "dispatcher.<name>").
+        :type name: ``str``
 
-    def __init__(self, dispatch_pool_size=50, monitor_thread_empty_q_sleep_time=5,
-                 monitor_thread_no_workers_sleep_time=1):
+        Note: "monitor_thread_*_sleep_time" arguments are not used anymore and are only accepted
+        for backward compatibility.
+        """
         self._pool_limit = dispatch_pool_size
         self._dispatcher_pool = eventlet.GreenPool(dispatch_pool_size)
+        self._work_buffer = eventlet.queue.LightQueue(maxsize=buffer_size or None)
+
+        # Number of work items which are waiting for a free worker (buffered items and the item
+        # which is held by the monitor thread)
+        self._queued = 0
+
+        # Number of work items which are currently being processed
+        self._in_flight = 0
+
+        # Number of dispatched work items and the total and maximum time (in seconds) work items
+        # have spent in the buffer
+        self._dispatched = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+
+        self._metrics_prefix = metrics.format_key('dispatcher', name) if name else None
+
         self._dispatch_monitor_thread = eventlet.greenthread.spawn(self._flush)
-        self._monitor_thread_empty_q_sleep_time = monitor_thread_empty_q_sleep_time
-        self._monitor_thread_no_workers_sleep_time = monitor_thread_no_workers_sleep_time
-        self._work_buffer = Queue.Queue()
 
     def dispatch(self, handler, *args):
-        self._work_buffer.put((handler, args), block=True, timeout=1)
-        self._flush_now()
+        now = time.time()
+
+        # Fast path - nothing is buffered and there is a free worker so the item can be
+        # dispatched right away
+        if not self._queued and self._dispatcher_pool.free() > 0:
+            self._spawn(handler, args, now)
+            return
+
+        self._queued += 1
+        self._work_buffer.put((handler, args, now), block=True)
 
     def shutdown(self):
         self._dispatch_monitor_thread.kill()
 
+    def get_stats(self):
+        """
+        Return dispatcher metrics.
+
+        :rtype: ``dict``
+        """
+        dispatched = self._dispatched
+
+        return {
+            'queue_size': self._queued,
+            'in_flight': self._in_flight,
+            'dispatched': dispatched,
+            'wait_time_avg': (self._wait_time_total / dispatched) if dispatched else 0.0,
+            'wait_time_max': self._wait_time_max
+        }
+
     def _flush(self):
         while True:
-            while self._work_buffer.empty():
-                eventlet.greenthread.sleep(self._monitor_thread_empty_q_sleep_time)
-            while self._dispatcher_pool.free() <= 0:
-                eventlet.greenthread.sleep(self._monitor_thread_no_workers_sleep_time)
-            self._flush_now()
-
-    def _flush_now(self):
-        if self._dispatcher_pool.free() <= 0:
-            return
-        while not self._work_buffer.empty() and self._dispatcher_pool.free() > 0:
-            (handler, args) = self._work_buffer.get_nowait()
-            self._dispatcher_pool.spawn(handler, *args)
+            # Note: Both calls block - first until there is a buffered item and then until there
+            # is a free worker in the pool
+            (handler, args, queued_at) = self._work_buffer.get(block=True)
+            self._spawn(handler, args, queued_at)
+            self._queued -= 1
+
+    def _spawn(self, handler, args, queued_at):
+        self._dispatcher_pool.spawn(self._run, handler, args, queued_at)
+
+    def _run(self, handler, args, queued_at):
+        wait_time = time.time() - queued_at
+
+        self._in_flight += 1
+        self._dispatched += 1
+        self._wait_time_total += wait_time
+        self._wait_time_max = max(self._wait_time_max, wait_time)
+
+        if self._metrics_prefix:
+            metrics.timing(self._metrics_prefix + '.wait_time', wait_time)
+            self._report_gauges()
+
+        try:
+            handler(*args)
+        finally:
+            self._in_flight -= 1
+
+            if self._metrics_prefix:
+                self._report_gauges()
+
+    def _report_gauges(self):
+        metrics.set_gauge(self._metrics_prefix + '.queue_size', self._queued)
+        metrics.set_gauge(self._metrics_prefix + '.in_flight', self._in_flight)
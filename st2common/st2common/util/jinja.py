@@ -16,12 +16,15 @@
 import json
 import six
 import re
+from collections import OrderedDict
 
 import semver
 import jinja2
 
 __all__ = [
     'get_jinja_environment',
+    'get_template',
+    'clear_template_cache',
     'render_values',
     'is_jinja_expression'
 ]
@@ -34,6 +37,17 @@ JINJA_EXPRESSIONS_START_MARKERS = [
     '{%'
 ]
 
+# Maximum number of compiled templates which are kept in the process wide template cache
+TEMPLATE_CACHE_MAX_SIZE = 1000
+
+# Environments used by render_values, keyed by the allow_undefined flag. Environments are only
+# ever read after construction so it's safe to share them.
+_ENVIRONMENTS = {}
+
+# Compiled templates keyed by (allow_undefined, template source). Ordered so the least recently
+# used entry can be evicted once the cache is full.
+_TEMPLATE_CACHE = OrderedDict()
+
 
 class CustomFilters(object):
     '''
@@ -147,6 +161,44 @@ def get_jinja_environment(allow_undefined=False):
     return env
 
 
+def get_template(source, allow_undefined=False):
+    """
+    Return compiled jinja2.Template for the provided source string.
+
+    Compiled templates are cached so repeatedly rendering the same template (e.g. action chain
+    node parameters) only pays the parse and compile cost once per process.
+
+    :param source: Template source.
+    :type source: ``str``
+
+    :rtype: :class:`jinja2.Template`
+    """
+    key = (allow_undefined, source)
+    template = _TEMPLATE_CACHE.pop(key, None)
+
+    if template is None:
+        env = _ENVIRONMENTS.get(allow_undefined, None)
+
+        if env is None:
+            env = get_jinja_environment(allow_undefined=allow_undefined)
+            _ENVIRONMENTS[allow_undefined] = env
+
+        template = env.from_string(source)
+
+        if len(_TEMPLATE_CACHE) >= TEMPLATE_CACHE_MAX_SIZE:
+            _TEMPLATE_CACHE.popitem(last=False)
+
+    _TEMPLATE_CACHE[key] = template
+    return template
+
+
+def clear_template_cache():
+    """
+    Remove all the compiled templates from the template cache.
+    """
+    _TEMPLATE_CACHE.clear()
+
+
 def render_values(mapping=None, context=None, allow_undefined=False):
     """
     Render an incoming mapping using context provided in context using Jinja2. Returns a dict
@@ -171,7 +223,6 @@ def render_values(mapping=None, context=None, allow_undefined=False):
     super_context['__context'] = context
     super_context.update(context)
 
-    env = get_jinja_environment(allow_undefined=allow_undefined)
     rendered_mapping = {}
     for k, v in six.iteritems(mapping):
         # jinja2 works with string so transform list and dict to strings.
@@ -182,8 +233,14 @@ def render_values(mapping=None, context=None, allow_undefined=False):
         else:
             v = str(v)
 
+        # Values without any template syntax (and no newlines which jinja normalizes) render to
+        # themselves so there is no need to go through jinja
+        if '{' not in v and '\n' not in v and '\r' not in v:
+            rendered_mapping[k] = mapping[k]
+            continue
+
         try:
-            rendered_v = env.from_string(v).render(super_context)
+            rendered_v = get_template(v, allow_undefined=allow_undefined).render(super_context)
         except Exception as e:
             # Attach key and value which failed the rendering
             e.key = k
@@ -0,0 +1,164 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Utility functions for keyset (cursor) based pagination.
+
+Instead of skipping over "offset" documents, next page is retrieved by filtering on the sort key
+and id of the last item on the previous page. Cursor which is handed out to the client is an
+opaque string which contains those values.
+"""
+
+import base64
+import datetime
+import json
+
+from bson.objectid import ObjectId
+from mongoengine.queryset.visitor import Q
+
+from st2common.util import isotime
+
+__all__ = [
+    'InvalidCursorError',
+
+    'get_cursor_order_by',
+    'get_cursor_for_instance',
+    'get_cursor_filter',
+    'encode_cursor',
+    'decode_cursor'
+]
+
+# Marker used to serialize datetime values in the cursor
+DATETIME_MARKER = '$dt'
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def get_cursor_order_by(sort_key):
+    """
+    Return ordering used for cursor pagination - sort key followed by the id as a tie breaker
+    (in the same direction).
+
+    :param sort_key: Sort key with an optional direction prefix (e.g. "-start_timestamp").
+    :type sort_key: ``str``
+
+    :rtype: ``list``
+    """
+    sort_key = sort_key or 'id'
+    descending = sort_key.startswith('-')
+    field_name = sort_key.lstrip('+-')
+
+    if field_name == 'id':
+        return ['-id' if descending else 'id']
+
+    direction = '-' if descending else ''
+    return [direction + field_name, direction + 'id']
+
+
+def get_cursor_for_instance(instance, order_by):
+    """
+    Return cursor which points after the provided instance.
+
+    :param order_by: Ordering as returned by ``get_cursor_order_by``.
+    :type order_by: ``list``
+
+    :rtype: ``str``
+    """
+    field_name = order_by[0].lstrip('+-')
+
+    if field_name == 'id':
+        return encode_cursor(value=None, object_id=instance.id)
+
+    value = instance
+    for attribute in field_name.split('.'):
+        if isinstance(value, dict):
+            value = value.get(attribute, None)
+        else:
+            value = getattr(value, attribute, None)
+
+        if value is None:
+            break
+
+    return encode_cursor(value=value, object_id=instance.id)
+
+
+def get_cursor_filter(cursor, order_by):
+    """
+    Return filter which matches all the documents which come after the provided cursor.
+
+    :param cursor: Cursor as returned by ``get_cursor_for_instance``.
+    :type cursor: ``str``
+
+    :rtype: :class:`Q`
+    """
+    value, object_id = decode_cursor(cursor=cursor)
+
+    descending = order_by[0].startswith('-')
+    field_name = order_by[0].lstrip('+-').replace('.', '__')
+    operator = 'lt' if descending else 'gt'
+
+    id_filter = Q(**{'id__%s' % (operator): object_id})
+
+    if field_name == 'id':
+        return id_filter
+
+    if value is None:
+        # Documents without a value come first in the ascending order and last in the descending
+        # one
+        null_filter = Q(**{'%s__exists' % (field_name): False})
+
+        if descending:
+            return null_filter & id_filter
+
+        return (null_filter & id_filter) | Q(**{'%s__exists' % (field_name): True})
+
+    result = Q(**{'%s__%s' % (field_name, operator): value})
+    result |= (Q(**{field_name: value}) & id_filter)
+
+    if descending:
+        result |= Q(**{'%s__exists' % (field_name): False})
+
+    return result
+
+
+def encode_cursor(value, object_id):
+    """
+    :rtype: ``str``
+    """
+    if isinstance(value, datetime.datetime):
+        value = {DATETIME_MARKER: isotime.format(value, usec=True, offset=False)}
+
+    data = json.dumps([value, str(object_id)], separators=(',', ':'))
+    return base64.urlsafe_b64encode(data).rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    :return: (value, object id) tuple.
+    :rtype: ``tuple``
+    """
+    try:
+        cursor = str(cursor)
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        value, object_id = json.loads(data)
+
+        if isinstance(value, dict) and DATETIME_MARKER in value:
+            value = isotime.parse(value[DATETIME_MARKER])
+
+        return value, ObjectId(object_id)
+    except Exception:
+        raise InvalidCursorError('Invalid cursor "%s".' % (cursor))
@@ -29,6 +29,7 @@ __all__ = [
     'kill_process',
 
     'quote_unix',
+    'quote_unix_path',
     'quote_windows'
 ]
 
@@ -37,6 +38,9 @@ LOG = logging.getLogger(__name__)
 # Constant taken from http://linux.die.net/include/linux/prctl.h
 PR_SET_PDEATHSIG = 1
 
+# Prefix of the paths which are relative to the user home directory
+HOME_DIR_PREFIX = '~/'
+
 
 # pylint: disable=too-many-function-args
 def run_command(cmd, stdin=None, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=False,
@@ -115,6 +119,25 @@ def quote_unix(value):
     return value
 
 
+def quote_unix_path(path, home_dir='"$HOME"'):
+    """
+    Return a quoted version of the path which can be used as one token in a shell command line.
+    Unlike with :func:`quote_unix`, leading "~/" is expanded to the user home directory.
+
+    :param path: Path to quote.
+    :type path: ``str``
+
+    :param home_dir: Shell expression which evaluates to the home directory.
+    :type home_dir: ``str``
+
+    :rtype: ``str``
+    """
+    if path.startswith(HOME_DIR_PREFIX):
+        return '%s/%s' % (home_dir, quote_unix(path[len(HOME_DIR_PREFIX):]))
+
+    return quote_unix(path)
+
+
 def quote_windows(value):
     """
     Return a quoted (shell-escaped) version of the value which can be used as one token in a
@@ -0,0 +1,130 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Utility functions for working with stateless tokens signed with a server side key.
+
+Token has the following format: <key id>.<base64 encoded JSON payload>.<base64 encoded
+HMAC-SHA256 signature of the key id and the payload>. Key id is included so the tokens signed
+with an old key are still accepted while the signing keys are being rotated.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+
+from oslo_config import cfg
+
+from st2common.exceptions.auth import TokenNotFoundError
+
+__all__ = [
+    'get_signing_keys',
+    'is_signed_token',
+    'sign_token',
+    'verify_token'
+]
+
+TOKEN_SEPARATOR = '.'
+
+
+def get_signing_keys():
+    """
+    Retrieve signing keys from the config.
+
+    :return: List of (key id, key) tuples. First key is the one used for signing new tokens.
+    :rtype: ``list`` of ``tuple``
+    """
+    result = []
+
+    for item in cfg.CONF.auth.execution_token_signing_keys or []:
+        if ':' not in item:
+            raise ValueError('Invalid signing key. Key needs to be in the "<key id>:<key>" '
+                             'format.')
+
+        key_id, key = item.split(':', 1)
+
+        if not key_id or not key or TOKEN_SEPARATOR in key_id:
+            raise ValueError('Invalid signing key "%s". Key id and key need to be provided and '
+                             'key id can\'t contain "%s".' % (key_id, TOKEN_SEPARATOR))
+
+        result.append((key_id, key))
+
+    return result
+
+
+def is_signed_token(token_string):
+    """
+    Return True if the provided string looks like a signed token (as opposed to a random token
+    which is stored in the database).
+    """
+    return bool(token_string) and token_string.count(TOKEN_SEPARATOR) == 2
+
+
+def sign_token(payload, key_id, key):
+    """
+    Serialize and sign the provided payload.
+
+    :param payload: Token payload.
+    :type payload: ``dict``
+
+    :rtype: ``str``
+    """
+    payload = _encode(json.dumps(payload, sort_keys=True, separators=(',', ':')))
+    signature = _encode(_get_signature(key_id=key_id, payload=payload, key=key))
+    return TOKEN_SEPARATOR.join([key_id, payload, signature])
+
+
+def verify_token(token_string, keys):
+    """
+    Verify the token signature and return the token payload.
+
+    :param keys: List of (key id, key) tuples which are accepted.
+    :type keys: ``list`` of ``tuple``
+
+    :rtype: ``dict``
+    """
+    if not is_signed_token(token_string):
+        raise TokenNotFoundError('Token is not a signed token.')
+
+    key_id, payload, signature = token_string.split(TOKEN_SEPARATOR)
+    key = dict(keys).get(key_id, None)
+
+    if not key:
+        raise TokenNotFoundError('Token is signed with an unknown key "%s".' % (key_id))
+
+    expected_signature = _encode(_get_signature(key_id=key_id, payload=payload, key=key))
+
+    if not hmac.compare_digest(str(signature), expected_signature):
+        raise TokenNotFoundError('Token signature is not valid.')
+
+    try:
+        return json.loads(_decode(payload))
+    except (TypeError, ValueError):
+        raise TokenNotFoundError('Token payload is not valid.')
+
+
+def _get_signature(key_id, payload, key):
+    message = TOKEN_SEPARATOR.join([key_id, payload])
+    return hmac.new(str(key), str(message), hashlib.sha256).digest()
+
+
+def _encode(value):
+    return base64.urlsafe_b64encode(value).rstrip('=')
+
+
+def _decode(value):
+    value = str(value)
+    return base64.urlsafe_b64decode(value + '=' * (-len(value) % 4))
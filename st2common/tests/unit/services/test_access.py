@@ -20,9 +20,12 @@ from oslo_config import cfg
 from st2tests.base import DbTestCase
 from st2common.util import isotime
 from st2common.util import date as date_utils
+from st2common.exceptions.auth import TokenExpiredError
 from st2common.exceptions.auth import TokenNotFoundError
 from st2common.persistence.auth import Token
+from st2common.persistence.auth import RevokedToken
 from st2common.services import access
+from st2common.util import auth as auth_utils
 import st2tests.config as tests_config
 
 
@@ -82,3 +85,38 @@ class AccessServiceTest(DbTestCase):
         self.assertTrue(token.token is not None)
         self.assertEqual(token.user, USERNAME)
         self.assertLess(isotime.parse(token.expiry), expected_expiry)
+
+    def test_create_execution_token(self):
+        cfg.CONF.set_override(name='execution_token_signing_keys', override=['key1:secret1'],
+                              group='auth')
+
+        try:
+            token = access.create_execution_token(USERNAME, execution_id='exec1')
+            self.assertEqual(token.user, USERNAME)
+            self.assertEqual(token.metadata, {'execution_id': 'exec1'})
+
+            # Token is not stored in the database
+            self.assertRaises(TokenNotFoundError, Token.get, token.token)
+            self.assertEqual(auth_utils.validate_token(token.token).user, USERNAME)
+        finally:
+            cfg.CONF.clear_override(name='execution_token_signing_keys', group='auth')
+
+    def test_revoke_execution_tokens(self):
+        cfg.CONF.set_override(name='execution_token_signing_keys', override=['key1:secret1'],
+                              group='auth')
+
+        try:
+            token = access.create_execution_token(USERNAME, execution_id='exec2')
+            self.assertFalse(access.is_execution_revoked('exec2'))
+
+            access.revoke_execution_tokens('exec2')
+            access.revoke_execution_tokens('exec2')
+            self.assertEqual(len(RevokedToken.query(execution_id='exec2')), 1)
+            self.assertRaises(TokenExpiredError, auth_utils.validate_token, token.token)
+
+            # Revocation list is re-retrieved from the database
+            access._REVOKED_EXECUTIONS['execution_ids'] = set()
+            access._REVOKED_EXECUTIONS['refreshed_at'] = 0
+            self.assertTrue(access.is_execution_revoked('exec2'))
+        finally:
+            cfg.CONF.clear_override(name='execution_token_signing_keys', group='auth')
@@ -22,7 +22,8 @@ from st2tests.fixturesloader import FixturesLoader
 FIXTURES_PACK = 'generic'
 TEST_FIXTURES = {
     'actionchains': ['chain1.yaml', 'malformedchain.yaml', 'no_default_chain.yaml',
-                     'chain_with_vars.yaml', 'chain_with_publish.yaml']
+                     'chain_with_vars.yaml', 'chain_with_publish.yaml',
+                     'chain_with_parallel_branches.yaml']
 }
 FIXTURES = FixturesLoader().load_fixtures(fixtures_pack=FIXTURES_PACK,
                                           fixtures_dict=TEST_FIXTURES)
@@ -31,6 +32,7 @@ MALFORMED_CHAIN = FIXTURES['actionchains']['malformedchain.yaml']
 NO_DEFAULT_CHAIN = FIXTURES['actionchains']['no_default_chain.yaml']
 CHAIN_WITH_VARS = FIXTURES['actionchains']['chain_with_vars.yaml']
 CHAIN_WITH_PUBLISH = FIXTURES['actionchains']['chain_with_publish.yaml']
+CHAIN_WITH_PARALLEL_BRANCHES = FIXTURES['actionchains']['chain_with_parallel_branches.yaml']
 
 
 class ActionChainSchemaTest(unittest2.TestCase):
@@ -56,6 +58,16 @@ class ActionChainSchemaTest(unittest2.TestCase):
         self.assertEquals(len(chain.chain[0].publish),
                           len(CHAIN_WITH_PUBLISH['chain'][0]['publish']))
 
+    def test_actionchain_with_parallel_branches(self):
+        chain = actionchain.ActionChain(**CHAIN_WITH_PARALLEL_BRANCHES)
+        self.assertEquals(len(chain.chain), len(CHAIN_WITH_PARALLEL_BRANCHES['chain']))
+        self.assertEquals(chain.chain[0].get_next_node_names(condition='on-success'),
+                          ['c2', 'c3', 'c4'])
+        self.assertEquals(chain.chain[0].get_next_node_names(condition='on-failure'), [])
+        self.assertEquals(chain.chain[1].get_next_node_names(condition='on-success'), ['c5'])
+        self.assertFalse(chain.chain[1].join)
+        self.assertTrue(chain.chain[4].join)
+
     def test_actionchain_schema_invalid(self):
         with self.assertRaises(ValidationError):
             actionchain.ActionChain(**MALFORMED_CHAIN)
@@ -13,6 +13,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
+
 import mock
 import pecan
 import unittest
@@ -190,3 +192,31 @@ class TestAPIModelBase(unittest.TestCase):
         self.assertEqual(rtn_val, 'null')
         pecan.request.json = {'a': '123', 'b': '456'}
         self.assertRaisesRegexp(exc.HTTPBadRequest, ''b' was unexpected', f, self)
+
+    def test_expose_streaming_list_result(self):
+        @base.jsexpose()
+        def f(self, *args, **kwargs):
+            return base.StreamingListResult(({'id': i} for i in range(3)))
+
+        response = f(self)
+
+        self.assertEqual(response, pecan.response)
+        self.assertEqual(response.content_length, None)
+        self.assertEqual(json.loads(''.join(response.app_iter)), [{'id': 0}, {'id': 1}, {'id': 2}])
+
+    def test_get_json_list_response_iterator(self):
+        items = [{'id': i, 'data': 'a' * 10} for i in range(10)]
+
+        chunks = list(base.get_json_list_response_iterator(items=iter(items), chunk_size=50))
+        self.assertTrue(len(chunks) > 1)
+        self.assertEqual(json.loads(''.join(chunks)), items)
+
+        chunks = list(base.get_json_list_response_iterator(items=iter([])))
+        self.assertEqual(chunks, ['[]'])
+
+        # Error before any data has been sent is propagated
+        def get_items():
+            raise ValueError('failure')
+            yield
+
+        self.assertRaises(ValueError, list, base.get_json_list_response_iterator(get_items()))
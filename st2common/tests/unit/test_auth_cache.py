@@ -0,0 +1,208 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+import time
+
+import mock
+import unittest2
+import webob
+from oslo_config import cfg
+
+import st2tests.config as tests_config
+tests_config.parse_args()
+
+from st2common.exceptions.auth import TokenExpiredError
+from st2common.hooks import AuthHook
+from st2common.models.api.auth import TokenAPI
+from st2common.models.db.auth import ApiKeyDB
+from st2common.models.db.auth import TokenDB
+from st2common.models.db.auth import UserDB
+from st2common.persistence.auth import RevokedToken
+from st2common.persistence.auth import Token
+from st2common.persistence.auth import User
+from st2common.services import access
+from st2common.services import auth_cache
+from st2common.services.auth_cache import AuthCache
+from st2common.services.auth_cache import AuthCacheInvalidator
+from st2common.transport import publishers
+from st2common.util import auth as auth_utils
+from st2common.util import date as date_utils
+from st2common.util import hash as hash_utils
+
+USER_DB = UserDB(name='stanley')
+
+
+class AuthCacheTestCase(unittest2.TestCase):
+
+    def test_get_and_set(self):
+        cache = AuthCache(ttl=10, max_size=10)
+        self.assertEqual(cache.get('token1'), None)
+
+        cache.set('token1', user=USER_DB)
+        self.assertEqual(cache.get('token1'), USER_DB)
+        self.assertEqual(cache.get('token2'), None)
+        self.assertEqual(cache.get_stats(), {'size': 1, 'hits': 1, 'misses': 2,
+                                             'hit_rate': 1.0 / 3})
+
+    def test_expired_entries_are_not_returned(self):
+        cache = AuthCache(ttl=10, max_size=10)
+        now = date_utils.get_datetime_utc_now()
+        cache.set('token1', user=USER_DB, expiry=now - datetime.timedelta(seconds=1))
+        cache.set('token2', user=USER_DB, expiry=now + datetime.timedelta(seconds=100))
+        self.assertEqual(cache.get('token1'), None)
+        self.assertEqual(cache.get('token2'), USER_DB)
+
+        with mock.patch.object(time, 'time', mock.Mock(return_value=time.time() + 11)):
+            self.assertEqual(cache.get('token2'), None)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = AuthCache(ttl=10, max_size=2)
+        cache.set('token1', user=USER_DB)
+        cache.set('token2', user=USER_DB)
+        cache.get('token1')
+        cache.set('token3', user=USER_DB)
+
+        self.assertEqual(cache.get('token1'), USER_DB)
+        self.assertEqual(cache.get('token2'), None)
+        self.assertEqual(cache.get('token3'), USER_DB)
+
+    def test_disabled_cache(self):
+        cache = AuthCache(ttl=0, max_size=10)
+        self.assertFalse(cache.enabled)
+        cache.set('token1', user=USER_DB)
+        self.assertEqual(cache.get('token1'), None)
+
+    def test_invalidator(self):
+        cache = AuthCache(ttl=10, max_size=10)
+        cache.set('token1', user=USER_DB)
+        cache.set('apikey1', user=USER_DB)
+        invalidator = AuthCacheInvalidator(cache=cache)
+
+        create_message = mock.Mock(delivery_info={'routing_key': publishers.CREATE_RK})
+        invalidator.process_token(TokenDB(user='stanley', token='token1'), create_message)
+        self.assertEqual(cache.get('token1'), USER_DB)
+        self.assertTrue(create_message.ack.called)
+
+        delete_message = mock.Mock(delivery_info={'routing_key': publishers.DELETE_RK})
+        invalidator.process_token(AuthCache.get_key('token1'), delete_message)
+        self.assertEqual(cache.get('token1'), None)
+
+        # Events published by older versions contain the whole token
+        cache.set('token2', user=USER_DB)
+        invalidator.process_token(TokenDB(user='stanley', token='token2'), delete_message)
+        self.assertEqual(cache.get('token2'), None)
+
+        # API key has been disabled
+        update_message = mock.Mock(delivery_info={'routing_key': publishers.UPDATE_RK})
+        api_key_db = ApiKeyDB(user='stanley', key_hash=hash_utils.hash('apikey1'), enabled=False)
+        invalidator.process_api_key(api_key_db, update_message)
+        self.assertEqual(cache.get('apikey1'), None)
+
+
+class TokenPublishTestCase(unittest2.TestCase):
+
+    def test_only_cache_key_is_published_if_cache_is_enabled(self):
+        publisher = mock.Mock()
+
+        with mock.patch.object(Token, '_get_publisher', mock.Mock(return_value=publisher)):
+            token_db = TokenDB(user='stanley', token='token1')
+
+            # Validation cache is disabled in the tests config
+            Token.publish_update(token_db)
+            Token.publish_delete(token_db)
+            self.assertFalse(publisher.publish_update.called)
+            self.assertFalse(publisher.publish_delete.called)
+
+            cfg.CONF.set_override(name='validation_cache_ttl', override=5, group='auth')
+            self.addCleanup(cfg.CONF.set_override, name='validation_cache_ttl', override=0,
+                            group='auth')
+
+            Token.publish_update(token_db)
+            Token.publish_delete(token_db)
+            publisher.publish_update.assert_called_once_with(AuthCache.get_key('token1'))
+            publisher.publish_delete.assert_called_once_with(AuthCache.get_key('token1'))
+
+    def test_token_api_doesnt_include_internal_fields(self):
+        expiry = date_utils.get_datetime_utc_now() + datetime.timedelta(seconds=100)
+        token_db = TokenDB(id='567890ab567890ab567890ab', user='stanley', token='token1',
+                           expiry=expiry)
+
+        token_api = TokenAPI.from_model(token_db)
+        token_api.validate()
+        self.assertEqual(sorted(vars(token_api).keys()),
+                         ['expiry', 'id', 'metadata', 'token', 'user'])
+
+
+class AuthHookCacheTestCase(unittest2.TestCase):
+
+    def setUp(self):
+        super(AuthHookCacheTestCase, self).setUp()
+        self.cache = AuthCache(ttl=10, max_size=10)
+
+    @mock.patch.object(User, 'get', mock.Mock(return_value=USER_DB))
+    def test_validation_result_is_cached(self):
+        expiry = date_utils.get_datetime_utc_now() + datetime.timedelta(seconds=100)
+        token_db = TokenDB(id='567890ab567890ab567890ab', user='stanley', token='token1',
+                           expiry=expiry)
+        request = webob.Request.blank('/v1/actions', headers={'X-Auth-Token': 'token1'})
+
+        with mock.patch.object(auth_cache, 'get_auth_cache', mock.Mock(return_value=self.cache)), \
+                mock.patch.object(auth_utils, 'validate_token_and_source',
+                                  mock.Mock(return_value=token_db)) as validate:
+            self.assertEqual(AuthHook._validate_creds_and_get_user(request), USER_DB)
+            self.assertEqual(AuthHook._validate_creds_and_get_user(request), USER_DB)
+
+            self.assertEqual(validate.call_count, 1)
+            self.assertEqual(User.get.call_count, 1)
+
+            # Token has been deleted
+            self.cache.invalidate(AuthCache.get_key('token1'))
+            self.assertEqual(AuthHook._validate_creds_and_get_user(request), USER_DB)
+            self.assertEqual(validate.call_count, 2)
+
+    @mock.patch.object(User, 'get', mock.Mock(return_value=USER_DB))
+    @mock.patch.object(access, '_register_user', mock.Mock())
+    @mock.patch.object(RevokedToken, 'query', mock.Mock())
+    @mock.patch.object(RevokedToken, 'add_or_update', mock.Mock())
+    def test_revoked_execution_token_is_evicted(self):
+        cfg.CONF.set_override(name='execution_token_signing_keys', override=['key1:secret1'],
+                              group='auth')
+        self.addCleanup(cfg.CONF.clear_override, name='execution_token_signing_keys',
+                        group='auth')
+
+        # Revocation list is not re-retrieved from the database during the test
+        revoked_executions = dict(access._REVOKED_EXECUTIONS)
+        self.addCleanup(access._REVOKED_EXECUTIONS.update, revoked_executions)
+        access._REVOKED_EXECUTIONS.update({'execution_ids': set(), 'refreshed_at': time.time()})
+        RevokedToken.query.return_value.first.return_value = None
+
+        token_db = access.create_execution_token('stanley', execution_id='exec1')
+        request = webob.Request.blank('/v1/actions', headers={'X-Auth-Token': token_db.token})
+
+        with mock.patch.object(auth_cache, 'get_auth_cache', mock.Mock(return_value=self.cache)), \
+                mock.patch.object(auth_utils, 'validate_token_and_source',
+                                  mock.Mock(wraps=auth_utils.validate_token_and_source)) \
+                as validate:
+            self.assertEqual(AuthHook._validate_creds_and_get_user(request), USER_DB)
+            self.assertEqual(AuthHook._validate_creds_and_get_user(request), USER_DB)
+            self.assertEqual(validate.call_count, 1)
+
+            access.revoke_execution_tokens('exec1')
+
+            # Cached entry is evicted and the token is validated (and rejected) again
+            self.assertRaises(TokenExpiredError, AuthHook._validate_creds_and_get_user, request)
+            self.assertEqual(validate.call_count, 2)
+            self.assertEqual(self.cache.get_stats()['size'], 0)
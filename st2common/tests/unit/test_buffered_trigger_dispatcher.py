@@ -0,0 +1,98 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import eventlet
+import mock
+
+from st2common.exceptions.triggers import TriggerBufferFullException
+from st2common.transport.reactor import BufferedTriggerDispatcher
+from unittest2 import TestCase
+
+
+class BufferedTriggerDispatcherTestCase(TestCase):
+
+    def test_dispatch_buffer_full(self):
+        dispatcher = BufferedTriggerDispatcher(buffer_size=3, dispatcher=mock.Mock())
+        dispatcher.dispatch('trigger1', payload={'a': 1})
+        dispatcher.dispatch_many([('trigger2', {}, None)])
+
+        # Either all the triggers are buffered or none of them
+        self.assertRaises(TriggerBufferFullException, dispatcher.dispatch_many,
+                          [('trigger3', {}, None), ('trigger4', {}, None)])
+        dispatcher.dispatch('trigger3')
+        self.assertRaises(TriggerBufferFullException, dispatcher.dispatch, 'trigger4')
+
+    def test_triggers_are_dispatched_in_batches(self):
+        mock_dispatcher = mock.Mock()
+        dispatcher = BufferedTriggerDispatcher(buffer_size=10, batch_size=2,
+                                               dispatcher=mock_dispatcher)
+        dispatcher.start()
+
+        for index in range(5):
+            dispatcher.dispatch('trigger%s' % (index), payload={'index': index})
+
+        while mock_dispatcher.dispatch_many.call_count < 3:
+            eventlet.sleep(0.01)
+        dispatcher.stop()
+
+        triggers = sum([call[0][0] for call in mock_dispatcher.dispatch_many.call_args_list], [])
+        self.assertEqual(triggers, [('trigger%s' % (index), {'index': index}, None)
+                                    for index in range(5)])
+        self.assertTrue(all([len(call[0][0]) <= 2
+                             for call in mock_dispatcher.dispatch_many.call_args_list]))
+
+    def test_failed_batch_is_dispatched_one_by_one(self):
+        mock_dispatcher = mock.Mock()
+        mock_dispatcher.dispatch_many.side_effect = Exception('failed')
+        mock_dispatcher.dispatch.side_effect = [Exception('failed'), None]
+        dispatcher = BufferedTriggerDispatcher(buffer_size=10, dispatcher=mock_dispatcher)
+
+        dispatcher.dispatch('trigger1')
+        dispatcher.dispatch('trigger2')
+        dispatcher.stop()
+
+        self.assertEqual(mock_dispatcher.dispatch_many.call_count, 1)
+        self.assertEqual(mock_dispatcher.dispatch.call_count, 2)
+
+    def test_stop_publishes_interrupted_and_remaining_triggers(self):
+        mock_dispatcher = mock.Mock()
+        # First batch is interrupted by stop while it's being published
+        mock_dispatcher.dispatch_many.side_effect = self._get_dispatch_many(blocking_calls=1)
+        dispatcher = BufferedTriggerDispatcher(buffer_size=10, batch_size=2,
+                                               dispatcher=mock_dispatcher)
+        dispatcher.start()
+
+        for index in range(4):
+            dispatcher.dispatch('trigger%s' % (index))
+
+        while not mock_dispatcher.dispatch_many.call_count:
+            eventlet.sleep(0.01)
+        dispatcher.stop()
+
+        triggers = [[trigger for (trigger, _, _) in call[0][0]]
+                    for call in mock_dispatcher.dispatch_many.call_args_list]
+        self.assertEqual(triggers, [['trigger0', 'trigger1'], ['trigger0', 'trigger1'],
+                                    ['trigger2', 'trigger3']])
+
+    def _get_dispatch_many(self, blocking_calls):
+        calls = []
+
+        def dispatch_many(triggers):
+            calls.append(triggers)
+
+            if len(calls) <= blocking_calls:
+                eventlet.sleep(10)
+
+        return dispatch_many
@@ -17,11 +17,17 @@ import copy
 import bson
 import datetime
 
+import mock
+import unittest2
+
 from st2tests.fixtures.packs import executions as fixture
 from st2tests import DbTestCase
 from st2common.util import isotime
 from st2common.util import date as date_utils
+from st2common.models.db.execution import ActionExecutionDB
+from st2common.models.db.execution import ActionExecutionFilterValueDB
 from st2common.persistence.execution import ActionExecution
+from st2common.persistence.execution import ActionExecutionFilterValue
 from st2common.models.api.execution import ActionExecutionAPI
 from st2common.exceptions.db import StackStormDBObjectNotFoundError
 
@@ -258,3 +264,82 @@ class TestActionExecutionHistoryModel(DbTestCase):
                                      order_by=['-start_timestamp'])
         self.assertLess(objs[9]['start_timestamp'],
                         objs[0]['start_timestamp'])
+
+
+class ActionExecutionFilterValueTestCase(unittest2.TestCase):
+
+    def _get_stored_execution(self):
+        return ActionExecutionDB._from_son({
+            '_id': bson.ObjectId(),
+            'action': {'ref': 'core.local'},
+            'runner': {'name': 'local-shell-cmd'},
+            'status': 'running',
+            'context': {'user': 'stanley'},
+            'start_timestamp': 1484000000000000,
+            'log': [],
+            'children': []
+        })
+
+    def test_get_changed_fields(self):
+        execution_db = ActionExecutionDB(action={'ref': 'core.local'}, status='running')
+        self.assertEqual(ActionExecution._get_changed_fields(execution_db), None)
+
+        execution_db = self._get_stored_execution()
+        execution_db.status = 'succeeded'
+        execution_db.result = {'stdout': 'foo'}
+        self.assertEqual(sorted(ActionExecution._get_changed_fields(execution_db)),
+                         ['result', 'status'])
+
+    def test_get_update_field(self):
+        self.assertEqual(ActionExecution._get_update_field('set__status'), 'status')
+        self.assertEqual(ActionExecution._get_update_field('push__log'), 'log')
+        self.assertEqual(ActionExecution._get_update_field('status'), 'status')
+        self.assertEqual(ActionExecution._get_update_field('set__action__ref'), 'action.ref')
+
+    @mock.patch.object(ActionExecutionFilterValue, '_upsert_values')
+    def test_only_changed_values_are_added_on_update(self, mock_upsert_values):
+        execution_db = self._get_stored_execution()
+
+        ActionExecutionFilterValue.add_execution_values(execution_db)
+        values = mock_upsert_values.call_args[1]['values']
+        self.assertEqual(sorted([value[:2] for value in values]),
+                         [('action', 'core.local'), ('runner', 'local-shell-cmd'),
+                          ('status', 'running'), ('user', 'stanley')])
+
+        ActionExecutionFilterValue.add_execution_values(execution_db,
+                                                        changed_fields=['status', 'result'])
+        values = mock_upsert_values.call_args[1]['values']
+        self.assertEqual([value[:2] for value in values], [('status', 'running')])
+
+        ActionExecutionFilterValue.add_execution_values(execution_db, changed_fields=['action'])
+        values = mock_upsert_values.call_args[1]['values']
+        self.assertEqual([value[:2] for value in values], [('action', 'core.local')])
+
+        ActionExecutionFilterValue.add_execution_values(execution_db, changed_fields=['result'])
+        self.assertEqual(mock_upsert_values.call_args[1]['values'], [])
+
+    @mock.patch.object(ActionExecutionFilterValue, 'query')
+    @mock.patch.object(ActionExecution, 'aggregate')
+    def test_delete_unused_values_uses_single_aggregation(self, mock_aggregate, mock_query):
+        value_dbs = [
+            ActionExecutionFilterValueDB(id=bson.ObjectId(), filter_name='action',
+                                         value='core.local'),
+            ActionExecutionFilterValueDB(id=bson.ObjectId(), filter_name='action',
+                                         value='core.old'),
+            ActionExecutionFilterValueDB(id=bson.ObjectId(), filter_name='status',
+                                         value='failed')
+        ]
+        mock_query.return_value = value_dbs
+        mock_aggregate.return_value = [
+            {'_id': None, 'action': ['core.local', 'core.remote'], 'status': ['succeeded']}
+        ]
+
+        impl = mock.Mock()
+        with mock.patch.object(ActionExecutionFilterValue, '_get_impl',
+                               mock.Mock(return_value=impl)):
+            deleted_count = ActionExecutionFilterValue.delete_unused_values(
+                timestamp=date_utils.get_datetime_utc_now())
+
+        self.assertEqual(deleted_count, 2)
+        self.assertEqual(mock_aggregate.call_count, 1)
+        impl.delete_by_query.assert_called_once_with(id__in=[value_dbs[1].id, value_dbs[2].id])
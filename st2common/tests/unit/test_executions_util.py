@@ -125,6 +125,20 @@ class ExecutionsUtilTestCase(CleanDbTestCase):
         parent_execution = ActionExecution.get_by_id(parent_execution_id)
         child_execs = parent_execution.children
         self.assertTrue(str(child_exec.id) in child_execs)
+        self.assertEqual(child_exec.root, parent_execution.root or parent_execution_id)
+        self.assertEqual(child_exec.depth, parent_execution.depth + 1)
+
+    def test_execution_creation_chains_nested_parent_without_root(self):
+        childliveaction = self.MODELS['liveactions']['childliveaction.yaml']
+        parent_execution_id = childliveaction.context['parent']['execution_id']
+
+        # Nested parent execution which was created before root id and depth were stored
+        ActionExecution.impl.model.objects(id=parent_execution_id).update(
+            set__parent='54e657d60640fd16887d6855', unset__root=True, unset__depth=True)
+
+        child_exec = executions_util.create_execution_object(childliveaction)
+        self.assertEqual(child_exec.parent, parent_execution_id)
+        self.assertEqual(child_exec.root, None)
 
     def test_execution_update(self):
         liveaction = self.MODELS['liveactions']['liveaction1.yaml']
@@ -261,6 +275,73 @@ class ExecutionsUtilDescendantsTestCase(CleanDbTestCase):
 
         self.assertListEqual(all_descendants_ids, expected_ids)
 
+    def test_get_all_descendants_without_root(self):
+        # Executions created before root id and depth were stored
+        ActionExecution.impl.model.objects.update(unset__root=True, unset__depth=True)
+
+        root_execution = self.MODELS['executions']['root_execution.yaml']
+        all_descendants = executions_util.get_descendants(str(root_execution.id))
+
+        all_descendants_ids = [str(descendant.id) for descendant in all_descendants]
+        all_descendants_ids.sort()
+
+        # everything except the root_execution
+        expected_ids = [str(v.id) for _, v in six.iteritems(self.MODELS['executions'])
+                        if v.id != root_execution.id]
+        expected_ids.sort()
+
+        self.assertListEqual(all_descendants_ids, expected_ids)
+
+    def test_get_descendants_of_child_execution(self):
+        child_execution = self.MODELS['executions']['child1_level1.yaml']
+        all_descendants = executions_util.get_descendants(str(child_execution.id))
+
+        all_descendants_ids = [str(descendant.id) for descendant in all_descendants]
+        all_descendants_ids.sort()
+
+        expected_ids = []
+        traverse = list(child_execution.children)
+        while traverse:
+            node_id = traverse.pop(0)
+            expected_ids.append(node_id)
+            traverse.extend(self._get_action_execution(node_id).children)
+        expected_ids.sort()
+
+        self.assertListEqual(all_descendants_ids, expected_ids)
+
+    def test_get_all_descendants_partially_without_root(self):
+        # Workflow which was running while root id and depth started being stored
+        root_execution = self.MODELS['executions']['root_execution.yaml']
+        ActionExecution.impl.model.objects(depth__lte=2).update(unset__root=True,
+                                                                unset__depth=True)
+
+        for result_fmt in ['default', 'sorted']:
+            all_descendants = executions_util.get_descendants(str(root_execution.id),
+                                                              result_fmt=result_fmt)
+
+            all_descendants_ids = [str(descendant.id) for descendant in all_descendants]
+            all_descendants_ids.sort()
+
+            # everything except the root_execution
+            expected_ids = [str(v.id) for _, v in six.iteritems(self.MODELS['executions'])
+                            if v.id != root_execution.id]
+            expected_ids.sort()
+
+            self.assertListEqual(all_descendants_ids, expected_ids)
+
+    def test_get_descendants_of_child_execution_only_retrieves_subtree(self):
+        child_execution = self.MODELS['executions']['child1_level1.yaml']
+
+        with mock.patch.object(ActionExecution, 'query',
+                               mock.Mock(side_effect=ActionExecution.query)) as query:
+            all_descendants = executions_util.get_descendants(str(child_execution.id))
+
+        subtree_ids = set([str(descendant.id) for descendant in all_descendants])
+        for call in query.call_args_list:
+            self.assertFalse('root' in call[1])
+            for execution in query.side_effect(**call[1]):
+                self.assertTrue(str(execution.id) in subtree_ids)
+
     def _get_action_execution(self, ae_id):
         for _, execution in six.iteritems(self.MODELS['executions']):
             if str(execution.id) == ae_id:
@@ -13,6 +13,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import time
+
 import eventlet
 import mock
 
@@ -49,3 +51,51 @@ class TestGreenPoolDispatch(TestCase):
         dispatcher.shutdown()
         call_args_list = [(args[0][0], args[0][1]) for args in mock_handler.call_args_list]
         self.assertItemsEqual(expected, call_args_list)
+
+    def test_buffered_item_is_dispatched_once_worker_is_free(self):
+        dispatcher = BufferedDispatcher(dispatch_pool_size=1)
+        event = eventlet.event.Event()
+        mock_handler = mock.MagicMock()
+
+        dispatcher.dispatch(event.wait)
+        dispatcher.dispatch(mock_handler, 1)
+        eventlet.sleep(0.01)
+        self.assertFalse(mock_handler.called)
+        self.assertEqual(dispatcher.get_stats()['in_flight'], 1)
+        self.assertEqual(dispatcher.get_stats()['queue_size'], 1)
+
+        # Buffered item is dispatched right away (no polling) once the worker is free
+        start = time.time()
+        event.send()
+        while not mock_handler.called:
+            eventlet.sleep(0.001)
+        self.assertTrue(time.time() - start < 0.5)
+        dispatcher.shutdown()
+
+        stats = dispatcher.get_stats()
+        self.assertEqual(stats['queue_size'], 0)
+        self.assertEqual(stats['dispatched'], 2)
+        self.assertTrue(stats['wait_time_max'] > 0)
+
+    def test_dispatch_blocks_while_buffer_is_full(self):
+        dispatcher = BufferedDispatcher(dispatch_pool_size=1, buffer_size=1)
+        event = eventlet.event.Event()
+        mock_handler = mock.MagicMock()
+
+        dispatcher.dispatch(event.wait)
+        eventlet.sleep(0.01)
+
+        # First item is buffered, second one is held by the monitor thread which waits for a free
+        # worker and the third one blocks the caller
+        dispatcher.dispatch(mock_handler, 1)
+        dispatcher.dispatch(mock_handler, 2)
+        blocked = eventlet.spawn(dispatcher.dispatch, mock_handler, 3)
+        eventlet.sleep(0.01)
+        self.assertFalse(blocked.dead)
+
+        event.send()
+        blocked.wait()
+        while mock_handler.call_count < 3:
+            eventlet.sleep(0.01)
+        dispatcher.shutdown()
+        self.assertEqual([args[0][0] for args in mock_handler.call_args_list], [1, 2, 3])
@@ -0,0 +1,83 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import bson
+import eventlet
+from kombu.message import Message
+import mock
+import unittest2
+
+from st2common.constants.action import LIVEACTION_STATUS_RUNNING
+from st2common.constants.action import LIVEACTION_STATUS_SUCCEEDED
+from st2common.models.db.liveaction import LiveActionDB
+from st2common.services.liveaction_watcher import LiveActionWatcher
+
+
+class LiveActionWatcherTests(unittest2.TestCase):
+
+    @mock.patch.object(Message, 'ack', mock.MagicMock())
+    def test_waiter_is_notified_on_completion(self):
+        watcher = LiveActionWatcher()
+        liveaction_id = bson.ObjectId()
+
+        thread = eventlet.spawn(watcher.wait, liveaction_id=liveaction_id, timeout=5)
+        eventlet.sleep(0)
+
+        # Update for a running liveaction shouldn't wake up the waiter
+        liveaction_db = LiveActionDB(id=liveaction_id, action='core.local',
+                                     status=LIVEACTION_STATUS_RUNNING)
+        watcher.process_task(liveaction_db, Message(None))
+        eventlet.sleep(0)
+        self.assertFalse(thread.dead)
+
+        liveaction_db = LiveActionDB(id=liveaction_id, action='core.local',
+                                     status=LIVEACTION_STATUS_SUCCEEDED)
+        watcher.process_task(liveaction_db, Message(None))
+
+        result = thread.wait()
+        self.assertEqual(result.status, LIVEACTION_STATUS_SUCCEEDED)
+        self.assertEqual(watcher._waiters, {})
+
+    def test_wait_timeout(self):
+        watcher = LiveActionWatcher()
+
+        result = watcher.wait(liveaction_id=bson.ObjectId(), timeout=0.01)
+        self.assertEqual(result, None)
+        self.assertEqual(watcher._waiters, {})
+
+    @mock.patch.object(Message, 'ack', mock.MagicMock())
+    def test_registered_waiter_is_notified_before_wait(self):
+        watcher = LiveActionWatcher()
+        liveaction_id = bson.ObjectId()
+
+        event = watcher.register(liveaction_id)
+
+        # Message which arrives before the caller starts waiting shouldn't be lost
+        liveaction_db = LiveActionDB(id=liveaction_id, action='core.local',
+                                     status=LIVEACTION_STATUS_SUCCEEDED)
+        watcher.process_task(liveaction_db, Message(None))
+
+        result = watcher.wait(liveaction_id=liveaction_id, timeout=0.01, event=event)
+        self.assertEqual(result.status, LIVEACTION_STATUS_SUCCEEDED)
+
+        watcher.unregister(liveaction_id, event)
+        self.assertEqual(watcher._waiters, {})
+
+    @mock.patch('st2common.services.liveaction_watcher.Connection',
+                mock.MagicMock(side_effect=ValueError('invalid url')))
+    def test_start_failure(self):
+        watcher = LiveActionWatcher()
+        watcher.start()
+        self.assertEqual(watcher.connection, None)
@@ -0,0 +1,153 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import socket
+
+import mock
+import unittest2
+from oslo_config import cfg
+
+import st2tests.config as tests_config
+tests_config.parse_args()
+
+from st2common.metrics import base as metrics
+from st2common.metrics.base import NoopDriver
+from st2common.metrics.base import Timer
+from st2common.metrics.drivers.statsd_driver import StatsdDriver
+from st2common.models.utils.query_metrics import QueryMetricsListener
+from st2common.models.utils.query_metrics import get_collection_name
+
+
+class StatsdDriverTestCase(unittest2.TestCase):
+
+    def setUp(self):
+        super(StatsdDriverTestCase, self).setUp()
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.listener.bind(('127.0.0.1', 0))
+        self.listener.settimeout(2)
+        self.port = self.listener.getsockname()[1]
+
+    def tearDown(self):
+        super(StatsdDriverTestCase, self).tearDown()
+        self.listener.close()
+
+    def _receive(self):
+        return self.listener.recv(1024)
+
+    def test_metrics_are_sent_to_statsd(self):
+        driver = StatsdDriver(host='127.0.0.1', port=self.port)
+
+        driver.inc_counter('rules.matched')
+        self.assertEqual(self._receive(), 'rules.matched:1|c')
+
+        driver.inc_counter('rules.matched', 3)
+        self.assertEqual(self._receive(), 'rules.matched:3|c')
+
+        driver.set_gauge('dispatcher.Worker.queue_size', 10)
+        self.assertEqual(self._receive(), 'dispatcher.Worker.queue_size:10|g')
+
+        driver.timing('action.run', 1.5)
+        self.assertEqual(self._receive(), 'action.run:1500.000|ms')
+
+    def test_key_prefix(self):
+        driver = StatsdDriver(host='127.0.0.1', port=self.port, prefix='st2')
+        driver.inc_counter('rules.matched')
+        self.assertEqual(self._receive(), 'st2.rules.matched:1|c')
+
+
+class MetricsTestCase(unittest2.TestCase):
+
+    def setUp(self):
+        super(MetricsTestCase, self).setUp()
+        metrics.reset_driver()
+
+    def tearDown(self):
+        super(MetricsTestCase, self).tearDown()
+        cfg.CONF.set_override(name='driver', override='noop', group='metrics')
+        cfg.CONF.set_override(name='port', override=8125, group='metrics')
+        metrics.reset_driver()
+
+    def test_default_driver_is_noop(self):
+        self.assertTrue(isinstance(metrics.get_driver(), NoopDriver))
+
+    def test_configured_driver_is_used(self):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        listener.bind(('127.0.0.1', 0))
+        listener.settimeout(2)
+
+        try:
+            cfg.CONF.set_override(name='driver', override='statsd', group='metrics')
+            cfg.CONF.set_override(name='port', override=listener.getsockname()[1],
+                                  group='metrics')
+            self.assertTrue(isinstance(metrics.get_driver(), StatsdDriver))
+
+            metrics.inc_counter('action.scheduled')
+            self.assertEqual(listener.recv(1024), 'action.scheduled:1|c')
+        finally:
+            listener.close()
+
+    def test_invalid_driver_falls_back_to_noop(self):
+        cfg.CONF.set_override(name='driver', override='invalid.module', group='metrics')
+        self.assertTrue(isinstance(metrics.get_driver(), NoopDriver))
+
+    @mock.patch.object(metrics, 'timing')
+    def test_timer(self, mock_timing):
+        with Timer('rules.enforce'):
+            pass
+
+        @Timer('action.run')
+        def run():
+            return 'result'
+
+        self.assertEqual(run(), 'result')
+        self.assertEqual([call[0][0] for call in mock_timing.call_args_list],
+                         ['rules.enforce', 'action.run'])
+
+    def test_format_key(self):
+        self.assertEqual(metrics.format_key('messaging', 'publisher', 'st2.liveaction'),
+                         'messaging.publisher.st2_liveaction')
+        self.assertEqual(metrics.format_key('db', 'action_execution_d_b', 'find'),
+                         'db.action_execution_d_b.find')
+
+
+class QueryMetricsListenerTestCase(unittest2.TestCase):
+
+    def test_get_collection_name(self):
+        self.assertEqual(get_collection_name({'find': 'rule_d_b', 'filter': {}}, 'find'),
+                         'rule_d_b')
+        self.assertEqual(get_collection_name({'getMore': 1, 'collection': 'rule_d_b'},
+                                             'getMore'), 'rule_d_b')
+        self.assertEqual(get_collection_name({'ismaster': 1}, 'ismaster'), None)
+
+    @mock.patch.object(metrics, 'inc_counter')
+    @mock.patch.object(metrics, 'timing')
+    def test_command_latency_is_recorded(self, mock_timing, mock_inc_counter):
+        listener = QueryMetricsListener()
+
+        listener.started(mock.Mock(command={'find': 'rule_d_b'}, command_name='find',
+                                   connection_id=('localhost', 27017), request_id=1))
+        listener.started(mock.Mock(command={'ismaster': 1}, command_name='ismaster',
+                                   connection_id=('localhost', 27017), request_id=2))
+        listener.succeeded(mock.Mock(command_name='find', duration_micros=2500,
+                                     connection_id=('localhost', 27017), request_id=1))
+        listener.succeeded(mock.Mock(command_name='ismaster', duration_micros=100,
+                                     connection_id=('localhost', 27017), request_id=2))
+        mock_timing.assert_called_once_with('db.rule_d_b.find', 0.0025)
+
+        listener.started(mock.Mock(command={'insert': 'rule_d_b'}, command_name='insert',
+                                   connection_id=('localhost', 27017), request_id=3))
+        listener.failed(mock.Mock(command_name='insert', duration_micros=1000,
+                                  connection_id=('localhost', 27017), request_id=3))
+        mock_inc_counter.assert_called_once_with('db.rule_d_b.insert.failed')
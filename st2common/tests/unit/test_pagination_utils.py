@@ -0,0 +1,71 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+
+import bson
+import unittest2
+
+from st2common.models.db.execution import ActionExecutionDB
+from st2common.util import date as date_utils
+from st2common.util import pagination as pagination_utils
+
+
+class PaginationUtilsTestCase(unittest2.TestCase):
+
+    def test_get_cursor_order_by(self):
+        self.assertEqual(pagination_utils.get_cursor_order_by('-start_timestamp'),
+                         ['-start_timestamp', '-id'])
+        self.assertEqual(pagination_utils.get_cursor_order_by('+trace_tag'),
+                         ['trace_tag', 'id'])
+        self.assertEqual(pagination_utils.get_cursor_order_by('-id'), ['-id'])
+        self.assertEqual(pagination_utils.get_cursor_order_by(None), ['id'])
+
+    def test_encode_and_decode_cursor(self):
+        object_id = bson.ObjectId()
+        timestamp = date_utils.add_utc_tz(datetime.datetime(2016, 7, 13, 10, 20, 30, 123456))
+
+        cursor = pagination_utils.encode_cursor(value=timestamp, object_id=object_id)
+        self.assertEqual(pagination_utils.decode_cursor(cursor), (timestamp, object_id))
+
+        cursor = pagination_utils.encode_cursor(value='tag-1', object_id=object_id)
+        self.assertEqual(pagination_utils.decode_cursor(cursor), ('tag-1', object_id))
+
+        self.assertRaises(pagination_utils.InvalidCursorError, pagination_utils.decode_cursor,
+                          'invalid')
+
+    def test_get_cursor_for_instance_and_filter(self):
+        timestamp = date_utils.add_utc_tz(datetime.datetime(2016, 7, 13, 10, 20, 30))
+        execution_db = ActionExecutionDB(id=bson.ObjectId(), start_timestamp=timestamp,
+                                         action={'ref': 'core.local'})
+
+        order_by = pagination_utils.get_cursor_order_by('-start_timestamp')
+        cursor = pagination_utils.get_cursor_for_instance(execution_db, order_by=order_by)
+        self.assertEqual(pagination_utils.decode_cursor(cursor),
+                         (timestamp, execution_db.id))
+
+        cursor_filter = pagination_utils.get_cursor_filter(cursor, order_by=order_by)
+        query = cursor_filter.to_query(ActionExecutionDB)
+        self.assertIn({'start_timestamp': {'$lt': 1468405230000000}}, query['$or'])
+
+        # Nested sort key
+        order_by = pagination_utils.get_cursor_order_by('action.ref')
+        cursor = pagination_utils.get_cursor_for_instance(execution_db, order_by=order_by)
+        self.assertEqual(pagination_utils.decode_cursor(cursor),
+                         ('core.local', execution_db.id))
+
+        cursor_filter = pagination_utils.get_cursor_filter(cursor, order_by=order_by)
+        query = cursor_filter.to_query(ActionExecutionDB)
+        self.assertIn({'action.ref': {'$gt': 'core.local'}}, query['$or'])
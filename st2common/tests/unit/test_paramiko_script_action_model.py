@@ -119,6 +119,20 @@ class ParamikoRemoteScriptActionTests(unittest2.TestCase):
              'cd /tmp && \'"\'"\'/tmp/remote script.sh\'"\'"\'\''
         self.assertEqual(script_action.get_full_command_string(), ex)
 
+    def test_script_path_relative_to_home_dir(self):
+        script_action = ParamikoRemoteScriptActionTests._get_test_script_action()
+        script_action.remote_script = '~/.st2-script-cache/abcd/remote_script.sh'
+        script_action.named_args = {}
+        script_action.positional_args = []
+        ex = 'cd /tmp && "$HOME"/.st2-script-cache/abcd/remote_script.sh'
+        self.assertEqual(script_action.get_full_command_string(), ex)
+
+        # Test with sudo - home directory of the SSH user is expanded by the outer shell
+        script_action.sudo = True
+        ex = 'sudo -E -- bash -c ' + \
+             '\'cd /tmp && "\'"$HOME"\'"/.st2-script-cache/abcd/remote_script.sh\''
+        self.assertEqual(script_action.get_full_command_string(), ex)
+
     @staticmethod
     def _get_test_script_action():
         local_script_path = '/opt/stackstorm/packs/fixtures/actions/remote_script.sh'
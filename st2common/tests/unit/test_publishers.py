@@ -0,0 +1,167 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import socket
+from collections import defaultdict
+
+import mock
+import unittest2
+from kombu import Exchange
+from kombu import Queue
+from oslo_config import cfg
+
+import st2tests.config as tests_config
+tests_config.parse_args()
+
+from st2common.transport import publishers
+from st2common.transport.publishers import PoolPublisher
+from st2common.transport.publishers import PublisherConfirms
+from st2common.transport import serializers
+
+EXCHANGE = Exchange('st2.test', type='topic')
+
+
+class PoolPublisherTestCase(unittest2.TestCase):
+
+    def test_producer_and_channel_are_reused(self):
+        publisher = PoolPublisher(urls=['memory://'])
+
+        with publisher.pool.acquire(block=True) as connection:
+            queue = Queue('st2.test.queue', EXCHANGE, routing_key='#')
+            queue(connection.default_channel).declare()
+
+        with mock.patch.object(publishers, 'Producer', wraps=publishers.Producer) as producer_cls:
+            publisher.publish({'id': 1}, EXCHANGE, routing_key='create')
+            publisher.publish_many([{'id': 2}, {'id': 3}], EXCHANGE, routing_key='create')
+            self.assertEqual(producer_cls.call_count, 1)
+
+        with publisher.pool.acquire(block=True) as connection:
+            channel = connection.default_channel
+            bodies = []
+            message = queue(channel).get(accept=['pickle'])
+            while message:
+                bodies.append(message.payload)
+                message = queue(channel).get(accept=['pickle'])
+
+        self.assertEqual(bodies, [{'id': 1}, {'id': 2}, {'id': 3}])
+
+    def test_compact_serializer_and_compression(self):
+        cfg.CONF.set_override(name='serializer', override='st2json', group='messaging')
+        cfg.CONF.set_override(name='compression_threshold', override=100, group='messaging')
+        self.addCleanup(cfg.CONF.clear_override, name='serializer', group='messaging')
+        self.addCleanup(cfg.CONF.clear_override, name='compression_threshold', group='messaging')
+
+        publisher = PoolPublisher(urls=['memory://'])
+
+        with publisher.pool.acquire(block=True) as connection:
+            queue = Queue('st2.test.compact', EXCHANGE, routing_key='#')
+            queue(connection.default_channel).declare()
+
+        payloads = [{'id': 1}, {'id': 2, 'result': 'x' * 1000}]
+        publisher.publish_many(payloads, EXCHANGE, routing_key='create')
+
+        with publisher.pool.acquire(block=True) as connection:
+            messages = [queue(connection.default_channel).get(accept=serializers.ACCEPT_CONTENT)
+                        for _ in payloads]
+
+        self.assertEqual([message.payload for message in messages], payloads)
+        self.assertEqual(messages[0].content_type, serializers.COMPACT_CONTENT_TYPE)
+        self.assertFalse('compression' in messages[0].headers)
+        self.assertEqual(messages[1].headers['compression'], 'application/x-gzip')
+
+    def test_publish_many_with_publisher_confirms(self):
+        cfg.CONF.set_override(name='publisher_confirms', override=True, group='messaging')
+        self.addCleanup(cfg.CONF.clear_override, name='publisher_confirms', group='messaging')
+
+        publisher = PoolPublisher(urls=['memory://'])
+
+        with publisher.pool.acquire(block=True) as connection:
+            queue = Queue('st2.test.confirms', EXCHANGE, routing_key='#')
+            channel = connection.default_channel
+            queue(channel).declare()
+
+        # Memory transport doesn't support publisher confirms so the broker side is emulated
+        calls = []
+        basic_publish = channel.basic_publish
+
+        def mock_basic_publish(*args, **kwargs):
+            calls.append('basic_publish')
+            return basic_publish(*args, **kwargs)
+
+        def mock_wait(allowed_methods, timeout=None):
+            calls.append('wait')
+            delivery_tag = calls.count('basic_publish')
+            for callback in list(channel.events['basic_ack']):
+                callback(delivery_tag, True)
+
+        channel.events = defaultdict(set)
+        channel.confirm_select = mock.Mock(side_effect=lambda: calls.append('confirm_select'))
+        channel.basic_publish = mock_basic_publish
+        channel.wait = mock_wait
+
+        publisher.publish_many([{'id': 1}, {'id': 2}], EXCHANGE, routing_key='create')
+        publisher.publish({'id': 3}, EXCHANGE, routing_key='create')
+
+        # Channel is put in the confirm mode once, before the first message is published on it
+        # and confirmations are awaited once per batch
+        self.assertEqual(calls, ['confirm_select', 'basic_publish', 'basic_publish', 'wait',
+                                 'basic_publish', 'wait'])
+
+        with publisher.pool.acquire(block=True) as connection:
+            bodies = [queue(connection.default_channel).get(accept=['pickle']).payload
+                      for _ in range(3)]
+        self.assertEqual(bodies, [{'id': 1}, {'id': 2}, {'id': 3}])
+
+
+class PublisherConfirmsTestCase(unittest2.TestCase):
+
+    def test_wait_for_multiple_messages(self):
+        channel = mock.Mock(events=defaultdict(set))
+        confirms = PublisherConfirms(channel=channel)
+        self.assertEqual(channel.confirm_select.call_count, 1)
+
+        for _ in range(4):
+            confirms.add_published()
+
+        # Broker acks the first two messages at once, nacks the third one and acks the last one
+        responses = [('basic_ack', 2, True), ('basic_nack', 3, False), ('basic_ack', 4, False)]
+
+        def wait(allowed_methods):
+            event, delivery_tag, multiple = responses.pop(0)
+            for callback in channel.events[event]:
+                callback(delivery_tag, multiple)
+
+        channel.wait.side_effect = wait
+
+        self.assertEqual(confirms.wait(), 1)
+        self.assertEqual(channel.wait.call_count, 3)
+
+        # Nothing is pending anymore
+        self.assertEqual(confirms.wait(), 0)
+        self.assertEqual(channel.wait.call_count, 3)
+
+    def test_wait_timeout(self):
+        channel = mock.Mock(events=defaultdict(set))
+        channel.wait.side_effect = socket.timeout()
+        confirms = PublisherConfirms(channel=channel)
+
+        for _ in range(2):
+            confirms.add_published()
+
+        # Messages which haven't been confirmed in time are treated as rejected
+        self.assertEqual(confirms.wait(timeout=0.05), 2)
+        self.assertTrue(channel.wait.call_count >= 1)
+        self.assertTrue(channel.wait.call_args[1]['timeout'] <= 0.05)
+        self.assertEqual(confirms.wait(timeout=0.05), 0)
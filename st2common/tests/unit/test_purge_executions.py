@@ -22,6 +22,7 @@ from st2common import log as logging
 from st2common.garbage_collection.executions import purge_executions
 from st2common.constants import action as action_constants
 from st2common.persistence.execution import ActionExecution
+from st2common.persistence.execution import ActionExecutionFilterValue
 from st2common.persistence.liveaction import LiveAction
 from st2common.util import date as date_utils
 from st2tests.base import CleanDbTestCase
@@ -183,3 +184,42 @@ class TestPurgeExecutions(CleanDbTestCase):
         self.assertEqual(len(ActionExecution.get_all()), 5)
         purge_executions(logger=LOG, timestamp=now - timedelta(days=10), purge_incomplete=True)
         self.assertEqual(len(ActionExecution.get_all()), 0)
+
+    def test_unused_filter_values_get_deleted(self):
+        now = date_utils.get_datetime_utc_now()
+
+        # Write one execution after cut-off threshold
+        exec_model = copy.deepcopy(self.models['executions']['execution1.yaml'])
+        exec_model['start_timestamp'] = now - timedelta(days=15)
+        exec_model['end_timestamp'] = now - timedelta(days=14)
+        exec_model['status'] = action_constants.LIVEACTION_STATUS_SUCCEEDED
+        exec_model['id'] = bson.ObjectId()
+        ActionExecution.add_or_update(exec_model)
+
+        # Write executions before cut-off threshold, one of them is not in a done state
+        exec_model = copy.deepcopy(self.models['executions']['execution1.yaml'])
+        exec_model['start_timestamp'] = now - timedelta(days=22)
+        exec_model['end_timestamp'] = now - timedelta(days=21)
+        exec_model['status'] = action_constants.LIVEACTION_STATUS_FAILED
+        exec_model['action']['ref'] = 'core.old_action'
+        exec_model['id'] = bson.ObjectId()
+        ActionExecution.add_or_update(exec_model)
+
+        exec_model = copy.deepcopy(self.models['executions']['execution1.yaml'])
+        exec_model['start_timestamp'] = now - timedelta(days=22)
+        exec_model['status'] = action_constants.LIVEACTION_STATUS_RUNNING
+        exec_model['action']['ref'] = 'core.running_action'
+        exec_model['id'] = bson.ObjectId()
+        ActionExecution.add_or_update(exec_model)
+
+        values = ActionExecutionFilterValue.get_values(filter_names=['action', 'status'])
+        self.assertItemsEqual(values['action'],
+                              ['core.local', 'core.old_action', 'core.running_action'])
+        self.assertItemsEqual(values['status'], ['succeeded', 'failed', 'running'])
+
+        purge_executions(logger=LOG, timestamp=now - timedelta(days=20))
+        self.assertEqual(len(ActionExecution.get_all()), 2)
+
+        values = ActionExecutionFilterValue.get_values(filter_names=['action', 'status'])
+        self.assertItemsEqual(values['action'], ['core.local', 'core.running_action'])
+        self.assertItemsEqual(values['status'], ['succeeded', 'running'])
@@ -0,0 +1,143 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import mock
+import unittest2
+
+from st2common.models.utils import query_metrics
+from st2common.models.utils.query_metrics import LatencyHistogram
+from st2common.models.utils.query_metrics import QueryMetricsListener
+from st2common.models.utils.query_metrics import QueryStatsReporter
+from st2common.models.utils.query_metrics import get_command_filter
+from st2common.models.utils.query_metrics import get_query_shape
+
+CONNECTION_ID = ('localhost', 27017)
+
+
+def execute_command(listener, request_id, command, duration_micros, command_name='find'):
+    listener.started(mock.Mock(command=command, command_name=command_name,
+                               connection_id=CONNECTION_ID, request_id=request_id))
+    listener.succeeded(mock.Mock(command_name=command_name, duration_micros=duration_micros,
+                                 connection_id=CONNECTION_ID, request_id=request_id))
+
+
+class LatencyHistogramTestCase(unittest2.TestCase):
+
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        self.assertEqual(histogram.percentile(50), 0.0)
+
+        for _ in range(90):
+            histogram.add(0.5)
+        for _ in range(9):
+            histogram.add(30)
+        histogram.add(7000)
+
+        self.assertEqual(histogram.count, 100)
+        self.assertEqual(histogram.max, 7000)
+        self.assertEqual(histogram.percentile(50), 1.0)
+        self.assertEqual(histogram.percentile(95), 50.0)
+        self.assertEqual(histogram.percentile(100), 7000)
+
+        stats = histogram.to_dict()
+        self.assertEqual(stats['buckets']['1'], 90)
+        self.assertEqual(stats['buckets']['50'], 9)
+        self.assertEqual(stats['buckets']['inf'], 1)
+        self.assertAlmostEqual(stats['avg_ms'], 73.15)
+
+
+class QueryShapeTestCase(unittest2.TestCase):
+
+    def test_get_query_shape(self):
+        query = {
+            'status': {'$in': ['failed', 'timeout']},
+            'start_timestamp': {'$gt': 1, '$lt': 2},
+            '$or': [{'action': 'core.local'}, {'context.user': 'stanley'}]
+        }
+        expected = {
+            'status': {'$in': '?'},
+            'start_timestamp': {'$gt': '?', '$lt': '?'},
+            '$or': [{'action': '?'}, {'context.user': '?'}]
+        }
+        self.assertEqual(get_query_shape(query), expected)
+        self.assertEqual(get_query_shape({'status': None}), {'status': '?'})
+        self.assertEqual(get_query_shape([{'$match': {'rule.id': 'abc'}}]),
+                         [{'$match': {'rule.id': '?'}}])
+
+    def test_get_command_filter(self):
+        self.assertEqual(get_command_filter({'find': 'rule_d_b', 'filter': {'a': 1}}, 'find'),
+                         {'a': 1})
+        self.assertEqual(get_command_filter({'count': 'rule_d_b', 'query': {'a': 1}}, 'count'),
+                         {'a': 1})
+        self.assertEqual(get_command_filter({'delete': 'rule_d_b', 'deletes': [{'q': {'a': 1}}]},
+                                            'delete'), {'a': 1})
+        self.assertEqual(get_command_filter({'insert': 'rule_d_b', 'documents': [{'a': 1}]},
+                                            'insert'), None)
+
+
+class QueryMetricsListenerTestCase(unittest2.TestCase):
+
+    def test_stats_per_collection_and_command(self):
+        listener = QueryMetricsListener()
+        execute_command(listener, 1, {'find': 'rule_d_b'}, 1000)
+        execute_command(listener, 2, {'find': 'rule_d_b'}, 3000)
+        execute_command(listener, 3, {'insert': 'trigger_instance_d_b'}, 500, 'insert')
+
+        stats = listener.get_stats(reset=True)['collections']
+        self.assertEqual(sorted(stats.keys()), ['rule_d_b', 'trigger_instance_d_b'])
+        self.assertEqual(stats['rule_d_b']['find']['count'], 2)
+        self.assertEqual(stats['rule_d_b']['find']['total_ms'], 4.0)
+        self.assertEqual(stats['rule_d_b']['find']['max_ms'], 3.0)
+        self.assertEqual(stats['trigger_instance_d_b']['insert']['count'], 1)
+
+        self.assertEqual(listener.get_stats()['collections'], {})
+
+    @mock.patch.object(query_metrics, 'LOG')
+    def test_slow_query_is_logged_without_values(self, mock_log):
+        listener = QueryMetricsListener(slow_query_threshold_ms=100)
+        command = {'find': 'action_execution_d_b', 'filter': {'liveaction.id': 'secret_id'},
+                   'sort': {'start_timestamp': -1}}
+        execute_command(listener, 1, command, 50000)
+        self.assertFalse(mock_log.warning.called)
+
+        execute_command(listener, 2, command, 150000)
+        self.assertEqual(mock_log.warning.call_count, 1)
+
+        args, kwargs = mock_log.warning.call_args
+        message = args[0] % args[1:]
+        self.assertEqual(message, 'Slow MongoDB query (150.000 ms): '
+                                  'db.action_execution_d_b.find({"liveaction.id": "?"})')
+        self.assertNotIn('secret_id', str(kwargs))
+        self.assertEqual(kwargs['extra']['sort'], ['start_timestamp'])
+
+    @mock.patch.object(query_metrics, 'LOG')
+    def test_reporter_logs_summary(self, mock_log):
+        listener = QueryMetricsListener()
+        reporter = QueryStatsReporter(listener=listener, interval=60)
+
+        reporter.report()
+        self.assertFalse(mock_log.info.called)
+
+        execute_command(listener, 1, {'find': 'rule_d_b'}, 1000)
+        execute_command(listener, 2, {'update': 'action_execution_d_b'}, 20000, 'update')
+        reporter.report()
+
+        self.assertEqual(mock_log.info.call_count, 1)
+        lines = mock_log.info.call_args[0][2].split('\n')
+        self.assertTrue(lines[0].startswith('action_execution_d_b.update: count=1'))
+        self.assertTrue(lines[1].startswith('rule_d_b.find: count=1'))
+
+        # Stats are reset after each summary
+        self.assertEqual(listener.get_stats()['collections'], {})
@@ -13,6 +13,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import eventlet
 import mock
 from kombu import Exchange, Queue
 
@@ -100,3 +101,65 @@ class StagedQueueConsumerTest(DbTestCase):
         mock_message = mock.MagicMock()
         handler._queue_consumer.process(payload, mock_message)
         self.assertTrue(mock_message.ack.called)
+
+
+class FakeBatchedMessageHandler(consumers.BatchedMessageHandler):
+    message_type = FakeModelDB
+
+    def process_batch(self, payloads):
+        pass
+
+
+def get_batched_handler(batch_size=3, batch_linger=10):
+    return FakeBatchedMessageHandler(mock.MagicMock(), [FAKE_WORK_Q], batch_size=batch_size,
+                                     batch_linger=batch_linger)
+
+
+class BatchedQueueConsumerTest(DbTestCase):
+
+    def test_batch_size_one_uses_regular_consumer(self):
+        handler = get_batched_handler(batch_size=1)
+        self.assertEqual(type(handler._queue_consumer), consumers.QueueConsumer)
+
+    @mock.patch.object(BufferedDispatcher, 'dispatch', mock.MagicMock())
+    def test_batch_is_dispatched_once_full(self):
+        handler = get_batched_handler(batch_size=3)
+        consumer = handler._queue_consumer
+        payloads = [FakeModelDB(), FakeModelDB(), FakeModelDB(), FakeModelDB()]
+        mock_message = mock.MagicMock()
+
+        for payload in payloads[:2]:
+            consumer.process(payload, mock_message)
+        self.assertFalse(BufferedDispatcher.dispatch.called)
+        self.assertEqual(mock_message.ack.call_count, 2)
+
+        consumer.process(payloads[2], mock_message)
+        BufferedDispatcher.dispatch.assert_called_once_with(consumer._process_messages,
+                                                            payloads[:3])
+
+        # Remaining messages are dispatched on linger timeout (or shutdown)
+        consumer.process(payloads[3], mock_message)
+        self.assertTrue(consumer._flush_timer is not None)
+        consumer.shutdown()
+        BufferedDispatcher.dispatch.assert_called_with(consumer._process_messages,
+                                                       payloads[3:])
+        self.assertEqual(consumer._flush_timer, None)
+
+    @mock.patch.object(BufferedDispatcher, 'dispatch', mock.MagicMock())
+    def test_batch_is_dispatched_after_linger(self):
+        handler = get_batched_handler(batch_size=3, batch_linger=0.01)
+        consumer = handler._queue_consumer
+        payload = FakeModelDB()
+        consumer.process(payload, mock.MagicMock())
+        self.assertFalse(BufferedDispatcher.dispatch.called)
+
+        eventlet.sleep(0.05)
+        BufferedDispatcher.dispatch.assert_called_once_with(consumer._process_messages,
+                                                            [payload])
+
+    @mock.patch.object(FakeBatchedMessageHandler, 'process_batch', mock.MagicMock())
+    def test_process_messages(self):
+        payloads = [FakeModelDB(), FakeModelDB()]
+        handler = get_batched_handler()
+        handler._queue_consumer._process_messages(payloads)
+        FakeBatchedMessageHandler.process_batch.assert_called_once_with(payloads)
@@ -0,0 +1,191 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+
+import mock
+import unittest2
+from oslo_config import cfg
+
+import st2tests.config as tests_config
+tests_config.parse_args()
+
+from st2common.models.db.auth import UserDB
+from st2common.models.db.rbac import RoleDB
+from st2common.models.db.rbac import PermissionGrantDB
+from st2common.models.db.rbac import UserRoleAssignmentDB
+from st2common.persistence.rbac import Role
+from st2common.persistence.rbac import UserRoleAssignment
+from st2common.persistence.rbac import PermissionGrant
+from st2common.rbac import permissions_cache
+from st2common.rbac.permissions_cache import UserPermissions
+from st2common.rbac.permissions_cache import get_user_permissions
+from st2common.rbac.permissions_cache import invalidate_permissions_cache
+from st2common.rbac.types import PermissionType
+from st2common.rbac.types import ResourceType
+
+USER_DB = UserDB(name='user1')
+
+GRANT_1 = PermissionGrantDB(id='567890ab567890ab567890ab',
+                            resource_uid='pack:dummy_pack_1',
+                            resource_type=ResourceType.PACK,
+                            permission_types=[PermissionType.ACTION_VIEW])
+GRANT_2 = PermissionGrantDB(id='567890ab567890ab567890ac',
+                            resource_uid='action:dummy_pack_1:my_action',
+                            resource_type=ResourceType.ACTION,
+                            permission_types=[PermissionType.ACTION_EXECUTE])
+GRANT_3 = PermissionGrantDB(id='567890ab567890ab567890ad',
+                            resource_uid=None,
+                            resource_type=None,
+                            permission_types=[PermissionType.RULE_CREATE])
+
+
+class UserPermissionsTestCase(unittest2.TestCase):
+
+    def setUp(self):
+        super(UserPermissionsTestCase, self).setUp()
+        self.permissions = UserPermissions(role_names=['role1'],
+                                           permission_grant_dbs=[GRANT_1, GRANT_2, GRANT_3])
+
+    def test_has_permission_grant_resource_uid(self):
+        self.assertTrue(self.permissions.has_permission_grant(
+            resource_uid='pack:dummy_pack_1',
+            resource_types=[ResourceType.PACK],
+            permission_types=[PermissionType.ACTION_VIEW, PermissionType.ACTION_ALL]))
+        self.assertFalse(self.permissions.has_permission_grant(
+            resource_uid='pack:dummy_pack_1',
+            resource_types=[ResourceType.PACK],
+            permission_types=[PermissionType.ACTION_EXECUTE]))
+        self.assertFalse(self.permissions.has_permission_grant(
+            resource_uid='pack:dummy_pack_1',
+            resource_types=[ResourceType.ACTION],
+            permission_types=[PermissionType.ACTION_VIEW]))
+        self.assertFalse(self.permissions.has_permission_grant(
+            resource_uid='pack:dummy_pack_2',
+            permission_types=[PermissionType.ACTION_VIEW]))
+
+    def test_has_permission_grant_resource_types(self):
+        self.assertTrue(self.permissions.has_permission_grant(
+            resource_types=[ResourceType.ACTION],
+            permission_types=[PermissionType.ACTION_EXECUTE]))
+        self.assertFalse(self.permissions.has_permission_grant(
+            resource_types=[ResourceType.RULE],
+            permission_types=[PermissionType.ACTION_EXECUTE]))
+
+    def test_has_permission_grant_permission_types(self):
+        self.assertTrue(self.permissions.has_permission_grant(
+            permission_types=[PermissionType.RULE_CREATE]))
+        self.assertFalse(self.permissions.has_permission_grant(
+            permission_types=[PermissionType.RULE_DELETE]))
+        self.assertTrue(self.permissions.has_permission_grant())
+        self.assertFalse(UserPermissions(role_names=[],
+                                         permission_grant_dbs=[]).has_permission_grant())
+
+
+@mock.patch.object(permissions_cache, '_start_invalidator', mock.Mock())
+class PermissionsCacheTestCase(unittest2.TestCase):
+
+    def setUp(self):
+        super(PermissionsCacheTestCase, self).setUp()
+        cfg.CONF.set_override(name='permissions_cache_ttl', override=10, group='rbac')
+        invalidate_permissions_cache(publish=False)
+
+    def tearDown(self):
+        super(PermissionsCacheTestCase, self).tearDown()
+        cfg.CONF.set_override(name='permissions_cache_ttl', override=0, group='rbac')
+        invalidate_permissions_cache(publish=False)
+
+    @mock.patch.object(UserRoleAssignment, 'query')
+    @mock.patch.object(Role, 'query')
+    @mock.patch.object(PermissionGrant, 'query')
+    def test_get_user_permissions_is_cached(self, mock_grant_query, mock_role_query,
+                                            mock_assignment_query):
+        mock_assignment_query.return_value.only.return_value.scalar.return_value = \
+            ['role1', 'role_which_doesnt_exist']
+        mock_role_query.return_value = [RoleDB(name='role1',
+                                               permission_grants=[str(GRANT_1.id)])]
+        mock_grant_query.return_value = [GRANT_1]
+
+        permissions = get_user_permissions(user_db=USER_DB)
+        self.assertEqual(permissions.role_names, set(['role1']))
+        self.assertTrue(permissions.has_permission_grant(resource_uid='pack:dummy_pack_1'))
+
+        # Subsequent lookup is served from the cache
+        self.assertEqual(get_user_permissions(user_db=USER_DB), permissions)
+        self.assertEqual(mock_assignment_query.call_count, 1)
+        self.assertEqual(mock_role_query.call_count, 1)
+        self.assertEqual(mock_grant_query.call_count, 1)
+
+        # Snapshot has expired
+        with mock.patch.object(time, 'time', mock.Mock(return_value=time.time() + 11)):
+            get_user_permissions(user_db=USER_DB)
+        self.assertEqual(mock_assignment_query.call_count, 2)
+
+        # Cache has been invalidated
+        invalidate_permissions_cache(publish=False)
+        get_user_permissions(user_db=USER_DB)
+        self.assertEqual(mock_assignment_query.call_count, 3)
+
+    @mock.patch.object(UserRoleAssignment, 'query')
+    @mock.patch.object(Role, 'query')
+    def test_get_user_permissions_cache_disabled(self, mock_role_query, mock_assignment_query):
+        cfg.CONF.set_override(name='permissions_cache_ttl', override=0, group='rbac')
+        mock_assignment_query.return_value.only.return_value.scalar.return_value = []
+
+        get_user_permissions(user_db=USER_DB)
+        get_user_permissions(user_db=USER_DB)
+
+        self.assertEqual(mock_assignment_query.call_count, 2)
+        self.assertFalse(mock_role_query.called)
+
+    def test_invalidate_permissions_cache_publishes_change(self):
+        publisher = mock.Mock()
+
+        with mock.patch.object(permissions_cache, '_PUBLISHER', publisher):
+            invalidate_permissions_cache(publish=False)
+            self.assertFalse(publisher.publish_change.called)
+
+            invalidate_permissions_cache()
+            self.assertEqual(publisher.publish_change.call_count, 1)
+
+    @mock.patch.object(UserRoleAssignment, '_get_impl')
+    @mock.patch.object(UserRoleAssignment, 'query')
+    @mock.patch.object(Role, 'query')
+    def test_rbac_model_writes_invalidate_cache(self, mock_role_query, mock_assignment_query,
+                                                mock_get_impl):
+        mock_assignment_query.return_value.only.return_value.scalar.return_value = ['role1']
+        mock_role_query.return_value = []
+        publisher = mock.Mock()
+        role_assignment_db = UserRoleAssignmentDB(user=USER_DB.name, role='role1')
+
+        with mock.patch.object(permissions_cache, '_PUBLISHER', publisher):
+            get_user_permissions(user_db=USER_DB)
+            get_user_permissions(user_db=USER_DB)
+            self.assertEqual(mock_assignment_query.call_count, 1)
+
+            # Role assignment is revoked directly through the persistence layer
+            mock_assignment_query.return_value.only.return_value.scalar.return_value = []
+            UserRoleAssignment.delete(role_assignment_db)
+
+            permissions = get_user_permissions(user_db=USER_DB)
+            self.assertEqual(mock_assignment_query.call_count, 2)
+            self.assertEqual(permissions.role_names, set([]))
+            self.assertEqual(publisher.publish_change.call_count, 1)
+
+            # Publish is skipped when requested by the caller
+            UserRoleAssignment.add_or_update(role_assignment_db, publish=False)
+            get_user_permissions(user_db=USER_DB)
+            self.assertEqual(mock_assignment_query.call_count, 2)
+            self.assertEqual(publisher.publish_change.call_count, 1)
@@ -20,6 +20,9 @@ from st2tests.base import DbTestCase
 from st2tests.config import parse_args
 from st2common.models.db.auth import UserDB
 from st2common.models.db.rbac import UserRoleAssignmentDB
+from st2common.persistence.rbac import UserRoleAssignment
+from st2common.rbac import permissions_cache
+from st2common.rbac.permissions_cache import invalidate_permissions_cache
 
 from st2common.rbac.types import SystemRole
 from st2common.rbac.utils import request_user_is_system_admin
@@ -183,3 +186,24 @@ class RBACUtilsTestCase(DbTestCase):
 
         # Regular user
         self.assertFalse(user_has_role(user_db=self.regular_user, role=SystemRole.ADMIN))
+
+    @mock.patch.object(permissions_cache, '_start_invalidator', mock.Mock())
+    @mock.patch.object(permissions_cache, '_PUBLISHER', mock.Mock())
+    def test_has_role_revoked_role_takes_effect_with_permissions_cache(self):
+        cfg.CONF.set_override(name='enable', override=True, group='rbac')
+        cfg.CONF.set_override(name='permissions_cache_ttl', override=10, group='rbac')
+        self.addCleanup(cfg.CONF.set_override, name='permissions_cache_ttl', override=0,
+                        group='rbac')
+        self.addCleanup(invalidate_permissions_cache, publish=False)
+
+        user_db = UserDB(name='cached_user')
+        user_db.save()
+
+        role_assignment_db = UserRoleAssignmentDB(user=user_db.name, role=SystemRole.ADMIN)
+        role_assignment_db = UserRoleAssignment.add_or_update(role_assignment_db)
+        self.assertTrue(user_has_role(user_db=user_db, role=SystemRole.ADMIN))
+
+        # Assignment is removed directly through the persistence layer (e.g. by the
+        # definitions syncer) and not through the RBAC service functions
+        UserRoleAssignment.delete(role_assignment_db)
+        self.assertFalse(user_has_role(user_db=user_db, role=SystemRole.ADMIN))
@@ -0,0 +1,107 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import calendar
+import time
+
+import mock
+import unittest2
+from oslo_config import cfg
+
+import st2tests.config as tests_config
+tests_config.parse_args()
+
+from st2common.exceptions.auth import TokenExpiredError
+from st2common.exceptions.auth import TokenNotFoundError
+from st2common.persistence.auth import Token
+from st2common.services import access
+from st2common.util import auth as auth_utils
+from st2common.util import signed_token
+
+KEYS = [('key2', 'secret2'), ('key1', 'secret1')]
+
+
+class SignedTokenUtilsTestCase(unittest2.TestCase):
+
+    def tearDown(self):
+        super(SignedTokenUtilsTestCase, self).tearDown()
+        cfg.CONF.clear_override(name='execution_token_signing_keys', group='auth')
+
+    def test_sign_and_verify_token(self):
+        payload = {'user': 'stanley', 'execution_id': 'abc', 'expiry': 10}
+        token = signed_token.sign_token(payload, key_id='key1', key='secret1')
+
+        self.assertTrue(signed_token.is_signed_token(token))
+        self.assertFalse(signed_token.is_signed_token('e4d0e5a8b2b84b40b3c4f87d2bc97b5e'))
+        self.assertEqual(signed_token.verify_token(token, keys=KEYS), payload)
+
+    def test_verify_token_failure(self):
+        token = signed_token.sign_token({'user': 'stanley'}, key_id='key1', key='secret1')
+        key_id, payload, signature = token.split('.')
+
+        # Tampered payload
+        other_payload = signed_token.sign_token({'user': 'admin'}, key_id='key1',
+                                                key='secret1').split('.')[1]
+        self.assertRaises(TokenNotFoundError, signed_token.verify_token,
+                          '.'.join([key_id, other_payload, signature]), KEYS)
+
+        # Key which has been rotated out
+        self.assertRaises(TokenNotFoundError, signed_token.verify_token, token,
+                          [('key2', 'secret2')])
+
+        # Key id doesn't match the key
+        self.assertRaises(TokenNotFoundError, signed_token.verify_token, token,
+                          [('key1', 'secret2')])
+
+        self.assertRaises(TokenNotFoundError, signed_token.verify_token, 'invalid', KEYS)
+
+    def test_get_signing_keys(self):
+        cfg.CONF.set_override(name='execution_token_signing_keys',
+                              override=['key2:secret2', 'key1:secret:1'], group='auth')
+        self.assertEqual(signed_token.get_signing_keys(),
+                         [('key2', 'secret2'), ('key1', 'secret:1')])
+
+        cfg.CONF.set_override(name='execution_token_signing_keys', override=['secret'],
+                              group='auth')
+        self.assertRaises(ValueError, signed_token.get_signing_keys)
+
+    @mock.patch.object(access, 'is_execution_revoked', mock.Mock(return_value=False))
+    @mock.patch.object(Token, 'get', mock.Mock())
+    def test_validate_execution_token(self):
+        cfg.CONF.set_override(name='execution_token_signing_keys',
+                              override=['key2:secret2', 'key1:secret1'], group='auth')
+        expiry = calendar.timegm(time.gmtime()) + 100
+        payload = {'user': 'stanley', 'execution_id': 'abc', 'expiry': expiry}
+
+        # Token signed with an older key is still accepted
+        token = signed_token.sign_token(payload, key_id='key1', key='secret1')
+        token_db = auth_utils.validate_token(token)
+
+        self.assertEqual(token_db.user, 'stanley')
+        self.assertEqual(token_db.token, token)
+        self.assertEqual(token_db.metadata, {'execution_id': 'abc'})
+        self.assertFalse(Token.get.called)
+        access.is_execution_revoked.assert_called_once_with('abc')
+
+        # Expired token
+        payload['expiry'] = expiry - 200
+        token = signed_token.sign_token(payload, key_id='key2', key='secret2')
+        self.assertRaises(TokenExpiredError, auth_utils.validate_token, token)
+
+        # Revoked token
+        payload['expiry'] = expiry
+        token = signed_token.sign_token(payload, key_id='key2', key='secret2')
+        access.is_execution_revoked.return_value = True
+        self.assertRaises(TokenExpiredError, auth_utils.validate_token, token)
@@ -0,0 +1,144 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+import json
+import zlib
+
+import bson
+import unittest2
+from kombu import serialization
+
+from st2common.constants.trace import TRACE_CONTEXT
+from st2common.models.api.trace import TraceContext
+from st2common.models.db.execution import ActionExecutionDB
+from st2common.models.db.liveaction import LiveActionDB
+from st2common.models.db.notification import NotificationSchema
+from st2common.models.db.notification import NotificationSubSchema
+from st2common.models.db.trigger import TriggerInstanceDB
+from st2common.transport import serializers
+from st2common.util import date as date_utils
+
+RESULT = {
+    'stdout': 'line\n' * 1000,
+    'stderr': '',
+    'nested': {'key.with.dots': [1, 2.5, None, True], '$dollar': {'a': 'b'}}
+}
+
+
+class CompactSerializerTestCase(unittest2.TestCase):
+
+    def test_liveaction_round_trip(self):
+        liveaction_db = LiveActionDB(id=bson.ObjectId(), status='succeeded', action='core.local',
+                                     start_timestamp=date_utils.get_datetime_utc_now(),
+                                     parameters={'cmd': 'date'}, result=RESULT,
+                                     context={'user': 'stanley'})
+        liveaction_db.notify = NotificationSchema(
+            on_success=NotificationSubSchema(message='done', routes=['slack']))
+
+        result = self._round_trip(liveaction_db)
+
+        self.assertTrue(isinstance(result, LiveActionDB))
+        self.assertEqual(result.id, liveaction_db.id)
+        self.assertEqual(result.start_timestamp, liveaction_db.start_timestamp)
+        self.assertEqual(result.result, RESULT)
+        self.assertEqual(result.notify.on_success.routes, ['slack'])
+
+        # Note: Embedded documents are serialized to strings which contain object ids
+        expected = liveaction_db.to_serializable_dict()
+        expected.pop('notify')
+        actual = result.to_serializable_dict()
+        actual.pop('notify')
+        self.assertEqual(actual, expected)
+
+    def test_execution_round_trip(self):
+        execution_db = ActionExecutionDB(id=bson.ObjectId(), status='succeeded',
+                                         action={'ref': 'core.local'},
+                                         runner={'name': 'local-shell-cmd'},
+                                         liveaction={'id': str(bson.ObjectId())},
+                                         start_timestamp=date_utils.get_datetime_utc_now(),
+                                         result=RESULT, children=['a', 'b'])
+
+        result = self._round_trip(execution_db)
+
+        self.assertTrue(isinstance(result, ActionExecutionDB))
+        self.assertEqual(result.to_serializable_dict(), execution_db.to_serializable_dict())
+
+    def test_trigger_instance_and_dict_payload_round_trip(self):
+        occurrence_time = date_utils.get_datetime_utc_now()
+        trigger_instance_db = TriggerInstanceDB(id=bson.ObjectId(), trigger='core.st2.webhook',
+                                                payload={'a.b': 1}, status='pending',
+                                                occurrence_time=occurrence_time)
+        payload = {
+            'trigger_instance': trigger_instance_db,
+            TRACE_CONTEXT: TraceContext(trace_tag='tag1'),
+            'naive': datetime.datetime(2016, 1, 1, 10, 10, 10, 123456),
+            # User provided values which look like serialized objects are left alone
+            'user': {serializers.TYPE_KEY: 'foo', serializers.VALUE_KEY: 'bar'},
+            'user_nested': {serializers.TYPE_KEY: 'oid', serializers.VALUE_KEY: {
+                serializers.TYPE_KEY: 'datetime', serializers.VALUE_KEY: 0}}
+        }
+
+        result = self._round_trip(payload)
+
+        self.assertEqual(result['trigger_instance'].payload, {'a.b': 1})
+        self.assertEqual(result['trigger_instance'].occurrence_time, occurrence_time)
+        self.assertEqual(result[TRACE_CONTEXT].trace_tag, 'tag1')
+        self.assertEqual(result['naive'], payload['naive'])
+        self.assertEqual(result['naive'].tzinfo, None)
+        self.assertEqual(result['user'], payload['user'])
+        self.assertEqual(result['user_nested'], payload['user_nested'])
+
+    def test_unsupported_object_is_not_serialized(self):
+        class Custom(object):
+            pass
+
+        self.assertRaises(TypeError, serializers.dumps, {'value': Custom()})
+        self.assertRaises(TypeError, serializers.dumps, {'value': set([1])})
+
+    def test_unsupported_encoded_object_is_rejected(self):
+        # Pickled objects are never restored
+        data = json.dumps({'a': {serializers.TYPE_KEY: 'pickle', serializers.VALUE_KEY: 'Yw=='}})
+        self.assertRaises(ValueError, serializers.loads, data)
+
+        # Only top level models can be restored
+        data = json.dumps({serializers.TYPE_KEY: serializers.MODEL_TYPE,
+                           serializers.VALUE_KEY: ['NotificationSubSchema', {}]})
+        self.assertRaises(ValueError, serializers.loads, data)
+
+        data = json.dumps({serializers.TYPE_KEY: serializers.MODEL_TYPE,
+                           serializers.VALUE_KEY: ['UnknownDB', {}]})
+        self.assertRaises(ValueError, serializers.loads, data)
+
+        # Only white listed fields of the internal objects are accepted
+        data = json.dumps({serializers.TYPE_KEY: 'trace_context',
+                           serializers.VALUE_KEY: {'trace_tag': 'a', 'foo': 'bar'}})
+        self.assertRaises(TypeError, serializers.loads, data)
+
+    def test_compressed_message(self):
+        content_type, content_encoding, body = serialization.dumps(
+            {'result': RESULT}, serializer=serializers.COMPACT_SERIALIZER)
+        compressed = zlib.compress(body)
+        self.assertTrue(len(compressed) < len(body))
+        self.assertEqual(serialization.loads(zlib.decompress(compressed), content_type,
+                                             content_encoding)['result'], RESULT)
+
+    def _round_trip(self, value):
+        content_type, content_encoding, body = serialization.dumps(
+            value, serializer=serializers.COMPACT_SERIALIZER)
+        self.assertEqual(content_type, serializers.COMPACT_CONTENT_TYPE)
+
+        accept = serialization.prepare_accept_content(serializers.ACCEPT_CONTENT)
+        return serialization.loads(body, content_type, content_encoding, accept=accept)
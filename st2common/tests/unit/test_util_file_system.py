@@ -15,10 +15,13 @@
 
 import os
 import os.path
+import shutil
+import tempfile
 
 import unittest2
 
 from st2common.util.file_system import get_file_list
+from st2common.util.file_system import get_content_hash
 
 CURRENT_DIR = os.path.dirname(__file__)
 ST2TESTS_DIR = os.path.join(CURRENT_DIR, '../../../st2tests/st2tests')
@@ -48,3 +51,39 @@ class FileSystemUtilsTestCase(unittest2.TestCase):
         ]
         result = get_file_list(directory=directory, exclude_patterns=['*.pyc', '*.yaml'])
         self.assertItemsEqual(expected, result)
+
+    def test_get_content_hash(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+
+        script_path = os.path.join(temp_dir, 'script.sh')
+        libs_path = os.path.join(temp_dir, 'lib')
+        os.makedirs(libs_path)
+
+        with open(script_path, 'w') as fp:
+            fp.write('echo "foo"')
+
+        with open(os.path.join(libs_path, 'common.sh'), 'w') as fp:
+            fp.write('bar=1')
+
+        hash_1 = get_content_hash(paths=[script_path, libs_path])
+        self.assertEqual(len(hash_1), 64)
+
+        # Same content, same hash, non-existent paths are ignored
+        hash_2 = get_content_hash(paths=[script_path, libs_path, None,
+                                         os.path.join(temp_dir, 'doesnt-exist')])
+        self.assertEqual(hash_1, hash_2)
+
+        # Adding a file to a dir changes the hash
+        with open(os.path.join(libs_path, 'other.sh'), 'w') as fp:
+            fp.write('')
+
+        hash_3 = get_content_hash(paths=[script_path, libs_path])
+        self.assertNotEqual(hash_1, hash_3)
+
+        # Changing the file content changes the hash
+        with open(script_path, 'w') as fp:
+            fp.write('echo "bar" # content with a different size')
+
+        hash_4 = get_content_hash(paths=[script_path, libs_path])
+        self.assertNotEqual(hash_3, hash_4)
@@ -35,6 +35,41 @@ class JinjaUtilsRenderTestCase(unittest2.TestCase):
         expected = {'k2': 'v2', 'k1': 'v1', 'k3': ''}
         self.assertEqual(actual, expected)
 
+    def test_render_values_non_template_values_retain_type(self):
+        actual = jinja_utils.render_values(
+            mapping={'k1': 'plain', 'k2': 5, 'k3': [1, 2], 'k4': 'line\n', 'k5': '{{a}}'},
+            context={'a': 'v1'})
+        expected = {'k1': 'plain', 'k2': 5, 'k3': [1, 2], 'k4': 'line', 'k5': 'v1'}
+        self.assertEqual(actual, expected)
+
+    def test_get_template_is_cached(self):
+        jinja_utils.clear_template_cache()
+
+        template_1 = jinja_utils.get_template('{{a}}')
+        template_2 = jinja_utils.get_template('{{a}}')
+        template_3 = jinja_utils.get_template('{{a}}', allow_undefined=True)
+        self.assertTrue(template_1 is template_2)
+        self.assertFalse(template_1 is template_3)
+        self.assertEqual(template_3.render({}), '')
+
+    def test_get_template_cache_evicts_least_recently_used(self):
+        jinja_utils.clear_template_cache()
+        original_max_size = jinja_utils.TEMPLATE_CACHE_MAX_SIZE
+        jinja_utils.TEMPLATE_CACHE_MAX_SIZE = 2
+
+        try:
+            template_a = jinja_utils.get_template('{{a}}')
+            jinja_utils.get_template('{{b}}')
+            self.assertTrue(jinja_utils.get_template('{{a}}') is template_a)
+            jinja_utils.get_template('{{c}}')
+
+            self.assertTrue(jinja_utils.get_template('{{a}}') is template_a)
+            self.assertEqual(len(jinja_utils._TEMPLATE_CACHE), 2)
+            self.assertTrue((False, '{{b}}') not in jinja_utils._TEMPLATE_CACHE)
+        finally:
+            jinja_utils.TEMPLATE_CACHE_MAX_SIZE = original_max_size
+            jinja_utils.clear_template_cache()
+
 
 class JinjaUtilsRegexFilterTestCase(unittest2.TestCase):
 
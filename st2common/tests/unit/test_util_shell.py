@@ -16,6 +16,7 @@
 import unittest2
 
 from st2common.util.shell import quote_unix
+from st2common.util.shell import quote_unix_path
 from st2common.util.shell import quote_windows
 
 
@@ -60,6 +61,11 @@ class ShellUtilsTestCase(unittest2.TestCase):
             expected_value = expected_value.lstrip()
             self.assertEqual(actual_value, expected_value.strip())
 
+    def test_quote_unix_path(self):
+        self.assertEqual(quote_unix_path('/tmp/foo bar'), "'/tmp/foo bar'")
+        self.assertEqual(quote_unix_path('~/foo bar'), '"$HOME"/\'foo bar\'')
+        self.assertEqual(quote_unix_path('~/foo', home_dir='/home/stanley'), '/home/stanley/foo')
+
     def test_quote_windows(self):
         arguments = [
             'foo',
@@ -14,6 +14,7 @@
 # limitations under the License.
 
 from st2common import log as logging
+from st2common.metrics import base as metrics
 from st2common.persistence.rule import Rule
 from st2common.services.triggers import get_trigger_db_by_ref
 from st2reactor.rules.enforcer import RuleEnforcer
@@ -25,13 +26,18 @@ LOG = logging.getLogger('st2reactor.rules.RulesEngine')
 class RulesEngine(object):
     def handle_trigger_instance(self, trigger_instance):
         # Find matching rules for trigger instance.
-        matching_rules = self.get_matching_rules_for_trigger(trigger_instance)
+        with metrics.Timer('rules.match'):
+            matching_rules = self.get_matching_rules_for_trigger(trigger_instance)
+
+        metrics.inc_counter('rules.trigger_instances')
+        metrics.inc_counter('rules.matched', len(matching_rules))
 
         # Create rule enforcers.
         enforcers = self.create_rule_enforcers(trigger_instance, matching_rules)
 
         # Enforce the rules.
-        self.enforce_rules(enforcers)
+        with metrics.Timer('rules.enforce'):
+            self.enforce_rules(enforcers)
 
     def get_matching_rules_for_trigger(self, trigger_instance):
         trigger = trigger_instance.trigger
@@ -53,6 +53,16 @@ def _register_app_opts():
         cfg.IntOpt('port', default=9102, help='StackStorm API stream, server port'),
         cfg.IntOpt('heartbeat', default=25,
                    help='Send empty message every N seconds to keep connection open'),
+        cfg.IntOpt('client_buffer_size', default=1000,
+                   help='Maximum number of events which are buffered for each client.'),
+        cfg.StrOpt('client_buffer_overflow_policy', default='drop_client',
+                   choices=['drop_client', 'drop_oldest', 'coalesce'],
+                   help='What to do when client buffer is full - disconnect the client '
+                        '(drop_client), drop the oldest event (drop_oldest) or replace pending '
+                        'event for the same object (coalesce).'),
+        cfg.IntOpt('replay_buffer_size', default=1000,
+                   help='Number of recent events which are kept in memory so reconnecting '
+                        'clients can resume using Last-Event-ID (0 to disable).'),
         cfg.BoolOpt('debug', default=False,
                     help='Specify to enable debug mode.'),
         cfg.StrOpt('logging', default='conf/logging.conf',
@@ -20,7 +20,7 @@ from pecan.rest import RestController
 
 from st2common import log as logging
 from st2common.models.api.base import jsexpose
-from st2common.util.jsonify import json_encode
+from st2stream.listener import EventFilter
 from st2stream.listener import get_listener
 
 LOG = logging.getLogger(__name__)
@@ -30,24 +30,51 @@ def format(gen):
     # Yield initial state so client would receive the headers the moment it connects to the stream
     yield '\n'
 
-    message = '''event: %s\ndata: %s\n\n'''
-
-    for pack in gen:
-        if not pack:
+    for stream_event in gen:
+        if not stream_event:
             # Note: gunicorn wsgi handler expect bytes, not unicode
             yield six.binary_type('\n')
         else:
-            (event, body) = pack
-            # Note: gunicorn wsgi handler expect bytes, not unicode
-            yield six.binary_type(message % (event, json_encode(body, indent=None)))
+            # Note: Event has already been serialized once by the listener and the same payload
+            # is shared by all the clients
+            yield stream_event.payload
+
+
+def csv(value):
+    if not value:
+        return None
+
+    return [item.strip() for item in value.split(',') if item.strip()]
 
 
 class StreamController(RestController):
     @jsexpose(content_type='text/event-stream')
-    def get_all(self):
+    def get_all(self, events=None, action_refs=None, users=None, last_event_id=None):
+        """
+            Stream events.
+
+            Handles requests:
+                GET /stream[?events=st2.execution__update&action_refs=core.local&users=stanley]
+
+            :param events: Comma delimited list of event names or exchanges to subscribe to.
+            :param action_refs: Comma delimited list of action references to filter events on.
+            :param users: Comma delimited list of users to filter events on.
+            :param last_event_id: Id of the last received event (used by clients which can't
+                                  send Last-Event-ID header).
+        """
+        last_event_id = pecan.request.headers.get('Last-Event-ID', None) or last_event_id
+        events = csv(events)
+        action_refs = csv(action_refs)
+        users = csv(users)
+
+        event_filter = None
+        if events or action_refs or users:
+            event_filter = EventFilter(events=events, action_refs=action_refs, users=users)
+
         def make_response():
-            res = Response(content_type='text/event-stream',
-                           app_iter=format(get_listener().generator()))
+            generator = get_listener().generator(event_filter=event_filter,
+                                                 last_event_id=last_event_id)
+            res = Response(content_type='text/event-stream', app_iter=format(generator))
             return res
 
         # Prohibit buffering response by eventlet
@@ -13,7 +13,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
+import itertools
+import uuid
+
 import eventlet
+import six
 
 from kombu import Connection, Queue
 from kombu.mixins import ConsumerMixin
@@ -22,10 +27,18 @@ from oslo_config import cfg
 from st2common.models.api.action import LiveActionAPI
 from st2common.models.api.execution import ActionExecutionAPI
 from st2common.transport import announcement, liveaction, execution, publishers
+from st2common.transport import serializers
 from st2common.transport import utils as transport_utils
+from st2common.util.jsonify import json_encode
 from st2common import log as logging
 
 __all__ = [
+    'RESET_EVENT',
+
+    'StreamEvent',
+    'EventFilter',
+    'ClientBuffer',
+
     'get_listener',
     'get_listener_if_set'
 ]
@@ -34,70 +47,408 @@ LOG = logging.getLogger(__name__)
 
 _listener = None
 
+EVENT_MESSAGE_FORMAT = '''id: %s\nevent: %s\ndata: %s\n\n'''
+
+# Event which is sent to the reconnecting client (regardless of the filter) when the events it
+# has missed can't be replayed. Client needs to reload the state it's tracking.
+RESET_EVENT = 'st2.stream__reset'
+
+OVERFLOW_POLICY_DROP_CLIENT = 'drop_client'
+OVERFLOW_POLICY_DROP_OLDEST = 'drop_oldest'
+OVERFLOW_POLICY_COALESCE = 'coalesce'
+
+OVERFLOW_POLICIES = [
+    OVERFLOW_POLICY_DROP_CLIENT,
+    OVERFLOW_POLICY_DROP_OLDEST,
+    OVERFLOW_POLICY_COALESCE
+]
+
+
+class StreamEvent(object):
+    """
+    Event which is shared (by reference) between all the client buffers and the replay buffer.
+
+    Message body is only converted to the API model and serialized when the payload is first
+    needed and the result is memoized so it happens at most once per message. The original message
+    body is released afterwards. Attributes which are used for filtering and coalescing are
+    retrieved from the message body directly.
+    """
+
+    __slots__ = ['id', 'event', 'object_id', 'action_ref', 'user', '_body', '_model',
+                 '_payload']
+
+    def __init__(self, id, event, body, model=None, object_id=None, action_ref=None,
+                 user=None):
+        """
+        :param body: Message body (database or API model object or a dictionary).
+
+        :param model: API model class which is used to convert the body (if any).
+        :type model: ``type``
+        """
+        self.id = id
+        self.event = event
+        self.object_id = object_id
+        self.action_ref = action_ref
+        self.user = user
+
+        self._body = body
+        self._model = model
+        self._payload = None
+
+    @property
+    def payload(self):
+        """
+        Server-sent event message (bytes).
+        """
+        if self._payload is None:
+            body = self._body
+
+            if self._model:
+                from_model_kwargs = {'mask_secrets': cfg.CONF.api.mask_secrets}
+                body = self._model.from_model(body, **from_model_kwargs)
+
+            payload = EVENT_MESSAGE_FORMAT % (self.id, self.event, json_encode(body, indent=None))
+
+            # Note: gunicorn wsgi handler expect bytes, not unicode
+            if isinstance(payload, six.text_type):
+                payload = payload.encode('utf-8')
+
+            self._payload = payload
+
+            # Original message is not needed anymore
+            self._body = None
+            self._model = None
+
+        return self._payload
+
+
+class EventFilter(object):
+    """
+    Server-side filter for events which are sent to a particular client.
+
+    Empty (None) filter matches everything. Event types can either be full event names (e.g.
+    "st2.execution__update") or exchange names (e.g. "st2.execution") which match all the
+    events on that exchange.
+    """
+
+    def __init__(self, events=None, action_refs=None, users=None):
+        self.events = frozenset(events) if events else None
+        self.action_refs = frozenset(action_refs) if action_refs else None
+        self.users = frozenset(users) if users else None
+
+    def matches(self, stream_event):
+        if self.events is not None:
+            exchange = stream_event.event.split('__', 1)[0]
+            if stream_event.event not in self.events and exchange not in self.events:
+                return False
+
+        if self.action_refs is not None and stream_event.action_ref not in self.action_refs:
+            return False
+
+        if self.users is not None and stream_event.user not in self.users:
+            return False
+
+        return True
+
+
+class ClientBuffer(object):
+    """
+    Bounded buffer of events which are waiting to be sent to a particular client.
+
+    When the buffer is full, one of the following overflow policies is applied:
+
+    * drop_client - buffer is marked as overflowed and the client is disconnected (it can
+      reconnect and resume using Last-Event-ID).
+    * drop_oldest - the oldest pending event is dropped.
+    * coalesce - pending event for the same object and event type is replaced with the new one
+      (this is done even if the buffer is not full yet). If there is no such event, the oldest
+      pending event is dropped.
+    """
+
+    def __init__(self, size, overflow_policy=OVERFLOW_POLICY_DROP_CLIENT):
+        self._size = size
+        self._overflow_policy = overflow_policy
+
+        # Keys of the pending events in order and the events themselves. Only events which can be
+        # coalesced use (event, object id) key, others use the unique event id
+        self._keys = collections.deque()
+        self._events = {}
+
+        # Used to wake up the consumer waiting for the events
+        self._signal = eventlet.queue.LightQueue()
+
+        self.overflowed = False
+        self.dropped_count = 0
+
+    def __len__(self):
+        return len(self._keys)
+
+    def put(self, stream_event):
+        if self.overflowed:
+            return
+
+        key = self._get_key(stream_event=stream_event)
+
+        if key in self._events:
+            # Newer update for the same object replaces the pending one (in place)
+            self._events[key] = stream_event
+            self.dropped_count += 1
+            return
+
+        if len(self._keys) >= self._size:
+            if self._overflow_policy == OVERFLOW_POLICY_DROP_CLIENT:
+                self.overflowed = True
+                self._notify()
+                return
+
+            del self._events[self._keys.popleft()]
+            self.dropped_count += 1
+
+        self._keys.append(key)
+        self._events[key] = stream_event
+        self._notify()
+
+    def get(self, timeout=None):
+        """
+        Return the oldest pending event, waiting up to timeout seconds for one.
+
+        :return: Event or None if the buffer has overflowed.
+        :raises: eventlet.queue.Empty if there are no events after timeout seconds.
+        """
+        if not self._keys and not self.overflowed:
+            # Discard stale notification for the events which have already been retrieved
+            while self._signal.qsize():
+                self._signal.get_nowait()
+
+            self._signal.get(timeout=timeout)
+
+        if self.overflowed:
+            return None
+
+        if not self._keys:
+            raise eventlet.queue.Empty()
+
+        return self._events.pop(self._keys.popleft())
+
+    def _get_key(self, stream_event):
+        if self._overflow_policy == OVERFLOW_POLICY_COALESCE and stream_event.object_id:
+            return (stream_event.event, stream_event.object_id)
+
+        return stream_event.id
+
+    def _notify(self):
+        if self._signal.qsize() == 0:
+            self._signal.put_nowait(True)
+
 
 class Listener(ConsumerMixin):
 
     def __init__(self, connection):
         self.connection = connection
+        # List of (buffer, event filter) tuples, one for each connected client
         self.queues = []
         self._stopped = False
 
+        # Event ids are "<listener id>-<sequence number>" so the events can only be replayed by
+        # the same listener which has generated them
+        self._listener_id = uuid.uuid4().hex[:8]
+        self._sequence = itertools.count(1)
+
+        # Recently emitted events which are replayed to the reconnecting clients
+        self._replay_buffer = collections.deque(maxlen=max(cfg.CONF.stream.replay_buffer_size,
+                                                           0))
+
     def get_consumers(self, consumer, channel):
         return [
             consumer(queues=[announcement.get_queue(routing_key=publishers.ANY_RK,
                                                     exclusive=True)],
-                     accept=['pickle'],
+                     accept=serializers.ACCEPT_CONTENT,
                      callbacks=[self.processor()]),
 
             consumer(queues=[execution.get_queue(routing_key=publishers.ANY_RK,
                                                  exclusive=True)],
-                     accept=['pickle'],
+                     accept=serializers.ACCEPT_CONTENT,
                      callbacks=[self.processor(ActionExecutionAPI)]),
 
             consumer(queues=[Queue(None,
                                    liveaction.LIVEACTION_XCHG,
                                    routing_key=publishers.ANY_RK,
                                    exclusive=True)],
-                     accept=['pickle'],
+                     accept=serializers.ACCEPT_CONTENT,
                      callbacks=[self.processor(LiveActionAPI)])
         ]
 
     def processor(self, model=None):
         def process(body, message):
-            from_model_kwargs = {'mask_secrets': cfg.CONF.api.mask_secrets}
             meta = message.delivery_info
             event_name = '%s__%s' % (meta.get('exchange'), meta.get('routing_key'))
 
             try:
-                if model:
-                    body = model.from_model(body, **from_model_kwargs)
-
-                self.emit(event_name, body)
+                # Note: Conversion to the API model is skipped if nobody needs the event (see
+                # Listener.emit)
+                self.emit(event_name, body, model=model)
             finally:
                 message.ack()
 
         return process
 
-    def emit(self, event, body):
-        pack = (event, body)
-        for queue in self.queues:
-            queue.put(pack)
+    def emit(self, event, body, model=None):
+        # Note: Event is serialized at most once and the same object is put in the replay buffer
+        # and on all the queues of the clients whose filters match the event
+        if not self.queues and not self._replay_buffer.maxlen:
+            return
 
-    def generator(self):
-        queue = eventlet.Queue()
-        self.queues.append(queue)
+        stream_event = self._get_stream_event(event=event, body=body, model=model)
+
+        queues = [queue for queue, event_filter in list(self.queues)
+                  if event_filter is None or event_filter.matches(stream_event)]
+
+        if not queues and not self._replay_buffer.maxlen:
+            return
+
+        # Note: Event is serialized here so the replay buffer only holds serialized events and an
+        # event which can't be serialized is dropped instead of failing each client stream
         try:
+            stream_event.payload
+        except Exception:
+            LOG.exception('Failed to serialize event "%s" (%s), dropping it.', event,
+                          stream_event.object_id)
+            return
+
+        if self._replay_buffer.maxlen:
+            self._replay_buffer.append(stream_event)
+
+        for queue in queues:
+            queue.put(stream_event)
+
+    def generator(self, event_filter=None, last_event_id=None):
+        """
+        :param event_filter: Optional filter for the events which are sent to this client.
+        :type event_filter: :class:`EventFilter`
+
+        :param last_event_id: Id of the last event received by the reconnecting client. Events
+                              which have been emitted after that event are replayed.
+        :type last_event_id: ``str``
+        """
+        queue = ClientBuffer(size=cfg.CONF.stream.client_buffer_size,
+                             overflow_policy=cfg.CONF.stream.client_buffer_overflow_policy)
+
+        reset_event = None
+
+        # Note: There is no context switch between replaying the events and subscribing so no
+        # events can be missed
+        if last_event_id:
+            stream_events = self._get_events_to_replay(last_event_id=last_event_id)
+
+            if stream_events is None:
+                reset_event = self._get_reset_event(
+                    last_event_id=last_event_id,
+                    message='Event "%s" is not available anymore.' % (last_event_id))
+                stream_events = []
+
+            stream_events = [stream_event for stream_event in stream_events
+                             if event_filter is None or event_filter.matches(stream_event)]
+
+            if len(stream_events) > cfg.CONF.stream.client_buffer_size:
+                LOG.debug('Too many events to replay (%s), skipping replay.', len(stream_events))
+                reset_event = self._get_reset_event(
+                    last_event_id=last_event_id,
+                    message='Too many events (%s) have been missed.' % (len(stream_events)))
+                stream_events = []
+
+            for stream_event in stream_events:
+                queue.put(stream_event)
+
+        subscription = (queue, event_filter)
+        self.queues.append(subscription)
+        try:
+            if reset_event:
+                # Note: Reset event is sent directly so it can't be dropped by the client buffer
+                yield reset_event
+
             while not self._stopped:
                 try:
-                    yield queue.get(timeout=cfg.CONF.stream.heartbeat)
+                    stream_event = queue.get(timeout=cfg.CONF.stream.heartbeat)
                 except eventlet.queue.Empty:
                     yield
+                    continue
+
+                if queue.overflowed:
+                    LOG.info('Client buffer has overflowed (%s events), disconnecting client.',
+                             len(queue))
+                    break
+
+                yield stream_event
         finally:
-            self.queues.remove(queue)
+            self.queues.remove(subscription)
 
     def shutdown(self):
         self._stopped = True
 
+    def _get_events_to_replay(self, last_event_id):
+        """
+        Return events which have been emitted after the provided event.
+
+        :return: List of events or None if the events can't be replayed (the event is not in the
+                 replay buffer anymore or it has been emitted by a different listener).
+        :rtype: ``list``
+        """
+        listener_id, _, sequence = last_event_id.rpartition('-')
+
+        if listener_id != self._listener_id or not sequence.isdigit():
+            LOG.debug('Unable to replay events after unknown event "%s".', last_event_id)
+            return None
+
+        sequence = int(sequence)
+        replay_buffer = list(self._replay_buffer)
+
+        if not replay_buffer or self._get_sequence(replay_buffer[0]) > sequence + 1:
+            LOG.debug('Event "%s" is not in the replay buffer anymore.', last_event_id)
+            return None
+
+        return [stream_event for stream_event in replay_buffer
+                if self._get_sequence(stream_event) > sequence]
+
+    def _get_reset_event(self, last_event_id, message):
+        """
+        Return event which tells the client that it can't resume after the provided event and
+        needs to reload its state. Event has a new id so the client can resume after it.
+        """
+        LOG.debug('Unable to resume after event "%s", sending reset event: %s', last_event_id,
+                  message)
+
+        event_id = '%s-%s' % (self._listener_id, next(self._sequence))
+        body = {'last_event_id': last_event_id, 'message': message}
+        return StreamEvent(id=event_id, event=RESET_EVENT, body=body)
+
+    @staticmethod
+    def _get_sequence(stream_event):
+        return int(stream_event.id.rpartition('-')[2])
+
+    def _get_stream_event(self, event, body, model=None):
+        event_id = '%s-%s' % (self._listener_id, next(self._sequence))
+        object_id = getattr(body, 'id', None)
+
+        return StreamEvent(id=event_id, event=event, body=body, model=model,
+                           object_id=str(object_id) if object_id else None,
+                           action_ref=self._get_action_ref(body=body),
+                           user=self._get_user(body=body))
+
+    @staticmethod
+    def _get_action_ref(body):
+        action = getattr(body, 'action', None)
+
+        # Note: Execution contains the whole action object and live action only the reference
+        if isinstance(action, dict):
+            return action.get('ref', None)
+
+        return action
+
+    @staticmethod
+    def _get_user(body):
+        context = getattr(body, 'context', None) or {}
+        return context.get('user', None)
+
 
 def listen(listener):
     try:
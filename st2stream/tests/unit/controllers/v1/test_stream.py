@@ -21,7 +21,7 @@ from st2stream import listener
 from base import FunctionalTest
 
 
-@mock.patch.object(pecan, 'request', type('request', (object,), {'environ': {}}))
+@mock.patch.object(pecan, 'request', type('request', (object,), {'environ': {}, 'headers': {}}))
 @mock.patch.object(pecan, 'response', mock.MagicMock())
 class TestStreamController(FunctionalTest):
 
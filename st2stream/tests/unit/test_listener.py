@@ -0,0 +1,286 @@
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+import json
+
+import eventlet
+import mock
+import unittest2
+from oslo_config import cfg
+
+import st2tests.config as tests_config
+tests_config.parse_args()
+
+from st2common.models.api.action import LiveActionAPI
+from st2common.models.api.execution import ActionExecutionAPI
+from st2common.models.db.execution import ActionExecutionDB
+from st2stream.controllers.v1 import stream
+from st2stream import listener
+
+
+class TestListener(unittest2.TestCase):
+
+    def setUp(self):
+        super(TestListener, self).setUp()
+        self.listener = listener.Listener(connection=mock.Mock())
+
+    def _subscribe(self, event_filter=None):
+        queue = mock.Mock()
+        self.listener.queues.append((queue, event_filter))
+        return queue
+
+    def test_event_is_serialized_once_and_shared(self):
+        queue1 = self._subscribe()
+        queue2 = self._subscribe()
+
+        body = ActionExecutionDB(id='5' * 24, action={'ref': 'core.local'},
+                                 context={'user': 'joe'})
+        with mock.patch.object(listener, 'json_encode',
+                               mock.Mock(wraps=listener.json_encode)) as json_encode, \
+                mock.patch.object(ActionExecutionAPI, 'from_model',
+                                  mock.Mock(return_value=ActionExecutionAPI(id='1'))) as from_model:
+            self.listener.emit('st2.execution__update', body, model=ActionExecutionAPI)
+
+            stream_event = queue1.put.call_args[0][0]
+            self.assertIs(queue2.put.call_args[0][0], stream_event)
+            self.assertEqual(stream_event.object_id, '5' * 24)
+            self.assertEqual(stream_event.action_ref, 'core.local')
+            self.assertEqual(stream_event.user, 'joe')
+
+            # Conversion and serialization happen once when the event is emitted
+            self.assertEqual(from_model.call_count, 1)
+            self.assertEqual(json_encode.call_count, 1)
+
+            self.assertEqual(queue1.put.call_args[0][0].payload,
+                             queue2.put.call_args[0][0].payload)
+            self.assertEqual(from_model.call_count, 1)
+            self.assertEqual(json_encode.call_count, 1)
+
+            # Replay buffer holds the serialized event and not the original message body
+            self.assertIs(self.listener._replay_buffer[-1], stream_event)
+            self.assertIsNone(stream_event._body)
+
+        event_id, event, data = stream_event.payload.split('\n')[:3]
+        self.assertEqual(event_id, 'id: %s' % (stream_event.id))
+        self.assertEqual(event, 'event: st2.execution__update')
+        self.assertEqual(json.loads(data[len('data: '):])['id'], '1')
+
+        # Payload is sent to the client as is
+        output = list(stream.format([stream_event, None]))
+        self.assertEqual(output, ['\n', stream_event.payload, '\n'])
+
+    def test_events_are_filtered(self):
+        all_queue = self._subscribe()
+        events_queue = self._subscribe(listener.EventFilter(events=['st2.liveaction']))
+        action_queue = self._subscribe(listener.EventFilter(action_refs=['core.remote']))
+        user_queue = self._subscribe(listener.EventFilter(events=['st2.execution__create'],
+                                                          users=['joe']))
+
+        self.listener.emit('st2.announcement__chatops', {'message': 'hello'})
+        self.listener.emit('st2.liveaction__update',
+                           LiveActionAPI(action='core.remote', context={'user': 'stanley'}))
+        self.listener.emit('st2.execution__create',
+                           ActionExecutionAPI(action={'ref': 'core.local'},
+                                              context={'user': 'joe'}))
+        self.listener.emit('st2.execution__update',
+                           ActionExecutionAPI(action={'ref': 'core.local'},
+                                              context={'user': 'joe'}))
+
+        def get_events(queue):
+            return [call[0][0].event for call in queue.put.call_args_list]
+
+        self.assertEqual(get_events(all_queue), ['st2.announcement__chatops',
+                                                 'st2.liveaction__update',
+                                                 'st2.execution__create',
+                                                 'st2.execution__update'])
+        self.assertEqual(get_events(events_queue), ['st2.liveaction__update'])
+        self.assertEqual(get_events(action_queue), ['st2.liveaction__update'])
+        self.assertEqual(get_events(user_queue), ['st2.execution__create'])
+
+    def test_event_is_not_converted_without_clients(self):
+        model = mock.Mock()
+
+        # No clients and replay buffer is disabled
+        self.listener._replay_buffer = collections.deque(maxlen=0)
+        self.listener.emit('st2.execution__update', ActionExecutionDB(), model=model)
+
+        # Client which is not subscribed to the event
+        self._subscribe(listener.EventFilter(events=['st2.liveaction']))
+        self.listener.emit('st2.execution__update', ActionExecutionDB(), model=model)
+
+        self.assertFalse(model.from_model.called)
+
+    def test_event_which_cant_be_serialized_is_dropped(self):
+        queue = self._subscribe()
+        model = mock.Mock()
+        model.from_model.side_effect = ValueError('invalid')
+
+        with mock.patch.object(listener, 'LOG') as log:
+            self.listener.emit('st2.execution__update', ActionExecutionDB(), model=model)
+
+        self.assertEqual(model.from_model.call_count, 1)
+        self.assertTrue(log.exception.called)
+        self.assertFalse(queue.put.called)
+        self.assertEqual(len(self.listener._replay_buffer), 0)
+
+        # Subsequent events are not affected
+        self.listener.emit('st2.execution__update', ActionExecutionAPI(id='1'))
+        self.assertEqual(queue.put.call_count, 1)
+        self.assertEqual(len(self.listener._replay_buffer), 1)
+
+    def test_events_are_replayed_after_last_event_id(self):
+        self.listener.emit('st2.execution__create', ActionExecutionAPI(id='1'))
+        self.listener.emit('st2.execution__update', ActionExecutionAPI(id='1'))
+        self.listener.emit('st2.execution__create', ActionExecutionAPI(id='2'))
+        first_id, second_id, third_id = [stream_event.id for stream_event in
+                                         self.listener._replay_buffer]
+
+        def get_replayed_events(last_event_id):
+            """
+            Return ids of the replayed events and the events which have been sent directly.
+            """
+            sent_events = []
+            with mock.patch.object(listener.ClientBuffer, 'put') as put:
+                generator = self.listener.generator(last_event_id=last_event_id)
+                with mock.patch.object(listener.ClientBuffer, 'get',
+                                       mock.Mock(side_effect=GeneratorExit)):
+                    with self.assertRaises(GeneratorExit):
+                        for stream_event in generator:
+                            sent_events.append(stream_event)
+            return [call[0][0].id for call in put.call_args_list], sent_events
+
+        def get_replayed_ids(last_event_id):
+            replayed_ids, sent_events = get_replayed_events(last_event_id=last_event_id)
+            self.assertEqual(sent_events, [])
+            return replayed_ids
+
+        def assertReset(last_event_id):
+            replayed_ids, sent_events = get_replayed_events(last_event_id=last_event_id)
+            self.assertEqual(replayed_ids, [])
+            self.assertEqual(len(sent_events), 1)
+            self.assertEqual(sent_events[0].event, listener.RESET_EVENT)
+
+            event_id, event, data = sent_events[0].payload.split('\n')[:3]
+            self.assertEqual(event, 'event: %s' % (listener.RESET_EVENT))
+            self.assertEqual(json.loads(data[len('data: '):])['last_event_id'], last_event_id)
+            return sent_events[0]
+
+        self.assertEqual(get_replayed_ids(first_id), [second_id, third_id])
+        self.assertEqual(get_replayed_ids(third_id), [])
+
+        # Events from a different listener (e.g. before restart) can't be replayed
+        assertReset('abcdef12-1')
+        assertReset('invalid')
+
+        # Event is not in the replay buffer anymore
+        self.listener._replay_buffer.popleft()
+        self.listener._replay_buffer.popleft()
+        reset_event = assertReset(first_id)
+
+        # Client can resume after the reset event
+        self.listener.emit('st2.execution__create', ActionExecutionAPI(id='3'))
+        fourth_id = self.listener._replay_buffer[-1].id
+        self.assertEqual(get_replayed_ids(reset_event.id), [fourth_id])
+
+        # Client is removed once the generator is done
+        self.assertEqual(self.listener.queues, [])
+
+    def test_reset_event_is_sent_when_too_many_events_have_been_missed(self):
+        for index in range(0, 4):
+            self.listener.emit('st2.execution__update', ActionExecutionAPI(id='1'))
+        first_id = self.listener._replay_buffer[0].id
+
+        cfg.CONF.set_override(name='client_buffer_size', override=2, group='stream')
+        try:
+            with mock.patch.object(listener.ClientBuffer, 'put') as put:
+                # Reset event is sent regardless of the filter
+                event_filter = listener.EventFilter(events=['st2.liveaction'])
+                generator = self.listener.generator(last_event_id=first_id)
+                self.assertEqual(next(generator).event, listener.RESET_EVENT)
+                generator.close()
+
+                generator = self.listener.generator(event_filter=event_filter,
+                                                    last_event_id=first_id)
+                with mock.patch.object(listener.ClientBuffer, 'get',
+                                       mock.Mock(side_effect=GeneratorExit)):
+                    self.assertRaises(GeneratorExit, next, generator)
+
+            self.assertFalse(put.called)
+        finally:
+            cfg.CONF.clear_override(name='client_buffer_size', group='stream')
+
+
+class TestClientBuffer(unittest2.TestCase):
+
+    def _get_event(self, event_id, event='st2.execution__update', object_id=None):
+        return listener.StreamEvent(id=event_id, event=event, body={}, object_id=object_id)
+
+    def _get_all(self, client_buffer):
+        result = []
+        while len(client_buffer):
+            result.append(client_buffer.get(timeout=0).id)
+        return result
+
+    def test_get_timeout(self):
+        client_buffer = listener.ClientBuffer(size=2)
+        self.assertRaises(eventlet.queue.Empty, client_buffer.get, timeout=0.01)
+
+        client_buffer.put(self._get_event('1'))
+        self.assertEqual(client_buffer.get(timeout=0.01).id, '1')
+        self.assertRaises(eventlet.queue.Empty, client_buffer.get, timeout=0.01)
+
+    def test_drop_client_policy(self):
+        client_buffer = listener.ClientBuffer(size=2, overflow_policy='drop_client')
+        client_buffer.put(self._get_event('1'))
+        client_buffer.put(self._get_event('2'))
+        self.assertFalse(client_buffer.overflowed)
+
+        client_buffer.put(self._get_event('3'))
+        self.assertTrue(client_buffer.overflowed)
+        self.assertEqual(client_buffer.get(timeout=0), None)
+
+    def test_drop_oldest_policy(self):
+        client_buffer = listener.ClientBuffer(size=2, overflow_policy='drop_oldest')
+        for event_id in ['1', '2', '3']:
+            client_buffer.put(self._get_event(event_id, object_id='a'))
+
+        self.assertFalse(client_buffer.overflowed)
+        self.assertEqual(client_buffer.dropped_count, 1)
+        self.assertEqual(self._get_all(client_buffer), ['2', '3'])
+
+    def test_coalesce_policy(self):
+        client_buffer = listener.ClientBuffer(size=2, overflow_policy='coalesce')
+        client_buffer.put(self._get_event('1', event='st2.execution__create', object_id='a'))
+        client_buffer.put(self._get_event('2', object_id='a'))
+        client_buffer.put(self._get_event('3', object_id='a'))
+        self.assertEqual(len(client_buffer), 2)
+
+        # Buffer is full and there is nothing to coalesce with
+        client_buffer.put(self._get_event('4', object_id='b'))
+        self.assertEqual(self._get_all(client_buffer), ['3', '4'])
+
+
+class TestListenerBufferConfig(unittest2.TestCase):
+
+    def test_replay_buffer_can_be_disabled(self):
+        cfg.CONF.set_override(name='replay_buffer_size', override=0, group='stream')
+
+        try:
+            test_listener = listener.Listener(connection=mock.Mock())
+            test_listener.emit('st2.execution__create', ActionExecutionAPI(id='1'))
+            self.assertEqual(len(test_listener._replay_buffer), 0)
+        finally:
+            cfg.CONF.clear_override(name='replay_buffer_size', group='stream')
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# Licensed to the StackStorm, Inc ('StackStorm') under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+A utility script which compares message size and (de)serialization speed of the serializers
+which can be used for the messages published to the internal exchanges.
+"""
+
+import argparse
+import timeit
+import zlib
+
+import bson
+from kombu import serialization
+
+from st2common.models.db.execution import ActionExecutionDB
+from st2common.models.db.liveaction import LiveActionDB
+from st2common.models.db.trigger import TriggerInstanceDB
+from st2common.transport import serializers
+from st2common.util import date as date_utils
+
+SERIALIZERS = ['pickle', serializers.COMPACT_SERIALIZER]
+
+
+def get_payloads(result_size):
+    now = date_utils.get_datetime_utc_now()
+    result = {
+        'stdout': '\n'.join(['line %s of the command output' % (i) for i in range(result_size)]),
+        'stderr': '',
+        'return_code': 0,
+        'succeeded': True,
+        'failed': False
+    }
+    parameters = {'cmd': 'date', 'hosts': 'localhost', 'timeout': 60}
+    context = {'user': 'stanley', 'parent': {'execution_id': str(bson.ObjectId())}}
+
+    liveaction_db = LiveActionDB(id=bson.ObjectId(), status='succeeded', action='core.remote',
+                                 start_timestamp=now, end_timestamp=now, parameters=parameters,
+                                 result=result, context=context,
+                                 runner_info={'hostname': 'st2', 'pid': 1234})
+    # Note: Same as in services.executions, only LiveAction specific attributes are stored in
+    # the "liveaction" dictionary
+    liveaction = {
+        'id': str(liveaction_db.id),
+        'action': liveaction_db.action,
+        'callback': {},
+        'runner_info': liveaction_db.runner_info,
+        'parameters': parameters
+    }
+    action = {
+        'ref': 'core.remote',
+        'runner_type': 'remote-shell-cmd',
+        'parameters': {'cmd': {'type': 'string'}}
+    }
+    runner = {
+        'name': 'remote-shell-cmd',
+        'runner_parameters': {'hosts': {'type': 'string'}}
+    }
+    execution_db = ActionExecutionDB(id=bson.ObjectId(), status='succeeded',
+                                     action=action, runner=runner, liveaction=liveaction,
+                                     start_timestamp=now, end_timestamp=now,
+                                     parameters=parameters, result=result, context=context,
+                                     log=[{'status': 'requested', 'timestamp': now},
+                                          {'status': 'succeeded', 'timestamp': now}])
+    payload = {
+        'headers': {'Content-Type': 'application/json'},
+        'body': {'action': 'closed', 'number': 1}
+    }
+    trigger_instance_db = TriggerInstanceDB(id=bson.ObjectId(), trigger='core.st2.webhook',
+                                            payload=payload, occurrence_time=now,
+                                            status='pending')
+
+    return [
+        ('LiveActionDB', liveaction_db),
+        ('ActionExecutionDB', execution_db),
+        ('TriggerInstanceDB', trigger_instance_db)
+    ]
+
+
+def benchmark(payload, serializer, compress, count):
+    content_type, content_encoding, body = serialization.dumps(payload, serializer=serializer)
+    accept = serialization.prepare_accept_content(serializers.ACCEPT_CONTENT)
+
+    def dumps():
+        body = serialization.dumps(payload, serializer=serializer)[2]
+        if compress:
+            body = zlib.compress(body)
+
+    def loads():
+        data = zlib.decompress(compressed) if compress else body
+        serialization.loads(data, content_type, content_encoding, accept=accept)
+
+    compressed = zlib.compress(body)
+    size = len(compressed) if compress else len(body)
+    dumps_time = min(timeit.repeat(dumps, number=count, repeat=3)) / count
+    loads_time = min(timeit.repeat(loads, number=count, repeat=3)) / count
+
+    return size, dumps_time, loads_time
+
+
+def main(result_size, count):
+    print('%-20s %-14s %10s %12s %12s' % ('Model', 'Serializer', 'Size (B)', 'Dumps (us)',
+                                          'Loads (us)'))
+
+    for (name, payload) in get_payloads(result_size=result_size):
+        for serializer in SERIALIZERS:
+            for compress in [False, True]:
+                size, dumps_time, loads_time = benchmark(payload=payload, serializer=serializer,
+                                                         compress=compress, count=count)
+                label = serializer + ('+zlib' if compress else '')
+                print('%-20s %-14s %10d %12.1f %12.1f' % (name, label, size,
+                                                          dumps_time * 1000000,
+                                                          loads_time * 1000000))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Message serializers benchmark')
+    parser.add_argument('--result-size', type=int, default=100,
+                        help='Number of lines in the action result')
+    parser.add_argument('--count', type=int, default=1000,
+                        help='Number of iterations')
+    args = parser.parse_args()
+
+    main(result_size=args.result_size, count=args.count)
@@ -62,10 +62,8 @@ def main(metadata_path, output_path, print_source=False):
     #  dot.body.extend(['rankdir=TD', 'size="10,5"'])
 
     # Add all nodes
-    node = chain_holder.get_next_node()
-    while node:
+    for node in chain_holder.actionchain.chain:
         dot.node(node.name, node.name)
-        node = chain_holder.get_next_node(curr_node_name=node.name)
 
     # Add connections
     node = chain_holder.get_next_node()
@@ -73,21 +71,21 @@ def main(metadata_path, output_path, print_source=False):
     nodes = [node]
     while nodes:
         previous_node = nodes.pop()
-        success_node = chain_holder.get_next_node(curr_node_name=previous_node.name,
-                                                  condition='on-success')
-        failure_node = chain_holder.get_next_node(curr_node_name=previous_node.name,
-                                                  condition='on-failure')
+        success_nodes = chain_holder.get_next_nodes(curr_node_name=previous_node.name,
+                                                    condition='on-success')
+        failure_nodes = chain_holder.get_next_nodes(curr_node_name=previous_node.name,
+                                                    condition='on-failure')
 
-        # Add success node (if any)
-        if success_node:
+        # Add success nodes (if any)
+        for success_node in success_nodes:
             dot.edge(previous_node.name, success_node.name, constraint='true',
                      color='green', label='on success')
             if success_node.name not in processed_nodes:
                 nodes.append(success_node)
                 processed_nodes.add(success_node.name)
 
-        # Add failure node (if any)
-        if failure_node:
+        # Add failure nodes (if any)
+        for failure_node in failure_nodes:
             dot.edge(previous_node.name, failure_node.name, constraint='true',
                      color='red', label='on failure')
             if failure_node.name not in processed_nodes: